@@ -0,0 +1 @@
+"""Performance benchmarks for the AWS Infrastructure Documentation Generator."""
@@ -0,0 +1,69 @@
+"""Benchmark the Diagrams-based and native diagram backends.
+
+Usage:
+    python -m benchmarks.bench_diagram_backends [node counts...]
+
+When the Graphviz ``dot`` binary is not installed the Diagrams path is
+measured without its layout step, which understates its cost.
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import diagrams
+
+from benchmarks.synthetic import generate_inventory
+from src.aws_infra_doc_gen.visualizer.diagram_generator import ArchitectureDiagramGenerator, _render_spec
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+def measure(func):
+    """Run func, returning (seconds, peak traced memory in MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+def bench(node_count: int, output_dir: str):
+    """Benchmark each backend on an inventory of roughly node_count nodes."""
+    resources = generate_inventory(int(node_count / 1.2))
+    generator = ArchitectureDiagramGenerator(output_dir, use_cache=False)
+    
+    for backend, fmt in [('diagrams', 'svg'), ('native', 'svg'), ('native', 'dot')]:
+        def run():
+            spec = generator._single_spec(resources, f"bench_{backend}.{fmt}")
+            spec['backend'] = backend
+            _render_spec(spec)
+        
+        seconds, peak_mb = measure(run)
+        print(f"{node_count:>8} nodes  {backend:<9} {fmt:<4} {seconds:8.2f}s  {peak_mb:8.1f} MB")
+
+def _write_source(diagram):
+    """Stand-in for Diagram.render that only writes the DOT source."""
+    with open(diagram.filename, 'w') as f:
+        f.write(diagram.dot.source)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    output_dir = tempfile.mkdtemp()
+    
+    if shutil.which('dot') is None:
+        print("Graphviz 'dot' not found: Diagrams timings exclude layout and rendering")
+        render = patch.object(diagrams.Diagram, 'render', _write_source)
+        render.start()
+    
+    try:
+        for size in sizes:
+            bench(size, output_dir)
+    finally:
+        shutil.rmtree(output_dir)
+
+if __name__ == '__main__':
+    main()
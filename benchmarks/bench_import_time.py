@@ -0,0 +1,97 @@
+"""Import-time regression benchmark for the CLI.
+
+Usage:
+    python -m benchmarks.bench_import_time [--baseline FILE]
+
+Measures, with ``python -X importtime`` in fresh interpreters, the imports
+paid by CLI startup and by each command, and fails when a command loads a
+heavy library it does not need. With ``--baseline`` the timings are compared
+against a saved run (written on first use) and a regression of more than 25%
+also fails.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+RUNS = 5
+TOLERANCE = 1.25
+
+HEAVY_MODULES = ['boto3', 'botocore', 'aiobotocore', 'aiohttp', 'diagrams', 'graphviz',
+                 'jinja2', 'markdown', 'git', 'weasyprint']
+
+# Modules each command imports, and the heavy libraries it may load
+SCENARIOS = {
+    'cli': ([], []),
+    'create_diagrams': (
+        ['src.aws_infra_doc_gen.visualizer.diagram_generator'],
+        [],
+    ),
+    'check_compliance': (
+        ['src.aws_infra_doc_gen.scanner.engine', 'src.aws_infra_doc_gen.scanner.aws_scanner',
+         'src.aws_infra_doc_gen.compliance.compliance_checker'],
+        ['boto3', 'botocore'],
+    ),
+    'track_changes': (
+        ['src.aws_infra_doc_gen.tracker.change_tracker'],
+        ['boto3', 'botocore'],
+    ),
+    'scan': (
+        ['src.aws_infra_doc_gen.service.scan_service', 'src.aws_infra_doc_gen.scanner.aws_scanner'],
+        ['boto3', 'botocore', 'jinja2', 'markdown'],
+    ),
+}
+
+def measure(modules):
+    """Import the CLI plus modules in a fresh interpreter.
+
+    Returns:
+        (total import time in ms, top-level packages imported)
+    """
+    code = "import src.aws_infra_doc_gen.__main__\n" + "".join(f"import {module}\n" for module in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    total_us = 0
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        packages.add(name.strip().split('.')[0])
+    return total_us / 1000, packages
+
+def main():
+    baseline_path = None
+    if '--baseline' in sys.argv:
+        baseline_path = sys.argv[sys.argv.index('--baseline') + 1]
+
+    timings = {}
+    failures = []
+    for scenario, (modules, allowed) in SCENARIOS.items():
+        runs = [measure(modules) for _ in range(RUNS)]
+        timings[scenario] = min(ms for ms, _ in runs)
+        loaded = sorted(set(HEAVY_MODULES) & runs[0][1] - set(allowed))
+        print(f"{scenario:<17} {timings[scenario]:8.1f} ms  heavy: {', '.join(loaded) or '-'}")
+        if loaded:
+            failures.append(f"{scenario} imports {', '.join(loaded)}")
+
+    if baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        for scenario, ms in timings.items():
+            if scenario in baseline and ms > baseline[scenario] * TOLERANCE:
+                failures.append(f"{scenario} import time {ms:.1f} ms exceeds baseline {baseline[scenario]:.1f} ms")
+    elif baseline_path:
+        with open(baseline_path, 'w') as f:
+            json.dump(timings, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {baseline_path}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the memory of dict resources against compact __slots__ records.
+
+Usage:
+    python -m benchmarks.bench_record_memory [sizes...]   (e.g. 100k 1m)
+
+Builds a synthetic inventory as the scanner returns it (one dict per
+resource), converts it with ``compact_inventory`` and reports the memory each
+representation retains, measured with tracemalloc, plus the time of a
+compliance check over each to show the cost of dict-style access to records.
+"""
+
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_scaled_inventory, parse_scale
+from src.aws_infra_doc_gen.compliance.compliance_checker import ComplianceChecker
+from src.aws_infra_doc_gen.records.resource_records import compact_inventory
+
+RULES_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'compliance_rules.yaml')
+DEFAULT_SIZES = ['100k']
+
+def retained(build) -> tuple:
+    """Run build under tracemalloc, returning its result and the bytes it keeps alive."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+def check_time(checker: ComplianceChecker, resources) -> float:
+    """Time one compliance check."""
+    start = time.perf_counter()
+    checker.check_compliance(resources)
+    return time.perf_counter() - start
+
+def bench(label: str):
+    """Compare both representations on an inventory of the given size."""
+    tracemalloc.start()
+    resources, dict_bytes = retained(lambda: generate_scaled_inventory(parse_scale(label)))
+    count = sum(len(resource_list) for resource_list in resources.values())
+    # The compact copy is measured once the dicts it replaces are gone
+    holder = {'resources': resources}
+    del resources
+    records, _ = retained(lambda: compact_inventory(holder.pop('resources')))
+    gc.collect()
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    resources = generate_scaled_inventory(parse_scale(label))
+    checker = ComplianceChecker(RULES_FILE)
+    dict_check = check_time(checker, resources)
+    record_check = check_time(checker, records)
+
+    print(f"{label:>6} ({count} resources)")
+    print(f"  dicts    {dict_bytes / 2**20:9.1f} MB  {dict_bytes / count:7.0f} B/resource  "
+          f"compliance {dict_check:6.2f}s")
+    print(f"  records  {record_bytes / 2**20:9.1f} MB  {record_bytes / count:7.0f} B/resource  "
+          f"compliance {record_check:6.2f}s")
+    print(f"  saved    {1 - record_bytes / dict_bytes:9.1%}")
+
+def main():
+    # The shipped rules log an error per resource some rules cannot evaluate
+    logging.disable(logging.ERROR)
+    for label in sys.argv[1:] or DEFAULT_SIZES:
+        bench(label)
+
+if __name__ == '__main__':
+    main()
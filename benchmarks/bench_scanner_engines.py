@@ -0,0 +1,156 @@
+"""Benchmark the sync and async scanner engines against a local moto server.
+
+Usage:
+    python -m benchmarks.bench_scanner_engines [bucket count] [function count] [latency ms]
+
+Starts ``moto.server`` in a subprocess (``pip install "moto[server]"``), seeds
+it with EC2 instances, RDS instances, S3 buckets and Lambda functions whose
+roles carry inline policies, then times a full scan with each engine. Both
+engines reach the server through ``AWS_ENDPOINT_URL``.
+
+moto answers in well under a millisecond, so every call is delayed by a
+simulated round-trip latency (default 50ms, typical of real AWS API calls)
+before it is sent.
+"""
+
+import asyncio
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import zipfile
+
+import boto3
+
+from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner
+from src.aws_infra_doc_gen.scanner.async_scanner import AsyncAWSResourceScanner
+
+REGION = 'us-east-1'
+RESOURCE_TYPES = ['ec2', 'rds', 's3', 'lambda']
+
+def _free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(port: int) -> subprocess.Popen:
+    """Start moto.server and wait until it accepts connections."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'moto.server', '-p', str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("moto server did not start")
+
+def seed(bucket_count: int, function_count: int):
+    """Create the benchmark inventory on the moto server."""
+    session = boto3.Session(region_name=REGION)
+
+    ec2 = session.client('ec2')
+    image_id = ec2.describe_images()['Images'][0]['ImageId']
+    ec2.run_instances(ImageId=image_id, MinCount=50, MaxCount=50, InstanceType='t3.micro')
+
+    rds = session.client('rds')
+    for i in range(5):
+        rds.create_db_instance(
+            DBInstanceIdentifier=f"db-{i}", DBInstanceClass='db.t3.micro', Engine='postgres',
+            AllocatedStorage=20, MasterUsername='admin', MasterUserPassword='password123'
+        )
+
+    s3 = session.client('s3')
+    for i in range(bucket_count):
+        s3.create_bucket(Bucket=f"bench-bucket-{i}")
+        if i % 2:
+            s3.put_bucket_encryption(
+                Bucket=f"bench-bucket-{i}",
+                ServerSideEncryptionConfiguration={
+                    'Rules': [{'ApplyServerSideEncryptionByDefault': {'SSEAlgorithm': 'AES256'}}]
+                }
+            )
+
+    iam = session.client('iam')
+    trust = json.dumps({
+        'Version': '2012-10-17',
+        'Statement': [{'Effect': 'Allow', 'Principal': {'Service': 'lambda.amazonaws.com'},
+                       'Action': 'sts:AssumeRole'}]
+    })
+    roles = []
+    for i in range(max(1, function_count // 10)):
+        role = iam.create_role(RoleName=f"bench-role-{i}", AssumeRolePolicyDocument=trust)['Role']
+        iam.put_role_policy(
+            RoleName=f"bench-role-{i}", PolicyName='s3',
+            PolicyDocument=json.dumps({
+                'Version': '2012-10-17',
+                'Statement': [{'Effect': 'Allow', 'Action': 's3:GetObject',
+                               'Resource': f"arn:aws:s3:::bench-bucket-{i}/*"}]
+            })
+        )
+        roles.append(role['Arn'])
+
+    code = io.BytesIO()
+    with zipfile.ZipFile(code, 'w') as archive:
+        archive.writestr('index.py', 'def handler(event, context):\n    return event\n')
+    lambda_client = session.client('lambda')
+    for i in range(function_count):
+        lambda_client.create_function(
+            FunctionName=f"bench-fn-{i}", Runtime='python3.11', Handler='index.handler',
+            Role=roles[i % len(roles)], Code={'ZipFile': code.getvalue()}
+        )
+
+def add_latency(scanner, latency: float):
+    """Delay every request the scanner sends by latency seconds."""
+    if isinstance(scanner, AsyncAWSResourceScanner):
+        async def delay(**kwargs):
+            await asyncio.sleep(latency)
+        scanner.session.register('before-send', delay)
+    else:
+        def delay(**kwargs):
+            time.sleep(latency)
+        scanner.session.events.register('before-send', delay)
+    return scanner
+
+def bench(label: str, scanner):
+    """Time one full scan, returning its resources."""
+    start = time.perf_counter()
+    resources = scanner.scan_resources(RESOURCE_TYPES)
+    elapsed = time.perf_counter() - start
+    counts = {resource_type: len(items) for resource_type, items in resources.items()}
+    print(f"{label:<6} {elapsed:7.2f}s  {counts}")
+    return resources
+
+def main():
+    bucket_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    function_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 50) / 1000
+
+    port = _free_port()
+    os.environ.update({
+        'AWS_ENDPOINT_URL': f"http://127.0.0.1:{port}",
+        'AWS_ACCESS_KEY_ID': 'testing',
+        'AWS_SECRET_ACCESS_KEY': 'testing',
+        'AWS_DEFAULT_REGION': REGION,
+    })
+    server = start_server(port)
+    try:
+        seed(bucket_count, function_count)
+        print(f"{bucket_count} buckets, {function_count} functions, {latency * 1000:.0f}ms latency per call")
+        sync_resources = bench('sync', add_latency(AWSResourceScanner(REGION), latency))
+        async_resources = bench('async', add_latency(AsyncAWSResourceScanner(REGION), latency))
+        if sync_resources != async_resources:
+            print("Warning: engines returned different resources")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark the scheduled engine against per-region scans on a skewed inventory.
+
+Usage:
+    python -m benchmarks.bench_scheduler [large region instances] [small regions] [latency ms] [workers]
+
+One region holds a large synthetic inventory (default 20000 EC2 instances,
+with RDS, S3 and Lambda scaled to match) and the others a tiny one, served
+by in-process fakes (``benchmarks.fake_aws``) that sleep for the latency on
+every call and page. The scan is timed:
+
+- ``sequential``: the sync engine, one region after another
+- ``per-region``: the sync engine, every region on its own thread
+- ``scheduled``: ``ScheduledScanner`` on a cold start, then again with the
+  first run's job estimates
+
+and compared with the lower bound of the total calls times the latency,
+spread over the workers.
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_aws import FakeAWS, FakeClientFactory
+from benchmarks.synthetic import generate_inventory
+from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner
+from src.aws_infra_doc_gen.scanner.scheduled_scanner import ScheduledScanner
+
+RESOURCE_TYPES = ['ec2', 'rds', 's3', 'lambda']
+
+def scan_region(factory, region: str):
+    return AWSResourceScanner(region, client_factory=factory).scan_resources(RESOURCE_TYPES)
+
+def timed(label: str, fakes, scan) -> float:
+    """Time one scan, printing its wall time and the calls it made."""
+    for fake in fakes.values():
+        fake.calls = 0
+    start = time.perf_counter()
+    scan()
+    elapsed = time.perf_counter() - start
+    calls = sum(fake.calls for fake in fakes.values())
+    print(f"{label:<18} {elapsed:7.2f}s  {calls} calls")
+    return elapsed
+
+def main():
+    large = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    small_regions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 32
+
+    regions = ['us-east-1'] + [f"region-{i}" for i in range(small_regions)]
+    fakes = {region: FakeAWS(generate_inventory(large if region == 'us-east-1' else 20, seed=i), latency)
+             for i, region in enumerate(regions)}
+    factory = FakeClientFactory(regions=fakes)
+    print(f"{len(regions)} regions, {large} instances in us-east-1, {latency * 1000:.0f}ms latency, "
+          f"{workers} workers")
+
+    timed('sequential', fakes, lambda: [scan_region(factory, region) for region in regions])
+    with ThreadPoolExecutor(len(regions)) as pool:
+        timed('per-region', fakes, lambda: list(pool.map(lambda region: scan_region(factory, region), regions)))
+
+    scanner = ScheduledScanner(regions, max_workers=workers, client_factory=factory)
+    timed('scheduled (cold)', fakes, lambda: scanner.scan_resources(RESOURCE_TYPES))
+    scanner.clear_cache()
+    timed('scheduled (warm)', fakes, lambda: scanner.scan_resources(RESOURCE_TYPES))
+    calls = sum(fake.calls for fake in fakes.values())
+    print(f"{'lower bound':<18} {calls * latency / workers:7.2f}s  ({scanner.units} units)")
+
+if __name__ == '__main__':
+    main()
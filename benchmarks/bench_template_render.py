@@ -0,0 +1,81 @@
+"""Benchmark markdown rendering of the single-document template.
+
+Usage:
+    python -m benchmarks.bench_template_render [resource counts...]
+
+Compares the previous setup (templates compiled on every run, mtime checks on
+every include, ``tojson(indent=2)`` per resource) with the bytecode cache and
+the ``resource_json`` serializer.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from jinja2.utils import htmlsafe_json_dumps
+
+from benchmarks.synthetic import generate_inventory
+from src.aws_infra_doc_gen.documentation.doc_generator import DocumentationGenerator
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+DEFAULT_SIZES = [100000]
+
+def _tojson(value):
+    """The serialization the template used before resource_json."""
+    return htmlsafe_json_dumps(value, indent=2, sort_keys=True)
+
+def _baseline(output_dir: str) -> DocumentationGenerator:
+    """Build a generator configured the way it was before the optimizations."""
+    generator = DocumentationGenerator(output_dir, TEMPLATE_DIR, incremental=False, template_cache=False)
+    generator.jinja_env.auto_reload = True
+    generator.jinja_env.filters['resource_json'] = _tojson
+    return generator
+
+def _optimized(output_dir: str) -> DocumentationGenerator:
+    """Build a generator with the bytecode cache and fast serializer."""
+    return DocumentationGenerator(output_dir, TEMPLATE_DIR, incremental=False)
+
+def load_templates(generator: DocumentationGenerator) -> float:
+    """Time loading (compiling or reading from cache) every template."""
+    start = time.perf_counter()
+    for name in generator.jinja_env.list_templates():
+        generator.jinja_env.get_template(name)
+    return time.perf_counter() - start
+
+def render(generator: DocumentationGenerator, resources) -> float:
+    """Time streaming the single document to markdown."""
+    start = time.perf_counter()
+    chunks = generator._generate_markdown(resources)
+    generator._write_outputs(os.path.join(generator.output_dir, 'documentation'), chunks, ['markdown'])
+    return time.perf_counter() - start
+
+def bench(resource_count: int, output_dir: str):
+    """Benchmark both configurations on an inventory of roughly resource_count resources."""
+    resources = generate_inventory(int(resource_count / 1.2))
+
+    # Warm the bytecode cache, as a previous run would have
+    load_templates(_optimized(output_dir))
+
+    for label, factory in [('before', _baseline), ('after', _optimized)]:
+        load_seconds = load_templates(factory(output_dir))
+        render_seconds = render(factory(output_dir), resources)
+        print(f"{resource_count:>8} resources  {label:<6}  load {load_seconds * 1000:7.1f}ms  "
+              f"render {render_seconds:7.2f}s")
+
+    with open(os.path.join(output_dir, 'documentation.md')) as f:
+        size_mb = sum(len(line) for line in f) / (1024 * 1024)
+    print(f"{resource_count:>8} resources  output {size_mb:.1f} MB")
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    output_dir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            bench(size, output_dir)
+    finally:
+        shutil.rmtree(output_dir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""In-process fake AWS APIs serving a synthetic inventory, with injected latency.
+
+``FakeAWS`` answers the calls the scanners make from a synthetic inventory
+(see ``benchmarks.synthetic``), sleeping for a simulated round trip on every
+call and every page. ``FakeClientFactory`` plugs it into
+``AWSResourceScanner`` and ``FakeAsyncScanner`` into the asyncio engine, so
+both engines can be timed at any scale without a network or moto.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Any, Optional
+
+from botocore.exceptions import ClientError
+
+from src.aws_infra_doc_gen.scanner.async_scanner import AsyncAWSResourceScanner
+
+# Page sizes of the paginated operations (the AWS maximums)
+PAGE_SIZES = {'describe_instances': 1000, 'describe_db_instances': 100, 'list_functions': 50}
+
+# Availability zones the instances are spread over, round robin
+ZONES = ['zone-a', 'zone-b', 'zone-c']
+
+class FakeAWS:
+    """API responses for a synthetic inventory."""
+
+    def __init__(self, resources: Dict[str, List[Dict[str, Any]]], latency: float = 0.001):
+        """Initialize the fake.
+
+        Args:
+            resources: Inventory shaped like the scanner's output
+            latency: Seconds every call and page takes
+        """
+        self.latency = latency
+        self.calls = 0
+        self.items = {
+            'describe_instances': [
+                self._reservation(instance, ZONES[index % len(ZONES)])
+                for index, instance in enumerate(resources.get('ec2', []))
+            ],
+            'describe_db_instances': [self._db_instance(instance) for instance in resources.get('rds', [])],
+            'list_functions': [self._function(function) for function in resources.get('lambda', [])],
+        }
+        self.buckets = {bucket['name']: bucket for bucket in resources.get('s3', [])}
+        self.role_policies = {}
+        for function in resources.get('lambda', []):
+            role_name = function['role'].split('/')[-1]
+            self.role_policies.setdefault(role_name, set()).update(function.get('policy_resources', []))
+
+    def pages(self, operation: str, **kwargs) -> List[Dict[str, Any]]:
+        """Split a paginated operation's items into response pages.
+
+        An availability-zone filter on describe_instances is honored.
+        """
+        if operation == 'list_role_policies':
+            return [{'PolicyNames': ['access'] if kwargs['RoleName'] in self.role_policies else []}]
+        if operation == 'list_attached_role_policies':
+            return [{'AttachedPolicies': []}]
+        key = {'describe_instances': 'Reservations', 'describe_db_instances': 'DBInstances',
+               'list_functions': 'Functions'}[operation]
+        items = self.items[operation]
+        for condition in kwargs.get('Filters', []):
+            if condition['Name'] == 'availability-zone':
+                items = [item for item in items
+                         if item['Instances'][0]['Placement']['AvailabilityZone'] in condition['Values']]
+        size = PAGE_SIZES[operation]
+        return [{key: items[start:start + size]} for start in range(0, max(len(items), 1), size)]
+
+    def respond(self, operation: str, **kwargs) -> Dict[str, Any]:
+        """Answer a non-paginated call."""
+        self.calls += 1
+        if operation == 'describe_availability_zones':
+            return {'AvailabilityZones': [{'ZoneName': zone, 'State': 'available'} for zone in ZONES]}
+        if operation == 'list_buckets':
+            return {'Buckets': [
+                {'Name': name, 'CreationDate': bucket['creation_date']} for name, bucket in self.buckets.items()
+            ]}
+        if operation == 'get_bucket_encryption':
+            encryption = self.buckets[kwargs['Bucket']]['encryption']
+            if encryption is None:
+                raise ClientError(
+                    {'Error': {'Code': 'ServerSideEncryptionConfigurationNotFoundError'}}, 'GetBucketEncryption'
+                )
+            return {'ServerSideEncryptionConfiguration': encryption}
+        if operation == 'get_bucket_location':
+            return {'LocationConstraint': self.buckets[kwargs['Bucket']]['location']}
+        if operation == 'get_role_policy':
+            return {'PolicyDocument': {'Statement': [
+                {'Effect': 'Allow', 'Action': '*', 'Resource': sorted(self.role_policies[kwargs['RoleName']])}
+            ]}}
+        raise NotImplementedError(operation)
+
+    def _reservation(self, instance: Dict[str, Any], zone: str) -> Dict[str, Any]:
+        return {'Instances': [{
+            'InstanceId': instance['id'],
+            'InstanceType': instance['type'],
+            'State': {'Name': instance['state']},
+            'VpcId': instance['vpc_id'],
+            'SubnetId': instance['subnet_id'],
+            'PrivateIpAddress': instance.get('private_ip'),
+            'Tags': instance['tags'],
+            'SecurityGroups': instance['security_groups'],
+            'LaunchTime': instance['launch_time'],
+            'Placement': {'AvailabilityZone': zone},
+        }]}
+
+    def _db_instance(self, instance: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'DBInstanceIdentifier': instance['identifier'],
+            'DBInstanceClass': instance['class'],
+            'Engine': instance['engine'],
+            'DBInstanceStatus': instance['status'],
+            'Endpoint': instance['endpoint'],
+            'MultiAZ': instance['multi_az'],
+            'VpcSecurityGroups': [{'VpcSecurityGroupId': sg} for sg in instance['vpc_security_groups']],
+            'DBSubnetGroup': {
+                'VpcId': instance['vpc_id'],
+                'Subnets': [{'SubnetIdentifier': subnet_id} for subnet_id in instance['subnet_ids']],
+            },
+            'StorageType': instance['storage']['type'],
+            'AllocatedStorage': instance['storage']['size'],
+            'StorageEncrypted': instance['storage']['encrypted'],
+        }
+
+    def _function(self, function: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'FunctionName': function['name'],
+            'Runtime': function['runtime'],
+            'Handler': function['handler'],
+            'Role': function['role'],
+            'MemorySize': function['memory'],
+            'Timeout': function['timeout'],
+            'LastModified': function['last_modified'],
+            'VpcConfig': function['vpc_config'],
+        }
+
+class FakeClient:
+    """Blocking client over FakeAWS, standing in for a boto3 client."""
+
+    exceptions = SimpleNamespace(ClientError=ClientError)
+
+    def __init__(self, fake: FakeAWS):
+        self.fake = fake
+
+    def get_paginator(self, operation: str):
+        fake = self.fake
+
+        def paginate(**kwargs):
+            for page in fake.pages(operation, **kwargs):
+                fake.calls += 1
+                time.sleep(fake.latency)
+                yield page
+
+        return SimpleNamespace(paginate=paginate)
+
+    def __getattr__(self, operation: str):
+        def call(**kwargs):
+            time.sleep(self.fake.latency)
+            return self.fake.respond(operation, **kwargs)
+        return call
+
+class FakeClientFactory:
+    """Client factory handing out FakeClients, for AWSResourceScanner."""
+
+    def __init__(self, fake: Optional[FakeAWS] = None, regions: Optional[Dict[str, FakeAWS]] = None):
+        """Initialize the factory.
+
+        Args:
+            fake: Fake serving every region
+            regions: Separate fakes by region, instead of a single fake
+        """
+        self.fake = fake
+        self.regions = regions
+
+    def client(self, service: str, region=None, session=None) -> FakeClient:
+        return FakeClient(self.regions[region] if self.regions is not None else self.fake)
+
+class FakeAsyncClient:
+    """Asyncio client over FakeAWS, standing in for an aiobotocore client."""
+
+    def __init__(self, fake: FakeAWS):
+        self.fake = fake
+
+    def get_paginator(self, operation: str):
+        fake = self.fake
+
+        async def paginate(**kwargs):
+            for page in fake.pages(operation, **kwargs):
+                fake.calls += 1
+                await asyncio.sleep(fake.latency)
+                yield page
+
+        return SimpleNamespace(paginate=paginate)
+
+    def __getattr__(self, operation: str):
+        async def call(**kwargs):
+            await asyncio.sleep(self.fake.latency)
+            return self.fake.respond(operation, **kwargs)
+        return call
+
+class FakeAsyncScanner(AsyncAWSResourceScanner):
+    """Asyncio scanner whose clients are FakeAsyncClients.
+
+    The per-service semaphores are kept, so concurrency limits apply as in a
+    real scan.
+    """
+
+    def __init__(self, fake: FakeAWS, region: str, **kwargs):
+        super().__init__(region, **kwargs)
+        self.fake = fake
+
+    async def _client(self, service: str):
+        if service not in self._limits:
+            limit = self.service_concurrency.get(service, self.max_concurrency)
+            self._limits[service] = asyncio.Semaphore(limit)
+        return FakeAsyncClient(self.fake)
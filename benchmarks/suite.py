@@ -0,0 +1,226 @@
+"""Benchmark suite over synthetic inventories, with regression tracking.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1k,100k,1m] [--only NAME,...] [--repeat N]
+                               [--latency MS] [--history FILE] [--threshold PCT] [--no-record]
+
+Times each subsystem on synthetic inventories (``benchmarks.synthetic``) of
+the requested sizes:
+
+- ``compliance``: ``ComplianceChecker.check_compliance`` with the shipped rules
+- ``compare_snapshots``: ``ChangeTracker._compare_snapshots`` against a snapshot
+  with 1% of the resources changed
+- ``generate_markdown``: rendering the single-document template
+- ``diagram_grouping``: building the tiered diagram specs (layout, no render)
+- ``json_serialization``: writing ``scan_results.json``
+- ``scan_sync`` / ``scan_async``: both scanner engines against in-process fake
+  clients that sleep ``--latency`` per call (``benchmarks.fake_aws``)
+
+Each benchmark keeps the best of ``--repeat`` runs (fewer once a benchmark has
+used its time budget). Results are appended to the history file with the
+commit and machine, and every result is compared with the median of the last
+runs on the same machine and latency; a slowdown beyond ``--threshold`` (and
+beyond a few milliseconds) is reported as a regression and makes the suite exit
+non-zero.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+
+from benchmarks.fake_aws import FakeAWS, FakeClientFactory, FakeAsyncScanner
+from benchmarks.synthetic import generate_scaled_inventory, mutate_inventory, parse_scale
+from src.aws_infra_doc_gen.compliance.compliance_checker import ComplianceChecker
+from src.aws_infra_doc_gen.documentation.doc_generator import DocumentationGenerator
+from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner
+from src.aws_infra_doc_gen.service.serialization import datetime_converter
+from src.aws_infra_doc_gen.tracker.change_tracker import ChangeTracker
+from src.aws_infra_doc_gen.visualizer.diagram_generator import ArchitectureDiagramGenerator
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+TEMPLATE_DIR = os.path.join(ROOT, 'templates')
+RULES_FILE = os.path.join(ROOT, 'config', 'compliance_rules.yaml')
+DEFAULT_HISTORY = os.path.join(ROOT, '.benchmark_history.jsonl')
+DEFAULT_SIZES = '1k,100k'
+REGION = 'us-east-1'
+RESOURCE_TYPES = ['ec2', 'rds', 's3', 'lambda']
+
+# Runs compared against, and seconds after which a benchmark stops repeating
+BASELINE_RUNS = 5
+TIME_BUDGET = 30
+
+# Fast benchmarks repeat until they have run this long, to steady the minimum
+MIN_SAMPLE_TIME = 1.0
+
+# Slowdowns smaller than this many seconds are noise, whatever the percentage
+MIN_REGRESSION = 0.005
+
+def bench_compliance(resources, options):
+    checker = ComplianceChecker(RULES_FILE)
+    return lambda: checker.check_compliance(resources)
+
+def bench_compare_snapshots(resources, options):
+    old, new = {'resources': resources}, {'resources': mutate_inventory(resources)}
+    # Comparing needs no storage backend
+    tracker = ChangeTracker.__new__(ChangeTracker)
+    return lambda: tracker._compare_snapshots(old, new)
+
+def bench_generate_markdown(resources, options):
+    generator = DocumentationGenerator(options.workdir, TEMPLATE_DIR, incremental=False)
+    generator.jinja_env.get_template('resources.md.j2')
+    return lambda: deque(generator._generate_markdown(resources), maxlen=0)
+
+def bench_diagram_grouping(resources, options):
+    generator = ArchitectureDiagramGenerator(options.workdir, use_cache=False)
+    return lambda: generator._build_tiered_specs(resources, 'svg', REGION)
+
+def bench_json_serialization(resources, options):
+    return lambda: json.dumps(resources, default=datetime_converter, indent=4)
+
+def bench_scan_sync(resources, options):
+    scanner = AWSResourceScanner(REGION, client_factory=FakeClientFactory(FakeAWS(resources, options.latency)))
+
+    def scan():
+        scanner.clear_cache()
+        scanner.scan_resources(RESOURCE_TYPES)
+    return scan
+
+def bench_scan_async(resources, options):
+    scanner = FakeAsyncScanner(FakeAWS(resources, options.latency), REGION)
+
+    def scan():
+        scanner.clear_cache()
+        scanner.scan_resources(RESOURCE_TYPES)
+    return scan
+
+BENCHMARKS = {
+    'compliance': bench_compliance,
+    'compare_snapshots': bench_compare_snapshots,
+    'generate_markdown': bench_generate_markdown,
+    'diagram_grouping': bench_diagram_grouping,
+    'json_serialization': bench_json_serialization,
+    'scan_sync': bench_scan_sync,
+    'scan_async': bench_scan_async,
+}
+
+def best_time(run, repeat: int) -> float:
+    """Best of at least repeat runs (or MIN_SAMPLE_TIME), stopping once TIME_BUDGET is spent."""
+    times = []
+    spent = 0.0
+    # As timeit does: collections triggered by earlier benchmarks' garbage are noise
+    gc.collect()
+    gc.disable()
+    try:
+        while not times or (spent < TIME_BUDGET and (len(times) < repeat or spent < MIN_SAMPLE_TIME)):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+            spent += times[-1]
+    finally:
+        gc.enable()
+    return min(times)
+
+def load_history(path: str):
+    """Read the recorded runs, oldest first."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def baseline(history, key: str, machine: str, latency_ms: float):
+    """Median of the last BASELINE_RUNS results for key on this machine and latency."""
+    values = [
+        run['results'][key] for run in history
+        if run['machine'] == machine and run.get('latency_ms') == latency_ms and key in run['results']
+    ]
+    return statistics.median(values[-BASELINE_RUNS:]) if values else None
+
+def git_commit():
+    """Short hash of the checked-out commit, if in a git repository."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Inventory sizes, e.g. 1k,100k,1m')
+    parser.add_argument('--only', help='Comma-separated benchmarks to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the best is kept')
+    parser.add_argument('--latency', type=float, default=1.0, help='Simulated API latency in ms')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='File results are appended to')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='Slowdown over the baseline, in percent, reported as a regression')
+    parser.add_argument('--no-record', action='store_true', help='Compare without appending to the history')
+    options = parser.parse_args()
+    options.latency /= 1000
+    return options
+
+def main():
+    options = parse_args()
+    names = options.only.split(',') if options.only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        sys.exit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    # The shipped rules log an error per resource some rules cannot evaluate
+    logging.disable(logging.ERROR)
+    machine = platform.node()
+    history = load_history(options.history)
+    results = {}
+    regressions = []
+    options.workdir = tempfile.mkdtemp()
+    try:
+        for label in options.sizes.split(','):
+            resources = generate_scaled_inventory(parse_scale(label))
+            total = sum(len(resource_list) for resource_list in resources.values())
+            print(f"{label}: {total} resources")
+            for name in names:
+                key = f"{name}@{label.lower()}"
+                seconds = best_time(BENCHMARKS[name](resources, options), options.repeat)
+                results[key] = seconds
+                reference = baseline(history, key, machine, options.latency * 1000)
+                line = f"  {name:<20} {seconds:10.3f}s"
+                if reference:
+                    change = seconds / reference - 1
+                    line += f"  baseline {reference:10.3f}s  {change:+7.1%}"
+                    if change * 100 > options.threshold and seconds - reference > MIN_REGRESSION:
+                        line += "  REGRESSION"
+                        regressions.append(key)
+                print(line, flush=True)
+            del resources
+    finally:
+        shutil.rmtree(options.workdir)
+
+    if not options.no_record:
+        with open(options.history, 'a') as f:
+            f.write(json.dumps({
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'commit': git_commit(),
+                'machine': machine,
+                'python': platform.python_version(),
+                'latency_ms': options.latency * 1000,
+                'results': results,
+                'regressions': regressions,
+            }) + '\n')
+        print(f"Results appended to {options.history}")
+
+    if regressions:
+        print(f"Regressions over {options.threshold:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Synthetic inventory generator for benchmarks."""
+
+import random
+from typing import Dict, List, Any
+
+def generate_inventory(ec2_count: int, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate an inventory shaped like the scanner's output.
+    
+    RDS, Lambda and S3 counts scale with the number of EC2 instances, spread
+    over a VPC/subnet topology of roughly 50 instances per subnet.
+    
+    Args:
+        ec2_count: Number of EC2 instances
+        seed: Random seed, so runs are comparable
+    """
+    rng = random.Random(seed)
+    subnet_count = max(1, ec2_count // 50)
+    subnets = [(f"vpc-{i // 8:04x}", f"subnet-{i:06x}") for i in range(subnet_count)]
+    security_groups = [f"sg-{i:06x}" for i in range(max(1, subnet_count * 2))]
+    
+    resources = {'ec2': [], 'rds': [], 'lambda': [], 's3': []}
+    for i in range(ec2_count):
+        vpc_id, subnet_id = rng.choice(subnets)
+        resources['ec2'].append({
+            'id': f"i-{i:012x}",
+            'type': rng.choice(['t3.micro', 'm5.large', 'c5.xlarge']),
+            'state': 'running',
+            'vpc_id': vpc_id,
+            'subnet_id': subnet_id,
+            'private_ip': f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            'tags': [{'Key': 'Name', 'Value': f"web-{i}"}, {'Key': 'Owner', 'Value': f"team-{i % 7}"}],
+            'security_groups': [{'GroupId': rng.choice(security_groups), 'GroupName': 'app'}],
+            'launch_time': '2024-01-01T00:00:00+00:00',
+        })
+    
+    for i in range(max(1, ec2_count // 20)):
+        vpc_id, subnet_id = rng.choice(subnets)
+        resources['rds'].append({
+            'identifier': f"db-{i}",
+            'class': 'db.t3.micro',
+            'engine': 'postgres',
+            'status': 'available',
+            'endpoint': {'Address': f"db-{i}.example.rds.amazonaws.com", 'Port': 5432},
+            'multi_az': i % 2 == 0,
+            'vpc_security_groups': [rng.choice(security_groups)],
+            'vpc_id': vpc_id,
+            'subnet_ids': [subnet_id],
+            'storage': {'type': 'gp2', 'size': 20, 'encrypted': i % 3 != 0},
+        })
+    
+    for i in range(max(1, ec2_count // 10)):
+        vpc_id, subnet_id = rng.choice(subnets)
+        resources['lambda'].append({
+            'name': f"fn-{i}",
+            'runtime': 'python3.11',
+            'handler': 'index.handler',
+            'role': f"arn:aws:iam::123456789012:role/fn-{i % 10}",
+            'memory': 128,
+            'timeout': 30,
+            'last_modified': '2024-01-01T00:00:00.000+0000',
+            'vpc_config': {
+                'VpcId': vpc_id,
+                'SubnetIds': [subnet_id],
+                'SecurityGroupIds': [rng.choice(security_groups)],
+            },
+            'policy_resources': [f"arn:aws:s3:::bucket-{i % 50}/*"],
+        })
+    
+    for i in range(max(1, ec2_count // 20)):
+        resources['s3'].append({
+            'name': f"bucket-{i}",
+            'creation_date': '2024-01-01T00:00:00+00:00',
+            'encryption': None if i % 4 == 0 else {'Rules': []},
+            'location': 'us-east-1',
+        })
+    
+    return resources
+
+# Named inventory scales, in total resources
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+
+# Total resources per EC2 instance (RDS 1/20, Lambda 1/10, S3 1/20)
+RESOURCES_PER_INSTANCE = 1.2
+
+def parse_scale(value: str) -> int:
+    """Parse a scale name (e.g. '100k') or plain resource count."""
+    return SCALES.get(value.lower()) or int(value)
+
+def generate_scaled_inventory(resource_count: int, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """Generate an inventory of roughly resource_count resources in total."""
+    return generate_inventory(max(1, int(resource_count / RESOURCES_PER_INSTANCE)), seed)
+
+def mutate_inventory(resources: Dict[str, List[Dict[str, Any]]], change_rate: float = 0.01,
+                     seed: int = 1) -> Dict[str, List[Dict[str, Any]]]:
+    """Derive a later snapshot of an inventory.
+    
+    Of every resource type, change_rate of the resources are modified, half
+    that many removed and half that many added. Unchanged resources are shared
+    with the original inventory.
+    
+    Args:
+        resources: Inventory to start from
+        change_rate: Fraction of resources modified
+        seed: Random seed, so runs are comparable
+    """
+    rng = random.Random(seed)
+    mutated = {}
+    for resource_type, resource_list in resources.items():
+        changed = list(resource_list)
+        count = max(1, int(len(changed) * change_rate))
+        for position in rng.sample(range(len(changed)), min(count, len(changed))):
+            resource = dict(changed[position])
+            resource['tags'] = list(resource.get('tags', [])) + [{'Key': 'Changed', 'Value': 'true'}]
+            changed[position] = resource
+        removed = min(count // 2, len(changed))
+        added = [dict(resource) for resource in changed[:removed]]
+        for number, resource in enumerate(added):
+            for field in ('id', 'identifier', 'name'):
+                if field in resource:
+                    resource[field] = f"{resource[field]}-new{number}"
+        mutated[resource_type] = changed[removed:] + added
+    return mutated
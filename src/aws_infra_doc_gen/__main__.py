@@ -3,37 +3,55 @@ import yaml
 import os
 import json
 from datetime import datetime
-from .scanner.aws_scanner import AWSResourceScanner
-from .visualizer.diagram_generator import ArchitectureDiagramGenerator
-from .documentation.doc_generator import DocumentationGenerator
-from .tracker.change_tracker import ChangeTracker
-from .compliance.compliance_checker import ComplianceChecker
+from .service.serialization import convert_datetimes, datetime_converter
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Custom datetime converter function to serialize datetime objects to ISO format
-def datetime_converter(o):
-    if isinstance(o, datetime):
-        return o.isoformat()  # Convert datetime to ISO format string
-    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
-
-# Utility function to ensure that all datetime objects are converted within a dict or list
-def convert_datetimes(data):
-    if isinstance(data, dict):
-        return {key: convert_datetimes(value) for key, value in data.items()}
-    elif isinstance(data, list):
-        return [convert_datetimes(item) for item in data]
-    elif isinstance(data, datetime):
-        return datetime_converter(data)
-    else:
-        return data
+# Commands import their subsystems on first use, so each command only pays for
+# the libraries it needs (boto3, diagrams, jinja2, git, aiobotocore, ...)
+
+# Functions listed after a --profile run
+PROFILE_TOP = 25
 
 @click.group()
-def cli():
+@click.option('--trace', type=click.Path(dir_okay=False),
+              help='Write a Chrome trace of the run (open in chrome://tracing or ui.perfetto.dev)')
+@click.option('--timings', is_flag=True,
+              help='Log the time and counts of every traced step when the command ends')
+@click.option('--profile', type=click.Path(dir_okay=False),
+              help='Profile the command with cProfile and save the stats to this file')
+@click.pass_context
+def cli(ctx, trace, timings, profile):
     """AWS Infrastructure Documentation Generator CLI."""
-    pass
+    if trace or timings:
+        from .tracing.tracer import get_tracer
+        tracer = get_tracer()
+        tracer.enable()
+        
+        def report():
+            if timings and tracer.spans:
+                logger.info(f"Timings:\n{tracer.format_summary()}")
+            if trace:
+                tracer.export_chrome_trace(trace)
+        
+        ctx.call_on_close(report)
+    
+    if profile:
+        import cProfile
+        import pstats
+        import sys
+        profiler = cProfile.Profile()
+        
+        def save_profile():
+            profiler.disable()
+            profiler.dump_stats(profile)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(PROFILE_TOP)
+            logger.info(f"Profile saved to {profile} (inspect with python -m pstats)")
+        
+        ctx.call_on_close(save_profile)
+        profiler.enable()
 
 @cli.command()
 @click.option('--config', '-c', type=click.Path(exists=True), required=True,
@@ -41,56 +59,13 @@ def cli():
 @click.option('--region', '-r', help='AWS region to scan')
 def scan(config, region):
     """Scan AWS infrastructure and generate documentation."""
+    from .service.scan_service import ScanService
+    
     try:
         with open(config, 'r') as f:
             config_data = yaml.safe_load(f)
         
-        region = region or config_data['aws'].get('regions', ['us-east-1'])[0]
-        
-        scanner = AWSResourceScanner(region)
-        diagram_gen = ArchitectureDiagramGenerator(config_data['output']['directory'])
-        doc_gen = DocumentationGenerator(
-            config_data['output']['directory'],
-            config_data['templates']['directory']
-        )
-        
-        resources = scanner.scan_resources(config_data['aws']['resources'])
-        resources = convert_datetimes(resources)
-
-        try:
-            raw_output_path = os.path.join(config_data['output']['directory'], 'scan_results.json')
-            with open(raw_output_path, 'w') as f:
-                json.dump(resources, f, default=datetime_converter, indent=4)
-        except KeyError as e:
-            print(f"Missing key in config data: {e}")
-        
-        for fmt in config_data['output']['diagrams']:
-            diagram_gen.generate_diagram(resources, f"architecture.{fmt}")
-        
-        doc_gen.generate_documentation(resources, config_data['output']['format'])
-        
-        if config_data.get('change_tracking', {}).get('enabled', False):
-            tracker = ChangeTracker(
-                storage_type=config_data['change_tracking']['storage'],
-                **config_data['change_tracking']['config']
-            )
-            tracker.save_snapshot(resources)
-        
-        if config_data.get('compliance', {}).get('enabled', False):
-            checker = ComplianceChecker(config_data['compliance']['rules_file'])
-            results = checker.check_compliance(resources)
-            
-            report = checker.generate_report(
-                results,
-                format=config_data['compliance'].get('report_format', 'json')
-            )
-            
-            report_path = os.path.join(
-                config_data['output']['directory'],
-                f"compliance_report.{config_data['compliance'].get('report_format', 'json')}"
-            )
-            with open(report_path, 'w') as f:
-                f.write(report)
+        ScanService(config_data, region).run()
         
         logger.info("Documentation generation completed successfully")
         
@@ -107,6 +82,8 @@ def scan(config, region):
               help='End time for change tracking (ISO format)')
 def track_changes(config, start_time, end_time):
     """Track infrastructure changes between two points in time."""
+    from .tracker.change_tracker import ChangeTracker
+    
     try:
         with open(config, 'r') as f:
             config_data = yaml.safe_load(f)
@@ -141,8 +118,12 @@ def track_changes(config, start_time, end_time):
 @cli.command()
 @click.option('--config', '-c', type=click.Path(exists=True), required=True,
               help='Path to configuration file')
-def check_compliance(config):
+@click.option('--from-store', is_flag=True,
+              help='Check the latest scan in the inventory store instead of scanning')
+def check_compliance(config, from_store):
     """Check infrastructure compliance and generate report."""
+    from .compliance.compliance_checker import ComplianceChecker
+    
     try:
         with open(config, 'r') as f:
             config_data = yaml.safe_load(f)
@@ -150,13 +131,16 @@ def check_compliance(config):
         if not config_data.get('compliance', {}).get('enabled', False):
             raise click.ClickException("Compliance checking is not enabled in config")
         
-        region = config_data['aws'].get('regions', ['us-east-1'])[0]
-        scanner = AWSResourceScanner(region)
-        resources = scanner.scan_resources(config_data['aws']['resources'])
-        resources = convert_datetimes(resources)
-        
         checker = ComplianceChecker(config_data['compliance']['rules_file'])
-        results = checker.check_compliance(resources)
+        if from_store:
+            results = checker.check_store(open_store(config_data))
+        else:
+            from .scanner.engine import create_scanner
+            region = config_data['aws'].get('regions', ['us-east-1'])[0]
+            scanner = create_scanner(config_data, region)
+            resources = scanner.scan_resources(config_data['aws']['resources'])
+            resources = convert_datetimes(resources)
+            results = checker.check_compliance(resources)
         
         report = checker.generate_report(
             results,
@@ -178,20 +162,30 @@ def check_compliance(config):
 
 @cli.command()
 @click.option('--input', '-i', type=click.Path(exists=True), required=True,
-              help='Path to existing scan results JSON file')
+              help='Path to existing scan results (JSON or inventory file)')
 @click.option('--output-dir', '-o', type=click.Path(), required=True,
               help='Directory to save the generated diagrams')
 @click.option('--formats', '-f', multiple=True, default=['png'],
               help='Diagram formats to generate (e.g., png, svg, pdf)')
-def create_diagrams(input, output_dir, formats):
+@click.option('--tiered', is_flag=True,
+              help='Generate an overview plus per-VPC and per-subnet drill-down diagrams')
+@click.option('--types', '-t', multiple=True,
+              help='Resource types to include (default: all); an inventory file only decodes these')
+def create_diagrams(input, output_dir, formats, tiered, types):
     """Generate architecture diagrams from existing scan results."""
+    from .visualizer.diagram_generator import ArchitectureDiagramGenerator
+    from .inventory.inventory_file import load_resources
+    
     try:
-        with open(input, 'r') as f:
-            resources = json.load(f)
+        resources = load_resources(input, types or None)
         
         diagram_gen = ArchitectureDiagramGenerator(output_dir)
         
         for fmt in formats:
+            if tiered:
+                paths = diagram_gen.generate_tiered_diagrams(resources, fmt)
+                logger.info(f"{len(paths)} {fmt} diagrams generated in {output_dir}")
+                continue
             diagram_name = f"architecture.{fmt}"
             diagram_gen.generate_diagram(resources, diagram_name)
             logger.info(f"Diagram generated: {os.path.join(output_dir, diagram_name)}")
@@ -202,5 +196,162 @@ def create_diagrams(input, output_dir, formats):
         logger.error(f"Error generating diagrams: {e}")
         raise click.ClickException(str(e))
 
+def open_store(config_data, path=None):
+    """Open the inventory store configured in config_data (or at path)."""
+    from .store.inventory_store import InventoryStore
+    
+    if path is None:
+        store_config = (config_data or {}).get('store', {})
+        path = store_config.get('path') or os.path.join(config_data['output']['directory'], 'inventory.db')
+    if not os.path.exists(path):
+        raise click.ClickException(f"No inventory store at {path}")
+    return InventoryStore(path)
+
+def parse_condition(text):
+    """Parse a --where filter: FIELD=VALUE, FIELD!=VALUE, FIELD>VALUE or FIELD<VALUE.
+    
+    Values are read as JSON when they parse (true, 3, null), else as strings.
+    """
+    for symbol, operator in [('!=', 'not_equals'), ('=', 'equals'), ('>', 'greater_than'), ('<', 'less_than')]:
+        field, found, value = text.partition(symbol)
+        if found and field:
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+            return field, (operator, value)
+    raise click.BadParameter(f"expected FIELD=VALUE, FIELD!=VALUE, FIELD>VALUE or FIELD<VALUE, got {text}")
+
+@cli.command()
+@click.option('--config', '-c', type=click.Path(exists=True),
+              help='Path to configuration file (locates the store)')
+@click.option('--db', type=click.Path(exists=True, dir_okay=False), help='Inventory store database')
+@click.option('--type', '-t', 'resource_type', help='Resource type')
+@click.option('--region', '-r', help='Region')
+@click.option('--vpc', 'vpc_id', help='VPC id')
+@click.option('--subnet', 'subnet_id', help='Subnet id')
+@click.option('--tag', 'tag_filters', multiple=True, help='Tag the resource must have: KEY or KEY=VALUE')
+@click.option('--without-tag', multiple=True, help='Tag key the resource must not have')
+@click.option('--where', '-w', 'conditions', multiple=True,
+              help='Field condition, e.g. storage.encrypted!=true (dotted fields are nested)')
+@click.option('--scan', 'scan_id', type=int, help='Scan to query (default: the latest)')
+@click.option('--limit', type=int, help='Maximum number of resources')
+@click.option('--count', 'count_only', is_flag=True, help='Print the number of matching resources')
+@click.option('--ids', 'ids_only', is_flag=True, help='Print the type and id of matching resources')
+def query(config, db, resource_type, region, vpc_id, subnet_id, tag_filters, without_tag, conditions,
+          scan_id, limit, count_only, ids_only):
+    """Query the inventory store, printing the matching resources as JSON."""
+    from .inventory.inventory_file import resource_id_of
+    
+    try:
+        if not config and not db:
+            raise click.ClickException("Either --config or --db is required")
+        config_data = None
+        if config:
+            with open(config, 'r') as f:
+                config_data = yaml.safe_load(f)
+        store = open_store(config_data, db)
+        
+        tags = {}
+        for tag in tag_filters:
+            key, found, value = tag.partition('=')
+            tags[key] = value if found else None
+        filters = {
+            'resource_type': resource_type,
+            'region': region,
+            'vpc_id': vpc_id,
+            'subnet_id': subnet_id,
+            'tags': tags,
+            'without_tags': list(without_tag),
+            'where': dict(parse_condition(condition) for condition in conditions),
+            'scan_id': scan_id,
+        }
+        
+        if count_only:
+            click.echo(store.count(**filters))
+        elif ids_only:
+            for found_type, resource in store.iter_resources(limit=limit, **filters):
+                click.echo(f"{found_type}\t{resource_id_of(resource)}")
+        else:
+            click.echo(json.dumps(store.resources(limit=limit, **filters), indent=4))
+        
+    except Exception as e:
+        logger.error(f"Error querying inventory store: {e}")
+        raise click.ClickException(str(e))
+
+@cli.command()
+@click.argument('source', type=click.Path(exists=True, dir_okay=False))
+@click.argument('destination', type=click.Path(dir_okay=False))
+def convert_inventory(source, destination):
+    """Convert scan results between JSON and the indexed inventory format.
+    
+    The direction follows SOURCE: a JSON file is converted to an inventory
+    file, and an inventory file back to JSON.
+    """
+    from .inventory.inventory_file import is_inventory_file, inventory_to_json, json_to_inventory
+    
+    try:
+        if is_inventory_file(source):
+            count = inventory_to_json(source, destination)
+        else:
+            count = json_to_inventory(source, destination)
+        logger.info(f"{count} resources converted to {destination}")
+        
+    except Exception as e:
+        logger.error(f"Error converting inventory: {e}")
+        raise click.ClickException(str(e))
+
+@cli.command()
+@click.option('--config', '-c', type=click.Path(exists=True), required=True,
+              help='Path to configuration file')
+@click.option('--region', '-r', help='AWS region to scan')
+@click.option('--interval', type=int,
+              help='Seconds between scheduled scans (default: daemon.interval from config)')
+@click.option('--host', default='127.0.0.1', help='Address for the HTTP API')
+@click.option('--port', '-p', type=int, help='Port for the HTTP API (default: daemon.port from config)')
+def serve(config, region, interval, host, port):
+    """Run as a daemon with scheduled scans and a local HTTP API."""
+    from .service.scan_service import ScanService
+    from .service.daemon import DocumentationDaemon
+    
+    try:
+        with open(config, 'r') as f:
+            config_data = yaml.safe_load(f)
+        
+        daemon_config = config_data.get('daemon', {})
+        daemon = DocumentationDaemon(
+            ScanService(config_data, region),
+            interval=interval if interval is not None else daemon_config.get('interval', 3600),
+            host=host,
+            port=port if port is not None else daemon_config.get('port', 8080)
+        )
+        daemon.serve_forever()
+        
+    except Exception as e:
+        logger.error(f"Error running daemon: {e}")
+        raise click.ClickException(str(e))
+
+@cli.command()
+@click.option('--config', '-c', type=click.Path(exists=True), required=True,
+              help='Path to configuration file')
+def worker(config):
+    """Scan the units a distributed coordinator publishes to the queue."""
+    from .distributed.coordinator import create_worker
+    from .distributed.work_queue import LocalQueue
+    
+    try:
+        with open(config, 'r') as f:
+            config_data = yaml.safe_load(f)
+        
+        scan_worker = create_worker(config_data)
+        if isinstance(scan_worker.queue, LocalQueue):
+            raise click.ClickException("A local queue is only reachable from the coordinator's process; "
+                                       "configure distributed.queue.type: redis")
+        scan_worker.run()
+    
+    except Exception as e:
+        logger.error(f"Error running worker: {e}")
+        raise click.ClickException(str(e))
+
 if __name__ == '__main__':
     cli()
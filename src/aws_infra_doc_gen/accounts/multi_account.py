@@ -0,0 +1,374 @@
+"""Multi-Account Scanning.
+
+This module fans a scan out over several accounts through assumed IAM roles.
+Every (account, region, resource type) is a work unit; units run on one
+shared thread pool, with a limit on the units in flight per account so a
+slow account holds at most its own share of the workers. An account whose
+role cannot be assumed, or whose units fail, is reported and skipped
+without stopping the others.
+
+Role credentials are cached per role and refreshed before they expire, and
+the resulting records are merged into one inventory tagged with their
+``account_id`` and ``region``.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Optional, Tuple, Callable
+import logging
+import boto3
+import botocore.session
+from botocore.credentials import RefreshableCredentials
+from botocore.exceptions import BotoCoreError, ClientError
+from ..clients.client_factory import ClientFactory, get_client_factory
+from ..scanner.aws_scanner import AWSResourceScanner
+from ..scanner.scheduled_scanner import GLOBAL_TYPES, region_of
+from ..tracing.tracer import get_tracer
+
+logger = logging.getLogger(__name__)
+
+# Work unit: (account id, region, resource type)
+WorkUnit = Tuple[str, str, str]
+
+# Seconds a failed AssumeRole is remembered before the role is tried again
+DEFAULT_FAILURE_TTL = 60.0
+
+class AccountUnavailable(Exception):
+    """Raised when an account's role cannot be assumed."""
+
+def account_of(role_arn: str) -> str:
+    """Get the account id of a role ARN (arn:aws:iam::<account>:role/<name>)."""
+    parts = role_arn.split(':')
+    if len(parts) < 6 or not parts[4]:
+        raise ValueError(f"Not a role ARN: {role_arn}")
+    return parts[4]
+
+def parse_accounts(entries: List[Any]) -> List[Dict[str, Any]]:
+    """Normalize the configured accounts.
+    
+    Args:
+        entries: Role ARNs, or dicts with ``role_arn`` and optionally ``name``
+            and ``external_id``
+    
+    Returns:
+        List of ``{'account_id', 'role_arn', 'name', 'external_id'}`` dicts
+    """
+    accounts = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'role_arn': entry}
+        accounts.append({
+            'account_id': account_of(entry['role_arn']),
+            'role_arn': entry['role_arn'],
+            'name': entry.get('name'),
+            'external_id': entry.get('external_id'),
+        })
+    return accounts
+
+class RoleSessions:
+    """Cache of boto3 sessions signing with assumed-role credentials.
+    
+    Each role is assumed once; its credentials refresh themselves ahead of
+    expiry, so a session stays usable for the life of the cache. A role that
+    cannot be assumed is retried once its failure expires.
+    """
+    
+    def __init__(self, session_name: str = 'aws-infra-doc-gen', duration: int = 3600,
+                 base_session: Optional[boto3.Session] = None,
+                 failure_ttl: float = DEFAULT_FAILURE_TTL):
+        """Initialize the cache.
+        
+        Args:
+            session_name: RoleSessionName of the assumed roles
+            duration: Requested credential lifetime in seconds
+            base_session: Session allowed to assume the roles (default: the
+                default credentials)
+            failure_ttl: Seconds a failed AssumeRole is remembered, so a
+                transient STS error does not disable the account for good
+        """
+        self.session_name = session_name
+        self.duration = duration
+        self.base_session = base_session or boto3.Session()
+        self.failure_ttl = failure_ttl
+        self._sessions = {}
+        self._failures = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+    
+    def session(self, role_arn: str, external_id: Optional[str] = None) -> boto3.Session:
+        """Get the session of a role, assuming it on first use.
+        
+        Raises:
+            AccountUnavailable: If the role cannot be assumed (remembered for
+                failure_ttl seconds, so the account's other units fail without
+                calling STS again)
+        """
+        with self._lock:
+            lock = self._locks.setdefault(role_arn, threading.Lock())
+        # Per-role lock: one slow STS call does not hold up other accounts
+        with lock:
+            failure = self._failures.get(role_arn)
+            if failure is not None:
+                expires, error = failure
+                if time.monotonic() < expires:
+                    raise error
+                self._failures.pop(role_arn, None)
+            if role_arn not in self._sessions:
+                try:
+                    credentials = RefreshableCredentials.create_from_metadata(
+                        metadata=self._assume(role_arn, external_id),
+                        refresh_using=lambda: self._assume(role_arn, external_id),
+                        method='sts-assume-role'
+                    )
+                except (ClientError, BotoCoreError) as e:
+                    error = AccountUnavailable(f"Cannot assume {role_arn}: {e}")
+                    self._failures[role_arn] = (time.monotonic() + self.failure_ttl, error)
+                    raise error from e
+                botocore_session = botocore.session.get_session()
+                botocore_session._credentials = credentials
+                self._sessions[role_arn] = boto3.Session(botocore_session=botocore_session)
+            return self._sessions[role_arn]
+    
+    def clear(self):
+        """Forget every session and remembered failure."""
+        with self._lock:
+            self._sessions = {}
+            self._failures = {}
+    
+    def forget_failures(self):
+        """Forget remembered failures so the next use retries their roles."""
+        with self._lock:
+            self._failures = {}
+    
+    def _assume(self, role_arn: str, external_id: Optional[str]) -> Dict[str, str]:
+        """Assume a role, returning its credentials in botocore's metadata format."""
+        kwargs = {'RoleArn': role_arn, 'RoleSessionName': self.session_name, 'DurationSeconds': self.duration}
+        if external_id:
+            kwargs['ExternalId'] = external_id
+        with get_tracer().span('sts.assume_role', role=role_arn):
+            credentials = self.base_session.client('sts').assume_role(**kwargs)['Credentials']
+        logger.debug(f"Assumed {role_arn} until {credentials['Expiration']}")
+        return {
+            'access_key': credentials['AccessKeyId'],
+            'secret_key': credentials['SecretAccessKey'],
+            'token': credentials['SessionToken'],
+            'expiry_time': credentials['Expiration'].isoformat()
+            if hasattr(credentials['Expiration'], 'isoformat') else credentials['Expiration'],
+        }
+
+class AccountScheduler:
+    """Runs work units on a shared pool with a per-account limit on units in flight.
+    
+    Accounts take turns for free workers, so every account makes progress
+    even while another has a long queue or slow calls.
+    """
+    
+    def __init__(self, max_workers: int = 32, account_concurrency: int = 4,
+                 timeout: Optional[float] = None):
+        """Initialize the scheduler.
+        
+        Args:
+            max_workers: Threads shared by every account
+            account_concurrency: Units of one account allowed in flight
+            timeout: Seconds after which units still queued or running are
+                reported as timed out and the run returns (default: no limit)
+        """
+        self.max_workers = max_workers
+        self.account_concurrency = account_concurrency
+        self.timeout = timeout
+    
+    def run(self, units: List[WorkUnit],
+            work: Callable[[WorkUnit], Any]) -> Tuple[Dict[WorkUnit, Any], List[Dict[str, Any]]]:
+        """Run work on every unit.
+        
+        Args:
+            units: Work units, queued per account in the given order
+            work: Function run on each unit
+        
+        Returns:
+            Tuple of the results by unit and the errors, as
+            ``{'account_id', 'region', 'resource_type', 'error'}`` dicts
+        """
+        queues = {}
+        for unit in units:
+            queues.setdefault(unit[0], deque()).append(unit)
+        turns = deque(queues)
+        in_flight = dict.fromkeys(queues, 0)
+        running = {}
+        results = {}
+        errors = []
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        
+        def fail(unit, error):
+            account, region, resource_type = unit
+            errors.append({'account_id': account, 'region': region, 'resource_type': resource_type,
+                           'error': str(error)})
+        
+        def dispatch():
+            # One unit per account per turn, until workers or eligible units run out
+            progressed = True
+            while progressed and len(running) < self.max_workers:
+                progressed = False
+                for _ in range(len(turns)):
+                    account = turns[0]
+                    turns.rotate(-1)
+                    if queues[account] and in_flight[account] < self.account_concurrency \
+                            and len(running) < self.max_workers:
+                        unit = queues[account].popleft()
+                        running[pool.submit(work, unit)] = unit
+                        in_flight[account] += 1
+                        progressed = True
+        
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='account-scan')
+        timed_out = False
+        try:
+            dispatch()
+            while running:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    timed_out = True
+                    break
+                for future in done:
+                    unit = running.pop(future)
+                    in_flight[unit[0]] -= 1
+                    try:
+                        results[unit] = future.result()
+                    except AccountUnavailable as e:
+                        # Every other unit of the account would fail the same way
+                        logger.error(str(e))
+                        fail(unit, e)
+                        while queues[unit[0]]:
+                            fail(queues[unit[0]].popleft(), e)
+                    except Exception as e:
+                        logger.error(f"Scanning {unit[2]} in {unit[0]}/{unit[1]} failed: {e}")
+                        fail(unit, e)
+                dispatch()
+        finally:
+            if timed_out:
+                logger.error(f"Account scan timed out after {self.timeout}s")
+                for unit in running.values():
+                    fail(unit, 'timed out')
+                for queue in queues.values():
+                    while queue:
+                        fail(queue.popleft(), 'timed out')
+            # Units still running after a timeout finish in the background
+            pool.shutdown(wait=not timed_out, cancel_futures=True)
+        
+        return results, errors
+
+class MultiAccountScanner:
+    """Scanner fanning out over accounts (assumed roles) and regions."""
+    
+    def __init__(self, accounts: List[Any], regions: List[str],
+                 sessions: Optional[RoleSessions] = None,
+                 scheduler: Optional[AccountScheduler] = None,
+                 client_factory: Optional[ClientFactory] = None,
+                 scanner_options: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Initialize the scanner.
+        
+        Args:
+            accounts: Role ARNs, or dicts with ``role_arn`` and optionally
+                ``name`` and ``external_id`` (see ``parse_accounts``)
+            regions: Regions to scan in every account
+            sessions: Cache of role sessions (default: a new cache)
+            scheduler: Scheduler of the work units (default: 32 workers, 4
+                units in flight per account)
+            client_factory: Pool of clients to reuse (default: the
+                process-wide pool)
+            scanner_options: Per-type plugin settings (``aws.scanners``)
+        """
+        self.accounts = parse_accounts(accounts)
+        self.regions = regions
+        self.sessions = sessions or RoleSessions()
+        self.scheduler = scheduler or AccountScheduler()
+        self.clients = client_factory or get_client_factory()
+        self.scanner_options = scanner_options
+        self.errors = []
+        self._scanners = {}
+        self._lock = threading.Lock()
+    
+    def scan_resources(self, resource_types: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Scan the resource types in every account and region.
+        
+        Failed units are logged and listed in ``errors``; their resources are
+        missing from the result.
+        
+        Args:
+            resource_types: List of AWS resource types to scan (e.g., ['ec2', 's3'])
+        
+        Returns:
+            Dictionary mapping resource types to the resources of every
+            account and region, each tagged with ``account_id`` and ``region``
+        """
+        # A role that failed in an earlier scan gets another try
+        self.sessions.forget_failures()
+        # Global types are listed once per account, from the first region
+        units = [
+            (account['account_id'], region, resource_type)
+            for account in self.accounts
+            for region in self.regions
+            for resource_type in resource_types
+            if resource_type not in GLOBAL_TYPES or region == self.regions[0]
+        ]
+        with get_tracer().span('accounts', accounts=len(self.accounts)) as span:
+            results, self.errors = self.scheduler.run(units, self._scan_unit)
+            span.count('units', len(units))
+            span.count('failed', len(self.errors))
+        
+        # Merge in configuration order, not completion order
+        resources = {resource_type: [] for resource_type in resource_types}
+        for unit in units:
+            account, region, resource_type = unit
+            for resource in results.get(unit, []):
+                resource['account_id'] = account
+                resource['region'] = region_of(resource_type, resource, region)
+                resources[resource_type].append(resource)
+        return resources
+    
+    def clear_cache(self):
+        """Forget the scanners' cached IAM role policies."""
+        with self._lock:
+            for scanner in self._scanners.values():
+                scanner.clear_cache()
+    
+    def _scan_unit(self, unit: WorkUnit) -> List[Dict[str, Any]]:
+        """Scan one resource type in one account and region."""
+        account, region, resource_type = unit
+        with get_tracer().span('account_unit', account=account, region=region):
+            return self._scanner(account, region).scan_resources([resource_type]).get(resource_type, [])
+    
+    def _scanner(self, account_id: str, region: str) -> AWSResourceScanner:
+        """Get the scanner of an account and region, creating it on first use."""
+        account = next(account for account in self.accounts if account['account_id'] == account_id)
+        session = self.sessions.session(account['role_arn'], account['external_id'])
+        with self._lock:
+            key = (account_id, region)
+            if key not in self._scanners:
+                self._scanners[key] = AWSResourceScanner(
+                    region,
+                    client_factory=self.clients,
+                    scanner_options=self.scanner_options,
+                    session=session
+                )
+            return self._scanners[key]
+
+def create_multi_account_scanner(config_data: Dict[str, Any]) -> MultiAccountScanner:
+    """Create the scanner configured by the ``accounts`` section."""
+    settings = config_data['accounts']
+    return MultiAccountScanner(
+        settings['roles'],
+        config_data['aws'].get('regions', ['us-east-1']),
+        sessions=RoleSessions(
+            session_name=settings.get('session_name', 'aws-infra-doc-gen'),
+            duration=settings.get('duration', 3600)
+        ),
+        scheduler=AccountScheduler(
+            max_workers=settings.get('max_workers', 32),
+            account_concurrency=settings.get('account_concurrency', 4),
+            timeout=settings.get('timeout') or None
+        ),
+        scanner_options=config_data['aws'].get('scanners')
+    )
@@ -0,0 +1,90 @@
+"""AWS Client Factory.
+
+This module pools boto3 clients so the scanner, the change tracker and
+repeated scans in one process share warm clients: endpoint resolution, service
+model loading and TLS connections are paid once per (service, region,
+credentials) instead of once per call site.
+"""
+
+import threading
+from typing import Any, Optional, Tuple
+import boto3
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+import logging
+from ..tracing.tracer import instrument_events
+
+logger = logging.getLogger(__name__)
+
+# Connections kept open per client (botocore's default is 10)
+DEFAULT_POOL_CONNECTIONS = 50
+
+class ClientFactory:
+    """Creates and caches boto3 clients keyed by service, region and credentials."""
+    
+    def __init__(self, max_pool_connections: int = DEFAULT_POOL_CONNECTIONS):
+        """Initialize the client factory.
+        
+        Args:
+            max_pool_connections: Size of each client's HTTP connection pool
+        """
+        self.config = Config(max_pool_connections=max_pool_connections, tcp_keepalive=True)
+        self._sessions = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+    
+    def client(self, service: str, region: Optional[str] = None,
+               session: Optional[boto3.Session] = None):
+        """Get a pooled client, creating it on first use.
+        
+        Args:
+            service: AWS service name (e.g. 's3')
+            region: Region of the client (default: the session's region)
+            session: Session providing the credentials (default: a shared
+                session for the region)
+        
+        Returns:
+            boto3 client
+        """
+        with self._lock:
+            session = session or self._session(region)
+            region = region or session.region_name
+            key = (service, region, self._credentials_key(session))
+            if key not in self._clients:
+                logger.debug(f"Creating {service} client for {region}")
+                client = session.client(service, region_name=region, config=self.config)
+                instrument_events(client.meta.events)
+                self._clients[key] = client
+            return self._clients[key]
+    
+    def clear(self):
+        """Drop every pooled client and session."""
+        with self._lock:
+            self._clients = {}
+            self._sessions = {}
+    
+    def _session(self, region: Optional[str]) -> boto3.Session:
+        """Get the shared default-credentials session for a region."""
+        if region not in self._sessions:
+            self._sessions[region] = boto3.Session(region_name=region)
+        return self._sessions[region]
+    
+    def _credentials_key(self, session: boto3.Session) -> Tuple[Any, ...]:
+        """Identify the credentials a session signs with."""
+        credentials = session.get_credentials()
+        if credentials is None:
+            return (session.profile_name, None)
+        if isinstance(credentials, RefreshableCredentials):
+            # Refreshed in place (assumed roles), so clients outlive the keys
+            return (session.profile_name, id(credentials))
+        return (session.profile_name, credentials.access_key)
+
+# Process-wide factory, so warm clients outlive individual runs
+_default_factory = None
+
+def get_client_factory() -> ClientFactory:
+    """Get the process-wide client factory."""
+    global _default_factory
+    if _default_factory is None:
+        _default_factory = ClientFactory()
+    return _default_factory
@@ -3,11 +3,15 @@
 This module validates AWS infrastructure against security and compliance rules.
 """
 
-from typing import Dict, List, Any
+from collections.abc import Mapping
+from typing import Dict, List, Any, Optional
 import json
 import yaml
 from datetime import datetime
 import logging
+from ..topology.topology_index import TopologyIndex
+from ..tracing.tracer import get_tracer
+from ..store.inventory_store import field_expression
 
 logger = logging.getLogger(__name__)
 
@@ -31,11 +35,17 @@ class ComplianceChecker:
             logger.error(f"Error loading rules file: {e}")
             raise
     
-    def check_compliance(self, resources: Dict[str, List[Dict[str, Any]]]) -> Dict:
+    def check_compliance(self, resources: Dict[str, List[Dict[str, Any]]],
+                         index: Optional[TopologyIndex] = None) -> Dict:
         """Check resources against compliance rules.
         
+        Rules may carry a ``scope`` selector (``region``, ``vpc_id`` and/or
+        ``subnet_id``) restricting them to resources in that location; scopes are
+        resolved through the topology index.
+        
         Args:
             resources: Dictionary of AWS resources by type
+            index: Prebuilt topology index of the resources
             
         Returns:
             Dictionary containing compliance results
@@ -49,6 +59,7 @@ class ComplianceChecker:
             },
             'violations': []
         }
+        tracer = get_tracer()
         
         for resource_type, resource_list in resources.items():
             type_rules = self.rules.get(resource_type, {})
@@ -57,9 +68,36 @@ class ComplianceChecker:
                 
             results['summary']['total_resources'] += len(resource_list)
             
-            for resource in resource_list:
-                violations = self._check_resource(resource, type_rules)
-                
+            scopes = {}
+            for rule_name, rule_config in type_rules.items():
+                if rule_config.get('scope'):
+                    index = index or TopologyIndex(resources)
+                    scopes[rule_name] = {
+                        id(resource)
+                        for resource in index.resources(resource_type, **rule_config['scope'])
+                    }
+            
+            # Rule by rule, so each rule's cost shows up in its own trace span
+            violations_by_resource = [[] for _ in resource_list]
+            for rule_name, rule_config in type_rules.items():
+                with tracer.span(f"compliance.{resource_type}.{rule_name}") as span:
+                    in_scope = scopes.get(rule_name)
+                    checked = failed = 0
+                    for violations, resource in zip(violations_by_resource, resource_list):
+                        if in_scope is not None and id(resource) not in in_scope:
+                            continue
+                        checked += 1
+                        if not self._evaluate_rule(resource, rule_config):
+                            failed += 1
+                            violations.append({
+                                'rule': rule_name,
+                                'description': rule_config.get('description', ''),
+                                'severity': rule_config.get('severity', 'medium')
+                            })
+                    span.count('checked', checked)
+                    span.count('violations', failed)
+            
+            for resource, violations in zip(resource_list, violations_by_resource):
                 if violations:
                     results['summary']['non_compliant'] += 1
                     results['violations'].append({
@@ -72,19 +110,99 @@ class ComplianceChecker:
         
         return results
     
-    def _check_resource(self, resource: Dict, rules: Dict) -> List[Dict]:
-        """Check a single resource against its type-specific rules."""
-        violations = []
-        
-        for rule_name, rule_config in rules.items():
-            if not self._evaluate_rule(resource, rule_config):
-                violations.append({
-                    'rule': rule_name,
-                    'description': rule_config.get('description', ''),
-                    'severity': rule_config.get('severity', 'medium')
+    def check_store(self, store, scan_id: Optional[int] = None) -> Dict:
+        """Check a scan held in an inventory store, without loading it whole.
+        
+        Rules comparing one field for (in)equality or existence run as SQL
+        queries for the violating resources; other rules decode and evaluate
+        the resources of their type one at a time. Results are the same as
+        check_compliance on the scan's resources.
+        
+        Args:
+            store: InventoryStore holding the scan
+            scan_id: Scan to check (default: the latest)
+        
+        Returns:
+            Dictionary containing compliance results
+        """
+        results = {
+            'timestamp': datetime.now().isoformat(),
+            'summary': {
+                'total_resources': 0,
+                'compliant': 0,
+                'non_compliant': 0
+            },
+            'violations': []
+        }
+        tracer = get_tracer()
+        scan_id = scan_id if scan_id is not None else store.latest_scan()
+        if scan_id is None:
+            return results
+        
+        for resource_type in store.types(scan_id):
+            type_rules = self.rules.get(resource_type, {})
+            if not type_rules:
+                continue
+            
+            # Row id -> violations, filled rule by rule
+            violations_by_row = {}
+            for rule_name, rule_config in type_rules.items():
+                with tracer.span(f"compliance.{resource_type}.{rule_name}") as span:
+                    filters = dict(rule_config.get('scope') or {}, resource_type=resource_type, scan_id=scan_id)
+                    condition = self._sql_condition(rule_config)
+                    if condition is not None:
+                        checked = store.count(**filters)
+                        failed_rows = [row for row, _ in store.resource_ids(where_not=condition, **filters)]
+                    else:
+                        checked = 0
+                        failed_rows = []
+                        for row, resource in store.rows(**filters):
+                            checked += 1
+                            if not self._evaluate_rule(resource, rule_config):
+                                failed_rows.append(row)
+                    for row in failed_rows:
+                        violations_by_row.setdefault(row, []).append({
+                            'rule': rule_name,
+                            'description': rule_config.get('description', ''),
+                            'severity': rule_config.get('severity', 'medium')
+                        })
+                    span.count('checked', checked)
+                    span.count('violations', len(failed_rows))
+            
+            total = store.count(resource_type=resource_type, scan_id=scan_id)
+            results['summary']['total_resources'] += total
+            results['summary']['non_compliant'] += len(violations_by_row)
+            results['summary']['compliant'] += total - len(violations_by_row)
+            resource_ids = dict(store.resource_ids(resource_type=resource_type, scan_id=scan_id)) \
+                if violations_by_row else {}
+            for row in sorted(violations_by_row):
+                resource_id = resource_ids[row]
+                results['violations'].append({
+                    'resource_type': resource_type,
+                    'resource_id': resource_id if resource_id is not None else self._get_resource_id(store.get(row)),
+                    'violations': violations_by_row[row]
                 })
         
-        return violations
+        return results
+    
+    def _sql_condition(self, rule: Dict) -> Optional[Dict[str, Any]]:
+        """Translate a rule to an inventory store filter, if it has an exact SQL equivalent."""
+        condition = rule.get('condition', {})
+        operator = condition.get('operator')
+        field = condition.get('field')
+        expected = condition.get('value')
+        
+        # Ordering and containment follow Python semantics (and its errors), so
+        # only (in)equality with a scalar and existence are translated
+        if operator not in ('equals', 'not_equals', 'exists', 'not_exists') or not field:
+            return None
+        if expected is not None and not isinstance(expected, (str, int, float, bool)):
+            return None
+        try:
+            field_expression(field)
+        except ValueError:
+            return None
+        return {field: (operator, expected)}
     
     def _evaluate_rule(self, resource: Dict, rule: Dict) -> bool:
         """Evaluate a single rule against a resource."""
@@ -130,7 +248,7 @@ class ComplianceChecker:
         value = resource
         
         for part in parts:
-            if isinstance(value, dict):
+            if isinstance(value, Mapping):
                 value = value.get(part)
             else:
                 return None
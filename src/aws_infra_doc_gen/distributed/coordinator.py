@@ -0,0 +1,351 @@
+"""Distributed Scanning.
+
+This module spreads a scan over worker processes on several hosts, so API
+rate limits per source IP and the CPU of normalizing records are shared
+among them. The ``Coordinator`` publishes one message per work unit (an
+account, region and resource type) to a queue; stateless ``ScanWorker``
+processes take units, scan them with ``AWSResourceScanner`` and publish the
+records back; the coordinator merges them into one inventory.
+
+Queues deliver at least once (see ``work_queue``), and the coordinator
+republishes units whose result is late, so a unit may be scanned more than
+once. The ``ResultMerger`` keeps the first result of each unit and each
+resource once, so retries never duplicate resources.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, List, Any, Optional
+import logging
+from ..accounts.multi_account import RoleSessions, parse_accounts
+from ..clients.client_factory import ClientFactory, get_client_factory
+from ..inventory.inventory_file import resource_id_of
+from ..scanner.aws_scanner import AWSResourceScanner
+from ..scanner.scheduled_scanner import GLOBAL_TYPES, region_of
+from ..tracing.tracer import get_tracer
+from .work_queue import LocalQueue, WorkQueue, create_queue
+
+logger = logging.getLogger(__name__)
+
+# Queue names
+TASKS = 'tasks'
+RESULTS = 'results'
+
+class ResultMerger:
+    """Merges unit results into one inventory, idempotently."""
+    
+    def __init__(self, units: List[Dict[str, Any]]):
+        """Initialize the merger.
+        
+        Args:
+            units: The scan's unit messages; results of other units are ignored
+        """
+        self.units = {unit['unit_id']: unit for unit in units}
+        self.results = {}
+        self.errors = {}
+        self.duplicates = 0
+    
+    @property
+    def pending(self) -> List[str]:
+        """Ids of the units without a result or error yet."""
+        return [unit_id for unit_id in self.units if unit_id not in self.results and unit_id not in self.errors]
+    
+    def add(self, message: Dict[str, Any]) -> bool:
+        """Merge a worker's result message.
+        
+        Args:
+            message: Result with ``unit_id`` and either ``resources`` or
+                ``error``
+        
+        Returns:
+            Whether the message was merged (False for a duplicate or a
+            unit of another scan)
+        """
+        unit_id = message.get('unit_id')
+        if unit_id not in self.units:
+            return False
+        if unit_id in self.results or unit_id in self.errors:
+            self.duplicates += 1
+            return False
+        if 'error' in message:
+            self.errors[unit_id] = message['error']
+        else:
+            self.results[unit_id] = message['resources']
+        return True
+    
+    def fail(self, unit_id: str, error: str):
+        """Record a unit that will not produce a result."""
+        if unit_id not in self.results:
+            self.errors.setdefault(unit_id, error)
+    
+    def merged(self, resource_types: List[str], tag_region: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Merge the results in unit order.
+        
+        A resource reported twice (by id, within an account and region) is
+        kept once.
+        
+        Args:
+            resource_types: Resource types of the result
+            tag_region: Tag every resource with its region (its unit's, or
+                a bucket's own location)
+        
+        Returns:
+            Dictionary mapping resource types to lists of resource metadata;
+            resources of other accounts are tagged with their ``account_id``
+        """
+        resources = {resource_type: [] for resource_type in resource_types}
+        seen = set()
+        for unit_id, unit in self.units.items():
+            for resource in self.results.get(unit_id, []):
+                resource_id = resource_id_of(resource)
+                if resource_id is not None:
+                    key = (unit['resource_type'], unit['account_id'], unit['region'], resource_id)
+                    if key in seen:
+                        self.duplicates += 1
+                        continue
+                    seen.add(key)
+                if unit['account_id']:
+                    resource['account_id'] = unit['account_id']
+                if tag_region:
+                    resource['region'] = region_of(unit['resource_type'], resource, unit['region'])
+                resources[unit['resource_type']].append(resource)
+        return resources
+    
+    def error_list(self) -> List[Dict[str, Any]]:
+        """The failed units, in the format of ``MultiAccountScanner.errors``."""
+        return [
+            {'account_id': self.units[unit_id]['account_id'], 'region': self.units[unit_id]['region'],
+             'resource_type': self.units[unit_id]['resource_type'], 'error': error}
+            for unit_id, error in self.errors.items()
+        ]
+
+class ScanWorker:
+    """Stateless worker scanning the units taken from a queue."""
+    
+    def __init__(self, queue: WorkQueue, client_factory: Optional[ClientFactory] = None,
+                 sessions: Optional[RoleSessions] = None, worker_id: Optional[str] = None):
+        """Initialize the worker.
+        
+        Args:
+            queue: Queue the coordinator publishes to
+            client_factory: Pool of clients to reuse (default: the
+                process-wide pool)
+            sessions: Cache of role sessions, for units of other accounts
+                (default: a new cache)
+            worker_id: Name reported with results (default: host and pid)
+        """
+        self.queue = queue
+        self.clients = client_factory or get_client_factory()
+        self.sessions = sessions or RoleSessions()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.processed = 0
+    
+    def run(self, stop: Optional[threading.Event] = None, poll_interval: float = 1.0):
+        """Process units until stopped.
+        
+        A unit is acknowledged only after its result is published, so a
+        worker dying mid-unit leaves it to be delivered again.
+        
+        Args:
+            stop: Event ending the loop (default: run forever)
+            poll_interval: Seconds to wait for a unit before checking stop
+        """
+        logger.info(f"Worker {self.worker_id} waiting for units")
+        while stop is None or not stop.is_set():
+            delivery = self.queue.get(TASKS, timeout=poll_interval)
+            if delivery is None:
+                continue
+            receipt, unit = delivery
+            self.queue.put(RESULTS, self.process(unit))
+            self.queue.ack(TASKS, receipt)
+            self.processed += 1
+    
+    def process(self, unit: Dict[str, Any]) -> Dict[str, Any]:
+        """Scan one unit.
+        
+        Args:
+            unit: Unit message published by the coordinator
+        
+        Returns:
+            Result message carrying the unit's records, or its error
+        """
+        result = {'scan_id': unit['scan_id'], 'unit_id': unit['unit_id'], 'worker': self.worker_id}
+        try:
+            with get_tracer().span('worker_unit', region=unit['region'], resource_type=unit['resource_type']):
+                session = self.sessions.session(unit['role_arn'], unit.get('external_id')) \
+                    if unit.get('role_arn') else None
+                scanner = AWSResourceScanner(
+                    unit['region'],
+                    client_factory=self.clients,
+                    scanner_options=unit.get('scanner_options'),
+                    session=session
+                )
+                result['resources'] = scanner.scan_resources([unit['resource_type']]).get(unit['resource_type'], [])
+        except Exception as e:
+            logger.warning(f"Unit {unit['unit_id']} failed: {e}")
+            result['error'] = str(e)
+        return result
+
+class Coordinator:
+    """Scanner publishing work units to a queue and merging the workers' results."""
+    
+    def __init__(self, queue: WorkQueue, regions: List[str], accounts: Optional[List[Any]] = None,
+                 scanner_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 unit_timeout: float = 600, max_attempts: int = 3, poll_interval: float = 1.0,
+                 local_workers: Optional[List[ScanWorker]] = None):
+        """Initialize the coordinator.
+        
+        Args:
+            queue: Queue the workers take units from
+            regions: Regions to scan
+            accounts: Accounts to scan through assumed roles (see
+                ``parse_accounts``); default: the workers' own account
+            scanner_options: Per-type plugin settings (``aws.scanners``)
+            unit_timeout: Seconds to wait for a unit's result before
+                publishing it again
+            max_attempts: Publications of a unit before it is reported as
+                failed
+            poll_interval: Seconds to wait for a result before checking
+                the timeouts
+            local_workers: Workers to run on threads of this process during
+                each scan (e.g. with a ``LocalQueue``)
+        """
+        self.queue = queue
+        self.regions = list(regions)
+        self.accounts = parse_accounts(accounts) if accounts else [
+            {'account_id': None, 'role_arn': None, 'name': None, 'external_id': None}
+        ]
+        self.scanner_options = scanner_options or {}
+        self.unit_timeout = unit_timeout
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.local_workers = local_workers or []
+        self.errors = []
+    
+    def scan_resources(self, resource_types: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Scan the resource types on the workers.
+        
+        Failed units are logged and listed in ``errors``; their resources are
+        missing from the result.
+        
+        Args:
+            resource_types: List of AWS resource types to scan (e.g., ['ec2', 's3'])
+        
+        Returns:
+            Dictionary mapping resource types to lists of resource metadata;
+            with several regions, each resource is tagged with its ``region``
+        """
+        units = self.units(uuid.uuid4().hex, resource_types)
+        merger = ResultMerger(units)
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=worker.run, args=(stop, self.poll_interval), daemon=True)
+            for worker in self.local_workers
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            with get_tracer().span('distributed_scan', units=len(units)) as span:
+                self._collect(units, merger)
+                span.count('duplicates', merger.duplicates)
+                span.count('failed', len(merger.errors))
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        
+        self.errors = merger.error_list()
+        for error in self.errors:
+            logger.error(f"Unit failed: {error}")
+        return merger.merged(resource_types, tag_region=len(self.regions) > 1)
+    
+    def units(self, scan_id: str, resource_types: List[str]) -> List[Dict[str, Any]]:
+        """Build the unit messages of a scan.
+        
+        Global types are scanned in the first region only.
+        """
+        units = []
+        for account in self.accounts:
+            for resource_type in resource_types:
+                regions = self.regions[:1] if resource_type in GLOBAL_TYPES else self.regions
+                for region in regions:
+                    units.append({
+                        'scan_id': scan_id,
+                        'unit_id': f"{scan_id}:{account['account_id'] or '-'}:{region}:{resource_type}",
+                        'attempt': 1,
+                        'account_id': account['account_id'],
+                        'role_arn': account['role_arn'],
+                        'external_id': account['external_id'],
+                        'region': region,
+                        'resource_type': resource_type,
+                        'scanner_options': {resource_type: self.scanner_options[resource_type]}
+                        if resource_type in self.scanner_options else None,
+                    })
+        return units
+    
+    def clear_cache(self):
+        """Nothing to clear: the workers hold no state between units."""
+    
+    def _collect(self, units: List[Dict[str, Any]], merger: ResultMerger):
+        """Publish the units and merge results until every unit is done."""
+        deadlines = {}
+        for unit in units:
+            self.queue.put(TASKS, unit)
+            deadlines[unit['unit_id']] = time.monotonic() + self.unit_timeout
+        
+        while merger.pending:
+            delivery = self.queue.get(RESULTS, timeout=self.poll_interval)
+            if delivery is not None:
+                receipt, result = delivery
+                if not merger.add(result):
+                    logger.debug(f"Dropping duplicate or stale result of unit {result.get('unit_id')}")
+                self.queue.ack(RESULTS, receipt)
+            
+            now = time.monotonic()
+            for unit_id in merger.pending:
+                if deadlines[unit_id] > now:
+                    continue
+                unit = merger.units[unit_id]
+                if unit['attempt'] >= self.max_attempts:
+                    merger.fail(unit_id, f"no result after {unit['attempt']} attempts")
+                    continue
+                unit['attempt'] += 1
+                logger.warning(f"Unit {unit_id} timed out; publishing attempt {unit['attempt']}")
+                self.queue.put(TASKS, unit)
+                deadlines[unit_id] = now + self.unit_timeout
+
+def create_worker(config_data: Dict[str, Any], queue: Optional[WorkQueue] = None) -> ScanWorker:
+    """Create a worker on the queue configured by the ``distributed`` section."""
+    settings = config_data['accounts'] if config_data.get('accounts', {}).get('enabled', False) else {}
+    return ScanWorker(
+        queue or create_queue(config_data['distributed'].get('queue')),
+        sessions=RoleSessions(
+            session_name=settings.get('session_name', 'aws-infra-doc-gen'),
+            duration=settings.get('duration', 3600)
+        )
+    )
+
+def create_coordinator(config_data: Dict[str, Any]) -> Coordinator:
+    """Create the coordinator configured by the ``distributed`` section.
+    
+    With a local queue, ``distributed.local_workers`` workers run in this
+    process, since no other process can reach the queue.
+    """
+    settings = config_data['distributed']
+    queue = create_queue(settings.get('queue'))
+    accounts = config_data.get('accounts', {})
+    local_workers = []
+    if isinstance(queue, LocalQueue):
+        local_workers = [create_worker(config_data, queue) for _ in range(settings.get('local_workers', 4))]
+    return Coordinator(
+        queue,
+        config_data['aws'].get('regions', ['us-east-1']),
+        accounts=accounts['roles'] if accounts.get('enabled', False) else None,
+        scanner_options=config_data['aws'].get('scanners'),
+        unit_timeout=settings.get('unit_timeout', 600),
+        max_attempts=settings.get('max_attempts', 3),
+        local_workers=local_workers
+    )
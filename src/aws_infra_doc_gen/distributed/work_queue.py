@@ -0,0 +1,205 @@
+"""Work Queues for Distributed Scanning.
+
+This module provides the queue backends linking a scan coordinator to its
+workers. Queues are named (the coordinator publishes units to one queue and
+reads results from another) and carry JSON messages with at-least-once
+delivery: a message taken with ``get`` is delivered again once its
+visibility timeout passes without an ``ack``, so a unit held by a crashed
+worker is picked up by another. Consumers must therefore tolerate
+duplicates.
+
+Backends:
+
+- ``LocalQueue``: in-process, for tests and single-host runs with worker
+  threads
+- ``RedisQueue``: any Redis-compatible server (``pip install redis``), for
+  workers on other hosts
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+import logging
+from ..service.serialization import datetime_converter
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds a delivered message stays invisible before it is delivered again
+DEFAULT_VISIBILITY_TIMEOUT = 300
+
+def encode(message: Dict[str, Any]) -> str:
+    """Serialize a message, with datetimes as ISO strings."""
+    return json.dumps(message, default=datetime_converter)
+
+class WorkQueue:
+    """Base of the queue backends."""
+    
+    def put(self, queue: str, message: Dict[str, Any]):
+        """Publish a message.
+        
+        Args:
+            queue: Queue name
+            message: JSON-serializable message
+        """
+        raise NotImplementedError
+    
+    def get(self, queue: str, timeout: float = 1.0) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Take the oldest visible message.
+        
+        Args:
+            queue: Queue name
+            timeout: Seconds to wait for a message
+        
+        Returns:
+            (receipt, message), or None if no message arrived in time; the
+            receipt acknowledges the message
+        """
+        raise NotImplementedError
+    
+    def ack(self, queue: str, receipt: str):
+        """Acknowledge a message so it is not delivered again."""
+        raise NotImplementedError
+
+class LocalQueue(WorkQueue):
+    """In-process queue, standing in for a queue server."""
+    
+    def __init__(self, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT):
+        """Initialize the queue.
+        
+        Args:
+            visibility_timeout: Seconds before an unacknowledged message is
+                delivered again
+        """
+        self.visibility_timeout = visibility_timeout
+        self._queues = {}
+        self._in_flight = {}
+        self._condition = threading.Condition()
+    
+    def put(self, queue: str, message: Dict[str, Any]):
+        with self._condition:
+            self._queues.setdefault(queue, deque()).append(encode(message))
+            self._condition.notify_all()
+    
+    def get(self, queue: str, timeout: float = 1.0) -> Optional[Tuple[str, Dict[str, Any]]]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                self._reclaim(queue)
+                messages = self._queues.get(queue)
+                if messages:
+                    body = messages.popleft()
+                    receipt = uuid.uuid4().hex
+                    self._in_flight.setdefault(queue, {})[receipt] = (
+                        time.monotonic() + self.visibility_timeout, body
+                    )
+                    return receipt, json.loads(body)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                # Wake up for messages whose visibility timeout ends first
+                self._condition.wait(min(remaining, self.visibility_timeout))
+    
+    def ack(self, queue: str, receipt: str):
+        with self._condition:
+            self._in_flight.get(queue, {}).pop(receipt, None)
+    
+    def pending(self, queue: str) -> int:
+        """Number of messages waiting or in flight."""
+        with self._condition:
+            return len(self._queues.get(queue, ())) + len(self._in_flight.get(queue, {}))
+    
+    def _reclaim(self, queue: str):
+        """Make messages past their visibility timeout visible again."""
+        in_flight = self._in_flight.get(queue, {})
+        now = time.monotonic()
+        for receipt, (expires, body) in list(in_flight.items()):
+            if expires <= now:
+                del in_flight[receipt]
+                self._queues.setdefault(queue, deque()).append(body)
+
+class RedisQueue(WorkQueue):
+    """Queue on a Redis-compatible server.
+    
+    Each queue is a list; delivered messages move atomically to a processing
+    list, with their visibility deadline in a sorted set, and are moved back
+    by any consumer that finds them expired.
+    """
+    
+    def __init__(self, url: str = 'redis://localhost:6379/0',
+                 visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+                 prefix: str = 'aws-infra-doc-gen', client=None):
+        """Initialize the queue.
+        
+        Args:
+            url: Server URL
+            visibility_timeout: Seconds before an unacknowledged message is
+                delivered again
+            prefix: Prefix of the keys holding the queues
+            client: Redis client to use instead of connecting to url
+        """
+        if client is None:
+            if redis is None:
+                raise ImportError("redis is required for the Redis queue. Please install it first.")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.redis = client
+        self.visibility_timeout = visibility_timeout
+        self.prefix = prefix
+    
+    def put(self, queue: str, message: Dict[str, Any]):
+        self.redis.lpush(self._key(queue), encode(message))
+    
+    def get(self, queue: str, timeout: float = 1.0) -> Optional[Tuple[str, Dict[str, Any]]]:
+        self._reclaim(queue)
+        # Blocking timeouts are whole seconds; 0 would block forever
+        body = self.redis.brpoplpush(self._key(queue), self._key(queue, 'processing'), max(1, round(timeout)))
+        if body is None:
+            return None
+        self.redis.zadd(self._key(queue, 'leases'), {body: time.time() + self.visibility_timeout})
+        return body, json.loads(body)
+    
+    def ack(self, queue: str, receipt: str):
+        pipeline = self.redis.pipeline()
+        pipeline.lrem(self._key(queue, 'processing'), 1, receipt)
+        pipeline.zrem(self._key(queue, 'leases'), receipt)
+        pipeline.execute()
+    
+    def _reclaim(self, queue: str):
+        """Move messages past their visibility timeout back to the queue."""
+        leases = self._key(queue, 'leases')
+        for body in self.redis.zrangebyscore(leases, 0, time.time()):
+            # Only the consumer that removes the lease requeues the message
+            if self.redis.zrem(leases, body) and self.redis.lrem(self._key(queue, 'processing'), 1, body):
+                self.redis.rpush(self._key(queue), body)
+    
+    def _key(self, queue: str, suffix: Optional[str] = None) -> str:
+        return f"{self.prefix}:{queue}:{suffix}" if suffix else f"{self.prefix}:{queue}"
+
+def create_queue(settings: Optional[Dict[str, Any]]) -> WorkQueue:
+    """Create the queue configured by ``distributed.queue``.
+    
+    Args:
+        settings: Queue settings, with ``type`` 'local' (the default) or
+            'redis', and ``url`` and ``visibility_timeout``
+    
+    Returns:
+        The queue backend
+    
+    Raises:
+        ValueError: If the type is unknown
+    """
+    settings = settings or {}
+    queue_type = settings.get('type', 'local')
+    visibility_timeout = settings.get('visibility_timeout', DEFAULT_VISIBILITY_TIMEOUT)
+    if queue_type == 'local':
+        return LocalQueue(visibility_timeout=visibility_timeout)
+    if queue_type == 'redis':
+        return RedisQueue(settings.get('url', 'redis://localhost:6379/0'), visibility_timeout=visibility_timeout)
+    raise ValueError(f"Unknown queue type: {queue_type}")
@@ -1,126 +1,556 @@
 import json
+from json.encoder import encode_basestring_ascii
 from datetime import datetime
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+import hashlib
+from itertools import islice
 import os
+import re
 import markdown
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Iterator
+from ..service.serialization import datetime_converter
+from ..topology.topology_index import TopologyIndex
+from .search_index import SearchIndex, SEARCH_DIR, DOC_CHUNK_SIZE
+from ..tracing.tracer import get_tracer
 
 # Logger setup
 logger = logging.getLogger(__name__)
 
-# Custom datetime converter function
-def datetime_converter(o):
-    if isinstance(o, datetime):
-        return o.isoformat()  # Convert datetime to ISO format string
-    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+# Manifest of the content hash each page was last generated from
+MANIFEST_FILE = ".doc_manifest.json"
+
+FILE_EXTENSIONS = {'markdown': 'md', 'html': 'html', 'pdf': 'pdf'}
+
+MARKDOWN_EXTENSIONS = ['tables', 'fenced_code', 'toc']
+
+# Compiled template cache, shared by runs and shard workers
+TEMPLATE_CACHE_DIR = ".template_cache"
+
+# Encoder chunks joined per hash update when fingerprinting inputs
+FINGERPRINT_BATCH = 4096
+
+# Escapes applied by Jinja's tojson filter, kept so output is unchanged
+_HTML_SAFE_JSON = str.maketrans({'<': '\\u003c', '>': '\\u003e', '&': '\\u0026', "'": '\\u0027'})
+
+# Placeholder splitting base.html.j2 around the streamed page content
+CONTENT_MARKER = "<!--documentation-content-->"
+
+def resource_json(value: Any) -> str:
+    """Serialize a resource exactly like ``tojson(indent=2)``, only faster.
+    
+    The standard library falls back to its pure-Python encoder whenever
+    ``indent`` is set; this walks the structure directly and leaves string
+    escaping to the C encoder. Datetimes are converted to ISO format.
+    """
+    parts = []
+    _encode_json(value, parts, '\n')
+    return ''.join(parts).translate(_HTML_SAFE_JSON)
+
+def _encode_json(value: Any, parts: List[str], newline: str):
+    """Append the indented JSON encoding of a value to parts."""
+    if isinstance(value, str):
+        parts.append(encode_basestring_ascii(value))
+    elif value is None:
+        parts.append('null')
+    elif value is True:
+        parts.append('true')
+    elif value is False:
+        parts.append('false')
+    elif isinstance(value, (int, float)):
+        parts.append(json.dumps(value))
+    elif isinstance(value, dict):
+        if not value:
+            parts.append('{}')
+            return
+        inner = newline + '  '
+        separator = '{' + inner
+        for key in sorted(value):
+            parts.append(separator)
+            parts.append(encode_basestring_ascii(key if isinstance(key, str) else json.dumps(key)))
+            parts.append(': ')
+            _encode_json(value[key], parts, inner)
+            separator = ',' + inner
+        parts.append(newline + '}')
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            parts.append('[]')
+            return
+        inner = newline + '  '
+        separator = '[' + inner
+        for item in value:
+            parts.append(separator)
+            _encode_json(item, parts, inner)
+            separator = ',' + inner
+        parts.append(newline + ']')
+    else:
+        _encode_json(datetime_converter(value), parts, newline)
+
+def _write_pdf(html_path: str, output_path: str):
+    """Render an HTML file to a PDF file with WeasyPrint."""
+    from weasyprint import HTML, CSS
+    
+    HTML(filename=html_path).write_pdf(
+        output_path,
+        stylesheets=[CSS(string='body { font-family: Arial, sans-serif; }')]
+    )
+
+# Per-process generators used by shard workers, keyed by (output_dir, template_dir)
+_shard_generators = {}
+
+def _render_shard(output_dir: str, template_dir: str, page: Dict[str, Any], formats: List[str],
+                  search: bool = False) -> str:
+    """Render one documentation shard (runs in a worker process).
+    
+    Returns:
+        Name of the rendered page
+    """
+    key = (output_dir, template_dir)
+    if key not in _shard_generators:
+        _shard_generators[key] = DocumentationGenerator(output_dir, template_dir)
+    return _shard_generators[key]._write_shard(page, formats, search)
 
 class DocumentationGenerator:
     """Generates documentation from AWS resource data."""
     
-    def __init__(self, output_dir: str, template_dir: str):
+    def __init__(self, output_dir: str, template_dir: str, page_size: int = 500,
+                 max_workers: Optional[int] = None, incremental: bool = True,
+                 template_cache: bool = True, search_index: bool = True):
         """Initialize the documentation generator.
         
         Args:
             output_dir: Directory to save generated documentation
             template_dir: Directory containing documentation templates
+            page_size: Number of resources per page in sharded mode
+            max_workers: Number of worker processes rendering shards
+                (default: one per CPU)
+            incremental: Only rewrite pages whose inputs changed since the
+                last run, leaving unchanged files (and their mtimes) alone
+            template_cache: Keep compiled templates in ``.template_cache``
+                under the output directory so later runs skip compilation
+            search_index: Write a client-side search index and search box
+                with sharded HTML documentation
         """
         self.output_dir = output_dir
         self.template_dir = template_dir
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.incremental = incremental
+        self.search_index = search_index
+        self._template_hash = None
+        self.shard_dir = os.path.join(output_dir, 'docs')
         os.makedirs(output_dir, exist_ok=True)
         
+        bytecode_cache = None
+        if template_cache:
+            cache_dir = os.path.join(output_dir, TEMPLATE_CACHE_DIR)
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        
+        # Templates don't change during a run, so skip the per-include mtime check
         self.jinja_env = Environment(
             loader=FileSystemLoader(template_dir),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            bytecode_cache=bytecode_cache,
+            auto_reload=False
         )
+        self.jinja_env.filters['resource_json'] = resource_json
     
-    def generate_documentation(self, resources: Dict[str, List[Dict[str, Any]]], formats: List[str]):
+    def generate_documentation(self, resources: Dict[str, List[Dict[str, Any]]], formats: List[str],
+                               index: Optional[TopologyIndex] = None):
         """Generate documentation in specified formats.
         
         Args:
             resources: Dictionary of AWS resources by type
             formats: List of output formats ('html', 'markdown', 'pdf')
+            index: Prebuilt topology index of the resources
         """
-        # Generate base markdown
-        markdown_content = self._generate_markdown(resources)
+        manifest = self._load_manifest(self.output_dir)
+        fingerprint = self._fingerprint(resources)
+        if self._is_current(manifest, self.output_dir, 'documentation', fingerprint, formats):
+            logger.info("Documentation unchanged, skipping regeneration")
+            return
+        
+        # Stream the rendered markdown straight to the output files; the PDF
+        # is laid out in a worker process and joined once the rest is written
+        chunks = self._generate_markdown(resources, index)
+        with self._pdf_executor(formats) as pdf_executor:
+            pdf_job = self._write_outputs(os.path.join(self.output_dir, 'documentation'), chunks, formats,
+                                          pdf_executor=pdf_executor)
+            self._wait_pdf(pdf_job)
+        
+        manifest['documentation'] = {'hash': fingerprint, 'formats': sorted(formats)}
+        self._save_manifest(self.output_dir, manifest)
+    
+    def generate_sharded_documentation(self, resources: Dict[str, List[Dict[str, Any]]],
+                                       formats: List[str],
+                                       index: Optional[TopologyIndex] = None) -> List[str]:
+        """Generate an index page plus paged documentation per resource type.
+        
+        Each resource type is split into pages of ``page_size`` resources, written
+        to the ``docs`` directory as ``<type>_p<n>`` in every requested format.
+        Pages render in parallel worker processes, each holding only its own
+        resources. Pages whose inputs are unchanged since the last run are not
+        rewritten, and pages that no longer exist are removed. With HTML output
+        a search index over the resources is written to ``docs/search``.
+        
+        Args:
+            resources: Dictionary of AWS resources by type
+            formats: List of output formats ('html', 'markdown', 'pdf')
+            index: Prebuilt topology index of the resources
+            
+        Returns:
+            List of page names, index first
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        generation_time = datetime_converter(datetime.now())
+        
+        pages = []
+        for resource_type, resource_list in resources.items():
+            page_count = max(1, -(-len(resource_list) // self.page_size))
+            for number in range(1, page_count + 1):
+                pages.append({
+                    'name': f"{resource_type}_p{number}",
+                    'resource_type': resource_type,
+                    'number': number,
+                    'page_count': page_count,
+                    'generation_time': generation_time,
+                    'resources': resource_list[(number - 1) * self.page_size:number * self.page_size],
+                })
+        
+        search = self.search_index and 'html' in formats
+        manifest = self._load_manifest(self.shard_dir)
+        current = {}
+        stale = []
+        for page in pages:
+            fingerprint = self._fingerprint({
+                'page': {key: value for key, value in page.items() if key != 'generation_time'},
+                'search': search,
+            })
+            current[page['name']] = {'hash': fingerprint, 'formats': sorted(formats)}
+            if not self._is_current(manifest, self.shard_dir, page['name'], fingerprint, formats):
+                stale.append(page)
+        logger.info(f"Rendering {len(stale)} of {len(pages)} documentation pages")
+        
+        if stale:
+            with get_tracer().span('docs.pages', formats=sorted(formats)) as span, \
+                    ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                span.count('pages', len(stale))
+                futures = [
+                    executor.submit(_render_shard, self.output_dir, self.template_dir, page, formats, search)
+                    for page in stale
+                ]
+                for future in futures:
+                    future.result()
+        
+        summaries = [self._page_summary(page) for page in pages]
+        pages_by_type = {}
+        for summary in summaries:
+            pages_by_type.setdefault(summary['resource_type'], []).append(summary)
+        
+        index = index or TopologyIndex(resources)
+        resource_counts = {
+            resource_type: len(resource_list)
+            for resource_type, resource_list in resources.items()
+        }
+        index_fingerprint = self._fingerprint({
+            'pages': summaries,
+            'resource_counts': resource_counts,
+            'topology': {
+                region: {
+                    vpc_id: {
+                        subnet_id: index.counts(region=region, vpc_id=vpc_id, subnet_id=subnet_id)
+                        for subnet_id in subnets
+                    }
+                    for vpc_id, subnets in index.vpcs(region).items()
+                }
+                for region in index.regions()
+            },
+        })
+        current['index'] = {'hash': index_fingerprint, 'formats': sorted(formats)}
+        with self._pdf_executor(formats) as pdf_executor:
+            # The index PDF is laid out while the search index is written
+            pdf_job = None
+            if not self._is_current(manifest, self.shard_dir, 'index', index_fingerprint, formats):
+                template = self.jinja_env.get_template('index.md.j2')
+                chunks = template.generate(
+                    generation_time=generation_time,
+                    pages_by_type=pages_by_type,
+                    resource_counts=resource_counts,
+                    topology=index
+                )
+                pdf_job = self._write_outputs(os.path.join(self.shard_dir, 'index'), chunks, formats,
+                                              pdf_executor=pdf_executor, search=search)
+            
+            if search:
+                search_fingerprint = self._fingerprint([current[page['name']]['hash'] for page in pages])
+                current['search'] = {'hash': search_fingerprint, 'formats': []}
+                if (not self._is_current(manifest, self.shard_dir, 'search', search_fingerprint, [])
+                        or not os.path.isdir(os.path.join(self.shard_dir, SEARCH_DIR))):
+                    self._write_search_index(pages)
+            
+            # Remove pages left over from a larger inventory
+            for name in set(manifest) - set(current):
+                for fmt in manifest[name]['formats']:
+                    path = os.path.join(self.shard_dir, f"{name}.{FILE_EXTENSIONS[fmt]}")
+                    if os.path.exists(path):
+                        os.remove(path)
+            
+            self._wait_pdf(pdf_job)
+        
+        self._save_manifest(self.shard_dir, current)
+        
+        return ['index'] + [summary['name'] for summary in summaries]
+    
+    def _write_shard(self, page: Dict[str, Any], formats: List[str], search: bool = False) -> str:
+        """Render and save one page of resources of a single type."""
+        template = self.jinja_env.get_template('resource_page.md.j2')
+        self._write_outputs(os.path.join(self.shard_dir, page['name']), template.generate(**page),
+                            formats, search=search)
+        return page['name']
+    
+    def _write_search_index(self, pages: List[Dict[str, Any]]):
+        """Build and write the search index over every page's resources."""
+        with get_tracer().span('docs.search_index') as span:
+            search_index = SearchIndex()
+            for page in pages:
+                for resource in page['resources']:
+                    search_index.add(page['resource_type'], resource, self._resource_label(resource), page['name'])
+            shard_count = search_index.write(self.shard_dir)
+            span.count('resources', len(search_index.docs))
+            span.count('shards', shard_count)
+        logger.info(f"Wrote search index of {len(search_index.docs)} resources in {shard_count} shards")
+    
+    def _page_summary(self, page: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize a page for the index."""
+        ids = [self._resource_label(resource) for resource in page['resources']]
+        return {
+            'name': page['name'],
+            'resource_type': page['resource_type'],
+            'number': page['number'],
+            'first': ids[0] if ids else '',
+            'last': ids[-1] if ids else '',
+        }
+    
+    def _write_outputs(self, base_path: str, chunks: Iterator[str], formats: List[str],
+                       pdf_executor: Optional[Executor] = None, search: bool = False) -> Optional[Future]:
+        """Stream markdown chunks to the markdown, HTML and PDF files of one page.
         
-        # Save in requested formats
+        Markdown is converted to HTML one section (heading) at a time, so peak
+        memory is bounded by the largest section rather than the whole document.
+        The PDF is rendered from the finished HTML file.
+        
+        Args:
+            base_path: Output path without extension
+            chunks: Rendered markdown chunks
+            formats: List of output formats ('html', 'markdown', 'pdf')
+            pdf_executor: Executor to run WeasyPrint on; without one the PDF is
+                rendered before returning
+            search: Add the search box for the index in ``search/``
+        
+        Returns:
+            The PDF job submitted to pdf_executor, to pass to ``_wait_pdf``
+        """
         for fmt in formats:
-            if fmt == 'markdown':
-                self._save_markdown(markdown_content)
-            elif fmt == 'html':
-                self._save_html(markdown_content)
-            elif fmt == 'pdf':
-                self._save_pdf(markdown_content)
-            else:
+            if fmt not in FILE_EXTENSIONS:
                 logger.warning(f"Unsupported format: {fmt}")
+        
+        # PDF-only runs still need the HTML on disk for WeasyPrint
+        html_path = f"{base_path}.html" if 'html' in formats else f"{base_path}.html.tmp"
+        
+        streamed = [fmt for fmt in ('markdown', 'html') if fmt in formats]
+        with get_tracer().span('docs.write', formats=streamed, page=os.path.basename(base_path)) as span, \
+                ExitStack() as stack:
+            markdown_file = None
+            if 'markdown' in formats:
+                markdown_file = stack.enter_context(open(f"{base_path}.md", 'w'))
+            
+            html_file = None
+            if 'html' in formats or 'pdf' in formats:
+                html_file = stack.enter_context(open(html_path, 'w'))
+                head, tail = self._html_frame(search)
+                html_file.write(head)
+            
+            converter = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+            for section in self._sections(chunks):
+                span.count('sections')
+                if markdown_file:
+                    markdown_file.write(section)
+                if html_file:
+                    html_file.write(self._section_html(converter, section))
+            
+            if html_file:
+                html_file.write(tail)
+        
+        pdf_job = None
+        if 'pdf' in formats:
+            pdf_job = self._save_pdf(html_path, f"{base_path}.pdf", pdf_executor)
+            if 'html' not in formats:
+                if pdf_job is None:
+                    os.remove(html_path)
+                else:
+                    pdf_job.add_done_callback(lambda _: os.remove(html_path))
+        return pdf_job
+    
+    def _sections(self, chunks: Iterator[str]) -> Iterator[str]:
+        """Regroup streamed markdown chunks into sections starting at headings.
+        
+        Lines inside fenced code blocks never start a section.
+        """
+        section = []
+        partial = ''
+        in_fence = False
+        for chunk in chunks:
+            lines = (partial + chunk).split('\n')
+            partial = lines.pop()
+            for line in lines:
+                if line.startswith('```'):
+                    in_fence = not in_fence
+                elif line.startswith('#') and not in_fence and section:
+                    yield ''.join(section)
+                    section = []
+                section.append(line + '\n')
+        
+        section.append(partial)
+        if any(section):
+            yield ''.join(section)
     
-    def _generate_markdown(self, resources: Dict[str, List[Dict[str, Any]]]) -> str:
-        """Generate markdown documentation from resource data."""
+    def _section_html(self, converter: markdown.Markdown, section: str) -> str:
+        """Convert one markdown section to HTML."""
+        html_content = converter.reset().convert(section)
+        
+        # Links between markdown pages point at their HTML counterparts
+        return re.sub(r'href="([^":]+)\.md"', r'href="\1.html"', html_content) + '\n'
+    
+    def _html_frame(self, search: bool = False):
+        """Split the base HTML template into the markup before and after the content."""
+        template = self.jinja_env.get_template('base.html.j2')
+        search_config = {'root': f"{SEARCH_DIR}/", 'doc_chunk': DOC_CHUNK_SIZE} if search else None
+        html = template.render(content=CONTENT_MARKER, search=search_config)
+        head, tail = html.split(CONTENT_MARKER, 1)
+        return head, tail
+    
+    def _fingerprint(self, inputs: Any) -> str:
+        """Hash page inputs together with the templates they render through."""
+        if self._template_hash is None:
+            digest = hashlib.sha256()
+            for root, _, files in sorted(os.walk(self.template_dir)):
+                for name in sorted(files):
+                    digest.update(name.encode('utf-8'))
+                    with open(os.path.join(root, name), 'rb') as f:
+                        digest.update(f.read())
+            self._template_hash = digest.hexdigest()
+        
+        # Hash the encoding as it is produced, never holding the whole inventory's JSON
+        digest = hashlib.sha256()
+        encoder = json.JSONEncoder(sort_keys=True, default=datetime_converter)
+        chunks = encoder.iterencode({'templates': self._template_hash, 'inputs': inputs})
+        while True:
+            batch = ''.join(islice(chunks, FINGERPRINT_BATCH))
+            if not batch:
+                return digest.hexdigest()
+            digest.update(batch.encode('utf-8'))
+    
+    def _is_current(self, manifest: Dict, directory: str, name: str, fingerprint: str,
+                    formats: List[str]) -> bool:
+        """Check whether a page's files were generated from the same inputs."""
+        entry = manifest.get(name)
+        if not self.incremental or not entry or entry['hash'] != fingerprint:
+            return False
+        if not set(formats) <= set(entry['formats']):
+            return False
+        return all(
+            os.path.exists(os.path.join(directory, f"{name}.{FILE_EXTENSIONS[fmt]}"))
+            for fmt in formats if fmt in FILE_EXTENSIONS
+        )
+    
+    def _load_manifest(self, directory: str) -> Dict[str, Dict[str, Any]]:
+        """Load the page manifest of a documentation directory."""
+        try:
+            with open(os.path.join(directory, MANIFEST_FILE), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _save_manifest(self, directory: str, manifest: Dict[str, Dict[str, Any]]):
+        """Save the page manifest of a documentation directory."""
+        with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    
+    def _resource_label(self, resource: Dict[str, Any]) -> str:
+        """Get the display identifier of a resource."""
+        for id_field in ['id', 'name', 'identifier']:
+            if resource.get(id_field):
+                return str(resource[id_field])
+        return ''
+    
+    def _generate_markdown(self, resources: Dict[str, List[Dict[str, Any]]],
+                           index: Optional[TopologyIndex] = None) -> Iterator[str]:
+        """Generate markdown documentation from resource data as a stream of chunks."""
         template = self.jinja_env.get_template('resources.md.j2')
         
         # Serialize datetime properly using the custom converter
         generation_time = datetime.now()
         
-        return template.render(
+        return template.generate(
             resources=resources,
             generation_time=datetime_converter(generation_time),  # Use datetime_converter to format the datetime
             resource_counts={ 
                 resource_type: len(resource_list) 
                 for resource_type, resource_list in resources.items()
-            }
+            },
+            topology=index or TopologyIndex(resources)
         )
     
-    def _save_markdown(self, content: str):
-        """Save documentation in markdown format."""
-        output_path = os.path.join(self.output_dir, 'documentation.md')
-        with open(output_path, 'w') as f:
-            f.write(content)
-    
-    def _save_html(self, markdown_content: str):
-        """Convert markdown to HTML and save."""
-        html_content = markdown.markdown(
-            markdown_content,
-            extensions=['tables', 'fenced_code', 'toc']
-        )
+    def _pdf_executor(self, formats: List[str]):
+        """Worker process for WeasyPrint, or a no-op context without PDF output."""
+        if 'pdf' not in formats:
+            return nullcontext()
+        return ProcessPoolExecutor(max_workers=1)
+    
+    def _save_pdf(self, html_path: str, output_path: str,
+                  executor: Optional[Executor] = None) -> Optional[Future]:
+        """Convert an HTML file to PDF and save.
         
-        template = self.jinja_env.get_template('base.html.j2')
-        final_html = template.render(content=html_content)
+        With an executor, WeasyPrint runs there and the job is returned at once,
+        so the caller keeps writing while the PDF is laid out; otherwise the
+        PDF is rendered in this process before returning.
         
-        output_path = os.path.join(self.output_dir, 'documentation.html')
-        with open(output_path, 'w') as f:
-            f.write(final_html)
+        Returns:
+            The submitted job, or None if the PDF was rendered here
+        """
+        if executor is not None:
+            return executor.submit(_write_pdf, html_path, output_path)
+        try:
+            with get_tracer().span('docs.pdf', page=os.path.basename(output_path)):
+                _write_pdf(html_path, output_path)
+        except ImportError:
+            logger.error("WeasyPrint is required for PDF generation. Please install it first.")
+        return None
     
-    def _save_pdf(self, markdown_content: str):
-        """Convert markdown to PDF and save."""
+    def _wait_pdf(self, job: Optional[Future]):
+        """Wait for a PDF job returned by ``_save_pdf``."""
+        if job is None:
+            return
         try:
-            from weasyprint import HTML, CSS
-            
-            # First convert to HTML
-            html_content = markdown.markdown(
-                markdown_content,
-                extensions=['tables', 'fenced_code', 'toc']
-            )
-            
-            template = self.jinja_env.get_template('base.html.j2')
-            final_html = template.render(content=html_content)
-            
-            # Convert HTML to PDF
-            output_path = os.path.join(self.output_dir, 'documentation.pdf')
-            HTML(string=final_html).write_pdf(
-                output_path,
-                stylesheets=[CSS(string='body { font-family: Arial, sans-serif; }')]
-            )
+            with get_tracer().span('docs.pdf_wait'):
+                job.result()
         except ImportError:
             logger.error("WeasyPrint is required for PDF generation. Please install it first.")
     
     def generate_resource_details(self, resource_type: str, resource: Dict[str, Any]) -> str:
-        """Generate detailed documentation for a specific resource."""
-        template_name = f"{resource_type}_details.md.j2"
+        """Generate detailed documentation for a specific resource.
+        
+        Uses ``<type>_details.md.j2`` when present, falling back to the generic
+        ``resource_details.md.j2``.
+        """
+        template_names = [f"{resource_type}_details.md.j2", 'resource_details.md.j2']
         try:
-            template = self.jinja_env.get_template(template_name)
-            return template.render(resource=resource)
+            template = self.jinja_env.select_template(template_names)
+            return template.render(resource=resource, resource_type=resource_type)
         except Exception as e:
             logger.error(f"Error generating details for {resource_type}: {e}")
             return json.dumps(resource, default=datetime_converter, indent=2)  # Ensure datetime is serialized correctly
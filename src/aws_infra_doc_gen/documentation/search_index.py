@@ -0,0 +1,161 @@
+"""Static Search Index.
+
+This module builds a prebuilt client-side search index for the sharded HTML
+documentation. Resources are tokenized on their ids, names, types, addresses
+and tags into an inverted index, which is split into shards by token prefix.
+Prefixes are lengthened until every shard is small, and a key list maps
+prefixes to shards, so a query only loads the shards its terms can match.
+Matched resources are looked up in fixed-size chunks of a document table.
+Posting lists are delta-encoded, which keeps common tokens small once gzipped.
+
+Every shard is gzip-compressed JSON wrapped in a small script that hands it to
+the search box in ``base.html.j2``, so the index loads over ``file://`` as well
+as from a web server.
+"""
+
+import base64
+import gzip
+import json
+import os
+import re
+import shutil
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, List, Any, Tuple
+from markdown.extensions.toc import slugify
+
+# Directory of the index shards, relative to the documentation pages
+SEARCH_DIR = "search"
+
+# Documents per document-table chunk
+DOC_CHUNK_SIZE = 5000
+
+# Tokens per inverted-index shard before it is split on a longer prefix
+SHARD_TOKENS = 20000
+
+# Resource fields indexed besides tags
+SEARCH_FIELDS = [
+    'id', 'name', 'identifier', 'type', 'engine', 'runtime', 'state', 'status',
+    'vpc_id', 'subnet_id', 'private_ip', 'public_ip',
+]
+
+TOKEN_SEPARATORS = re.compile(r'[\s/:,=]+')
+TOKEN_PARTS = re.compile(r'[-_]+')
+WORD_PART = re.compile(r'[a-z]{2}')
+PLAIN_SLUG = re.compile(r'[a-z0-9_-]+')
+
+@lru_cache(maxsize=65536)
+def _tokenize_text(text: str) -> Tuple[str, ...]:
+    """Tokenize a string; types, VPCs and tags repeat across many resources."""
+    tokens = set()
+    for word in TOKEN_SEPARATORS.split(text.lower()):
+        if word:
+            tokens.add(word)
+            tokens.update(part for part in TOKEN_PARTS.split(word) if WORD_PART.match(part))
+    return tuple(sorted(tokens))
+
+def tokenize(value: Any) -> Tuple[str, ...]:
+    """Split a field value into lowercase search tokens.
+
+    Whole words are kept so prefixes of ids and addresses match, along with
+    the hyphen and underscore separated parts that start with a word, such as
+    ``web`` in ``web-12``. Numeric and hex parts are left out: they are unique
+    per resource and would bloat the index.
+    """
+    return _tokenize_text(str(value))
+
+def heading_anchor(label: str) -> str:
+    """Get the id the markdown toc extension gives a resource heading."""
+    anchor = label.lower()
+    if PLAIN_SLUG.fullmatch(anchor):
+        return anchor
+    return slugify(label, '-')
+
+def shard_prefixes(tokens: List[str], length: int = 1) -> List[Tuple[str, List[str]]]:
+    """Group sorted tokens into shards by prefix, lengthening crowded prefixes.
+    
+    A token belongs to the shard of the longest prefix it starts with.
+    
+    Returns:
+        List of (prefix, tokens) pairs
+    """
+    shards = []
+    for prefix, group in groupby(tokens, key=lambda token: token[:length]):
+        group = list(group)
+        if len(group) <= SHARD_TOKENS or len(prefix) < length:
+            shards.append((prefix, group))
+            continue
+        # Tokens equal to the prefix itself keep the prefix's own shard
+        shorter = [token for token in group if len(token) == length]
+        if shorter:
+            shards.append((prefix, shorter))
+        shards.extend(shard_prefixes([token for token in group if len(token) > length], length + 1))
+    return shards
+
+class SearchIndex:
+    """Inverted index over documented resources."""
+    
+    def __init__(self):
+        """Initialize an empty search index."""
+        self.docs = []
+        self.postings = {}
+    
+    def add(self, resource_type: str, resource: Dict[str, Any], label: str, page: str):
+        """Index a resource documented on a page.
+        
+        Args:
+            resource_type: Type of the resource
+            resource: Resource data
+            label: Display identifier, also the resource's heading on the page
+            page: Name of the page documenting the resource
+        """
+        doc_id = len(self.docs)
+        self.docs.append([label, resource_type, f"{page}.html#{heading_anchor(label)}"])
+        
+        values = [resource_type] + [resource[field] for field in SEARCH_FIELDS if resource.get(field)]
+        for tag in resource.get('tags') or []:
+            values.extend([tag.get('Key', ''), tag.get('Value', '')])
+        
+        tokens = set()
+        for value in values:
+            tokens.update(tokenize(value))
+        for token in tokens:
+            self.postings.setdefault(token, []).append(doc_id)
+    
+    def write(self, directory: str) -> int:
+        """Write the index shards, replacing any previous index.
+        
+        Args:
+            directory: Documentation directory; shards go to its ``search``
+                subdirectory
+        
+        Returns:
+            Number of shard files written
+        """
+        search_dir = os.path.join(directory, SEARCH_DIR)
+        shutil.rmtree(search_dir, ignore_errors=True)
+        os.makedirs(search_dir)
+        
+        shards = shard_prefixes(sorted(self.postings))
+        for number, (_, tokens) in enumerate(shards):
+            postings = {}
+            for token in tokens:
+                doc_ids = self.postings[token]
+                postings[token] = [doc_ids[0]] + [
+                    current - previous for previous, current in zip(doc_ids, doc_ids[1:])
+                ]
+            self._write_shard(search_dir, f"t_{number}", postings)
+        
+        for start in range(0, len(self.docs), DOC_CHUNK_SIZE):
+            self._write_shard(search_dir, f"d_{start // DOC_CHUNK_SIZE}",
+                              self.docs[start:start + DOC_CHUNK_SIZE])
+        
+        self._write_shard(search_dir, 'keys', [prefix for prefix, _ in shards])
+        return len(shards) + -(-len(self.docs) // DOC_CHUNK_SIZE) + 1
+    
+    def _write_shard(self, search_dir: str, name: str, data: Any):
+        """Write one gzip-compressed shard as a loadable script."""
+        payload = gzip.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'), mtime=0)
+        encoded = base64.b64encode(payload).decode('ascii')
+        with open(os.path.join(search_dir, f"{name}.js"), 'w') as f:
+            f.write(f'searchShardLoaded("{name}","{encoded}");\n')
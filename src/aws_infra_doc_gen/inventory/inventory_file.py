@@ -0,0 +1,338 @@
+"""Indexed Inventory File.
+
+This module provides a binary inventory format for random access to scanned
+resources. ``scan_results.json`` has to be decoded whole even to read one
+resource; an inventory file stores every resource as its own JSON document,
+with an index of byte offsets per resource type and per resource id, and is
+read through ``mmap`` so only the resources a reader touches are decoded.
+
+Layout (integers are little-endian)::
+
+    magic         8 bytes   b'AIDGINV1'
+    header        u64, u64  offset and length of the header
+    data          one compact JSON document per resource, grouped by type
+    offset tables per type, u64 offsets of its count + 1 document boundaries
+    id index      (u64 id hash, u32 type number, u32 position) entries, sorted
+    header        JSON: version, types with their count and offset table,
+                  and the id index location
+
+Converters to and from the ``scan_results.json`` format are provided by
+``json_to_inventory`` and ``inventory_to_json``.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+import logging
+from ..service.serialization import datetime_converter
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AIDGINV1'
+VERSION = 1
+
+# Magic, then the header's offset and length
+PREFIX = struct.Struct('<8sQQ')
+OFFSET = struct.Struct('<Q')
+# Id hash, type number, position within the type
+ID_ENTRY = struct.Struct('<QII')
+
+# Fields identifying a resource, in the order TopologyIndex.resource_key tries them
+ID_FIELDS = ('id', 'name', 'identifier')
+
+def resource_id_of(resource: Dict[str, Any]) -> Optional[str]:
+    """Get the identifier of a resource, if it has one."""
+    for id_field in ID_FIELDS:
+        if id_field in resource:
+            return str(resource[id_field])
+    return None
+
+def _id_hash(value: str) -> int:
+    """Stable 64-bit hash of a resource id (unlike hash(), the same in every process)."""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def is_inventory_file(path: str) -> bool:
+    """Check whether a file is an inventory file (rather than JSON)."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def write_inventory(resources: Dict[str, List[Dict[str, Any]]], path: str) -> int:
+    """Write resources to an inventory file.
+    
+    Args:
+        resources: Dictionary of AWS resources by type
+        path: File to write
+    
+    Returns:
+        Number of resources written
+    """
+    encoder = json.JSONEncoder(default=datetime_converter, separators=(',', ':'))
+    types = {}
+    id_entries = []
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREFIX.pack(MAGIC, 0, 0))
+        
+        boundaries = {}
+        for type_number, (resource_type, resource_list) in enumerate(resources.items()):
+            offsets = [f.tell()]
+            for position, resource in enumerate(resource_list):
+                f.write(encoder.encode(resource).encode('utf-8'))
+                offsets.append(f.tell())
+                identifier = resource_id_of(resource)
+                if identifier is not None:
+                    id_entries.append((_id_hash(identifier), type_number, position))
+            boundaries[resource_type] = offsets
+        
+        # Tables are 8-byte aligned
+        f.write(b'\0' * (-f.tell() % 8))
+        for resource_type, offsets in boundaries.items():
+            types[resource_type] = {'count': len(offsets) - 1, 'offsets': f.tell()}
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        
+        id_entries.sort()
+        id_index = {'offset': f.tell(), 'count': len(id_entries)}
+        for entry in id_entries:
+            f.write(ID_ENTRY.pack(*entry))
+        
+        header = json.dumps({'version': VERSION, 'types': types, 'ids': id_index}).encode('utf-8')
+        header_offset = f.tell()
+        f.write(header)
+        f.seek(0)
+        f.write(PREFIX.pack(MAGIC, header_offset, len(header)))
+    os.replace(tmp_path, path)
+    
+    count = sum(entry['count'] for entry in types.values())
+    logger.info(f"Inventory of {count} resources written to {path}")
+    return count
+
+class ResourceList(Sequence):
+    """Lazy, read-only list of the resources of one type in an inventory file.
+    
+    Each access decodes the resource from the file, so a reader keeping a
+    resource should hold on to the returned dict.
+    """
+    
+    def __init__(self, inventory: 'InventoryFile', resource_type: str):
+        self._inventory = inventory
+        self.resource_type = resource_type
+        self._count = inventory._types[resource_type]['count']
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._inventory._decode(self.resource_type, i) for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError('resource position out of range')
+        return self._inventory._decode(self.resource_type, position)
+    
+    def __iter__(self):
+        return (self._inventory._decode(self.resource_type, i) for i in range(self._count))
+
+class InventoryFile:
+    """Memory-mapped reader of an inventory file.
+    
+    Example::
+        
+        with InventoryFile('scan_results.inv') as inventory:
+            instance = inventory.get('i-0123456789abcdef0')
+            buckets = inventory['s3']
+            resources = inventory.load(['ec2', 'rds'])
+    """
+    
+    def __init__(self, path: str):
+        """Open an inventory file.
+        
+        Args:
+            path: Inventory file to read
+        
+        Raises:
+            ValueError: If the file is not an inventory file of a supported version
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self._map) < PREFIX.size or self._map[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not an inventory file")
+            _, header_offset, header_length = PREFIX.unpack_from(self._map, 0)
+            header = json.loads(self._map[header_offset:header_offset + header_length])
+            if header.get('version') != VERSION:
+                raise ValueError(f"Unsupported inventory file version: {header.get('version')}")
+        except (ValueError, OSError):
+            self.close()
+            raise
+        self._types = header['types']
+        self._type_names = list(self._types)
+        self._ids = header['ids']
+    
+    def close(self):
+        """Unmap and close the file."""
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def types(self) -> List[str]:
+        """Get the resource types in the file."""
+        return list(self._type_names)
+    
+    def counts(self) -> Dict[str, int]:
+        """Get the number of resources of each type."""
+        return {resource_type: entry['count'] for resource_type, entry in self._types.items()}
+    
+    def __contains__(self, resource_type: str) -> bool:
+        return resource_type in self._types
+    
+    def __getitem__(self, resource_type: str) -> ResourceList:
+        """Get the resources of a type, decoded as they are accessed."""
+        if resource_type not in self._types:
+            raise KeyError(resource_type)
+        return ResourceList(self, resource_type)
+    
+    def load(self, resource_types: Optional[Iterable[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Decode the resources of some or all types.
+        
+        Args:
+            resource_types: Types to decode (default: all); types not in the
+                file are skipped
+        
+        Returns:
+            Dictionary of AWS resources by type, as in scan_results.json
+        """
+        if resource_types is None:
+            resource_types = self._type_names
+        return {
+            resource_type: self._decode_all(resource_type)
+            for resource_type in resource_types if resource_type in self._types
+        }
+    
+    def get(self, resource_id: str, resource_type: Optional[str] = None,
+            default: Any = None) -> Any:
+        """Find a resource by id (its 'id', 'name' or 'identifier').
+        
+        Args:
+            resource_id: Identifier of the resource
+            resource_type: Only match resources of this type
+            default: Returned when no resource matches
+        
+        Returns:
+            The first matching resource, or default
+        """
+        for found_type, resource in self._find(resource_id):
+            if resource_type is None or found_type == resource_type:
+                return resource
+        return default
+    
+    def find(self, resource_id: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Find every resource with an id, across all types.
+        
+        Returns:
+            List of (resource type, resource) pairs
+        """
+        return list(self._find(resource_id))
+    
+    def _find(self, resource_id: str):
+        """Yield the (type, resource) pairs with an id, by binary search of the id index."""
+        target = _id_hash(resource_id)
+        base, count = self._ids['offset'], self._ids['count']
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if ID_ENTRY.unpack_from(self._map, base + middle * ID_ENTRY.size)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+        
+        # Entries sharing the hash are adjacent; check each for a real match
+        for entry in range(low, count):
+            id_hash, type_number, position = ID_ENTRY.unpack_from(self._map, base + entry * ID_ENTRY.size)
+            if id_hash != target:
+                break
+            resource_type = self._type_names[type_number]
+            resource = self._decode(resource_type, position)
+            if resource_id == resource_id_of(resource):
+                yield resource_type, resource
+    
+    def _bounds(self, resource_type: str, position: int) -> Tuple[int, int]:
+        """Byte range of a resource's document."""
+        table = self._types[resource_type]['offsets'] + position * OFFSET.size
+        return struct.unpack_from('<QQ', self._map, table)
+    
+    def _decode(self, resource_type: str, position: int) -> Dict[str, Any]:
+        """Decode one resource."""
+        start, end = self._bounds(resource_type, position)
+        return json.loads(self._map[start:end])
+    
+    def _decode_all(self, resource_type: str) -> List[Dict[str, Any]]:
+        """Decode every resource of a type."""
+        count = self._types[resource_type]['count']
+        if not count:
+            return []
+        table = self._types[resource_type]['offsets']
+        offsets = struct.unpack_from(f"<{count + 1}Q", self._map, table)
+        # The documents are contiguous: joined into one JSON array, they decode
+        # in a single call instead of one per resource
+        data = self._map[offsets[0]:offsets[-1]]
+        base = offsets[0]
+        return json.loads(b'[' + b','.join(
+            data[start - base:end - base] for start, end in zip(offsets, offsets[1:])
+        ) + b']')
+
+def json_to_inventory(json_path: str, inventory_path: str) -> int:
+    """Convert a scan_results.json file to an inventory file.
+    
+    Returns:
+        Number of resources converted
+    """
+    with open(json_path, 'r') as f:
+        resources = json.load(f)
+    return write_inventory(resources, inventory_path)
+
+def inventory_to_json(inventory_path: str, json_path: str) -> int:
+    """Convert an inventory file to the scan_results.json format.
+    
+    Returns:
+        Number of resources converted
+    """
+    with InventoryFile(inventory_path) as inventory:
+        resources = inventory.load()
+    with open(json_path, 'w') as f:
+        json.dump(resources, f, default=datetime_converter, indent=4)
+    return sum(len(resource_list) for resource_list in resources.values())
+
+def load_resources(path: str, resource_types: Optional[Iterable[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Load resources from a scan_results.json or an inventory file.
+    
+    With an inventory file only the requested types are decoded.
+    
+    Args:
+        path: JSON or inventory file
+        resource_types: Types to load (default: all)
+    
+    Returns:
+        Dictionary of AWS resources by type
+    """
+    if is_inventory_file(path):
+        with InventoryFile(path) as inventory:
+            return inventory.load(resource_types)
+    with open(path, 'r') as f:
+        resources = json.load(f)
+    if resource_types is None:
+        return resources
+    return {resource_type: resources[resource_type] for resource_type in resource_types if resource_type in resources}
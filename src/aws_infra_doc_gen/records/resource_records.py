@@ -0,0 +1,315 @@
+"""Compact Resource Records.
+
+This module provides ``__slots__`` record classes for the resources the
+scanners return, as a compact alternative to one dict per resource. Field
+values are stored in slots instead of a per-resource hash table, strings are
+interned so repeated values (instance types, VPC and subnet ids, ...) are
+stored once, and tags live in a columnar ``TagStore`` shared by an inventory.
+
+Records are read-only mappings: ``record['vpc_id']``, ``record.get('tags')``,
+``dict(record)`` and Jinja's ``resource.id`` all work as with the dicts, and a
+record compares equal to the dict it was built from.
+"""
+
+import keyword
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+def record_slots(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Slot names of a record's fields.
+    
+    Keywords (``class``) get a trailing underscore, and ``tags`` is stored as a
+    row of the tag store plus the store itself.
+    """
+    slots = []
+    for field in fields:
+        if field == 'tags':
+            slots.extend(['_tag_row', '_tag_store'])
+        else:
+            slots.append(_slot_name(field))
+    return tuple(slots)
+
+def _slot_name(field: str) -> str:
+    """Slot holding a (non-tag) field."""
+    return f"{field}_" if keyword.iskeyword(field) else field
+
+def _intern(value: Any, shared: Optional[Dict[Any, Any]] = None) -> Any:
+    """Intern the strings of a value, recursing into dicts and lists.
+    
+    With a shared cache, equal nested dicts and lists also become one object.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if not isinstance(value, (dict, list)):
+        return value
+    if shared is not None:
+        key = _freeze(value)
+        existing = shared.get(key)
+        if existing is not None:
+            return existing
+    if isinstance(value, dict):
+        interned = {sys.intern(key) if isinstance(key, str) else key: _intern(item, shared)
+                    for key, item in value.items()}
+    else:
+        interned = [_intern(item, shared) for item in value]
+    if shared is not None:
+        shared[key] = interned
+    return interned
+
+def _freeze(value: Any) -> Any:
+    """Hashable key of a value, distinguishing types (so 1 and True differ)."""
+    if isinstance(value, dict):
+        return (dict, tuple((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return (list, tuple(_freeze(item) for item in value))
+    return (type(value), value)
+
+class TagStore:
+    """Columnar store of the AWS tag lists of many resources.
+    
+    Every distinct key and value string is stored once; a tag is a pair of
+    string ids in the ``keys`` and ``values`` columns, and a resource's tags
+    are the slice ``offsets[row]:offsets[row + 1]`` of those columns.
+    """
+    
+    def __init__(self):
+        """Initialize an empty store."""
+        self.strings = []
+        self.keys = array('I')
+        self.values = array('I')
+        self.offsets = array('Q', [0])
+        self._ids = {}
+    
+    def __len__(self) -> int:
+        """Number of tag lists stored."""
+        return len(self.offsets) - 1
+    
+    def add(self, tags: List[Dict[str, str]]) -> int:
+        """Store a resource's tags.
+        
+        Args:
+            tags: Tags in the AWS format, [{'Key': ..., 'Value': ...}]
+        
+        Returns:
+            Row of the tag list
+        """
+        for tag in tags:
+            self.keys.append(self._id(tag['Key']))
+            self.values.append(self._id(tag['Value']))
+        self.offsets.append(len(self.keys))
+        return len(self.offsets) - 2
+    
+    def get(self, row: int) -> List[Dict[str, str]]:
+        """Rebuild the AWS-format tag list of a row."""
+        start, end = self.offsets[row], self.offsets[row + 1]
+        strings = self.strings
+        return [
+            {'Key': strings[key], 'Value': strings[value]}
+            for key, value in zip(self.keys[start:end], self.values[start:end])
+        ]
+    
+    def rows_with(self, key: str, value: Optional[str] = None) -> List[int]:
+        """Find the rows carrying a tag key, optionally with a given value.
+        
+        Scans the id columns only, without rebuilding any tag list.
+        """
+        key_id = self._ids.get(key)
+        value_id = self._ids.get(value) if value is not None else None
+        if key_id is None or (value is not None and value_id is None):
+            return []
+        rows = []
+        row = 0
+        for position, candidate in enumerate(self.keys):
+            if candidate != key_id or (value_id is not None and self.values[position] != value_id):
+                continue
+            while self.offsets[row + 1] <= position:
+                row += 1
+            if not rows or rows[-1] != row:
+                rows.append(row)
+        return rows
+    
+    def _id(self, string: str) -> int:
+        """Get the id of a string, adding it on first use."""
+        string_id = self._ids.get(string)
+        if string_id is None:
+            string_id = self._ids[string] = len(self.strings)
+            self.strings.append(sys.intern(string))
+        return string_id
+
+# Store for records unpickled in another process (e.g. a render worker)
+_unpickled_tags = TagStore()
+
+class ResourceRecord(Mapping):
+    """Base of the compact, read-only resource records.
+    
+    Subclasses list their fields in ``FIELDS`` (in the scanner's key order)
+    and set ``__slots__ = record_slots(FIELDS)``. Fields a resource lacks are
+    left unset and are absent from the mapping.
+    """
+    
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+        cls._slot_of = {field: _slot_name(field) for field in cls.FIELDS if field != 'tags'}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], tag_store: Optional[TagStore] = None,
+                  shared: Optional[Dict[Any, Any]] = None) -> Optional['ResourceRecord']:
+        """Build a record from a scanned resource.
+        
+        Args:
+            data: Resource as returned by the scanner
+            tag_store: Store holding the tags (required when the resource has tags)
+            shared: Cache making equal nested values of many records one
+                object; such values must not be modified
+        
+        Returns:
+            Record, or None if the resource has fields the record cannot hold
+        """
+        if not cls.FIELDS or not data.keys() <= cls._field_set:
+            return None
+        record = cls.__new__(cls)
+        for field, value in data.items():
+            if field == 'tags':
+                if value is not None:
+                    record._tag_store = tag_store
+                    record._tag_row = tag_store.add(value)
+                else:
+                    record._tag_row = None
+            else:
+                setattr(record, cls._slot_of[field], _intern(value, shared))
+        return record
+    
+    @property
+    def tags(self) -> Optional[List[Dict[str, str]]]:
+        """Tags in the AWS format, rebuilt from the tag store."""
+        row = self._tag_row
+        return None if row is None else self._tag_store.get(row)
+    
+    def __getitem__(self, field: str) -> Any:
+        if field == 'tags' and 'tags' in self._field_set:
+            try:
+                return self.tags
+            except AttributeError:
+                raise KeyError(field) from None
+        slot = self._slot_of.get(field)
+        if slot is None:
+            raise KeyError(field)
+        try:
+            return getattr(self, slot)
+        except AttributeError:
+            raise KeyError(field) from None
+    
+    def get(self, field: str, default: Any = None) -> Any:
+        slot = self._slot_of.get(field)
+        if slot is not None:
+            return getattr(self, slot, default)
+        if field == 'tags' and 'tags' in self._field_set:
+            return self.tags if hasattr(self, '_tag_row') else default
+        return default
+    
+    def __contains__(self, field: object) -> bool:
+        if field == 'tags' and 'tags' in self._field_set:
+            return hasattr(self, '_tag_row')
+        slot = self._slot_of.get(field)
+        return slot is not None and hasattr(self, slot)
+    
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self.FIELDS if field in self)
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+    
+    def __reduce__(self):
+        # Tags travel as a plain list, not with the whole inventory's store
+        return (_restore, (type(self), dict(self)))
+
+def _restore(cls, data: Dict[str, Any]) -> ResourceRecord:
+    """Rebuild a pickled record."""
+    return cls.from_dict(data, _unpickled_tags)
+
+# Fields of every record, set on the resources of multi-account scans
+LOCATION_FIELDS = ('account_id', 'region')
+
+class EC2Instance(ResourceRecord):
+    """EC2 instance record."""
+    
+    FIELDS = ('id', 'type', 'state', 'vpc_id', 'subnet_id', 'private_ip', 'public_ip',
+              'tags', 'security_groups', 'launch_time') + LOCATION_FIELDS
+    __slots__ = record_slots(FIELDS)
+
+class S3Bucket(ResourceRecord):
+    """S3 bucket record."""
+    
+    FIELDS = ('name', 'creation_date', 'encryption', 'location') + LOCATION_FIELDS
+    __slots__ = record_slots(FIELDS)
+
+class RDSInstance(ResourceRecord):
+    """RDS instance record."""
+    
+    FIELDS = ('identifier', 'class', 'engine', 'status', 'endpoint', 'multi_az',
+              'vpc_security_groups', 'vpc_id', 'subnet_ids', 'storage') + LOCATION_FIELDS
+    __slots__ = record_slots(FIELDS)
+
+class LambdaFunction(ResourceRecord):
+    """Lambda function record."""
+    
+    FIELDS = ('name', 'runtime', 'handler', 'role', 'memory', 'timeout', 'last_modified',
+              'vpc_config', 'policy_resources') + LOCATION_FIELDS
+    __slots__ = record_slots(FIELDS)
+
+# Record class of each resource type
+RECORD_TYPES = {
+    'ec2': EC2Instance,
+    's3': S3Bucket,
+    'rds': RDSInstance,
+    'lambda': LambdaFunction,
+}
+
+def compact_inventory(resources: Dict[str, List[Dict[str, Any]]],
+                      tag_store: Optional[TagStore] = None) -> Dict[str, List[Any]]:
+    """Convert scanned resources to compact records.
+    
+    Resources of types without a record class, or with fields their record
+    does not declare, are kept as dicts. Equal nested values (security
+    groups, storage settings, ...) are shared between records, so records
+    and their values must be treated as read-only.
+    
+    Args:
+        resources: Dictionary of AWS resources by type
+        tag_store: Store for the tags (default: a new store for this inventory)
+    
+    Returns:
+        Dictionary of resources by type, as records where possible
+    """
+    tag_store = tag_store if tag_store is not None else TagStore()
+    shared = {}
+    compacted = {}
+    kept = 0
+    for resource_type, resource_list in resources.items():
+        record_class = RECORD_TYPES.get(resource_type)
+        if record_class is None:
+            compacted[resource_type] = resource_list
+            continue
+        records = []
+        for resource in resource_list:
+            record = record_class.from_dict(resource, tag_store, shared)
+            if record is None:
+                kept += 1
+                record = resource
+            records.append(record)
+        compacted[resource_type] = records
+    if kept:
+        logger.debug(f"{kept} resources with unexpected fields kept as dicts")
+    return compacted
@@ -0,0 +1,271 @@
+"""Asynchronous AWS Resource Scanner.
+
+This module provides an asyncio engine with the same ``_scan_*`` contract as
+``AWSResourceScanner``, built on aiobotocore. Every service gets one client
+with a pooled HTTP connector and a bounded semaphore, so thousands of
+per-bucket and per-function detail calls can be in flight at once without
+a thread per call.
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Dict, List, Any, Optional
+import logging
+from botocore.exceptions import ClientError
+from ..tracing.tracer import get_tracer, instrument_events
+from .aws_scanner import ec2_record, s3_record, rds_record, lambda_record, s3_policy_resources
+from .registry import EngineScanner, Paginate, get_scanner
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session
+except ImportError:
+    get_session = None
+
+logger = logging.getLogger(__name__)
+
+# Default in-flight calls per service
+DEFAULT_CONCURRENCY = 256
+
+class AsyncAWSResourceScanner:
+    """Asyncio scanner for discovering and collecting AWS resource information."""
+    
+    def __init__(self, region: str, max_concurrency: int = DEFAULT_CONCURRENCY,
+                 service_concurrency: Optional[Dict[str, int]] = None,
+                 endpoint_url: Optional[str] = None,
+                 scanner_options: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Initialize the scanner.
+        
+        Args:
+            region: AWS region to scan
+            max_concurrency: In-flight calls allowed per service, which is
+                also the size of each client's connection pool
+            service_concurrency: Per-service overrides of max_concurrency,
+                e.g. {'iam': 20} for services with tight rate limits
+            endpoint_url: Endpoint for every service (e.g. a local moto server)
+            scanner_options: Per-type plugin settings (``aws.scanners``)
+        """
+        if get_session is None:
+            raise ImportError("aiobotocore is required for the async scanner. Please install it first.")
+        
+        self.region = region
+        self.max_concurrency = max_concurrency
+        self.service_concurrency = service_concurrency or {}
+        self.endpoint_url = endpoint_url
+        self.scanner_options = scanner_options or {}
+        self.session = get_session()
+        instrument_events(self.session)
+        self._clients = {}
+        self._limits = {}
+        self._role_policy_cache = {}
+    
+    def scan_resources(self, resource_types: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Scan AWS resources of specified types.
+        
+        Args:
+            resource_types: List of AWS resource types to scan (e.g., ['ec2', 's3'])
+        
+        Returns:
+            Dictionary mapping resource types to lists of resource metadata
+        """
+        return asyncio.run(self.scan_resources_async(resource_types))
+    
+    async def scan_resources_async(self, resource_types: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Scan AWS resources of specified types concurrently.
+        
+        Args:
+            resource_types: List of AWS resource types to scan (e.g., ['ec2', 's3'])
+        
+        Returns:
+            Dictionary mapping resource types to lists of resource metadata
+        """
+        scanners = {}
+        for resource_type in resource_types:
+            plugin = get_scanner(resource_type, self.scanner_options.get(resource_type))
+            if isinstance(plugin, EngineScanner):
+                scanners[resource_type] = getattr(self, f"_scan_{resource_type}")
+            elif plugin is not None:
+                scanners[resource_type] = lambda plugin=plugin: self._run_plugin(plugin)
+            else:
+                logger.warning(f"Scanner for {resource_type} not implemented")
+        
+        async with AsyncExitStack() as stack:
+            self._stack = stack
+            self._role_tasks = {}
+            try:
+                results = await asyncio.gather(*(
+                    self._traced_scan(resource_type, scanner) for resource_type, scanner in scanners.items()
+                ))
+            finally:
+                self._clients = {}
+                self._limits = {}
+        
+        return dict(zip(scanners, results))
+    
+    async def _traced_scan(self, resource_type: str, scanner) -> List[Dict[str, Any]]:
+        """Run one ``_scan_*`` method in a tracing span."""
+        with get_tracer().span(f"scan.{resource_type}") as span:
+            resources = await scanner()
+            span.count('resources', len(resources))
+            return resources
+    
+    async def _run_plugin(self, plugin) -> List[Dict[str, Any]]:
+        """Run a plugin's scan, executing the requests it yields."""
+        steps = plugin.scan()
+        result = None
+        while True:
+            try:
+                request = steps.send(result)
+            except StopIteration as done:
+                return done.value
+            result = await self._execute(request)
+    
+    async def _execute(self, request):
+        """Execute a plugin's request, or every request of a batch concurrently.
+        
+        Args:
+            request: Paginate or Call, or a (nested) list of them
+        
+        Returns:
+            The items of a Paginate, the response of a Call, or a list of
+            results matching a batch
+        """
+        if isinstance(request, list):
+            return list(await asyncio.gather(*(self._execute(item) for item in request)))
+        if isinstance(request, Paginate):
+            return await self._paginate(request.service, request.operation, request.key, **request.kwargs)
+        try:
+            return await self._call(request.service, request.operation, **request.kwargs)
+        except ClientError as e:
+            if not request.optional:
+                raise
+            logger.debug(f"Skipping {request.service}.{request.operation}: {e}")
+            return None
+    
+    def clear_cache(self):
+        """Forget cached IAM role policies so the next scan re-reads them."""
+        self._role_policy_cache = {}
+    
+    async def _client(self, service: str):
+        """Get the run's client for a service, creating it on first use.
+        
+        Creation is shared as a task so concurrent first calls get one client.
+        """
+        if service not in self._clients:
+            limit = self.service_concurrency.get(service, self.max_concurrency)
+            self._limits[service] = asyncio.Semaphore(limit)
+            self._clients[service] = asyncio.ensure_future(self._stack.enter_async_context(
+                self.session.create_client(
+                    service,
+                    region_name=self.region,
+                    endpoint_url=self.endpoint_url,
+                    config=AioConfig(max_pool_connections=limit)
+                )
+            ))
+        return await self._clients[service]
+    
+    async def _call(self, service: str, operation: str, **kwargs) -> Dict[str, Any]:
+        """Make one API call, waiting for a free slot in the service's semaphore."""
+        client = await self._client(service)
+        async with self._limits[service]:
+            return await getattr(client, operation)(**kwargs)
+    
+    async def _paginate(self, service: str, operation: str, key: str, **kwargs) -> List[Dict[str, Any]]:
+        """Collect the items under key from every page of a paginated call."""
+        client = await self._client(service)
+        items = []
+        async with self._limits[service]:
+            async for page in client.get_paginator(operation).paginate(**kwargs):
+                items.extend(page.get(key, []))
+        return items
+    
+    async def _scan_ec2(self) -> List[Dict[str, Any]]:
+        """Scan EC2 instances."""
+        return [
+            ec2_record(instance)
+            for reservation in await self._paginate('ec2', 'describe_instances', 'Reservations')
+            for instance in reservation['Instances']
+        ]
+    
+    async def _scan_s3(self) -> List[Dict[str, Any]]:
+        """Scan S3 buckets, fetching every bucket's details concurrently."""
+        response = await self._call('s3', 'list_buckets')
+        return await asyncio.gather(*(self._describe_bucket(bucket) for bucket in response['Buckets']))
+    
+    async def _describe_bucket(self, bucket: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch a bucket's encryption and location."""
+        async def encryption():
+            try:
+                return await self._call('s3', 'get_bucket_encryption', Bucket=bucket['Name'])
+            except ClientError:
+                return None
+        
+        encryption_response, location = await asyncio.gather(
+            encryption(),
+            self._call('s3', 'get_bucket_location', Bucket=bucket['Name'])
+        )
+        return s3_record(bucket, encryption_response, location)
+    
+    async def _scan_rds(self) -> List[Dict[str, Any]]:
+        """Scan RDS instances."""
+        instances = await self._paginate('rds', 'describe_db_instances', 'DBInstances')
+        return [rds_record(instance) for instance in instances]
+    
+    async def _scan_lambda(self) -> List[Dict[str, Any]]:
+        """Scan Lambda functions, resolving their roles' policies concurrently."""
+        functions = await self._paginate('lambda', 'list_functions', 'Functions')
+        policy_resources = await asyncio.gather(
+            *(self._get_role_policy_resources(function['Role']) for function in functions)
+        )
+        
+        return [lambda_record(function, resources) for function, resources in zip(functions, policy_resources)]
+    
+    async def _get_role_policy_resources(self, role_arn: str) -> List[Any]:
+        """Collect the S3 resources allowed by an IAM role's policies.
+        
+        Each role is resolved once per scanner; functions sharing a role await
+        the same lookup.
+        """
+        if role_arn in self._role_policy_cache:
+            return self._role_policy_cache[role_arn]
+        if role_arn not in self._role_tasks:
+            self._role_tasks[role_arn] = asyncio.ensure_future(self._read_role_policies(role_arn))
+        return await self._role_tasks[role_arn]
+    
+    async def _read_role_policies(self, role_arn: str) -> List[Any]:
+        """Read a role's policies and keep the S3 resources they allow."""
+        role_name = role_arn.split('/')[-1]
+        documents = []
+        try:
+            inline, attached = await asyncio.gather(
+                self._paginate('iam', 'list_role_policies', 'PolicyNames', RoleName=role_name),
+                self._paginate('iam', 'list_attached_role_policies', 'AttachedPolicies', RoleName=role_name)
+            )
+            documents.extend(await asyncio.gather(*(
+                self._inline_policy_document(role_name, policy_name)
+                for policy_name in inline
+            )))
+            documents.extend(await asyncio.gather(*(
+                self._attached_policy_document(policy['PolicyArn'])
+                for policy in attached
+            )))
+        except ClientError as e:
+            logger.warning(f"Could not read policies for role {role_name}: {e}")
+        
+        self._role_policy_cache[role_arn] = s3_policy_resources(documents)
+        return self._role_policy_cache[role_arn]
+    
+    async def _inline_policy_document(self, role_name: str, policy_name: str) -> Dict[str, Any]:
+        """Fetch an inline role policy document."""
+        response = await self._call('iam', 'get_role_policy', RoleName=role_name, PolicyName=policy_name)
+        return response['PolicyDocument']
+    
+    async def _attached_policy_document(self, policy_arn: str) -> Dict[str, Any]:
+        """Fetch the default version document of a managed policy."""
+        policy = await self._call('iam', 'get_policy', PolicyArn=policy_arn)
+        version = await self._call(
+            'iam', 'get_policy_version',
+            PolicyArn=policy_arn,
+            VersionId=policy['Policy']['DefaultVersionId']
+        )
+        return version['PolicyVersion']['Document']
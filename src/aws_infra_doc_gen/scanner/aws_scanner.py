@@ -4,27 +4,179 @@ This module handles the discovery and metadata collection of AWS resources.
 """
 
 import boto3
-from typing import Dict, List, Any
+from botocore.exceptions import ClientError
+from typing import Dict, List, Any, Optional
 import logging
 import json
 from datetime import datetime
+from fnmatch import fnmatchcase
+from ..clients.client_factory import ClientFactory, get_client_factory
+from ..tracing.tracer import get_tracer
+from .registry import EngineScanner, Paginate, get_scanner, run_plugin
 
 
 
 
 logger = logging.getLogger(__name__)
 
+def ec2_record(instance: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the record of a described EC2 instance."""
+    return {
+        'id': instance['InstanceId'],
+        'type': instance['InstanceType'],
+        'state': instance['State']['Name'],
+        'vpc_id': instance.get('VpcId'),
+        'subnet_id': instance.get('SubnetId'),
+        'private_ip': instance.get('PrivateIpAddress'),
+        'public_ip': instance.get('PublicIpAddress'),
+        'tags': instance.get('Tags', []),
+        'security_groups': instance.get('SecurityGroups', []),
+        'launch_time': instance.get('LaunchTime'),
+    }
+
+def s3_record(bucket: Dict[str, Any], encryption: Optional[Dict[str, Any]],
+              location: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the record of a bucket from list_buckets and its detail calls.
+    
+    Args:
+        bucket: Entry of list_buckets
+        encryption: get_bucket_encryption response (None if not configured)
+        location: get_bucket_location response
+    """
+    return {
+        'name': bucket['Name'],
+        'creation_date': bucket['CreationDate'],
+        'encryption': encryption.get('ServerSideEncryptionConfiguration') if encryption else None,
+        'location': location['LocationConstraint'],
+    }
+
+def rds_record(instance: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the record of a described RDS instance."""
+    return {
+        'identifier': instance['DBInstanceIdentifier'],
+        'class': instance['DBInstanceClass'],
+        'engine': instance['Engine'],
+        'status': instance['DBInstanceStatus'],
+        'endpoint': instance.get('Endpoint'),
+        'multi_az': instance['MultiAZ'],
+        'vpc_security_groups': [
+            sg['VpcSecurityGroupId']
+            for sg in instance.get('VpcSecurityGroups', [])
+        ],
+        'vpc_id': instance.get('DBSubnetGroup', {}).get('VpcId'),
+        'subnet_ids': [
+            subnet['SubnetIdentifier']
+            for subnet in instance.get('DBSubnetGroup', {}).get('Subnets', [])
+        ],
+        'storage': {
+            'type': instance['StorageType'],
+            'size': instance['AllocatedStorage'],
+            'encrypted': instance['StorageEncrypted'],
+        }
+    }
+
+def lambda_record(function: Dict[str, Any], policy_resources: List[Any]) -> Dict[str, Any]:
+    """Build the record of a listed Lambda function and its role's policy resources."""
+    return {
+        'name': function['FunctionName'],
+        'runtime': function['Runtime'],
+        'handler': function['Handler'],
+        'role': function['Role'],
+        'memory': function['MemorySize'],
+        'timeout': function['Timeout'],
+        'last_modified': function['LastModified'],
+        'vpc_config': function.get('VpcConfig'),
+        'policy_resources': policy_resources,
+    }
+
+def _as_list(value: Any) -> List[Any]:
+    return [value] if isinstance(value, str) else list(value or [])
+
+def _can_grant_s3(action: str) -> bool:
+    """Whether an action pattern (e.g. 's3:Get*', '*') matches some S3 operation."""
+    service, _, _ = action.lower().partition(':')
+    return fnmatchcase('s3', service)
+
+def _covers_s3(action: str) -> bool:
+    """Whether an action pattern matches every S3 operation."""
+    service, _, operation = action.lower().partition(':')
+    return fnmatchcase('s3', service) and operation in ('', '*')
+
+def _is_s3_resource(resource: str) -> bool:
+    """Whether a resource pattern can match an S3 bucket or object."""
+    parts = resource.split(':', 5)
+    return resource == '*' or (len(parts) == 6 and parts[0] == 'arn' and fnmatchcase('s3', parts[2]))
+
+def _covers_buckets(resource: str) -> bool:
+    """Whether a resource pattern matches every bucket."""
+    return resource == '*' or resource.split(':', 5)[-1] == '*'
+
+def s3_policy_resources(documents: List[Dict[str, Any]]) -> List[Any]:
+    """Collect the S3 resources granted by the Allow statements of policy documents.
+    
+    Statements whose Action (or NotAction) cannot grant an S3 operation, such
+    as ``logs:*`` on ``*``, are skipped. A statement with NotResource grants
+    every S3 resource but the listed ones, and is kept as
+    ``{'NotResource': [...]}``.
+    
+    Args:
+        documents: IAM policy documents
+    
+    Returns:
+        Sorted resource ARN patterns, followed by the NotResource entries
+    """
+    resources = set()
+    exclusions = []
+    for document in documents:
+        statements = document.get('Statement', [])
+        if isinstance(statements, dict):
+            statements = [statements]
+        for statement in statements:
+            if statement.get('Effect') != 'Allow':
+                continue
+            if 'NotAction' in statement:
+                if any(_covers_s3(action) for action in _as_list(statement['NotAction'])):
+                    continue
+            elif not any(_can_grant_s3(action) for action in _as_list(statement.get('Action'))):
+                continue
+            
+            if 'NotResource' in statement:
+                excluded = sorted(r for r in _as_list(statement['NotResource']) if _is_s3_resource(r))
+                if any(_covers_buckets(resource) for resource in excluded):
+                    continue
+                if not excluded:
+                    resources.add('*')
+                elif {'NotResource': excluded} not in exclusions:
+                    exclusions.append({'NotResource': excluded})
+                continue
+            resources.update(r for r in _as_list(statement.get('Resource')) if _is_s3_resource(r))
+    return sorted(resources) + exclusions
+
 class AWSResourceScanner:
     """Scanner for discovering and collecting AWS resource information."""
     
-    def __init__(self, region: str):
+    def __init__(self, region: str, client_factory: Optional[ClientFactory] = None,
+                 scanner_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 inventory_source=None, session: Optional[boto3.Session] = None):
         """Initialize the scanner.
         
         Args:
             region: AWS region to scan
+            client_factory: Pool of clients to reuse (default: the
+                process-wide pool shared with the change tracker)
+            scanner_options: Per-type plugin settings (``aws.scanners``)
+            inventory_source: Bulk source (AWS Config, Resource Explorer)
+                consulted before the per-service scanners, see
+                ``inventory_sources``
+            session: Session providing the credentials (default: the
+                default credentials)
         """
         self.region = region
-        self.session = boto3.Session(region_name=region)
+        self.session = session or boto3.Session(region_name=region)
+        self.clients = client_factory or get_client_factory()
+        self.scanner_options = scanner_options or {}
+        self.inventory_source = inventory_source
+        self._role_policy_cache = {}
         
     def scan_resources(self, resource_types: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """Scan AWS resources of specified types.
@@ -36,42 +188,76 @@ class AWSResourceScanner:
             Dictionary mapping resource types to lists of resource metadata
         """
         resources = {}
+        tracer = get_tracer()
+        requested = resource_types
+        
+        if self.inventory_source is not None:
+            with tracer.span('inventory_source') as span:
+                resources, resource_types = self.inventory_source.collect(self, resource_types)
+                span.count('resources', sum(len(records) for records in resources.values()))
         
         for resource_type in resource_types:
-            method_name = f"_scan_{resource_type}"
-            if hasattr(self, method_name):
-                scanner = getattr(self, method_name)
-                resources[resource_type] = scanner()
+            plugin = get_scanner(resource_type, self.scanner_options.get(resource_type))
+            if plugin is not None:
+                with tracer.span(f"scan.{resource_type}") as span:
+                    if isinstance(plugin, EngineScanner):
+                        resources[resource_type] = getattr(self, f"_scan_{resource_type}")()
+                    else:
+                        resources[resource_type] = run_plugin(plugin, self._execute)
+                    span.count('resources', len(resources[resource_type]))
             else:
                 logger.warning(f"Scanner for {resource_type} not implemented")
                 
-        return resources
+        return {resource_type: resources[resource_type] for resource_type in requested if resource_type in resources}
+    
+    def _execute(self, request):
+        """Execute a plugin's request, or each request of a batch in turn.
+        
+        Args:
+            request: Paginate or Call, or a (nested) list of them
+        
+        Returns:
+            The items of a Paginate, the response of a Call, or a list of
+            results matching a batch
+        """
+        if isinstance(request, list):
+            return [self._execute(item) for item in request]
+        
+        client = self.clients.client(request.service, self.region, self.session)
+        if isinstance(request, Paginate):
+            items = []
+            for page in client.get_paginator(request.operation).paginate(**request.kwargs):
+                items.extend(page.get(request.key, []))
+            return items
+        
+        try:
+            return getattr(client, request.operation)(**request.kwargs)
+        except ClientError as e:
+            if not request.optional:
+                raise
+            logger.debug(f"Skipping {request.service}.{request.operation}: {e}")
+            return None
+    
+    def clear_cache(self):
+        """Forget cached IAM role policies so the next scan re-reads them."""
+        self._role_policy_cache = {}
     
     def _scan_ec2(self) -> List[Dict[str, Any]]:
         """Scan EC2 instances."""
-        ec2 = self.session.client('ec2')
+        ec2 = self.clients.client('ec2', self.region, self.session)
         instances = []
         
         paginator = ec2.get_paginator('describe_instances')
         for page in paginator.paginate():
             for reservation in page['Reservations']:
                 for instance in reservation['Instances']:
-                    instances.append({
-                        'id': instance['InstanceId'],
-                        'type': instance['InstanceType'],
-                        'state': instance['State']['Name'],
-                        'vpc_id': instance.get('VpcId'),
-                        'subnet_id': instance.get('SubnetId'),
-                        'tags': instance.get('Tags', []),
-                        'security_groups': instance.get('SecurityGroups', []),
-                        'launch_time': instance.get('LaunchTime'),
-                    })
+                    instances.append(ec2_record(instance))
         
         return instances
     
     def _scan_s3(self) -> List[Dict[str, Any]]:
         """Scan S3 buckets."""
-        s3 = self.session.client('s3')
+        s3 = self.clients.client('s3', self.region, self.session)
         buckets = []
         
         response = s3.list_buckets()
@@ -81,56 +267,64 @@ class AWSResourceScanner:
             except s3.exceptions.ClientError:
                 encryption = None
                 
-            buckets.append({
-                'name': bucket['Name'],
-                'creation_date': bucket['CreationDate'],
-                'encryption': encryption.get('ServerSideEncryptionConfiguration') if encryption else None,
-                'location': s3.get_bucket_location(Bucket=bucket['Name'])['LocationConstraint'],
-            })
+            buckets.append(s3_record(bucket, encryption, s3.get_bucket_location(Bucket=bucket['Name'])))
             
         return buckets
     
     def _scan_rds(self) -> List[Dict[str, Any]]:
         """Scan RDS instances."""
-        rds = self.session.client('rds')
+        rds = self.clients.client('rds', self.region, self.session)
         instances = []
         
         paginator = rds.get_paginator('describe_db_instances')
         for page in paginator.paginate():
             for instance in page['DBInstances']:
-                instances.append({
-                    'identifier': instance['DBInstanceIdentifier'],
-                    'class': instance['DBInstanceClass'],
-                    'engine': instance['Engine'],
-                    'status': instance['DBInstanceStatus'],
-                    'endpoint': instance.get('Endpoint'),
-                    'multi_az': instance['MultiAZ'],
-                    'storage': {
-                        'type': instance['StorageType'],
-                        'size': instance['AllocatedStorage'],
-                        'encrypted': instance['StorageEncrypted'],
-                    }
-                })
+                instances.append(rds_record(instance))
                 
         return instances
     
     def _scan_lambda(self) -> List[Dict[str, Any]]:
         """Scan Lambda functions."""
-        lambda_client = self.session.client('lambda')
+        lambda_client = self.clients.client('lambda', self.region, self.session)
+        iam = self.clients.client('iam', self.region, self.session)
         functions = []
         
         paginator = lambda_client.get_paginator('list_functions')
         for page in paginator.paginate():
             for function in page['Functions']:
-                functions.append({
-                    'name': function['FunctionName'],
-                    'runtime': function['Runtime'],
-                    'handler': function['Handler'],
-                    'role': function['Role'],
-                    'memory': function['MemorySize'],
-                    'timeout': function['Timeout'],
-                    'last_modified': function['LastModified'],
-                    'vpc_config': function.get('VpcConfig'),
-                })
+                functions.append(
+                    lambda_record(function, self._get_role_policy_resources(iam, function['Role']))
+                )
                 
-        return functions
\ No newline at end of file
+        return functions
+    
+    def _get_role_policy_resources(self, iam, role_arn: str) -> List[Any]:
+        """Collect the S3 resources allowed by an IAM role's policies.
+        
+        Results are cached per role, since many functions usually share one
+        execution role.
+        """
+        if role_arn in self._role_policy_cache:
+            return self._role_policy_cache[role_arn]
+        
+        role_name = role_arn.split('/')[-1]
+        documents = []
+        try:
+            for page in iam.get_paginator('list_role_policies').paginate(RoleName=role_name):
+                for policy_name in page['PolicyNames']:
+                    documents.append(
+                        iam.get_role_policy(RoleName=role_name, PolicyName=policy_name)['PolicyDocument']
+                    )
+            for page in iam.get_paginator('list_attached_role_policies').paginate(RoleName=role_name):
+                for attached in page['AttachedPolicies']:
+                    policy = iam.get_policy(PolicyArn=attached['PolicyArn'])['Policy']
+                    version = iam.get_policy_version(
+                        PolicyArn=attached['PolicyArn'],
+                        VersionId=policy['DefaultVersionId']
+                    )
+                    documents.append(version['PolicyVersion']['Document'])
+        except ClientError as e:
+            logger.warning(f"Could not read policies for role {role_name}: {e}")
+        
+        self._role_policy_cache[role_arn] = s3_policy_resources(documents)
+        return self._role_policy_cache[role_arn]
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""Scanner Engine Selection.
+
+This module picks the scanner implementation configured by
+``aws.scanner_engine``, importing only the engine that is used.
+"""
+
+from typing import Dict, Any
+
+def create_scanner(config_data: Dict[str, Any], region: str):
+    """Create the scanner selected by ``aws.scanner_engine`` ('sync', 'async' or 'scheduled').
+    
+    The 'scheduled' engine scans every ``aws.regions`` region at once, on one
+    pool of ``aws.max_workers`` threads. With ``accounts.enabled``, every
+    configured account and region is scanned through assumed roles instead
+    of region alone. With ``distributed.enabled``, the scan is published to a
+    queue for ``worker`` processes (see ``distributed.coordinator``).
+    """
+    if config_data.get('distributed', {}).get('enabled', False):
+        from ..distributed.coordinator import create_coordinator
+        return create_coordinator(config_data)
+    if config_data.get('accounts', {}).get('enabled', False):
+        from ..accounts.multi_account import create_multi_account_scanner
+        return create_multi_account_scanner(config_data)
+    engine = config_data['aws'].get('scanner_engine', 'sync')
+    if engine == 'async':
+        # aiobotocore pulls in aiohttp, so only load it when selected
+        from .async_scanner import AsyncAWSResourceScanner
+        return AsyncAWSResourceScanner(
+            region,
+            max_concurrency=config_data['aws'].get('max_concurrency', 256),
+            scanner_options=config_data['aws'].get('scanners')
+        )
+    if engine == 'scheduled':
+        from .scheduled_scanner import ScheduledScanner
+        return ScheduledScanner(
+            config_data['aws'].get('regions') or [region],
+            max_workers=config_data['aws'].get('max_workers', 32),
+            scanner_options=config_data['aws'].get('scanners')
+        )
+    from .aws_scanner import AWSResourceScanner
+    from .inventory_sources import create_inventory_source
+    return AWSResourceScanner(
+        region,
+        scanner_options=config_data['aws'].get('scanners'),
+        inventory_source=create_inventory_source(config_data['aws'].get('inventory_source'))
+    )
@@ -0,0 +1,464 @@
+"""Bulk Inventory Sources.
+
+This module provides alternate inventory sources for ``AWSResourceScanner``
+that replace the per-service list and describe calls with bulk queries:
+
+- ``ConfigInventorySource`` reads configuration items with one AWS Config
+  advanced query per region, through an aggregator to cover every account.
+  Global types (S3) are queried in every region, as ``list_buckets`` lists
+  them.
+  Items are normalized to the scanners' record shapes, and targeted detail
+  calls are made only for fields Config does not record (S3 encryption,
+  Lambda role policies).
+- ``ResourceExplorerSource`` lists the region's resources with Resource
+  Explorer and skips the per-service scans of regional types with no
+  resources.
+
+Types a source does not cover are scanned by the regular scanners.
+"""
+
+from datetime import datetime
+import json
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+from botocore.exceptions import ClientError
+from .scheduled_scanner import GLOBAL_TYPES
+from .services import tag_value
+
+logger = logging.getLogger(__name__)
+
+# AWS Config resource types of each scanner type
+CONFIG_TYPES = {
+    'ec2': 'AWS::EC2::Instance',
+    's3': 'AWS::S3::Bucket',
+    'rds': 'AWS::RDS::DBInstance',
+    'lambda': 'AWS::Lambda::Function',
+    'vpc': 'AWS::EC2::VPC',
+    'subnet': 'AWS::EC2::Subnet',
+    'security_group': 'AWS::EC2::SecurityGroup',
+    'dynamodb': 'AWS::DynamoDB::Table',
+    'elb': 'AWS::ElasticLoadBalancingV2::LoadBalancer',
+}
+
+# Resource Explorer resource types of each scanner type
+EXPLORER_TYPES = {
+    'ec2': ['ec2:instance'],
+    's3': ['s3:bucket'],
+    'rds': ['rds:db'],
+    'lambda': ['lambda:function'],
+    'vpc': ['ec2:vpc'],
+    'subnet': ['ec2:subnet'],
+    'security_group': ['ec2:security-group'],
+    'apigateway': ['apigateway:restapis', 'apigateway:apis'],
+    'dynamodb': ['dynamodb:table'],
+    'ecs': ['ecs:cluster'],
+    'elb': ['elasticloadbalancing:loadbalancer/app', 'elasticloadbalancing:loadbalancer/net',
+            'elasticloadbalancing:loadbalancer/gwy'],
+}
+
+# Items per page of an advanced query (the API maximum)
+CONFIG_PAGE_SIZE = 100
+
+# Results per page of a Resource Explorer search (the API maximum)
+EXPLORER_PAGE_SIZE = 1000
+
+def timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Config timestamp into the datetime the describe calls return."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return value
+
+def pascal_case(value: Any) -> Any:
+    """Rename the camelCase keys of a Config structure to the API's PascalCase."""
+    if isinstance(value, dict):
+        return {key[:1].upper() + key[1:]: pascal_case(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [pascal_case(item) for item in value]
+    return value
+
+def config_tags(item: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Convert a configuration item's tags to an AWS tag list."""
+    tags = item.get('tags') or []
+    if isinstance(tags, dict):
+        return [{'Key': key, 'Value': value} for key, value in tags.items()]
+    return [{'Key': tag.get('key'), 'Value': tag.get('value')} for tag in tags]
+
+def permissions(rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert Config security group rules to the describe call's shape."""
+    converted = []
+    for rule in pascal_case(rules or []):
+        # Config lists IPv4 ranges as both plain strings and objects
+        rule.pop('IpRanges', None)
+        rule['IpRanges'] = rule.pop('Ipv4Ranges', [])
+        converted.append(rule)
+    return converted
+
+def _ec2(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': configuration.get('instanceId', item.get('resourceId')),
+        'type': configuration.get('instanceType'),
+        'state': (configuration.get('state') or {}).get('name'),
+        'vpc_id': configuration.get('vpcId'),
+        'subnet_id': configuration.get('subnetId'),
+        'private_ip': configuration.get('privateIpAddress'),
+        'public_ip': configuration.get('publicIpAddress'),
+        'tags': config_tags(item),
+        'security_groups': pascal_case(configuration.get('securityGroups', [])),
+        'launch_time': timestamp(configuration.get('launchTime')),
+    }
+
+def _s3(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    region = item.get('awsRegion')
+    return {
+        'name': configuration.get('name', item.get('resourceName')),
+        'creation_date': timestamp(configuration.get('creationDate')),
+        # Not in the configuration item; filled in by a detail call
+        'encryption': None,
+        # get_bucket_location reports us-east-1 as no constraint
+        'location': None if region == 'us-east-1' else region,
+    }
+
+def _rds(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    subnet_group = configuration.get('dBSubnetGroup') or {}
+    endpoint = configuration.get('endpoint')
+    return {
+        'identifier': configuration.get('dBInstanceIdentifier', item.get('resourceName')),
+        'class': configuration.get('dBInstanceClass'),
+        'engine': configuration.get('engine'),
+        'status': configuration.get('dBInstanceStatus'),
+        'endpoint': pascal_case(endpoint) if endpoint else None,
+        'multi_az': configuration.get('multiAZ'),
+        'vpc_security_groups': [
+            sg['vpcSecurityGroupId'] for sg in configuration.get('vpcSecurityGroups', [])
+        ],
+        'vpc_id': subnet_group.get('vpcId'),
+        'subnet_ids': [subnet['subnetIdentifier'] for subnet in subnet_group.get('subnets', [])],
+        'storage': {
+            'type': configuration.get('storageType'),
+            'size': configuration.get('allocatedStorage'),
+            'encrypted': configuration.get('storageEncrypted'),
+        }
+    }
+
+def _lambda(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    vpc_config = configuration.get('vpcConfig')
+    return {
+        'name': configuration.get('functionName', item.get('resourceName')),
+        'runtime': configuration.get('runtime'),
+        'handler': configuration.get('handler'),
+        'role': configuration.get('role'),
+        'memory': configuration.get('memorySize'),
+        'timeout': configuration.get('timeout'),
+        'last_modified': configuration.get('lastModified'),
+        'vpc_config': pascal_case(vpc_config) if vpc_config else None,
+        # Not in the configuration item; filled in by detail calls
+        'policy_resources': None,
+    }
+
+def _vpc(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    tags = config_tags(item)
+    return {
+        'id': configuration.get('vpcId', item.get('resourceId')),
+        'name': tag_value(tags, 'Name'),
+        'cidr_block': configuration.get('cidrBlock'),
+        'state': configuration.get('state'),
+        'is_default': configuration.get('isDefault', False),
+        'tags': tags,
+    }
+
+def _subnet(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    tags = config_tags(item)
+    subnet_id = configuration.get('subnetId', item.get('resourceId'))
+    return {
+        'id': subnet_id,
+        'name': tag_value(tags, 'Name'),
+        'vpc_id': configuration.get('vpcId'),
+        'subnet_id': subnet_id,
+        'cidr_block': configuration.get('cidrBlock'),
+        'availability_zone': configuration.get('availabilityZone'),
+        'public': configuration.get('mapPublicIpOnLaunch', False),
+        'available_ips': configuration.get('availableIpAddressCount'),
+        'tags': tags,
+    }
+
+def _security_group(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': configuration.get('groupId', item.get('resourceId')),
+        'name': configuration.get('groupName', item.get('resourceName')),
+        'vpc_id': configuration.get('vpcId'),
+        'description': configuration.get('description'),
+        'ingress': permissions(configuration.get('ipPermissions')),
+        'egress': permissions(configuration.get('ipPermissionsEgress')),
+        'tags': config_tags(item),
+    }
+
+def _dynamodb(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    encryption = configuration.get('sSEDescription') or configuration.get('sseDescription')
+    return {
+        'name': configuration.get('tableName', item.get('resourceName')),
+        'arn': configuration.get('tableArn', item.get('arn')),
+        'status': configuration.get('tableStatus'),
+        'billing_mode': (configuration.get('billingModeSummary') or {}).get('billingMode', 'PROVISIONED'),
+        'item_count': configuration.get('itemCount'),
+        'size_bytes': configuration.get('tableSizeBytes'),
+        'encryption': pascal_case(encryption) if encryption else None,
+        'created_date': timestamp(configuration.get('creationDateTime')),
+    }
+
+def _elb(item: Dict[str, Any], configuration: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'name': configuration.get('loadBalancerName', item.get('resourceName')),
+        'arn': configuration.get('loadBalancerArn', item.get('arn')),
+        'type': configuration.get('type'),
+        'scheme': configuration.get('scheme'),
+        'state': (configuration.get('state') or {}).get('code'),
+        'dns_name': configuration.get('dNSName') or configuration.get('dnsName'),
+        'vpc_id': configuration.get('vpcId'),
+        'subnet_ids': [
+            zone['subnetId'] for zone in configuration.get('availabilityZones', []) if zone.get('subnetId')
+        ],
+        'security_groups': configuration.get('securityGroups', []),
+        'tags': config_tags(item),
+    }
+
+# Builders of each scanner type's record from a configuration item
+NORMALIZERS = {
+    'ec2': _ec2,
+    's3': _s3,
+    'rds': _rds,
+    'lambda': _lambda,
+    'vpc': _vpc,
+    'subnet': _subnet,
+    'security_group': _security_group,
+    'dynamodb': _dynamodb,
+    'elb': _elb,
+}
+
+def normalize(resource_type: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a scanner record from an advanced query result.
+    
+    Args:
+        resource_type: Scanner resource type (e.g. 'ec2')
+        item: Query result with ``configuration`` and ``tags``
+    
+    Returns:
+        Record in the shape the type's scanner returns
+    """
+    return NORMALIZERS[resource_type](item, item.get('configuration') or {})
+
+class ConfigInventorySource:
+    """Inventory from AWS Config advanced queries."""
+    
+    def __init__(self, aggregator: Optional[str] = None, detail_calls: bool = True):
+        """Initialize the source.
+        
+        Args:
+            aggregator: Configuration aggregator to query, covering every
+                account and region it aggregates; its records are tagged with
+                their ``account_id`` (default: query the scanner's account only)
+            detail_calls: Fill in the fields Config does not record with
+                detail calls, for resources in the scanner's own account
+        """
+        self.aggregator = aggregator
+        self.detail_calls = detail_calls
+        self._account_id = None
+    
+    def collect(self, scanner, resource_types: List[str]) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+        """Read the scanner's region from AWS Config.
+        
+        Resources of global types are read from every region.
+        
+        Args:
+            scanner: AWSResourceScanner whose region and clients to use
+            resource_types: Requested resource types
+        
+        Returns:
+            Tuple of the resources by type and the requested types this
+            source does not cover
+        """
+        covered = [resource_type for resource_type in resource_types if resource_type in CONFIG_TYPES]
+        remaining = [resource_type for resource_type in resource_types if resource_type not in CONFIG_TYPES]
+        if not covered:
+            return {}, remaining
+        
+        by_config_type = {CONFIG_TYPES[resource_type]: resource_type for resource_type in covered}
+        resources = {resource_type: [] for resource_type in covered}
+        own_account = self._own_account(scanner) if self.detail_calls else None
+        
+        # Global types are read from every region, as list_buckets lists them
+        global_types = [config_type for config_type, resource_type in by_config_type.items()
+                        if resource_type in GLOBAL_TYPES]
+        regional = [config_type for config_type in by_config_type if config_type not in global_types]
+        items = self._query(scanner, regional, scanner.region) if regional else []
+        if global_types:
+            items.extend(self._query(scanner, global_types))
+        
+        for item in items:
+            resource_type = by_config_type.get(item.get('resourceType'))
+            if resource_type is None:
+                continue
+            record = normalize(resource_type, item)
+            if self.aggregator:
+                record['account_id'] = item['accountId']
+            if own_account is not None and item.get('accountId', own_account) == own_account:
+                self._fill_details(scanner, resource_type, record)
+            resources[resource_type].append(record)
+        
+        logger.info(
+            f"Read {sum(len(records) for records in resources.values())} resources in "
+            f"{scanner.region} from AWS Config"
+        )
+        return resources, remaining
+    
+    def _query(self, scanner, config_types: List[str], region: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Run the advanced query for the given Config types.
+        
+        Args:
+            scanner: AWSResourceScanner whose clients to use
+            config_types: Config resource types to read
+            region: Region to read (default: every region)
+        """
+        type_list = ", ".join(f"'{config_type}'" for config_type in config_types)
+        expression = (
+            "SELECT resourceId, resourceName, resourceType, awsRegion, accountId, arn, configuration, tags "
+            f"WHERE resourceType IN ({type_list})"
+        )
+        if region:
+            expression += f" AND awsRegion = '{region}'"
+        client = scanner.clients.client('config', scanner.region, scanner.session)
+        if self.aggregator:
+            paginator = client.get_paginator('select_aggregate_resource_config')
+            pages = paginator.paginate(
+                Expression=expression,
+                ConfigurationAggregatorName=self.aggregator,
+                PaginationConfig={'PageSize': CONFIG_PAGE_SIZE}
+            )
+        else:
+            paginator = client.get_paginator('select_resource_config')
+            pages = paginator.paginate(Expression=expression, PaginationConfig={'PageSize': CONFIG_PAGE_SIZE})
+        
+        items = []
+        for page in pages:
+            for result in page.get('Results', []):
+                items.append(json.loads(result) if isinstance(result, str) else result)
+        return items
+    
+    def _own_account(self, scanner) -> Optional[str]:
+        """Get the account the scanner's credentials belong to."""
+        if self._account_id is None:
+            try:
+                sts = scanner.clients.client('sts', scanner.region, scanner.session)
+                self._account_id = sts.get_caller_identity()['Account']
+            except ClientError as e:
+                logger.warning(f"Could not identify the scanned account, skipping detail calls: {e}")
+        return self._account_id
+    
+    def _fill_details(self, scanner, resource_type: str, record: Dict[str, Any]):
+        """Fill in the fields of a record that Config does not record."""
+        if resource_type == 's3':
+            s3 = scanner.clients.client('s3', scanner.region, scanner.session)
+            try:
+                encryption = s3.get_bucket_encryption(Bucket=record['name'])
+                record['encryption'] = encryption.get('ServerSideEncryptionConfiguration')
+            except ClientError:
+                record['encryption'] = None
+        elif resource_type == 'lambda':
+            iam = scanner.clients.client('iam', scanner.region, scanner.session)
+            record['policy_resources'] = scanner._get_role_policy_resources(iam, record['role'])
+            vpc_config = record['vpc_config']
+            if vpc_config and vpc_config.get('SubnetIds') and not vpc_config.get('VpcId'):
+                # Config omits the VPC of a function's subnets
+                lambda_client = scanner.clients.client('lambda', scanner.region, scanner.session)
+                configuration = lambda_client.get_function_configuration(FunctionName=record['name'])
+                record['vpc_config'] = configuration.get('VpcConfig')
+
+class ResourceExplorerSource:
+    """Resource Explorer listing used to skip the scans of absent types."""
+    
+    def __init__(self, view_arn: Optional[str] = None):
+        """Initialize the source.
+        
+        Args:
+            view_arn: View to search (default: the region's default view; an
+                aggregator index's view covers every region)
+        """
+        self.view_arn = view_arn
+    
+    def collect(self, scanner, resource_types: List[str]) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+        """Find which requested regional types have resources in the scanner's region.
+        
+        Args:
+            scanner: AWSResourceScanner whose region and clients to use
+            resource_types: Requested resource types
+        
+        Returns:
+            Tuple of empty resource lists for the types with no resources and
+            the types that still need a scan
+        """
+        present = self._present_types(scanner)
+        if present is None:
+            return {}, list(resource_types)
+        
+        resources = {}
+        remaining = []
+        for resource_type in resource_types:
+            explorer_types = EXPLORER_TYPES.get(resource_type)
+            # Global resources are indexed in their home region, not necessarily this one
+            if (explorer_types is not None and resource_type not in GLOBAL_TYPES
+                    and not present.intersection(explorer_types)):
+                resources[resource_type] = []
+            else:
+                remaining.append(resource_type)
+        
+        if resources:
+            logger.info(f"Skipping types with no resources in {scanner.region}: {', '.join(resources)}")
+        return resources, remaining
+    
+    def _present_types(self, scanner) -> Optional[set]:
+        """Get the Resource Explorer types with resources in the region.
+        
+        Returns:
+            Set of resource types, or None if the listing is incomplete and
+            every type must be scanned
+        """
+        client = scanner.clients.client('resource-explorer-2', scanner.region, scanner.session)
+        kwargs = {'QueryString': f"region:{scanner.region}", 'PaginationConfig': {'PageSize': EXPLORER_PAGE_SIZE}}
+        if self.view_arn:
+            kwargs['ViewArn'] = self.view_arn
+        
+        present = set()
+        try:
+            for page in client.get_paginator('search').paginate(**kwargs):
+                present.update(resource['ResourceType'] for resource in page.get('Resources', []))
+                if not page.get('Count', {}).get('Complete', True):
+                    logger.info("Resource Explorer results are incomplete, scanning every type")
+                    return None
+        except ClientError as e:
+            logger.warning(f"Resource Explorer search failed, scanning every type: {e}")
+            return None
+        return present
+
+def create_inventory_source(settings: Optional[Dict[str, Any]]):
+    """Create the inventory source configured by ``aws.inventory_source``.
+    
+    Args:
+        settings: ``{'type': 'api' | 'config' | 'resource_explorer', ...}``
+    
+    Returns:
+        Inventory source, or None to scan every type with the service APIs
+    """
+    settings = settings or {}
+    source_type = settings.get('type', 'api')
+    if source_type == 'config':
+        return ConfigInventorySource(
+            aggregator=settings.get('aggregator'),
+            detail_calls=settings.get('detail_calls', True)
+        )
+    if source_type == 'resource_explorer':
+        return ResourceExplorerSource(view_arn=settings.get('view_arn'))
+    if source_type != 'api':
+        raise ValueError(f"Unknown inventory source: {source_type}")
+    return None
@@ -0,0 +1,190 @@
+"""Scanner Plugin Registry.
+
+This module maps resource types to the plugins that scan them, replacing the
+engines' lookup of ``_scan_<type>`` methods by name.
+
+A plugin describes a scan once for both engines: its ``scan`` method is a
+generator yielding API requests (``Paginate`` and ``Call``) and receiving
+their results. A yielded list of requests is a batch, which the sync engine
+runs in turn and the asyncio engine runs concurrently, so a plugin never adds
+a serial round trip per item where the API allows a batch.
+
+Example::
+
+    @register_scanner('sqs')
+    class QueueScanner(ScannerPlugin):
+        def scan(self):
+            urls = yield Paginate('sqs', 'list_queues', 'QueueUrls', page_size=1000)
+            return [{'name': url.rsplit('/', 1)[-1], 'url': url} for url in urls]
+
+Plugins outside this package register the same way, or through the
+``aws_infra_doc_gen.scanners`` entry point group.
+"""
+
+import threading
+from typing import Dict, List, Any, Optional, Iterator, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'aws_infra_doc_gen.scanners'
+
+class Paginate:
+    """Request for every item under ``key`` across the pages of an operation."""
+    
+    __slots__ = ('service', 'operation', 'key', 'kwargs')
+    
+    def __init__(self, service: str, operation: str, key: str, page_size: Optional[int] = None, **kwargs):
+        """Describe a paginated call.
+        
+        Args:
+            service: Client service name (e.g. 'ec2')
+            operation: Paginated operation (e.g. 'describe_vpcs')
+            key: Response key holding the items
+            page_size: Items per page, usually the API maximum
+            **kwargs: Operation parameters (e.g. Filters)
+        """
+        if page_size:
+            kwargs['PaginationConfig'] = {'PageSize': page_size}
+        self.service = service
+        self.operation = operation
+        self.key = key
+        self.kwargs = kwargs
+
+class Call:
+    """Request for a single API call."""
+    
+    __slots__ = ('service', 'operation', 'kwargs', 'optional')
+    
+    def __init__(self, service: str, operation: str, optional: bool = False, **kwargs):
+        """Describe a call.
+        
+        Args:
+            service: Client service name
+            operation: Operation name
+            optional: Return None instead of raising if the call fails with a
+                ClientError (e.g. a detail the caller may not read)
+            **kwargs: Operation parameters
+        """
+        self.service = service
+        self.operation = operation
+        self.optional = optional
+        self.kwargs = kwargs
+
+Request = Union[Paginate, Call, List[Union[Paginate, Call]]]
+
+class ScannerPlugin:
+    """Base of the scanner plugins."""
+    
+    def __init__(self, resource_type: str, options: Optional[Dict[str, Any]] = None):
+        """Initialize the plugin.
+        
+        Args:
+            resource_type: Type the plugin was registered for
+            options: Settings from ``aws.scanners.<type>`` in the config, e.g.
+                ``filters`` passed to the describe calls
+        """
+        self.resource_type = resource_type
+        self.options = options or {}
+    
+    def scan(self) -> Iterator[Request]:
+        """Yield the requests of the scan, returning the resources."""
+        raise NotImplementedError
+    
+    @property
+    def filters(self) -> List[Dict[str, Any]]:
+        """Describe-call filters configured for this type."""
+        return self.options.get('filters', [])
+
+class EngineScanner(ScannerPlugin):
+    """Plugin for a type each engine scans with its own ``_scan_<type>`` method.
+    
+    Used for the services whose detail calls (per bucket, per role) the
+    engines already schedule their own way.
+    """
+    
+    def scan(self):
+        raise TypeError(f"{self.resource_type} is scanned by the engine's own method")
+
+SCANNERS: Dict[str, type] = {}
+
+_loaded = False
+_load_lock = threading.RLock()
+
+def register_scanner(resource_type: str, plugin: Optional[type] = None):
+    """Register the plugin class scanning a resource type.
+    
+    Usable as a class decorator; a later registration replaces an earlier one.
+    """
+    def register(plugin_class: type) -> type:
+        SCANNERS[resource_type] = plugin_class
+        return plugin_class
+    
+    return register(plugin) if plugin is not None else register
+
+def _load_plugins():
+    """Register the built-in plugins and those installed as entry points, once.
+    
+    Concurrent callers wait for the first load to finish, so none of them
+    sees a partly filled registry.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        from . import services  # noqa: F401 (registers the built-in plugins)
+        _load_entry_points()
+        _loaded = True
+
+def _load_entry_points():
+    """Register the plugins installed under ENTRY_POINT_GROUP."""
+    try:
+        from importlib.metadata import entry_points
+        installed = entry_points()
+        installed = installed.select(group=ENTRY_POINT_GROUP) if hasattr(installed, 'select') \
+            else installed.get(ENTRY_POINT_GROUP, [])
+    except ImportError:
+        return
+    for entry_point in installed:
+        try:
+            register_scanner(entry_point.name, entry_point.load())
+        except Exception as e:
+            logger.warning(f"Could not load scanner plugin {entry_point.name}: {e}")
+
+def get_scanner(resource_type: str, options: Optional[Dict[str, Any]] = None) -> Optional[ScannerPlugin]:
+    """Create the plugin scanning a resource type, or None if there is none.
+    
+    Args:
+        resource_type: Resource type (e.g. 'vpc')
+        options: The type's ``aws.scanners.<type>`` settings
+    """
+    _load_plugins()
+    plugin_class = SCANNERS.get(resource_type)
+    return plugin_class(resource_type, options) if plugin_class is not None else None
+
+def run_plugin(plugin: ScannerPlugin, execute) -> List[Dict[str, Any]]:
+    """Run a plugin's scan, executing each yielded request with execute.
+    
+    Args:
+        plugin: Plugin to run
+        execute: Function taking a request (or nested list of requests) and
+            returning its result (or nested list of results)
+    
+    Returns:
+        The resources the plugin returns
+    """
+    steps = plugin.scan()
+    result = None
+    while True:
+        try:
+            request = steps.send(result)
+        except StopIteration as done:
+            return done.value
+        result = execute(request)
+
+def scanner_types() -> List[str]:
+    """List the resource types with a registered scanner."""
+    _load_plugins()
+    return list(SCANNERS)
@@ -0,0 +1,306 @@
+"""Scheduled AWS Resource Scanner.
+
+This module provides an engine that scans every configured region at once
+on a ``WorkScheduler``. Each (region, resource type) job is broken into
+units of one API page or one detail call:
+
+- paginated listings run page by page, each page a unit that queues the
+  next one, and EC2 instances are listed per availability zone so a region
+  with tens of thousands of instances paginates in parallel chains;
+- detail calls (per bucket, per Lambda role, and the batches of the scanner
+  plugins) are one unit each.
+
+Units carry the estimated remaining time of their job, taken from the
+previous run's durations, so idle workers always advance the longest job
+first and pages (which gate everything after them) before detail calls.
+Wall time then approaches the total work divided by the workers, bounded
+by the longest page chain.
+"""
+
+import functools
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Dict, List, Any, Optional
+import logging
+import boto3
+from ..clients.client_factory import ClientFactory, get_client_factory
+from ..tracing.tracer import get_tracer
+from .aws_scanner import AWSResourceScanner, ec2_record, s3_record, rds_record, lambda_record
+from .registry import Call, EngineScanner, Paginate, get_scanner
+from .work_scheduler import WorkScheduler
+
+logger = logging.getLogger(__name__)
+
+# Seconds assumed for a job not timed in an earlier run
+DEFAULT_ESTIMATE = 1.0
+
+# Priority added to units on a job's critical path (pages), ahead of any estimate
+CRITICAL_PATH = 1e9
+
+# Types listed by a global API; scanned once, in the first region
+GLOBAL_TYPES = {'s3'}
+
+def region_of(resource_type: str, record: Dict[str, Any], scanned_region: str) -> str:
+    """Region of a scanned resource.
+    
+    Resources of global types are tagged with their own location rather than
+    the region they were listed from.
+    """
+    if resource_type == 's3':
+        # get_bucket_location reports us-east-1 as no constraint
+        return record.get('location') or 'us-east-1'
+    return scanned_region
+
+class Invoke:
+    """Request running a function of the engine as one unit."""
+    
+    __slots__ = ('fn', 'args')
+    
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+class _Job:
+    """One resource type in one region, driven as a chain of units."""
+    
+    def __init__(self, scheduler: WorkScheduler, scanner: AWSResourceScanner, resource_type: str,
+                 steps, estimate: float):
+        self.scheduler = scheduler
+        self.scanner = scanner
+        self.region = scanner.region
+        self.resource_type = resource_type
+        self.steps = steps
+        self.estimate = estimate
+        self.future = Future()
+        self.started = None
+        self.duration = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Queue the job's first units."""
+        self.started = time.monotonic()
+        self._advance(None)
+    
+    def _priority(self, critical: bool) -> float:
+        """Estimated remaining seconds of the job, boosted on the critical path."""
+        remaining = max(self.estimate - (time.monotonic() - self.started), 0.0)
+        return remaining + (CRITICAL_PATH if critical else 0.0)
+    
+    def _advance(self, result):
+        """Send a result to the job's steps and execute their next request."""
+        if self.future.done():
+            return
+        try:
+            request = self.steps.send(result)
+        except StopIteration as done:
+            self.duration = time.monotonic() - self.started
+            self.future.set_result(done.value)
+            return
+        except Exception as e:
+            self._fail(e)
+            return
+        self._execute(request, self._advance)
+    
+    def _fail(self, error: BaseException):
+        with self._lock:
+            if not self.future.done():
+                self.duration = time.monotonic() - self.started
+                self.future.set_exception(error)
+    
+    def _execute(self, request, callback):
+        """Execute a request as units, passing its result to callback."""
+        if isinstance(request, list):
+            self._gather(request, callback)
+        elif isinstance(request, Paginate):
+            self._paginate(request, callback)
+        elif isinstance(request, Invoke):
+            self._submit(callback, request.fn, *request.args)
+        else:
+            self._submit(callback, self.scanner._execute, request)
+    
+    def _submit(self, callback, fn, *args, critical: bool = False):
+        """Queue one unit, resolving callback (or failing the job) when it completes."""
+        future = self.scheduler.submit(self._unit, fn, args, priority=self._priority(critical))
+        future.add_done_callback(functools.partial(self._resolve, callback))
+    
+    def _unit(self, fn, args):
+        with get_tracer().span(f"unit.{self.resource_type}", region=self.region):
+            return fn(*args)
+    
+    def _resolve(self, callback, done: Future):
+        if self.future.done():
+            return
+        error = done.exception()
+        if error is not None:
+            self._fail(error)
+        else:
+            callback(done.result())
+    
+    def _gather(self, requests: List[Any], callback):
+        """Execute a batch, each request on its own, calling back with every result."""
+        if not requests:
+            callback([])
+            return
+        results = [None] * len(requests)
+        remaining = [len(requests)]
+        
+        def collect(index, result):
+            results[index] = result
+            with self._lock:
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished:
+                callback(results)
+        
+        for index, request in enumerate(requests):
+            self._execute(request, functools.partial(collect, index))
+    
+    def _paginate(self, request: Paginate, callback):
+        """Fetch a paginated listing one page per unit."""
+        items = []
+        pages = []
+        
+        def first_page():
+            client = self.scanner.clients.client(request.service, self.region, self.scanner.session)
+            pages.append(iter(client.get_paginator(request.operation).paginate(**request.kwargs)))
+            return next_page()
+        
+        def next_page():
+            return next(pages[0], None)
+        
+        def on_page(page):
+            if page is None:
+                callback(items)
+                return
+            items.extend(page.get(request.key, []))
+            self._submit(on_page, next_page, critical=True)
+        
+        self._submit(on_page, first_page, critical=True)
+
+class ScheduledScanner:
+    """Scanner running every region's scans as prioritized fine-grained units."""
+    
+    def __init__(self, regions: List[str], max_workers: int = 32,
+                 client_factory: Optional[ClientFactory] = None,
+                 scanner_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 session: Optional[boto3.Session] = None):
+        """Initialize the scanner.
+        
+        Args:
+            regions: Regions to scan
+            max_workers: Units run at once
+            client_factory: Pool of clients to reuse (default: the
+                process-wide pool)
+            scanner_options: Per-type plugin settings (``aws.scanners``)
+            session: Session providing the credentials (default: the
+                default credentials)
+        """
+        self.regions = list(regions)
+        self.max_workers = max_workers
+        self.clients = client_factory or get_client_factory()
+        self.scanner_options = scanner_options or {}
+        self.scanners = {
+            region: AWSResourceScanner(region, client_factory=self.clients,
+                                       scanner_options=scanner_options, session=session)
+            for region in self.regions
+        }
+        # Seconds each (region, type) job took in the last run
+        self.estimates = {}
+        self.units = 0
+    
+    def scan_resources(self, resource_types: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Scan AWS resources of specified types in every region.
+        
+        Args:
+            resource_types: List of AWS resource types to scan (e.g., ['ec2', 's3'])
+        
+        Returns:
+            Dictionary mapping resource types to lists of resource metadata;
+            with several regions, each resource is tagged with its ``region``
+        """
+        tracer = get_tracer()
+        jobs = []
+        with tracer.span('scheduled_scan', regions=len(self.regions)) as span, \
+                WorkScheduler(self.max_workers) as scheduler:
+            for resource_type in resource_types:
+                plugin = get_scanner(resource_type, self.scanner_options.get(resource_type))
+                if plugin is None:
+                    logger.warning(f"Scanner for {resource_type} not implemented")
+                    continue
+                regions = self.regions[:1] if resource_type in GLOBAL_TYPES else self.regions
+                for region in regions:
+                    scanner = self.scanners[region]
+                    steps = getattr(self, f"_steps_{resource_type}")(scanner) \
+                        if isinstance(plugin, EngineScanner) else type(plugin)(resource_type, plugin.options).scan()
+                    jobs.append(_Job(scheduler, scanner, resource_type, steps,
+                                     self.estimates.get((region, resource_type), DEFAULT_ESTIMATE)))
+            
+            # Longest jobs first, so their first pages start at once
+            for job in sorted(jobs, key=lambda job: job.estimate, reverse=True):
+                job.start()
+            wait([job.future for job in jobs])
+            span.count('jobs', len(jobs))
+        
+        self.units = scheduler.executed
+        errors = []
+        resources = {}
+        for job in jobs:
+            self.estimates[(job.region, job.resource_type)] = job.duration
+            records = resources.setdefault(job.resource_type, [])
+            error = job.future.exception()
+            if error is not None:
+                errors.append(error)
+                continue
+            for record in job.future.result():
+                if len(self.regions) > 1:
+                    record['region'] = region_of(job.resource_type, record, job.region)
+                records.append(record)
+        if errors:
+            raise errors[0]
+        return {resource_type: resources[resource_type] for resource_type in resource_types
+                if resource_type in resources}
+    
+    def clear_cache(self):
+        """Forget cached IAM role policies so the next scan re-reads them."""
+        for scanner in self.scanners.values():
+            scanner.clear_cache()
+    
+    def _steps_ec2(self, scanner: AWSResourceScanner):
+        """List instances per availability zone, as parallel page chains."""
+        zones = yield Call('ec2', 'describe_availability_zones', optional=True)
+        names = [zone['ZoneName'] for zone in (zones or {}).get('AvailabilityZones', [])]
+        if len(names) > 1:
+            shards = yield [
+                Paginate('ec2', 'describe_instances', 'Reservations', page_size=1000,
+                         Filters=[{'Name': 'availability-zone', 'Values': [name]}])
+                for name in names
+            ]
+            reservations = [reservation for shard in shards for reservation in shard]
+        else:
+            reservations = yield Paginate('ec2', 'describe_instances', 'Reservations', page_size=1000)
+        return [ec2_record(instance) for reservation in reservations for instance in reservation['Instances']]
+    
+    def _steps_s3(self, scanner: AWSResourceScanner):
+        """List buckets, then read each bucket's details as separate units."""
+        buckets = (yield Call('s3', 'list_buckets'))['Buckets']
+        details = yield [
+            [Call('s3', 'get_bucket_encryption', optional=True, Bucket=bucket['Name']),
+             Call('s3', 'get_bucket_location', Bucket=bucket['Name'])]
+            for bucket in buckets
+        ]
+        return [s3_record(bucket, encryption, location) for bucket, (encryption, location) in zip(buckets, details)]
+    
+    def _steps_rds(self, scanner: AWSResourceScanner):
+        """List DB instances page by page."""
+        instances = yield Paginate('rds', 'describe_db_instances', 'DBInstances', page_size=100)
+        return [rds_record(instance) for instance in instances]
+    
+    def _steps_lambda(self, scanner: AWSResourceScanner):
+        """List functions, then resolve each distinct role's policies as one unit."""
+        functions = yield Paginate('lambda', 'list_functions', 'Functions', page_size=50)
+        iam = scanner.clients.client('iam', scanner.region, scanner.session)
+        roles = list(dict.fromkeys(function['Role'] for function in functions))
+        policies = yield [Invoke(scanner._get_role_policy_resources, iam, role) for role in roles]
+        policy_resources = dict(zip(roles, policies))
+        return [lambda_record(function, policy_resources[function['Role']]) for function in functions]
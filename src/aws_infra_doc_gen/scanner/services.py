@@ -0,0 +1,233 @@
+"""Built-in Scanner Plugins.
+
+This module registers the scanners of the built-in resource types. Every
+plugin lists its resources with the bulk describe call of its service at the
+API's maximum page size, and where details need another call it batches as
+many resources per call as the API accepts.
+"""
+
+from typing import Dict, List, Any
+from .registry import ScannerPlugin, EngineScanner, Paginate, Call, register_scanner
+
+# Items per call of the batch describe operations
+ECS_CLUSTERS_PER_CALL = 100
+ECS_SERVICES_PER_CALL = 10
+ELB_TAGS_PER_CALL = 20
+
+def chunks(items: List[Any], size: int) -> List[List[Any]]:
+    """Split items into lists of at most size."""
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+def tag_value(tags: List[Dict[str, str]], key: str):
+    """Get the value of a tag from an AWS tag list."""
+    for tag in tags or []:
+        if tag.get('Key') == key:
+            return tag.get('Value')
+    return None
+
+# Types with dedicated engine methods (per-bucket and per-role detail calls)
+for resource_type in ['ec2', 's3', 'rds', 'lambda']:
+    register_scanner(resource_type, EngineScanner)
+
+@register_scanner('vpc')
+class VPCScanner(ScannerPlugin):
+    """VPCs."""
+    
+    def scan(self):
+        vpcs = yield Paginate('ec2', 'describe_vpcs', 'Vpcs', page_size=1000, Filters=self.filters)
+        return [
+            {
+                'id': vpc['VpcId'],
+                'name': tag_value(vpc.get('Tags'), 'Name'),
+                'cidr_block': vpc.get('CidrBlock'),
+                'state': vpc.get('State'),
+                'is_default': vpc.get('IsDefault', False),
+                'tags': vpc.get('Tags', []),
+            }
+            for vpc in vpcs
+        ]
+
+@register_scanner('subnet')
+class SubnetScanner(ScannerPlugin):
+    """Subnets."""
+    
+    def scan(self):
+        subnets = yield Paginate('ec2', 'describe_subnets', 'Subnets', page_size=1000, Filters=self.filters)
+        return [
+            {
+                'id': subnet['SubnetId'],
+                'name': tag_value(subnet.get('Tags'), 'Name'),
+                'vpc_id': subnet.get('VpcId'),
+                'subnet_id': subnet['SubnetId'],
+                'cidr_block': subnet.get('CidrBlock'),
+                'availability_zone': subnet.get('AvailabilityZone'),
+                'public': subnet.get('MapPublicIpOnLaunch', False),
+                'available_ips': subnet.get('AvailableIpAddressCount'),
+                'tags': subnet.get('Tags', []),
+            }
+            for subnet in subnets
+        ]
+
+@register_scanner('security_group')
+class SecurityGroupScanner(ScannerPlugin):
+    """Security groups."""
+    
+    def scan(self):
+        groups = yield Paginate(
+            'ec2', 'describe_security_groups', 'SecurityGroups', page_size=1000, Filters=self.filters
+        )
+        return [
+            {
+                'id': group['GroupId'],
+                'name': group.get('GroupName'),
+                'vpc_id': group.get('VpcId'),
+                'description': group.get('Description'),
+                'ingress': group.get('IpPermissions', []),
+                'egress': group.get('IpPermissionsEgress', []),
+                'tags': group.get('Tags', []),
+            }
+            for group in groups
+        ]
+
+@register_scanner('apigateway')
+class APIGatewayScanner(ScannerPlugin):
+    """API Gateway REST APIs and HTTP/WebSocket APIs."""
+    
+    def scan(self):
+        rest_apis, apis = yield [
+            Paginate('apigateway', 'get_rest_apis', 'items', page_size=500),
+            Paginate('apigatewayv2', 'get_apis', 'Items'),
+        ]
+        resources = [
+            {
+                'id': api['id'],
+                'name': api.get('name'),
+                'protocol': 'REST',
+                'description': api.get('description'),
+                'endpoint_types': api.get('endpointConfiguration', {}).get('types', []),
+                'created_date': api.get('createdDate'),
+                'tags': [{'Key': key, 'Value': value} for key, value in (api.get('tags') or {}).items()],
+            }
+            for api in rest_apis
+        ]
+        resources.extend(
+            {
+                'id': api['ApiId'],
+                'name': api.get('Name'),
+                'protocol': api.get('ProtocolType'),
+                'description': api.get('Description'),
+                'endpoint': api.get('ApiEndpoint'),
+                'created_date': api.get('CreatedDate'),
+                'tags': [{'Key': key, 'Value': value} for key, value in (api.get('Tags') or {}).items()],
+            }
+            for api in apis
+        )
+        return resources
+
+@register_scanner('dynamodb')
+class DynamoDBScanner(ScannerPlugin):
+    """DynamoDB tables.
+    
+    DynamoDB has no batch describe, so the per-table calls are yielded as one
+    batch and run concurrently by the asyncio engine.
+    """
+    
+    def scan(self):
+        names = yield Paginate('dynamodb', 'list_tables', 'TableNames', page_size=100)
+        responses = yield [Call('dynamodb', 'describe_table', optional=True, TableName=name) for name in names]
+        tables = []
+        for name, response in zip(names, responses):
+            table = (response or {}).get('Table', {})
+            tables.append({
+                'name': name,
+                'arn': table.get('TableArn'),
+                'status': table.get('TableStatus'),
+                'billing_mode': table.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED'),
+                'item_count': table.get('ItemCount'),
+                'size_bytes': table.get('TableSizeBytes'),
+                'encryption': table.get('SSEDescription'),
+                'created_date': table.get('CreationDateTime'),
+            })
+        return tables
+
+@register_scanner('ecs')
+class ECSScanner(ScannerPlugin):
+    """ECS clusters with their services."""
+    
+    def scan(self):
+        cluster_arns = yield Paginate('ecs', 'list_clusters', 'clusterArns', page_size=100)
+        described, service_arns = yield [
+            [Call('ecs', 'describe_clusters', clusters=batch, include=['TAGS'])
+             for batch in chunks(cluster_arns, ECS_CLUSTERS_PER_CALL)],
+            [Paginate('ecs', 'list_services', 'serviceArns', page_size=100, cluster=arn) for arn in cluster_arns],
+        ]
+        clusters = [cluster for response in described for cluster in response['clusters']]
+        
+        batches = [
+            (arn, batch)
+            for arn, arns in zip(cluster_arns, service_arns)
+            for batch in chunks(arns, ECS_SERVICES_PER_CALL)
+        ]
+        responses = yield [Call('ecs', 'describe_services', cluster=arn, services=batch) for arn, batch in batches]
+        services = {}
+        for (arn, _), response in zip(batches, responses):
+            services.setdefault(arn, []).extend(self._service(service) for service in response['services'])
+        
+        return [
+            {
+                'name': cluster['clusterName'],
+                'arn': cluster['clusterArn'],
+                'status': cluster.get('status'),
+                'running_tasks': cluster.get('runningTasksCount'),
+                'active_services': cluster.get('activeServicesCount'),
+                'services': services.get(cluster['clusterArn'], []),
+                'tags': [{'Key': tag['key'], 'Value': tag.get('value')} for tag in cluster.get('tags', [])],
+            }
+            for cluster in clusters
+        ]
+    
+    def _service(self, service: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize a described ECS service."""
+        network = service.get('networkConfiguration', {}).get('awsvpcConfiguration', {})
+        return {
+            'name': service['serviceName'],
+            'arn': service['serviceArn'],
+            'status': service.get('status'),
+            'launch_type': service.get('launchType'),
+            'desired_count': service.get('desiredCount'),
+            'running_count': service.get('runningCount'),
+            'subnet_ids': network.get('subnets', []),
+            'security_groups': network.get('securityGroups', []),
+        }
+
+@register_scanner('elb')
+class LoadBalancerScanner(ScannerPlugin):
+    """Application, network and gateway load balancers."""
+    
+    def scan(self):
+        balancers = yield Paginate('elbv2', 'describe_load_balancers', 'LoadBalancers', page_size=400)
+        arns = [balancer['LoadBalancerArn'] for balancer in balancers]
+        responses = yield [
+            Call('elbv2', 'describe_tags', optional=True, ResourceArns=batch)
+            for batch in chunks(arns, ELB_TAGS_PER_CALL)
+        ]
+        tags = {
+            description['ResourceArn']: description.get('Tags', [])
+            for response in responses if response
+            for description in response['TagDescriptions']
+        }
+        return [
+            {
+                'name': balancer['LoadBalancerName'],
+                'arn': balancer['LoadBalancerArn'],
+                'type': balancer.get('Type'),
+                'scheme': balancer.get('Scheme'),
+                'state': balancer.get('State', {}).get('Code'),
+                'dns_name': balancer.get('DNSName'),
+                'vpc_id': balancer.get('VpcId'),
+                'subnet_ids': [zone['SubnetId'] for zone in balancer.get('AvailabilityZones', []) if zone.get('SubnetId')],
+                'security_groups': balancer.get('SecurityGroups', []),
+                'tags': tags.get(balancer['LoadBalancerArn'], []),
+            }
+            for balancer in balancers
+        ]
@@ -0,0 +1,105 @@
+"""Priority Work Scheduler.
+
+This module provides a thread pool whose queue is ordered by priority rather
+than arrival. Scans submit fine-grained units (one page, one detail call)
+with the estimated remaining time of the job they belong to, so idle
+workers always pick up the longest job's next step; with skewed workloads
+this keeps every worker busy until the total work runs out instead of
+leaving one worker grinding through the largest region at the end.
+
+Workers share one heap, which balances load the way per-worker deques with
+work stealing would, without a stealing protocol.
+"""
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+class WorkScheduler:
+    """Thread pool running the highest-priority submitted unit first."""
+    
+    def __init__(self, max_workers: int = 32):
+        """Initialize the scheduler.
+        
+        Args:
+            max_workers: Worker threads
+        """
+        self.max_workers = max_workers
+        self._queue = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._closed = False
+        self.executed = 0
+    
+    def __enter__(self) -> 'WorkScheduler':
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.shutdown()
+    
+    def start(self):
+        """Start the worker threads."""
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"scan-worker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def shutdown(self):
+        """Stop the workers once the queue is empty."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+    
+    def submit(self, fn: Callable[..., Any], *args, priority: float = 0.0) -> Future:
+        """Queue a unit of work.
+        
+        Units may be submitted from other units and from future callbacks.
+        
+        Args:
+            fn: Function to run
+            *args: Its arguments
+            priority: Higher runs first; equal priorities run in submission order
+        
+        Returns:
+            Future of the function's result
+        """
+        future = Future()
+        with self._condition:
+            heapq.heappush(self._queue, (-priority, next(self._order), fn, args, future))
+            self._condition.notify()
+        return future
+    
+    def pending(self) -> int:
+        """Number of queued units not yet started."""
+        with self._condition:
+            return len(self._queue)
+    
+    def _work(self):
+        """Run queued units until shut down."""
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                _, _, fn, args, future = heapq.heappop(self._queue)
+                self.executed += 1
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
@@ -0,0 +1,135 @@
+"""Documentation Daemon.
+
+This module keeps a ScanService resident, runs it on a schedule and exposes a
+small local HTTP API:
+
+- ``GET /status``: state of the latest run
+- ``GET /resources``: resources from the latest successful scan
+- ``GET /compliance``: compliance results from the latest successful scan
+- ``POST /scan``: start a run now (returns immediately)
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+import logging
+from ..tracing.tracer import get_tracer
+from .scan_service import ScanService
+from .serialization import datetime_converter
+
+logger = logging.getLogger(__name__)
+
+class DocumentationDaemon:
+    """Runs scheduled scans and serves their results over HTTP."""
+    
+    def __init__(self, service: ScanService, interval: int, host: str = '127.0.0.1', port: int = 8080):
+        """Initialize the daemon.
+        
+        Args:
+            service: Scan service to run
+            interval: Seconds between scheduled runs (0 disables the schedule)
+            host: Address the HTTP API binds to
+            port: Port the HTTP API listens on (0 picks a free port)
+        """
+        self.service = service
+        self.interval = interval
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._trigger = threading.Event()
+        self._stop = threading.Event()
+        self._scheduler = None
+    
+    @property
+    def address(self):
+        """Host and port the HTTP API is listening on."""
+        return self.httpd.server_address[:2]
+    
+    def start(self):
+        """Start the scheduler and HTTP API in background threads."""
+        self._scheduler = threading.Thread(target=self._schedule, name='scan-scheduler', daemon=True)
+        self._scheduler.start()
+        threading.Thread(target=self.httpd.serve_forever, name='http-api', daemon=True).start()
+        host, port = self.address
+        logger.info(f"Serving on http://{host}:{port}, scanning every {self.interval}s")
+    
+    def serve_forever(self):
+        """Start the daemon and block until interrupted."""
+        self.start()
+        try:
+            self._stop.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+    
+    def stop(self):
+        """Stop the scheduler and HTTP API."""
+        self._stop.set()
+        self._trigger.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._scheduler:
+            self._scheduler.join()
+    
+    def trigger(self):
+        """Request a run as soon as the current one (if any) finishes."""
+        self._trigger.set()
+    
+    def _schedule(self):
+        """Run scans on the interval, or early when triggered."""
+        # First run starts immediately
+        self._trigger.set()
+        while not self._stop.is_set():
+            self._trigger.wait(self.interval or None)
+            if self._stop.is_set():
+                break
+            self._trigger.clear()
+            tracer = get_tracer()
+            first_span = len(tracer.spans)
+            try:
+                summary = self.service.run()
+                logger.info(f"Scheduled scan finished: {summary.get('resource_counts')}")
+            except Exception as e:
+                logger.error(f"Scheduled scan failed: {e}")
+            if tracer.enabled:
+                logger.info(f"Run timings:\n{tracer.format_summary(tracer.spans[first_span:])}")
+    
+    def _handler_class(self):
+        """Build the request handler bound to this daemon."""
+        daemon = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                routes = {
+                    '/status': lambda: daemon.service.last_run or {'status': 'pending'},
+                    '/resources': lambda: daemon.service.resources,
+                    '/compliance': lambda: daemon.service.compliance_results,
+                }
+                if self.path not in routes:
+                    self._send(404, {'error': f"Unknown path {self.path}"})
+                    return
+                body = routes[self.path]()
+                if body is None:
+                    self._send(404, {'error': 'No completed scan yet'})
+                else:
+                    self._send(200, body)
+            
+            def do_POST(self):
+                if self.path != '/scan':
+                    self._send(404, {'error': f"Unknown path {self.path}"})
+                    return
+                daemon.trigger()
+                self._send(202, {'status': 'scheduled'})
+            
+            def _send(self, status: int, body: Any):
+                payload = json.dumps(body, default=datetime_converter).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format: str, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+        
+        return Handler
@@ -0,0 +1,184 @@
+"""Scan Service.
+
+This module runs the full scan pipeline (scan, diagrams, documentation, change
+tracking and compliance) and holds its components between runs, so the
+daemon's scheduled scans reuse warm clients, compiled templates, loaded
+compliance rules and render caches.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+import logging
+from ..visualizer.diagram_generator import ArchitectureDiagramGenerator
+from ..documentation.doc_generator import DocumentationGenerator
+from ..tracker.change_tracker import ChangeTracker
+from ..compliance.compliance_checker import ComplianceChecker
+from ..topology.topology_index import TopologyIndex
+from ..scanner.engine import create_scanner
+from ..records.resource_records import compact_inventory
+from ..inventory.inventory_file import write_inventory
+from ..store.inventory_store import InventoryStore
+from ..tracing.tracer import get_tracer
+from .serialization import convert_datetimes, datetime_converter
+
+logger = logging.getLogger(__name__)
+
+class ScanService:
+    """Runs the scan pipeline with components kept warm between runs."""
+    
+    def __init__(self, config_data: Dict[str, Any], region: Optional[str] = None):
+        """Initialize the scan service.
+        
+        Args:
+            config_data: Parsed configuration file
+            region: AWS region to scan (default: the first configured region)
+        """
+        self.config_data = config_data
+        self.region = region or config_data['aws'].get('regions', ['us-east-1'])[0]
+        self.output_dir = config_data['output']['directory']
+        
+        self.scanner = create_scanner(config_data, self.region)
+        self.diagram_gen = ArchitectureDiagramGenerator(self.output_dir)
+        self.doc_gen = DocumentationGenerator(
+            self.output_dir,
+            config_data['templates']['directory'],
+            page_size=config_data['output'].get('page_size', 500)
+        )
+        
+        self.store = None
+        store_config = config_data.get('store', {})
+        if store_config.get('enabled', False):
+            self.store = InventoryStore(
+                store_config.get('path', os.path.join(self.output_dir, 'inventory.db')),
+                keep_scans=store_config.get('keep_scans')
+            )
+        
+        self.tracker = None
+        if config_data.get('change_tracking', {}).get('enabled', False):
+            tracking_config = dict(config_data['change_tracking'].get('config') or {})
+            # SQLite snapshots without a database of their own are the store's scans
+            if config_data['change_tracking']['storage'] == 'sqlite' and self.store \
+                    and not tracking_config.get('path'):
+                tracking_config['store'] = self.store
+            self.tracker = ChangeTracker(
+                storage_type=config_data['change_tracking']['storage'],
+                **tracking_config
+            )
+        
+        self.checker = None
+        if config_data.get('compliance', {}).get('enabled', False):
+            self.checker = ComplianceChecker(config_data['compliance']['rules_file'])
+        
+        self.resources = None
+        self.compliance_results = None
+        self.last_run = None
+        self._lock = threading.Lock()
+    
+    def run(self) -> Dict[str, Any]:
+        """Scan the infrastructure and regenerate every output.
+        
+        Runs are serialized; a run requested while another is in progress
+        waits for it to finish.
+        
+        Returns:
+            Summary of the run
+        """
+        with self._lock:
+            started = datetime.now()
+            self.last_run = {'status': 'running', 'started': started.isoformat()}
+            try:
+                with get_tracer().span('run', region=self.region):
+                    self._run()
+            except Exception as e:
+                self.last_run = {
+                    'status': 'failed',
+                    'started': started.isoformat(),
+                    'finished': datetime.now().isoformat(),
+                    'error': str(e),
+                }
+                raise
+            
+            self.last_run = {
+                'status': 'succeeded',
+                'started': started.isoformat(),
+                'finished': datetime.now().isoformat(),
+                'resource_counts': {
+                    resource_type: len(resource_list)
+                    for resource_type, resource_list in self.resources.items()
+                },
+            }
+            if self.compliance_results:
+                self.last_run['compliance'] = self.compliance_results['summary']
+            if getattr(self.scanner, 'errors', None):
+                self.last_run['errors'] = self.scanner.errors
+            return self.last_run
+    
+    def _run(self):
+        """Run the pipeline steps."""
+        config_data = self.config_data
+        tracer = get_tracer()
+        
+        with tracer.span('scan') as span:
+            self.scanner.clear_cache()
+            resources = self.scanner.scan_resources(config_data['aws']['resources'])
+            span.count('resources', sum(len(resource_list) for resource_list in resources.values()))
+        with tracer.span('index'):
+            resources = convert_datetimes(resources)
+            if config_data['output'].get('compact_records', False):
+                resources = compact_inventory(resources)
+            index = TopologyIndex(resources, self.region)
+        
+        try:
+            raw_output_path = os.path.join(self.output_dir, 'scan_results.json')
+            with tracer.span('scan_results'), open(raw_output_path, 'w') as f:
+                json.dump(resources, f, default=datetime_converter, indent=4)
+        except KeyError as e:
+            print(f"Missing key in config data: {e}")
+        
+        if self.store:
+            with tracer.span('store'):
+                self.store.write_scan(resources, region=self.region)
+        
+        if config_data['output'].get('inventory_file', False):
+            with tracer.span('inventory_file'):
+                write_inventory(resources, os.path.join(self.output_dir, 'scan_results.inv'))
+        
+        with tracer.span('diagrams'):
+            for fmt in config_data['output']['diagrams']:
+                if config_data['output'].get('diagram_mode') == 'tiered':
+                    self.diagram_gen.generate_tiered_diagrams(resources, fmt, region=self.region, index=index)
+                else:
+                    self.diagram_gen.generate_diagram(resources, f"architecture.{fmt}", index=index)
+        
+        with tracer.span('docs'):
+            if config_data['output'].get('documentation_mode') == 'sharded':
+                self.doc_gen.generate_sharded_documentation(resources, config_data['output']['format'], index=index)
+            else:
+                self.doc_gen.generate_documentation(resources, config_data['output']['format'], index=index)
+        
+        # A tracker sharing the store already has this scan as its snapshot
+        if self.tracker and (self.store is None or self.tracker.store is not self.store):
+            with tracer.span('snapshot'):
+                self.tracker.save_snapshot(resources)
+        
+        if self.checker:
+            with tracer.span('compliance'):
+                results = self.checker.check_compliance(resources, index=index)
+                
+                report = self.checker.generate_report(
+                    results,
+                    format=config_data['compliance'].get('report_format', 'json')
+                )
+                
+                report_path = os.path.join(
+                    self.output_dir,
+                    f"compliance_report.{config_data['compliance'].get('report_format', 'json')}"
+                )
+                with open(report_path, 'w') as f:
+                    f.write(report)
+            self.compliance_results = results
+        
+        self.resources = resources
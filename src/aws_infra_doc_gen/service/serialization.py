@@ -0,0 +1,23 @@
+"""Serialization helpers shared by the CLI and the scan service."""
+
+from collections.abc import Mapping
+from datetime import datetime
+
+# Custom datetime converter function to serialize datetime objects to ISO format
+def datetime_converter(o):
+    if isinstance(o, datetime):
+        return o.isoformat()  # Convert datetime to ISO format string
+    if isinstance(o, Mapping):
+        return dict(o)  # Compact resource records
+    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+
+# Utility function to ensure that all datetime objects are converted within a dict or list
+def convert_datetimes(data):
+    if isinstance(data, dict):
+        return {key: convert_datetimes(value) for key, value in data.items()}
+    elif isinstance(data, list):
+        return [convert_datetimes(item) for item in data]
+    elif isinstance(data, datetime):
+        return datetime_converter(data)
+    else:
+        return data
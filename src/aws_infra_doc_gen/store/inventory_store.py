@@ -0,0 +1,415 @@
+"""Inventory Store.
+
+This module keeps scanned resources in an embedded SQLite database, so
+questions like "EC2 instances in vpc-x without an Owner tag" or "unencrypted
+RDS instances" are answered by indexed queries instead of loading the whole
+JSON inventory and filtering it in Python.
+
+Every scan is written in one bulk transaction. A resource is a row of
+``resources`` holding its type, id, region, VPC and JSON document, with its
+subnets in ``resource_subnets`` and its tags in ``tags``; all of them are
+indexed, as are the key attributes in ``INDEXED_FIELDS``. Older scans are kept
+(up to ``keep_scans``) so the change tracker can compare scans in SQL.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+import logging
+from ..service.serialization import datetime_converter
+from ..topology.topology_index import locate
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    region TEXT
+);
+CREATE TABLE IF NOT EXISTS resources (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER NOT NULL,
+    resource_type TEXT NOT NULL,
+    resource_id,
+    resource_key TEXT NOT NULL,
+    region TEXT,
+    vpc_id TEXT,
+    digest BLOB NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resources_type ON resources (scan_id, resource_type);
+CREATE INDEX IF NOT EXISTS resources_key ON resources (scan_id, resource_type, resource_key);
+CREATE INDEX IF NOT EXISTS resources_region ON resources (scan_id, region);
+CREATE INDEX IF NOT EXISTS resources_vpc ON resources (scan_id, vpc_id);
+CREATE TABLE IF NOT EXISTS resource_subnets (
+    resource INTEGER NOT NULL,
+    subnet_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resource_subnets_subnet ON resource_subnets (subnet_id, resource);
+CREATE INDEX IF NOT EXISTS resource_subnets_resource ON resource_subnets (resource);
+CREATE TABLE IF NOT EXISTS tags (
+    resource INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS tags_key ON tags (key, value, resource);
+CREATE INDEX IF NOT EXISTS tags_resource ON tags (resource, key);
+"""
+
+# Attributes with an expression index, for the queries and compliance rules
+# that filter on them
+INDEXED_FIELDS = ['state', 'type', 'encryption', 'engine', 'storage.encrypted', 'multi_az', 'runtime']
+
+# Comparisons available in where filters, named as in the compliance rules
+SQL_OPERATORS = {
+    'equals': '{field} IS ?',
+    'not_equals': '{field} IS NOT ?',
+    'exists': '{field} IS NOT NULL',
+    'not_exists': '{field} IS NULL',
+    'greater_than': '{field} > ?',
+    'less_than': '{field} < ?',
+}
+
+# Encoders of the stored documents and of their change digests
+_ENCODER = json.JSONEncoder(default=datetime_converter, separators=(',', ':'))
+_CANONICAL_ENCODER = json.JSONEncoder(default=datetime_converter, separators=(',', ':'), sort_keys=True)
+
+def field_expression(field: str) -> str:
+    """SQL expression extracting a (dotted, nested) field from a resource's JSON.
+    
+    The path is inlined rather than bound, so queries match the expression
+    indexes on INDEXED_FIELDS.
+    
+    Raises:
+        ValueError: If the field name cannot be expressed as a JSON path
+    """
+    parts = field.split('.')
+    if not all(parts) or any('"' in part or "'" in part for part in parts):
+        raise ValueError(f"Unsupported field name: {field}")
+    path = '$' + ''.join(f'."{part}"' for part in parts)
+    return f"json_extract(data, '{path}')"
+
+def condition_sql(field: str, condition: Any) -> Tuple[str, List[Any]]:
+    """SQL of a where filter on a field.
+    
+    Args:
+        field: Dotted field name
+        condition: A value to compare equal to, or an (operator, value) pair
+            with an operator from SQL_OPERATORS
+    
+    Returns:
+        SQL and its parameters
+    """
+    operator, value = condition if isinstance(condition, tuple) else ('equals', condition)
+    template = SQL_OPERATORS.get(operator)
+    if template is None:
+        raise ValueError(f"Unsupported operator: {operator}")
+    sql = template.format(field=field_expression(field))
+    return sql, ([value] if '?' in sql else [])
+
+def _resource_id(resource: Dict[str, Any]) -> Any:
+    """Identifier of a resource, as used by the change tracker and topology index."""
+    for id_field in ['id', 'name', 'identifier']:
+        if id_field in resource:
+            return resource[id_field]
+    return None
+
+def _tag_pairs(tags: Any) -> List[Tuple[str, Any]]:
+    """(key, value) pairs of AWS-format tags, given as a list or a dict."""
+    if isinstance(tags, dict):
+        return list(tags.items())
+    return [(tag.get('Key'), tag.get('Value')) for tag in tags or [] if isinstance(tag, dict) and tag.get('Key')]
+
+class InventoryStore:
+    """SQLite store of scanned resources."""
+    
+    def __init__(self, path: str, keep_scans: Optional[int] = None):
+        """Open (or create) a store.
+        
+        Args:
+            path: Database file
+            keep_scans: Number of most recent scans to keep (default: all)
+        """
+        self.path = path
+        self.keep_scans = keep_scans or None
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        # One connection per thread, as the daemon writes from its scan thread
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA + ''.join(
+            f"CREATE INDEX IF NOT EXISTS resources_field_{field.replace('.', '_')} "
+            f"ON resources (scan_id, resource_type, {field_expression(field)});\n"
+            for field in INDEXED_FIELDS
+        ))
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+    
+    @contextmanager
+    def _transaction(self):
+        """Run statements in one write transaction."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+    
+    def close(self):
+        """Close this thread's connection."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+    
+    def write_scan(self, resources: Dict[str, List[Dict[str, Any]]], region: str = 'default',
+                   timestamp: Optional[str] = None) -> int:
+        """Write the resources of a scan in one transaction.
+        
+        Args:
+            resources: Dictionary of AWS resources by type
+            region: Region of resources that do not record their own
+            timestamp: ISO time of the scan (default: now)
+        
+        Returns:
+            Id of the new scan
+        """
+        timestamp = timestamp or datetime.now().isoformat()
+        rows, subnets, tags = [], [], []
+        
+        with self._transaction() as connection:
+            scan_id = connection.execute(
+                'INSERT INTO scans (timestamp, region) VALUES (?, ?)', (timestamp, region)
+            ).lastrowid
+            # Row ids are assigned here so subnets and tags can refer to them
+            # without a round trip per resource; the transaction holds the write lock
+            row_id = connection.execute('SELECT COALESCE(MAX(id), 0) FROM resources').fetchone()[0]
+            for resource_type, resource_list in resources.items():
+                for resource in resource_list:
+                    row_id += 1
+                    vpc_id, subnet_ids = locate(resource_type, resource)
+                    rows.append(self._row(row_id, scan_id, resource_type, resource, region, vpc_id))
+                    subnets.extend((row_id, subnet_id) for subnet_id in subnet_ids)
+                    tags.extend((row_id, key, value) for key, value in _tag_pairs(resource.get('tags')))
+            
+            connection.executemany(
+                'INSERT INTO resources (id, scan_id, resource_type, resource_id, resource_key, region, '
+                'vpc_id, digest, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+            )
+            connection.executemany('INSERT INTO resource_subnets (resource, subnet_id) VALUES (?, ?)', subnets)
+            connection.executemany('INSERT INTO tags (resource, key, value) VALUES (?, ?, ?)', tags)
+            if self.keep_scans:
+                self._prune(connection, scan_id - self.keep_scans)
+        
+        logger.info(f"Scan {scan_id} with {len(rows)} resources written to {self.path}")
+        return scan_id
+    
+    def _row(self, row_id: int, scan_id: int, resource_type: str, resource: Dict[str, Any],
+             region: str, vpc_id: str) -> Tuple:
+        """Build the resources row of a resource."""
+        resource_id = _resource_id(resource)
+        if resource_id is not None and not isinstance(resource_id, (str, int, float)):
+            resource_id = str(resource_id)
+        data = _ENCODER.encode(resource)
+        # Key order is irrelevant to whether a resource changed
+        canonical = _CANONICAL_ENCODER.encode(resource)
+        resource_key = str(resource_id) if resource_id is not None else canonical
+        return (
+            row_id, scan_id, resource_type, resource_id, resource_key,
+            resource.get('region') or region, vpc_id,
+            hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).digest(), data,
+        )
+    
+    def _prune(self, connection: sqlite3.Connection, last_dropped: int):
+        """Delete the scans up to an id, with their resources."""
+        if last_dropped < 1:
+            return
+        old_rows = 'SELECT id FROM resources WHERE scan_id <= ?'
+        connection.execute(f'DELETE FROM tags WHERE resource IN ({old_rows})', (last_dropped,))
+        connection.execute(f'DELETE FROM resource_subnets WHERE resource IN ({old_rows})', (last_dropped,))
+        connection.execute('DELETE FROM resources WHERE scan_id <= ?', (last_dropped,))
+        connection.execute('DELETE FROM scans WHERE id <= ?', (last_dropped,))
+    
+    def scans(self) -> List[Dict[str, Any]]:
+        """List the stored scans, oldest first."""
+        rows = self._connection().execute(
+            'SELECT s.id, s.timestamp, s.region, COUNT(r.id) FROM scans s '
+            'LEFT JOIN resources r ON r.scan_id = s.id GROUP BY s.id ORDER BY s.id'
+        )
+        return [
+            {'id': scan_id, 'timestamp': timestamp, 'region': region, 'resources': count}
+            for scan_id, timestamp, region, count in rows
+        ]
+    
+    def latest_scan(self) -> Optional[int]:
+        """Get the id of the most recent scan."""
+        return self._connection().execute('SELECT MAX(id) FROM scans').fetchone()[0]
+    
+    def scan_at(self, timestamp: Any) -> Optional[int]:
+        """Get the id of the last scan at or before a time (datetime or ISO string)."""
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        row = self._connection().execute(
+            'SELECT id FROM scans WHERE timestamp <= ? ORDER BY timestamp DESC, id DESC LIMIT 1', (timestamp,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def types(self, scan_id: Optional[int] = None) -> List[str]:
+        """Get the resource types of a scan, in the order they were written."""
+        rows = self._connection().execute(
+            'SELECT resource_type FROM resources WHERE scan_id = ? GROUP BY resource_type ORDER BY MIN(id)',
+            (self._scan(scan_id),)
+        )
+        return [resource_type for resource_type, in rows]
+    
+    def _scan(self, scan_id: Optional[int]) -> Optional[int]:
+        """Resolve the default (latest) scan."""
+        return scan_id if scan_id is not None else self.latest_scan()
+    
+    def _where(self, resource_type: Optional[str] = None, region: Optional[str] = None,
+               vpc_id: Optional[str] = None, subnet_id: Optional[str] = None,
+               tags: Optional[Dict[str, Optional[str]]] = None, without_tags: Optional[Iterable[str]] = None,
+               where: Optional[Dict[str, Any]] = None, where_not: Optional[Dict[str, Any]] = None,
+               scan_id: Optional[int] = None) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause of a resource query."""
+        clauses, params = ['scan_id = ?'], [self._scan(scan_id)]
+        for column, value in [('resource_type', resource_type), ('region', region), ('vpc_id', vpc_id)]:
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if subnet_id is not None:
+            clauses.append('id IN (SELECT resource FROM resource_subnets WHERE subnet_id = ?)')
+            params.append(subnet_id)
+        for key, value in (tags or {}).items():
+            if value is None:
+                clauses.append('EXISTS (SELECT 1 FROM tags WHERE resource = resources.id AND key = ?)')
+                params.append(key)
+            else:
+                clauses.append('EXISTS (SELECT 1 FROM tags WHERE resource = resources.id AND key = ? AND value = ?)')
+                params.extend([key, value])
+        for key in without_tags or []:
+            clauses.append('NOT EXISTS (SELECT 1 FROM tags WHERE resource = resources.id AND key = ?)')
+            params.append(key)
+        for field, condition in (where or {}).items():
+            sql, values = condition_sql(field, condition)
+            clauses.append(sql)
+            params.extend(values)
+        if where_not:
+            conditions = [condition_sql(field, condition) for field, condition in where_not.items()]
+            # A comparison that is NULL (a missing field) counts as not matching
+            clauses.append('NOT (' + ' AND '.join(f"COALESCE({sql}, 0)" for sql, _ in conditions) + ')')
+            params.extend(value for _, values in conditions for value in values)
+        return ' AND '.join(clauses), params
+    
+    def iter_resources(self, limit: Optional[int] = None, **filters) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Query resources, decoding only those that match.
+        
+        Args:
+            limit: Maximum number of resources
+            **filters: Any of resource_type, region, vpc_id, subnet_id, tags
+                ({key: value, or None for any value}), without_tags ([keys]),
+                where and where_not ({field: value or (operator, value)}, fields
+                dotted for nested values) and scan_id (default: the latest)
+        
+        Yields:
+            (resource type, resource) pairs, in scan order
+        """
+        clause, params = self._where(**filters)
+        sql = f"SELECT resource_type, data FROM resources WHERE {clause} ORDER BY id"
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        for resource_type, data in self._connection().execute(sql, params):
+            yield resource_type, json.loads(data)
+    
+    def resources(self, limit: Optional[int] = None, **filters) -> Dict[str, List[Dict[str, Any]]]:
+        """Query resources, grouped by type as in scan_results.json.
+        
+        Takes the filters of iter_resources.
+        """
+        grouped = {}
+        for resource_type, resource in self.iter_resources(limit=limit, **filters):
+            grouped.setdefault(resource_type, []).append(resource)
+        return grouped
+    
+    def count(self, **filters) -> int:
+        """Count the resources matching the filters of iter_resources."""
+        clause, params = self._where(**filters)
+        return self._connection().execute(f"SELECT COUNT(*) FROM resources WHERE {clause}", params).fetchone()[0]
+    
+    def resource_ids(self, **filters) -> List[Tuple[int, Any]]:
+        """Get the (row id, resource id) pairs matching the filters, in scan order, without decoding."""
+        clause, params = self._where(**filters)
+        return self._connection().execute(
+            f"SELECT id, resource_id FROM resources WHERE {clause} ORDER BY id", params
+        ).fetchall()
+    
+    def rows(self, **filters) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield the (row id, resource) pairs matching the filters, in scan order."""
+        clause, params = self._where(**filters)
+        for row_id, data in self._connection().execute(
+            f"SELECT id, data FROM resources WHERE {clause} ORDER BY id", params
+        ):
+            yield row_id, json.loads(data)
+    
+    def get(self, row_id: int) -> Optional[Dict[str, Any]]:
+        """Get a resource by row id."""
+        row = self._connection().execute('SELECT data FROM resources WHERE id = ?', (row_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def changes(self, old_scan: int, new_scan: int) -> List[Dict[str, Any]]:
+        """Compare two scans in SQL, decoding only the resources that changed.
+        
+        Resources are matched by type and id, and compared by a digest of
+        their content.
+        
+        Returns:
+            Changes in the change tracker's format (added/removed/modified)
+        """
+        connection = self._connection()
+        missing_from = (
+            'SELECT a.resource_type, a.resource_key, a.data FROM resources a WHERE a.scan_id = ? '
+            'AND NOT EXISTS (SELECT 1 FROM resources b WHERE b.scan_id = ? '
+            'AND b.resource_type = a.resource_type AND b.resource_key = a.resource_key) ORDER BY a.id'
+        )
+        changes = []
+        for change_type, scans in [('added', (new_scan, old_scan)), ('removed', (old_scan, new_scan))]:
+            for resource_type, resource_key, data in connection.execute(missing_from, scans):
+                changes.append({
+                    'type': change_type,
+                    'resource_type': resource_type,
+                    'resource_id': resource_key,
+                    'details': json.loads(data)
+                })
+        modified = connection.execute(
+            'SELECT n.resource_type, n.resource_key, o.data, n.data FROM resources n '
+            'JOIN resources o ON o.scan_id = ? AND o.resource_type = n.resource_type '
+            'AND o.resource_key = n.resource_key '
+            'WHERE n.scan_id = ? AND o.digest != n.digest ORDER BY n.id',
+            (old_scan, new_scan)
+        )
+        for resource_type, resource_key, old_data, new_data in modified:
+            changes.append({
+                'type': 'modified',
+                'resource_type': resource_type,
+                'resource_id': resource_key,
+                'old': json.loads(old_data),
+                'new': json.loads(new_data)
+            })
+        return changes
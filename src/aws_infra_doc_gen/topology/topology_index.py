@@ -0,0 +1,150 @@
+"""Topology Index.
+
+This module indexes AWS resources by region, VPC and subnet in a single pass,
+so the diagram, documentation and compliance subsystems can share one grouping.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+
+NO_VPC = 'no_vpc'
+NO_SUBNET = 'no_subnet'
+
+def resource_key(resource_type: str, resource: Dict[str, Any]) -> str:
+    """Get a unique key for a resource across all resource types."""
+    for id_field in ['id', 'name', 'identifier']:
+        if id_field in resource:
+            return f"{resource_type}:{resource[id_field]}"
+    return f"{resource_type}:{id(resource)}"
+
+def locate(resource_type: str, resource: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """Get the VPC and subnets a resource lives in."""
+    if resource_type == 'rds':
+        subnet_group = resource.get('DBSubnetGroup') or {}
+        vpc_id = resource.get('vpc_id') or subnet_group.get('VpcId')
+        subnet_ids = resource.get('subnet_ids') or [
+            subnet.get('SubnetIdentifier') for subnet in subnet_group.get('Subnets', [])
+        ]
+    elif resource_type == 'lambda':
+        vpc_config = resource.get('vpc_config') or {}
+        vpc_id = vpc_config.get('VpcId')
+        subnet_ids = vpc_config.get('SubnetIds')
+    else:
+        vpc_id = resource.get('vpc_id')
+        subnet_ids = resource.get('subnet_ids') or [resource.get('subnet_id')]
+    
+    subnet_ids = [subnet_id for subnet_id in subnet_ids or [] if subnet_id]
+    return vpc_id or NO_VPC, subnet_ids or [NO_SUBNET]
+
+class TopologyIndex:
+    """Index of resources by region, VPC, subnet and resource type."""
+    
+    def __init__(self, resources: Dict[str, List[Dict[str, Any]]], region: str = 'default'):
+        """Build the index in a single pass over the inventory.
+        
+        Args:
+            resources: Dictionary of AWS resources by type
+            region: Region of resources that do not record their own
+        """
+        self.default_region = region
+        
+        # region -> VPC -> subnet -> resource type -> resources
+        self.tree = {}
+        
+        # resource key -> first (region, VPC, subnet) placement
+        self._placements = {}
+        
+        for resource_type, resource_list in resources.items():
+            for resource in resource_list:
+                self.add(resource_type, resource)
+    
+    def add(self, resource_type: str, resource: Dict[str, Any]):
+        """Add a resource to the index.
+        
+        Resources spanning several subnets (RDS subnet groups, VPC Lambda
+        functions) are listed under each of them.
+        """
+        region = resource.get('region') or self.default_region
+        vpc_id, subnet_ids = locate(resource_type, resource)
+        
+        subnets = self.tree.setdefault(region, {}).setdefault(vpc_id, {})
+        for subnet_id in subnet_ids:
+            subnets.setdefault(subnet_id, {}).setdefault(resource_type, []).append(resource)
+        
+        self._placements.setdefault(
+            resource_key(resource_type, resource),
+            (region, vpc_id, subnet_ids[0])
+        )
+    
+    def regions(self) -> List[str]:
+        """Get the indexed regions."""
+        return list(self.tree)
+    
+    def vpcs(self, region: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, List[Dict]]]]:
+        """Get subnets grouped by VPC, across all regions unless one is given.
+        
+        Returns:
+            Dictionary mapping VPC IDs to {subnet ID: {resource type: resources}}
+        """
+        if region is not None:
+            return self.tree.get(region, {})
+        
+        if len(self.tree) == 1:
+            return next(iter(self.tree.values()))
+        
+        # Shared keys (no_vpc, no_subnet) hold resources of every region
+        merged = {}
+        for vpcs in self.tree.values():
+            for vpc_id, subnets in vpcs.items():
+                merged_subnets = merged.setdefault(vpc_id, {})
+                for subnet_id, by_type in subnets.items():
+                    merged_types = merged_subnets.setdefault(subnet_id, {})
+                    for resource_type, resource_list in by_type.items():
+                        merged_types.setdefault(resource_type, []).extend(resource_list)
+        return merged
+    
+    def subnets(self, vpc_id: str, region: Optional[str] = None) -> Dict[str, Dict[str, List[Dict]]]:
+        """Get the resources of a VPC grouped by subnet and resource type."""
+        return self.vpcs(region).get(vpc_id, {})
+    
+    def resources(self, resource_type: Optional[str] = None, region: Optional[str] = None,
+                  vpc_id: Optional[str] = None, subnet_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Query resources by type and location.
+        
+        Every filter is optional; resources listed under several subnets are
+        returned once.
+        """
+        return [
+            resource
+            for type_name, resource in self._walk(region, vpc_id, subnet_id)
+            if resource_type is None or type_name == resource_type
+        ]
+    
+    def counts(self, region: Optional[str] = None, vpc_id: Optional[str] = None,
+               subnet_id: Optional[str] = None) -> Dict[str, int]:
+        """Count resources by type within a location."""
+        counts = {}
+        for type_name, _ in self._walk(region, vpc_id, subnet_id):
+            counts[type_name] = counts.get(type_name, 0) + 1
+        return counts
+    
+    def _walk(self, region: Optional[str], vpc_id: Optional[str], subnet_id: Optional[str]):
+        """Yield unique (resource type, resource) pairs within a location."""
+        seen = set()
+        for region_name, vpcs in self.tree.items():
+            if region is not None and region_name != region:
+                continue
+            for vpc_name, subnets in vpcs.items():
+                if vpc_id is not None and vpc_name != vpc_id:
+                    continue
+                for subnet_name, by_type in subnets.items():
+                    if subnet_id is not None and subnet_name != subnet_id:
+                        continue
+                    for type_name, resource_list in by_type.items():
+                        for resource in resource_list:
+                            if id(resource) not in seen:
+                                seen.add(id(resource))
+                                yield type_name, resource
+    
+    def placement(self, resource_type: str, resource: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+        """Get the first (region, VPC, subnet) a resource was indexed under."""
+        return self._placements.get(resource_key(resource_type, resource))
@@ -0,0 +1,289 @@
+"""Run Tracer.
+
+This module records timed spans over a run (scanner methods, AWS API calls,
+compliance rules, diagram and documentation rendering) with per-span counts.
+Spans aggregate into a run summary and export as a Chrome trace, viewable in
+chrome://tracing or https://ui.perfetto.dev.
+
+Tracing is off by default; a disabled tracer hands out a shared no-op span, so
+instrumented code pays one attribute check per span.
+"""
+
+import json
+import sys
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Spans kept per tracer; later spans are counted but dropped
+DEFAULT_MAX_SPANS = 1_000_000
+
+def _track() -> Tuple[int, int]:
+    """Identify the thread and asyncio task a span runs on."""
+    task_id = 0
+    # Only consult asyncio when it is already loaded: no loop, no tasks
+    asyncio = sys.modules.get('asyncio')
+    if asyncio is not None:
+        try:
+            task = asyncio.current_task()
+            task_id = id(task) if task is not None else 0
+        except RuntimeError:
+            pass
+    return threading.get_ident(), task_id
+
+class Span:
+    """A timed operation with attributes and counters."""
+    
+    __slots__ = ('tracer', 'name', 'attrs', 'counts', 'start', 'end', 'track')
+    
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.counts = {}
+        self.start = None
+        self.end = None
+        self.track = None
+    
+    def count(self, key: str, amount: int = 1):
+        """Add to one of the span's counters."""
+        self.counts[key] = self.counts.get(key, 0) + amount
+    
+    def set(self, **attrs):
+        """Set attributes of the span."""
+        self.attrs.update(attrs)
+    
+    @property
+    def duration(self) -> float:
+        """Duration of the span in seconds."""
+        return self.end - self.start
+    
+    def __enter__(self):
+        self.track = _track()
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer._finish(self)
+        return False
+
+class _NullSpan:
+    """Span handed out while tracing is disabled."""
+    
+    def count(self, key: str, amount: int = 1):
+        pass
+    
+    def set(self, **attrs):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class Tracer:
+    """Collects spans and reports on them."""
+    
+    def __init__(self, enabled: bool = False, max_spans: int = DEFAULT_MAX_SPANS):
+        """Initialize the tracer.
+        
+        Args:
+            enabled: Record spans from the start
+            max_spans: Spans kept in memory before further spans are dropped
+        """
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+    
+    def enable(self):
+        """Start recording spans."""
+        self.enabled = True
+    
+    def disable(self):
+        """Stop recording spans."""
+        self.enabled = False
+    
+    def reset(self):
+        """Forget every recorded span."""
+        with self._lock:
+            self.spans = []
+            self.dropped = 0
+            self._origin = time.perf_counter()
+    
+    def span(self, name: str, **attrs):
+        """Open a span, used as a context manager.
+        
+        Args:
+            name: Span name; spans with the same name are aggregated
+            **attrs: Attributes recorded with the span
+        
+        Returns:
+            Span (or a no-op span while tracing is disabled)
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+    
+    def record(self, name: str, start: float, end: float, **attrs):
+        """Record a span whose start and end were measured elsewhere.
+        
+        Args:
+            name: Span name
+            start: Start time from time.perf_counter()
+            end: End time from time.perf_counter()
+            **attrs: Attributes recorded with the span
+        """
+        if not self.enabled:
+            return
+        span = Span(self, name, attrs)
+        span.start, span.end, span.track = start, end, _track()
+        self._finish(span)
+    
+    def _finish(self, span: Span):
+        """Store a finished span."""
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+    
+    def summary(self, spans: Optional[List[Span]] = None) -> Dict[str, Dict[str, Any]]:
+        """Aggregate spans by name.
+        
+        Args:
+            spans: Spans to aggregate (default: every recorded span)
+        
+        Returns:
+            Dictionary mapping span names to calls, total and max seconds and
+            summed counters
+        """
+        totals = {}
+        for span in self.spans if spans is None else spans:
+            entry = totals.get(span.name)
+            if entry is None:
+                entry = totals[span.name] = {'calls': 0, 'total': 0.0, 'max': 0.0, 'counts': {}}
+            duration = span.duration
+            entry['calls'] += 1
+            entry['total'] += duration
+            entry['max'] = max(entry['max'], duration)
+            for key, amount in span.counts.items():
+                entry['counts'][key] = entry['counts'].get(key, 0) + amount
+        return totals
+    
+    def format_summary(self, spans: Optional[List[Span]] = None, limit: Optional[int] = None) -> str:
+        """Render the span summary as a text table, slowest total first.
+        
+        Times are inclusive: a span's total contains its nested spans.
+        
+        Args:
+            spans: Spans to summarize (default: every recorded span)
+            limit: Maximum number of rows
+        """
+        rows = sorted(self.summary(spans).items(), key=lambda item: item[1]['total'], reverse=True)
+        if limit:
+            rows = rows[:limit]
+        width = max([len(name) for name, _ in rows] + [4])
+        lines = [f"{'Span':<{width}}  {'Calls':>7}  {'Total s':>9}  {'Mean ms':>9}  {'Max ms':>9}  Counts"]
+        for name, entry in rows:
+            counts = ' '.join(f"{key}={value}" for key, value in sorted(entry['counts'].items()))
+            lines.append(
+                f"{name:<{width}}  {entry['calls']:>7}  {entry['total']:>9.3f}  "
+                f"{entry['total'] / entry['calls'] * 1000:>9.1f}  {entry['max'] * 1000:>9.1f}  {counts}"
+            )
+        if self.dropped:
+            lines.append(f"({self.dropped} spans dropped after the first {self.max_spans})")
+        return '\n'.join(lines)
+    
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Build a Chrome trace (Trace Event Format) of the recorded spans.
+        
+        Every thread and asyncio task gets its own track, so concurrent spans
+        do not overlap on one row.
+        """
+        tracks = {}
+        events = []
+        for span in self.spans:
+            if span.track not in tracks:
+                thread_id, task_id = span.track
+                tracks[span.track] = len(tracks) + 1
+                label = f"thread {thread_id}" + (f" task {task_id:x}" if task_id else '')
+                events.append({
+                    'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tracks[span.track],
+                    'args': {'name': label},
+                })
+            args = dict(span.attrs)
+            args.update(span.counts)
+            events.append({
+                'name': span.name,
+                'cat': span.name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': (span.start - self._origin) * 1e6,
+                'dur': span.duration * 1e6,
+                'pid': 1,
+                'tid': tracks[span.track],
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    
+    def export_chrome_trace(self, path: str):
+        """Write the Chrome trace of the recorded spans to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        logger.info(f"Wrote trace of {len(self.spans)} spans to {path}")
+
+# Process-wide tracer used by every instrumented component
+_default_tracer = Tracer()
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer."""
+    return _default_tracer
+
+def instrument_events(events):
+    """Trace every AWS API call made through an event emitter.
+    
+    Each call, and so each page of a paginated call, becomes an
+    ``aws.<service>.<Operation>`` span covering parameter validation,
+    signing, the request and response parsing. Works with boto3 client
+    emitters (``client.meta.events``) and aiobotocore sessions.
+    
+    Args:
+        events: Object with a botocore-style ``register(event_name, handler)``
+    """
+    events.register('before-parameter-build', _call_started, unique_id='aws-infra-doc-gen-trace-start')
+    events.register('after-call', _call_finished, unique_id='aws-infra-doc-gen-trace-end')
+    events.register('after-call-error', _call_failed, unique_id='aws-infra-doc-gen-trace-error')
+
+def _call_started(context: Dict[str, Any], **kwargs):
+    """Note when an API call starts."""
+    if _default_tracer.enabled:
+        context['trace_start'] = time.perf_counter()
+
+def _call_finished(model, context: Dict[str, Any], http_response=None, **kwargs):
+    """Record the span of a completed API call."""
+    start = context.pop('trace_start', None)
+    if start is not None:
+        _default_tracer.record(
+            f"aws.{model.service_model.endpoint_prefix}.{model.name}", start, time.perf_counter(),
+            status=getattr(http_response, 'status_code', None)
+        )
+
+def _call_failed(context: Dict[str, Any], exception: Exception, **kwargs):
+    """Record the span of an API call that raised before a response arrived."""
+    start = context.pop('trace_start', None)
+    if start is not None:
+        _default_tracer.record(
+            f"aws.{kwargs['event_name'].split('.', 1)[1]}", start, time.perf_counter(),
+            error=type(exception).__name__
+        )
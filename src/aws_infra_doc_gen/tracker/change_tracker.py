@@ -7,10 +7,11 @@ import json
 import os
 from datetime import datetime
 from typing import Dict, List, Any
-import boto3
-import git
 from botocore.exceptions import ClientError
 import logging
+from ..clients.client_factory import get_client_factory
+from ..service.serialization import datetime_converter
+from ..store.inventory_store import InventoryStore
 
 logger = logging.getLogger(__name__)
 
@@ -21,14 +22,23 @@ class ChangeTracker:
         """Initialize the change tracker.
         
         Args:
-            storage_type: Where to store changes ('git' or 's3')
-            **kwargs: Additional arguments for storage configuration
+            storage_type: Where to store changes ('git', 's3' or 'sqlite')
+            **kwargs: Additional arguments for storage configuration; for
+                'sqlite', the database ``path`` (and optionally ``keep_scans``)
+                or an open inventory ``store``
         """
         self.storage_type = storage_type
         self.storage_config = kwargs
+        self.store = None
         
-        if storage_type == 's3':
-            self.s3_client = boto3.client('s3')
+        if storage_type == 'sqlite':
+            self.store = kwargs.get('store')
+            if self.store is None:
+                if not kwargs.get('path'):
+                    raise ValueError("path is required for SQLite storage")
+                self.store = InventoryStore(kwargs['path'], keep_scans=kwargs.get('keep_scans'))
+        elif storage_type == 's3':
+            self.s3_client = get_client_factory().client('s3')
             self.bucket_name = kwargs.get('bucket_name')
             if not self.bucket_name:
                 raise ValueError("bucket_name is required for S3 storage")
@@ -40,6 +50,8 @@ class ChangeTracker:
     
     def _init_git_repo(self):
         """Initialize or open Git repository."""
+        import git
+        
         if not os.path.exists(self.repo_path):
             os.makedirs(self.repo_path)
         
@@ -55,6 +67,10 @@ class ChangeTracker:
             resources: Dictionary of AWS resources by type
         """
         timestamp = datetime.now().isoformat()
+        if self.storage_type == 'sqlite':
+            self.store.write_scan(resources, timestamp=timestamp)
+            return
+        
         snapshot = {
             'timestamp': timestamp,
             'resources': resources
@@ -72,7 +88,7 @@ class ChangeTracker:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=json.dumps(snapshot, indent=2)
+                Body=json.dumps(snapshot, indent=2, default=datetime_converter)
             )
         except ClientError as e:
             logger.error(f"Error saving to S3: {e}")
@@ -83,7 +99,7 @@ class ChangeTracker:
         file_path = os.path.join(self.repo_path, f"snapshot_{timestamp}.json")
         
         with open(file_path, 'w') as f:
-            json.dump(snapshot, f, indent=2)
+            json.dump(snapshot, f, indent=2, default=datetime_converter)
         
         self.repo.index.add([file_path])
         self.repo.index.commit(f"Infrastructure snapshot {timestamp}")
@@ -101,11 +117,25 @@ class ChangeTracker:
         if not end_time:
             end_time = datetime.now().isoformat()
         
+        if self.storage_type == 'sqlite':
+            return self._get_store_changes(start_time, end_time)
+        
         start_snapshot = self._get_snapshot(start_time)
         end_snapshot = self._get_snapshot(end_time)
         
         return self._compare_snapshots(start_snapshot, end_snapshot)
     
+    def _get_store_changes(self, start_time: str, end_time: str) -> List[Dict]:
+        """Compare the scans in effect at two times, in the inventory store."""
+        scans = []
+        for timestamp in (start_time, end_time):
+            scan_id = self.store.scan_at(timestamp)
+            if scan_id is None:
+                logger.error(f"Snapshot not found: {timestamp}")
+                raise LookupError(f"No snapshot at or before {timestamp}")
+            scans.append(scan_id)
+        return self.store.changes(*scans)
+    
     def _get_snapshot(self, timestamp: str) -> Dict:
         """Retrieve a specific snapshot."""
         if self.storage_type == 's3':
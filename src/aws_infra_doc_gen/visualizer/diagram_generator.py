@@ -3,161 +3,693 @@
 This module generates visual diagrams of AWS infrastructure using the Diagrams library.
 """
 
-from diagrams import Diagram, Cluster
-from diagrams.aws.compute import EC2, Lambda
-from diagrams.aws.database import RDS
-from diagrams.aws.storage import S3
-from diagrams.aws.network import VPC, PrivateSubnet, PublicSubnet
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Tuple, Optional
+from fnmatch import fnmatchcase
+from ..topology.topology_index import TopologyIndex, resource_key, NO_VPC
+from .native_renderer import render_native, cluster_tree
+from ..tracing.tracer import get_tracer
+import hashlib
+import importlib
+import json
+import logging
 import os
+import re
+
+logger = logging.getLogger(__name__)
+
+S3_CLUSTER = "S3 Buckets"
+
+# Render cache manifest, mapping output files to the fingerprint they were rendered from
+CACHE_FILE = ".diagram_cache.json"
+CACHE_VERSION = 2
+
+# Formats the native backend can write without Graphviz
+NATIVE_FORMATS = ['svg', 'dot']
+
+# Resource types drawn inside subnets, in drawing order
+SUBNET_TYPES = ['ec2', 'rds', 'lambda']
+
+TYPE_CLUSTERS = {
+    'ec2': "EC2 Instances",
+    'rds': "RDS Instances",
+    'lambda': "Lambda Functions",
+}
+
+# Diagrams node class of each spec node kind, imported on first render so the
+# native backend and spec building never load the Diagrams library
+NODE_CLASSES = {
+    'ec2': ('diagrams.aws.compute', 'EC2'),
+    'rds': ('diagrams.aws.database', 'RDS'),
+    'lambda': ('diagrams.aws.compute', 'Lambda'),
+    's3': ('diagrams.aws.storage', 'S3'),
+    'vpc': ('diagrams.aws.network', 'VPC'),
+    'subnet': ('diagrams.aws.network', 'PrivateSubnet'),
+    'link': ('diagrams.generic.blank', 'Blank'),
+}
+
+
+def _render_spec(spec: Dict[str, Any]) -> str:
+    """Render a diagram spec with the Diagrams library or the native backend.
+    
+    Specs are plain dicts so they can be shipped to worker processes. Nodes are
+    ``{'key', 'kind', 'label', 'cluster', 'url'}`` dicts, clusters may be nested
+    through ``cluster_parents`` and edges are ``(source key, target key, edge
+    attributes)`` tuples.
+    
+    Returns:
+        Path of the rendered file
+    """
+    if spec.get('backend') == 'native':
+        return render_native(spec)
+    
+    from diagrams import Diagram, Edge
+    
+    with Diagram(spec['title'], filename=spec['filename'], outformat=spec['outformat'],
+                 show=False, graph_attr={'compound': 'true'}):
+        nodes = {}
+        by_cluster, children = cluster_tree(spec)
+        
+        for node in by_cluster.get(None, []):
+            nodes[node['key']] = _create_node(node)
+        for cluster_label in children.get(None, []):
+            _render_cluster(cluster_label, spec, by_cluster, children, nodes)
+        
+        for src, dst, attrs in spec['edges']:
+            nodes[src] >> Edge(**attrs) >> nodes[dst]
+    
+    return f"{spec['filename']}.{spec['outformat']}"
+
+
+def _render_cluster(cluster_label: str, spec: Dict[str, Any], by_cluster: Dict,
+                    children: Dict, nodes: Dict):
+    """Render a spec cluster with its nodes and nested clusters."""
+    from diagrams import Cluster
+    
+    cluster_url = spec.get('cluster_urls', {}).get(cluster_label)
+    with Cluster(cluster_label, graph_attr={'URL': cluster_url} if cluster_url else None):
+        for node in by_cluster.get(cluster_label, []):
+            nodes[node['key']] = _create_node(node)
+        for child in children.get(cluster_label, []):
+            _render_cluster(child, spec, by_cluster, children, nodes)
+
+
+def _create_node(node: Dict[str, Any]):
+    """Create a Diagrams node from a spec node."""
+    attrs = {'URL': node['url']} if node.get('url') else {}
+    module_name, class_name = NODE_CLASSES[node['kind']]
+    node_class = getattr(importlib.import_module(module_name), class_name)
+    return node_class(node['label'], **attrs)
+
+
+def _fingerprint(spec: Dict[str, Any]) -> str:
+    """Compute a canonical fingerprint of a spec's topology and labels.
+    
+    Node and edge order do not affect the fingerprint, so reordered API results
+    still hit the render cache.
+    """
+    canonical = {
+        'version': CACHE_VERSION,
+        'title': spec['title'],
+        'outformat': spec['outformat'],
+        'backend': spec.get('backend', 'diagrams'),
+        'nodes': sorted(spec['nodes'], key=lambda node: node['key']),
+        'edges': sorted([src, dst, sorted(attrs.items())] for src, dst, attrs in spec['edges']),
+        'cluster_urls': spec.get('cluster_urls', {}),
+        'cluster_parents': spec.get('cluster_parents', {}),
+    }
+    payload = json.dumps(canonical, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
 
 class ArchitectureDiagramGenerator:
     """Generates architecture diagrams from AWS resource data."""
     
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, bundle_threshold: int = 5, page_size: int = 200,
+                 max_workers: Optional[int] = None, use_cache: bool = True,
+                 backend: str = 'auto', native_threshold: int = 2000):
         """Initialize the diagram generator.
         
         Args:
             output_dir: Directory to save generated diagrams
+            bundle_threshold: Maximum number of edges drawn individually between
+                two clusters before they are collapsed into one bundle edge
+            page_size: Maximum number of resources per subnet diagram page in
+                tiered mode
+            max_workers: Number of worker processes rendering tiered diagrams
+                (default: one per CPU)
+            use_cache: Skip rendering diagrams whose topology fingerprint
+                matches the previous render
+            backend: 'diagrams' to render through the Diagrams library and
+                Graphviz, 'native' to write DOT/SVG directly, or 'auto' to use
+                the native backend for SVG/DOT diagrams larger than
+                native_threshold nodes
+            native_threshold: Node count above which 'auto' switches to the
+                native backend
         """
         self.output_dir = output_dir
+        self.bundle_threshold = bundle_threshold
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.backend = backend
+        self.native_threshold = native_threshold
         os.makedirs(output_dir, exist_ok=True)
         
-    def generate_diagram(self, resources: Dict[str, List[Dict[str, Any]]], filename: str):
+    def generate_diagram(self, resources: Dict[str, List[Dict[str, Any]]], filename: str,
+                         index: Optional[TopologyIndex] = None):
         """Generate an architecture diagram.
         
         Args:
             resources: Dictionary of AWS resources by type
-            filename: Output filename (without extension)
+            filename: Output filename; an extension selects the format (default: png)
+            index: Prebuilt topology index of the resources
         """
-        with Diagram("AWS Architecture", filename=os.path.join(self.output_dir, filename),
-                    show=False):
+        with get_tracer().span('diagram.layout', mode='single') as span:
+            spec = self._single_spec(resources, filename, index)
+            span.count('nodes', len(spec['nodes']))
+            span.count('edges', len(spec['edges']))
+        self._render_specs([spec])
+    
+    def _single_spec(self, resources: Dict[str, List[Dict[str, Any]]], filename: str,
+                     index: Optional[TopologyIndex] = None) -> Dict[str, Any]:
+        """Build the spec of a single diagram holding every resource."""
+        index = index or TopologyIndex(resources)
+        nodes = []
+        cluster_parents = {}
+        
+        # Owning cluster label of each resource, keyed by resource key
+        clusters = {}
+        
+        # Create nodes for resources not in a VPC
+        for bucket in resources.get('s3', []):
+            self._add_node(nodes, clusters, 's3', bucket, S3_CLUSTER)
+        
+        # Create VPC clusters and their resources
+        for vpc_id, subnets in self._diagram_topology(index).items():
+            vpc_label = f"VPC {vpc_id}"
             
-            # Group resources by VPC
-            vpc_resources = self._group_by_vpc(resources)
+            # Create subnet clusters
+            for subnet_id, subnet_data in subnets.items():
+                cluster_label = f"Subnet {subnet_id}"
+                cluster_parents[cluster_label] = vpc_label
+                for resource_type in SUBNET_TYPES:
+                    for resource in subnet_data.get(resource_type, []):
+                        self._add_node(nodes, clusters, resource_type, resource, cluster_label)
+        
+        # Connect resources once the whole topology is placed
+        edges = [
+            (src, dst) for src, dst in self._plan_connections(resources)
+            if src in clusters and dst in clusters
+        ]
+        
+        # A format extension on the filename selects the output format
+        name, extension = os.path.splitext(filename)
+        if not extension:
+            name, extension = filename, '.png'
+        
+        return {
+            'title': "AWS Architecture",
+            'filename': os.path.join(self.output_dir, name),
+            'outformat': extension[1:],
+            'nodes': nodes,
+            'cluster_parents': cluster_parents,
+            'edges': self._spec_edges(edges, clusters),
+        }
+    
+    def _render_specs(self, specs: List[Dict[str, Any]]) -> List[str]:
+        """Render specs, skipping those whose fingerprint matches the cached render.
+        
+        Returns:
+            Paths of all diagram files, rendered or reused
+        """
+        for spec in specs:
+            spec['backend'] = self._select_backend(spec)
+        
+        cache = self._load_cache() if self.use_cache else {}
+        paths = [f"{spec['filename']}.{spec['outformat']}" for spec in specs]
+        fingerprints = [_fingerprint(spec) for spec in specs]
+        
+        stale = [
+            spec for spec, path, fingerprint in zip(specs, paths, fingerprints)
+            if cache.get(os.path.basename(path)) != fingerprint or not os.path.exists(path)
+        ]
+        logger.info(f"Rendering {len(stale)} of {len(specs)} diagrams")
+        
+        with get_tracer().span('diagram.render') as span:
+            span.count('rendered', len(stale))
+            span.count('cached', len(specs) - len(stale))
+            if len(stale) > 1:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    list(executor.map(_render_spec, stale))
+            elif stale:
+                _render_spec(stale[0])
+        
+        if self.use_cache:
+            for path, fingerprint in zip(paths, fingerprints):
+                cache[os.path.basename(path)] = fingerprint
+            self._save_cache(cache)
+        
+        return paths
+    
+    def _select_backend(self, spec: Dict[str, Any]) -> str:
+        """Pick the rendering backend for a spec."""
+        if self.backend != 'auto':
+            return self.backend
+        if len(spec['nodes']) > self.native_threshold and spec['outformat'] in NATIVE_FORMATS:
+            return 'native'
+        return 'diagrams'
+    
+    def _load_cache(self) -> Dict[str, str]:
+        """Load the render cache manifest."""
+        try:
+            with open(os.path.join(self.output_dir, CACHE_FILE), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _save_cache(self, cache: Dict[str, str]):
+        """Save the render cache manifest."""
+        with open(os.path.join(self.output_dir, CACHE_FILE), 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+    
+    def generate_tiered_diagrams(self, resources: Dict[str, List[Dict[str, Any]]],
+                                 fmt: str = 'svg', region: Optional[str] = None,
+                                 index: Optional[TopologyIndex] = None) -> List[str]:
+        """Generate an overview diagram plus per-VPC and per-subnet drill-downs.
+        
+        The overview shows one aggregated node per VPC with resource counts, each
+        VPC diagram shows its subnets by resource type, and each subnet diagram
+        is split into pages of at most ``page_size`` resources. Nodes link to the
+        diagram they summarize (clickable in SVG output). Diagrams are rendered
+        in parallel worker processes, and only those whose fingerprint changed
+        since the previous run are re-rendered.
+        
+        Args:
+            resources: Dictionary of AWS resources by type
+            fmt: Output format (e.g. 'svg', 'png')
+            region: Region shown in the overview title
+            index: Prebuilt topology index of the resources
             
-            # Create nodes for resources not in a VPC
-            s3_buckets = []
-            if 's3' in resources:
-                for bucket in resources['s3']:
-                    s3_buckets.append(S3(bucket['name']))
+        Returns:
+            List of generated file paths
+        """
+        with get_tracer().span('diagram.layout', mode='tiered') as span:
+            specs = self._build_tiered_specs(resources, fmt, region, index)
+            span.count('diagrams', len(specs))
+            span.count('nodes', sum(len(spec['nodes']) for spec in specs))
+        return self._render_specs(specs)
+    
+    def _build_tiered_specs(self, resources: Dict[str, List[Dict[str, Any]]], fmt: str,
+                            region: Optional[str] = None,
+                            index: Optional[TopologyIndex] = None) -> List[Dict[str, Any]]:
+        """Build the overview, VPC and subnet page specs for tiered mode."""
+        topology = self._diagram_topology(index or TopologyIndex(resources))
+        placements = {}
+        for vpc_id, subnets in topology.items():
+            for subnet_id, subnet_data in subnets.items():
+                for resource_type in SUBNET_TYPES:
+                    for resource in subnet_data.get(resource_type, []):
+                        key = resource_key(resource_type, resource)
+                        placements.setdefault(key, (vpc_id, subnet_id))
+        
+        edges = self._plan_connections(resources)
+        bucket_count = len(resources.get('s3', []))
+        
+        # Positions of the edges touching each resource and each VPC, so every
+        # drill-down only visits its own edges
+        edges_by_key = {}
+        edges_by_vpc = {}
+        for position, (src, dst) in enumerate(edges):
+            for key in {src, dst}:
+                edges_by_key.setdefault(key, []).append(position)
+            for vpc_id in {placements.get(src, (None,))[0], placements.get(dst, (None,))[0]} - {None}:
+                edges_by_vpc.setdefault(vpc_id, []).append(position)
+        
+        specs = [self._overview_spec(topology, placements, edges, bucket_count, fmt, region)]
+        for vpc_id, subnets in topology.items():
+            vpc_edges = [edges[position] for position in edges_by_vpc.get(vpc_id, [])]
+            specs.append(self._vpc_spec(vpc_id, subnets, placements, vpc_edges, bucket_count, fmt))
+            for subnet_id, subnet_data in subnets.items():
+                specs.extend(self._subnet_specs(vpc_id, subnet_id, subnet_data,
+                                                placements, edges, edges_by_key, bucket_count, fmt))
+        return specs
+    
+    def _overview_spec(self, topology: Dict, placements: Dict, edges: List[Tuple[str, str]],
+                       bucket_count: int, fmt: str, region: Optional[str]) -> Dict[str, Any]:
+        """Build the account/region overview with one aggregated node per VPC."""
+        cluster = f"Region {region}" if region else None
+        vpc_counts = {}
+        for key, (vpc_id, _) in placements.items():
+            counts = vpc_counts.setdefault(vpc_id, {})
+            resource_type = key.split(':', 1)[0]
+            counts[resource_type] = counts.get(resource_type, 0) + 1
+        
+        nodes = []
+        for vpc_id, subnets in topology.items():
+            counts = vpc_counts.get(vpc_id, {})
+            summary = ", ".join(f"{count} {resource_type}" for resource_type, count in counts.items() if count)
+            nodes.append({
+                'key': f"vpc:{vpc_id}",
+                'kind': 'vpc',
+                'label': f"VPC {vpc_id}\n{len(subnets)} subnets\n{summary}",
+                'cluster': cluster,
+                'url': self._diagram_file(fmt, 'vpc', vpc_id),
+            })
+        if bucket_count:
+            nodes.append({'key': 's3', 'kind': 's3', 'label': f"S3\n{bucket_count} buckets",
+                          'cluster': cluster})
+        
+        def endpoint(key):
+            if key.startswith('s3:'):
+                return 's3'
+            if key in placements:
+                return f"vpc:{placements[key][0]}"
+            return None
+        
+        return {
+            'title': f"AWS Architecture Overview ({region})" if region else "AWS Architecture Overview",
+            'filename': os.path.join(self.output_dir, 'overview'),
+            'outformat': fmt,
+            'nodes': nodes,
+            'edges': self._aggregate_edges(edges, endpoint),
+        }
+    
+    def _vpc_spec(self, vpc_id: str, subnets: Dict, placements: Dict,
+                  edges: List[Tuple[str, str]], bucket_count: int, fmt: str) -> Dict[str, Any]:
+        """Build a VPC drill-down with one aggregated node per subnet and type.
+        
+        Args:
+            edges: Edges with at least one end in the VPC
+        """
+        nodes = [{'key': 'up', 'kind': 'link', 'label': "Overview",
+                  'url': self._diagram_file(fmt, 'overview')}]
+        cluster_urls = {}
+        for subnet_id, subnet_data in subnets.items():
+            cluster = f"Subnet {subnet_id}"
+            cluster_urls[cluster] = self._diagram_file(fmt, 'subnet', vpc_id, subnet_id)
+            for resource_type in SUBNET_TYPES:
+                count = len(subnet_data.get(resource_type, []))
+                if count:
+                    nodes.append({
+                        'key': f"{subnet_id}:{resource_type}",
+                        'kind': resource_type,
+                        'label': f"{TYPE_CLUSTERS[resource_type]}\n{count}",
+                        'cluster': cluster,
+                        'url': cluster_urls[cluster],
+                    })
+        
+        external = {}
+        
+        def endpoint(key):
+            if key.startswith('s3:'):
+                external['s3'] = {'key': 's3', 'kind': 's3', 'label': f"S3\n{bucket_count} buckets"}
+                return 's3'
+            if key not in placements:
+                return None
+            other_vpc, subnet_id = placements[key]
+            if other_vpc == vpc_id:
+                return f"{subnet_id}:{key.split(':', 1)[0]}"
+            external[f"vpc:{other_vpc}"] = {
+                'key': f"vpc:{other_vpc}", 'kind': 'vpc', 'label': f"VPC {other_vpc}",
+                'url': self._diagram_file(fmt, 'vpc', other_vpc),
+            }
+            return f"vpc:{other_vpc}"
+        
+        aggregated = self._aggregate_edges(edges, endpoint)
+        
+        return {
+            'title': f"VPC {vpc_id}",
+            'filename': os.path.join(self.output_dir, self._diagram_name('vpc', vpc_id)),
+            'outformat': fmt,
+            'nodes': nodes + list(external.values()),
+            'cluster_urls': cluster_urls,
+            'edges': aggregated,
+        }
+    
+    def _subnet_specs(self, vpc_id: str, subnet_id: str, subnet_data: Dict, placements: Dict,
+                      edges: List[Tuple[str, str]], edges_by_key: Dict[str, List[int]],
+                      bucket_count: int, fmt: str) -> List[Dict[str, Any]]:
+        """Build the paginated resource-level diagrams of one subnet.
+        
+        Args:
+            edges: Every planned edge
+            edges_by_key: Positions in edges of the edges touching each resource
+        """
+        members = [
+            (resource_type, resource)
+            for resource_type in SUBNET_TYPES
+            for resource in subnet_data.get(resource_type, [])
+        ]
+        pages = [members[i:i + self.page_size] for i in range(0, len(members), self.page_size)] or [[]]
+        page_of = {}
+        for number, page in enumerate(pages, start=1):
+            for resource_type, resource in page:
+                page_of.setdefault(resource_key(resource_type, resource), number)
+        
+        specs = []
+        for number, page in enumerate(pages, start=1):
+            nodes = [{'key': 'up', 'kind': 'link', 'label': f"VPC {vpc_id}",
+                      'url': self._diagram_file(fmt, 'vpc', vpc_id)}]
+            clusters = {}
+            for resource_type, resource in page:
+                key = resource_key(resource_type, resource)
+                if key in clusters:
+                    continue
+                clusters[key] = TYPE_CLUSTERS[resource_type]
+                nodes.append({
+                    'key': key,
+                    'kind': resource_type,
+                    'label': self._node_label(resource_type, resource),
+                    'cluster': clusters[key],
+                })
+            for other, label in ((number - 1, "Previous page"), (number + 1, "Next page")):
+                if 1 <= other <= len(pages):
+                    nodes.append({'key': f"page:{other}", 'kind': 'link', 'label': label,
+                                  'url': self._diagram_file(fmt, 'subnet', vpc_id, subnet_id, page=other)})
             
-            # Create VPC clusters and their resources
-            for vpc_id, vpc_data in vpc_resources.items():
-                with Cluster(f"VPC {vpc_id}"):
-                    # Create subnet clusters
-                    subnet_resources = self._group_by_subnet(vpc_data)
-                    
-                    for subnet_id, subnet_data in subnet_resources.items():
-                        with Cluster(f"Subnet {subnet_id}"):
-                            # Create EC2 instances
-                            ec2_instances = []
-                            for instance in subnet_data.get('ec2', []):
-                                ec2_instances.append(
-                                    EC2(f"{instance['id']}\n{instance['type']}")
-                                )
-                            
-                            # Create RDS instances
-                            rds_instances = []
-                            for db in subnet_data.get('rds', []):
-                                rds_instances.append(
-                                    RDS(f"{db['identifier']}\n{db['engine']}")
-                                )
-                            
-                            # Create Lambda functions
-                            lambda_functions = []
-                            for func in subnet_data.get('lambda', []):
-                                lambda_functions.append(
-                                    Lambda(f"{func['name']}\n{func['runtime']}")
-                                )
-                            
-                            # Connect resources within subnet
-                            self._create_connections(
-                                ec2_instances,
-                                rds_instances,
-                                lambda_functions,
-                                s3_buckets
-                            )
-    
-    def _group_by_vpc(self, resources: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict]:
-        """Group resources by VPC ID."""
-        vpc_resources = {}
-        
-        # Process EC2 instances
-        for instance in resources.get('ec2', []):
-            vpc_id = instance.get('vpc_id', 'no_vpc')
-            if vpc_id not in vpc_resources:
-                vpc_resources[vpc_id] = {'ec2': []}
-            vpc_resources[vpc_id]['ec2'].append(instance)
+            touching = [
+                edges[position]
+                for position in sorted({position for key in clusters for position in edges_by_key.get(key, [])})
+            ]
+            local = [(src, dst) for src, dst in touching if src in clusters and dst in clusters]
+            page_edges = self._spec_edges(local, clusters)
+            
+            external = {}
+            
+            def endpoint(key):
+                if key in clusters:
+                    return key
+                if key.startswith('s3:'):
+                    external['s3'] = {'key': 's3', 'kind': 's3', 'label': f"S3\n{bucket_count} buckets"}
+                    return 's3'
+                if key in page_of:
+                    node_key = f"page:{page_of[key]}"
+                    external[node_key] = {
+                        'key': node_key, 'kind': 'link', 'label': f"Page {page_of[key]}",
+                        'url': self._diagram_file(fmt, 'subnet', vpc_id, subnet_id, page=page_of[key]),
+                    }
+                    return node_key
+                if key not in placements:
+                    return None
+                other_vpc, other_subnet = placements[key]
+                node_key = f"subnet:{other_vpc}:{other_subnet}"
+                external[node_key] = {
+                    'key': node_key, 'kind': 'subnet', 'label': f"Subnet {other_subnet}",
+                    'url': self._diagram_file(fmt, 'subnet', other_vpc, other_subnet),
+                }
+                return node_key
+            
+            # Edges leaving the page are summarized onto link nodes
+            crossing = [(src, dst) for src, dst in touching if (src in clusters) != (dst in clusters)]
+            page_edges.extend(self._aggregate_edges(crossing, endpoint))
+            drawn = {node['key'] for node in nodes}
+            nodes.extend(node for key, node in external.items() if key not in drawn)
+            
+            specs.append({
+                'title': f"Subnet {subnet_id}" + (f" ({number}/{len(pages)})" if len(pages) > 1 else ""),
+                'filename': os.path.join(self.output_dir,
+                                         self._diagram_name('subnet', vpc_id, subnet_id, page=number)),
+                'outformat': fmt,
+                'nodes': nodes,
+                'edges': page_edges,
+            })
+        return specs
+    
+    def _aggregate_edges(self, edges: List[Tuple[str, str]], endpoint) -> List[Tuple[str, str, Dict]]:
+        """Collapse resource edges onto summary nodes, labelled with their counts.
+        
+        Args:
+            edges: Resource-level (source key, target key) pairs
+            endpoint: Callable mapping a resource key to its summary node key,
+                or None to drop the edge
+        """
+        counts = {}
+        for src, dst in edges:
+            a, b = endpoint(src), endpoint(dst)
+            if a is None or b is None or a == b:
+                continue
+            counts[(a, b)] = counts.get((a, b), 0) + 1
         
-        # Process RDS instances
+        return [
+            (a, b, {'label': f"{count} connections" if count > 1 else ""})
+            for (a, b), count in sorted(counts.items())
+        ]
+    
+    def _node_label(self, resource_type: str, resource: Dict[str, Any]) -> str:
+        """Get the two-line label of a resource node."""
+        if resource_type == 'ec2':
+            return f"{resource['id']}\n{resource['type']}"
+        if resource_type == 'rds':
+            return f"{resource['identifier']}\n{resource['engine']}"
+        if resource_type == 'lambda':
+            return f"{resource['name']}\n{resource['runtime']}"
+        return resource.get('name', '')
+    
+    def _diagram_name(self, *parts: str, page: int = 1) -> str:
+        """Get a filesystem-safe diagram name (without extension)."""
+        name = "_".join(re.sub(r'[^A-Za-z0-9.-]+', '-', str(part)) for part in parts)
+        return f"{name}_p{page}" if page > 1 else name
+    
+    def _diagram_file(self, fmt: str, *parts: str, page: int = 1) -> str:
+        """Get the relative file name used to link to another diagram."""
+        return f"{self._diagram_name(*parts, page=page)}.{fmt}"
+    
+    def _add_node(self, nodes: List[Dict], clusters: Dict[str, str], resource_type: str,
+                  resource: Dict[str, Any], cluster_label: str):
+        """Add a resource node; resources placed in several subnets get one node per
+        subnet, and edges attach to the first."""
+        key = resource_key(resource_type, resource)
+        node_key = key if key not in clusters else f"{key}@{cluster_label}"
+        clusters.setdefault(key, cluster_label)
+        nodes.append({
+            'key': node_key,
+            'kind': resource_type,
+            'label': self._node_label(resource_type, resource),
+            'cluster': cluster_label,
+        })
+    
+    def _diagram_topology(self, index: TopologyIndex) -> Dict[str, Dict[str, Dict[str, List[Dict]]]]:
+        """Get the VPC -> subnet -> type groupings drawn in diagrams.
+        
+        RDS instances and Lambda functions outside a VPC are not drawn in any
+        subnet cluster.
+        """
+        topology = {}
+        for vpc_id, subnets in index.vpcs().items():
+            for subnet_id, by_type in subnets.items():
+                drawn = {
+                    resource_type: by_type[resource_type]
+                    for resource_type in SUBNET_TYPES
+                    if resource_type in by_type and (vpc_id != NO_VPC or resource_type == 'ec2')
+                }
+                if drawn:
+                    topology.setdefault(vpc_id, {})[subnet_id] = drawn
+        return topology
+    
+    def _spec_edges(self, edges: List[Tuple[str, str]], clusters: Dict[str, str]) -> List[Tuple[str, str, Dict]]:
+        """Turn planned resource edges into spec edges.
+        
+        Edges between two clusters that exceed ``bundle_threshold`` are drawn as a
+        single labelled bundle edge, so the edge count stays near-linear in the
+        number of resources.
+        """
+        individual, bundles = self._bundle_edges(edges, clusters)
+        spec_edges = [(src, dst, {}) for src, dst in individual]
+        
+        for (src_cluster, dst_cluster), members in bundles.items():
+            attrs = {'label': f"{len(members)} connections", 'style': "bold"}
+            if src_cluster != dst_cluster:
+                attrs.update({'ltail': f"cluster_{src_cluster}", 'lhead': f"cluster_{dst_cluster}"})
+            spec_edges.append((members[0][0], members[0][1], attrs))
+        
+        return spec_edges
+    
+    def _plan_connections(self, resources: Dict[str, List[Dict[str, Any]]]) -> List[Tuple[str, str]]:
+        """Derive resource relationships from the scanned metadata.
+        
+        EC2 instances and VPC Lambda functions connect to RDS instances sharing a
+        security group, and Lambda functions connect to the S3 buckets granted by
+        their execution role's policies.
+        
+        Returns:
+            Sorted list of unique (source key, target key) pairs
+        """
+        edges = set()
+        
+        # Index RDS instances by the security groups attached to them
+        sg_targets = {}
         for db in resources.get('rds', []):
-            if 'DBSubnetGroup' in db:
-                vpc_id = db['DBSubnetGroup'].get('VpcId', 'no_vpc')
-                if vpc_id not in vpc_resources:
-                    vpc_resources[vpc_id] = {'rds': []}
-                elif 'rds' not in vpc_resources[vpc_id]:
-                    vpc_resources[vpc_id]['rds'] = []
-                vpc_resources[vpc_id]['rds'].append(db)
-        
-        # Process Lambda functions
-        for func in resources.get('lambda', []):
-            vpc_config = func.get('vpc_config', {})
-            if vpc_config:
-                vpc_id = vpc_config.get('VpcId', 'no_vpc')
-                if vpc_id not in vpc_resources:
-                    vpc_resources[vpc_id] = {'lambda': []}
-                elif 'lambda' not in vpc_resources[vpc_id]:
-                    vpc_resources[vpc_id]['lambda'] = []
-                vpc_resources[vpc_id]['lambda'].append(func)
-        
-        return vpc_resources
-    
-    def _group_by_subnet(self, vpc_data: Dict) -> Dict[str, Dict]:
-        """Group VPC resources by subnet ID."""
-        subnet_resources = {}
-        
-        # Process EC2 instances
-        for instance in vpc_data.get('ec2', []):
-            subnet_id = instance.get('subnet_id', 'no_subnet')
-            if subnet_id not in subnet_resources:
-                subnet_resources[subnet_id] = {'ec2': []}
-            subnet_resources[subnet_id]['ec2'].append(instance)
-        
-        # Process RDS instances
-        for db in vpc_data.get('rds', []):
-            if 'DBSubnetGroup' in db:
-                for subnet in db['DBSubnetGroup'].get('Subnets', []):
-                    subnet_id = subnet.get('SubnetIdentifier', 'no_subnet')
-                    if subnet_id not in subnet_resources:
-                        subnet_resources[subnet_id] = {'rds': []}
-                    elif 'rds' not in subnet_resources[subnet_id]:
-                        subnet_resources[subnet_id]['rds'] = []
-                    subnet_resources[subnet_id]['rds'].append(db)
-        
-        # Process Lambda functions
-        for func in vpc_data.get('lambda', []):
-            vpc_config = func.get('vpc_config', {})
-            if vpc_config:
-                for subnet_id in vpc_config.get('SubnetIds', []):
-                    if subnet_id not in subnet_resources:
-                        subnet_resources[subnet_id] = {'lambda': []}
-                    elif 'lambda' not in subnet_resources[subnet_id]:
-                        subnet_resources[subnet_id]['lambda'] = []
-                    subnet_resources[subnet_id]['lambda'].append(func)
-        
-        return subnet_resources
-    
-    def _create_connections(self, ec2_instances, rds_instances, lambda_functions, s3_buckets):
-        """Create connections between resources based on security groups and policies."""
+            key = resource_key('rds', db)
+            for sg_id in db.get('vpc_security_groups') or []:
+                sg_targets.setdefault(sg_id, []).append(key)
+        
         # Connect EC2 to RDS if they share security groups
-        for ec2 in ec2_instances:
-            for rds in rds_instances:
-                ec2 >> rds
+        for instance in resources.get('ec2', []):
+            key = resource_key('ec2', instance)
+            for sg in instance.get('security_groups') or []:
+                for target in sg_targets.get(sg.get('GroupId'), []):
+                    edges.add((key, target))
+        
+        bucket_keys = {
+            bucket['name']: resource_key('s3', bucket)
+            for bucket in resources.get('s3', [])
+        }
         
         # Connect Lambda to other resources based on VPC config and policies
-        for lambda_func in lambda_functions:
-            for s3 in s3_buckets:
-                lambda_func >> s3
-            for rds in rds_instances:
-                lambda_func >> rds
\ No newline at end of file
+        for func in resources.get('lambda', []):
+            key = resource_key('lambda', func)
+            vpc_config = func.get('vpc_config') or {}
+            for sg_id in vpc_config.get('SecurityGroupIds', []):
+                for target in sg_targets.get(sg_id, []):
+                    edges.add((key, target))
+            for grant in func.get('policy_resources') or []:
+                for target in self._match_bucket_keys(grant, bucket_keys):
+                    edges.add((key, target))
+        
+        return sorted(edges)
+    
+    def _match_bucket_keys(self, grant: Any, bucket_keys: Dict[str, str]) -> List[str]:
+        """Resolve a policy grant to S3 bucket keys.
+        
+        A grant is a resource ARN pattern (possibly wildcarded), or
+        ``{'NotResource': [...]}`` for every bucket the patterns do not match.
+        """
+        if isinstance(grant, dict):
+            excluded = set()
+            for arn in grant.get('NotResource', []):
+                # Excluding a bucket's objects still leaves the bucket granted
+                if '/' not in arn:
+                    excluded.update(self._match_bucket_keys(arn, bucket_keys))
+            return [key for key in bucket_keys.values() if key not in excluded]
+        if grant == '*':
+            return list(bucket_keys.values())
+        parts = grant.split(':', 5)
+        if len(parts) != 6 or parts[0] != 'arn' or not fnmatchcase('s3', parts[2]):
+            return []
+        
+        pattern = parts[5].split('/', 1)[0]
+        if not any(ch in pattern for ch in '*?['):
+            return [bucket_keys[pattern]] if pattern in bucket_keys else []
+        return [key for name, key in bucket_keys.items() if fnmatchcase(name, pattern)]
+    
+    def _bundle_edges(self, edges: List[Tuple[str, str]], clusters: Dict[str, str]):
+        """Split edges into individually drawn edges and per-cluster-pair bundles.
+        
+        Returns:
+            Tuple of (individual edges, {(source cluster, target cluster): edges})
+        """
+        by_cluster_pair = {}
+        for src, dst in edges:
+            pair = (clusters.get(src), clusters.get(dst))
+            by_cluster_pair.setdefault(pair, []).append((src, dst))
+        
+        individual = []
+        bundles = {}
+        for pair, members in by_cluster_pair.items():
+            if len(members) > self.bundle_threshold and None not in pair:
+                bundles[pair] = members
+            else:
+                individual.extend(members)
+        
+        return individual, bundles
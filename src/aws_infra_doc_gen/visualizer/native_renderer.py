@@ -0,0 +1,259 @@
+"""Native Diagram Renderer.
+
+This module writes diagram specs straight to DOT or SVG without the Diagrams
+library, for inventories too large to lay out with Graphviz. SVG output uses a
+precomputed grid layout: nodes are placed on a grid inside their cluster and
+clusters are packed into rows inside their parent.
+"""
+
+from typing import Dict, List, Any, Tuple
+from html import escape as html_escape
+import math
+
+NODE_WIDTH = 180
+NODE_HEIGHT = 48
+GAP = 16
+PADDING = 16
+CLUSTER_HEADER = 28
+
+NODE_COLORS = {
+    'ec2': '#F58536',
+    'rds': '#3B48CC',
+    'lambda': '#ED7100',
+    's3': '#3F8624',
+    'vpc': '#8C4FFF',
+    'subnet': '#147EBA',
+    'link': '#7D8998',
+}
+
+
+def render_native(spec: Dict[str, Any]) -> str:
+    """Render a diagram spec as DOT or SVG.
+
+    Returns:
+        Path of the rendered file
+    """
+    path = f"{spec['filename']}.{spec['outformat']}"
+    if spec['outformat'] == 'dot':
+        write_dot(spec, path)
+    elif spec['outformat'] == 'svg':
+        write_svg(spec, path)
+    else:
+        raise ValueError(f"Unsupported format for native backend: {spec['outformat']}")
+    return path
+
+
+def write_dot(spec: Dict[str, Any], path: str):
+    """Stream a diagram spec to a Graphviz DOT file."""
+    by_cluster, children = cluster_tree(spec)
+    node_ids = {}
+
+    with open(path, 'w') as f:
+        f.write(f"digraph {_dot_quote(spec['title'])} {{\n")
+        f.write(f"\tgraph [label={_dot_quote(spec['title'])} compound=true rankdir=LR]\n")
+        f.write("\tnode [shape=box style=\"rounded,filled\" fontcolor=white fontname=\"Sans-Serif\"]\n")
+
+        for node in by_cluster.get(None, []):
+            _write_dot_node(f, node, node_ids, 1)
+        for cluster_label in children.get(None, []):
+            _write_dot_cluster(f, cluster_label, spec, by_cluster, children, node_ids, 1)
+
+        for src, dst, attrs in spec['edges']:
+            rendered = " ".join(f"{name}={_dot_quote(value)}" for name, value in sorted(attrs.items()) if value)
+            f.write(f"\t{node_ids[src]} -> {node_ids[dst]} [{rendered}]\n")
+        f.write("}\n")
+
+
+def _write_dot_cluster(f, cluster_label: str, spec: Dict[str, Any], by_cluster: Dict,
+                       children: Dict, node_ids: Dict, depth: int):
+    """Write a DOT subgraph for a cluster and its nested clusters."""
+    indent = "\t" * depth
+    f.write(f"{indent}subgraph {_dot_quote('cluster_' + cluster_label)} {{\n")
+    f.write(f"{indent}\tlabel={_dot_quote(cluster_label)}\n")
+    cluster_url = spec.get('cluster_urls', {}).get(cluster_label)
+    if cluster_url:
+        f.write(f"{indent}\tURL={_dot_quote(cluster_url)}\n")
+
+    for node in by_cluster.get(cluster_label, []):
+        _write_dot_node(f, node, node_ids, depth + 1)
+    for child in children.get(cluster_label, []):
+        _write_dot_cluster(f, child, spec, by_cluster, children, node_ids, depth + 1)
+    f.write(f"{indent}}}\n")
+
+
+def _write_dot_node(f, node: Dict[str, Any], node_ids: Dict, depth: int):
+    """Write a DOT node statement."""
+    node_ids[node['key']] = f"n{len(node_ids)}"
+    attrs = f"label={_dot_quote(node['label'])} fillcolor={_dot_quote(NODE_COLORS[node['kind']])}"
+    if node.get('url'):
+        attrs += f" URL={_dot_quote(node['url'])}"
+    indent = "\t" * depth
+    f.write(f"{indent}{node_ids[node['key']]} [{attrs}]\n")
+
+
+def _dot_quote(value: Any) -> str:
+    """Quote a DOT identifier or attribute value."""
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{text}"'
+
+
+def write_svg(spec: Dict[str, Any], path: str):
+    """Lay out a diagram spec on a grid and stream it to an SVG file."""
+    by_cluster, children = cluster_tree(spec)
+    sizes = {}
+    width, height = _measure(None, by_cluster, children, sizes)
+
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+                f'width="{width + 2 * PADDING}" height="{height + CLUSTER_HEADER + 2 * PADDING}" '
+                f'font-family="Sans-Serif" font-size="12">\n')
+        f.write(f'<text x="{PADDING}" y="{PADDING + 14}" font-size="18">{_xml_text(spec["title"])}</text>\n')
+
+        centers = {}
+        _place(f, None, PADDING, PADDING + CLUSTER_HEADER, spec, by_cluster, children, sizes, centers, 0)
+
+        f.write('<g stroke="#7B8894" stroke-opacity="0.6" fill="none">\n')
+        for src, dst, attrs in spec['edges']:
+            (x1, y1), (x2, y2) = centers[src], centers[dst]
+            width_attr = ' stroke-width="3"' if attrs.get('style') == 'bold' else ''
+            f.write(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}"{width_attr}/>\n')
+            if attrs.get('label'):
+                f.write(f'<text x="{(x1 + x2) // 2}" y="{(y1 + y2) // 2}" fill="#2D3436" '
+                        f'stroke="none">{_xml_text(attrs["label"])}</text>\n')
+        f.write('</g>\n</svg>\n')
+
+
+def _xml_text(text: str) -> str:
+    """Escape text content for SVG."""
+    return html_escape(text, quote=False)
+
+
+def _xml_attr(value: str) -> str:
+    """Quote and escape an SVG attribute value."""
+    return f'"{html_escape(value)}"'
+
+
+def _measure(cluster_label, by_cluster: Dict, children: Dict, sizes: Dict) -> Tuple[int, int]:
+    """Compute the size of a cluster's contents, recording every nested cluster's size."""
+    count = len(by_cluster.get(cluster_label, []))
+    columns = math.ceil(math.sqrt(count)) if count else 0
+    rows = math.ceil(count / columns) if count else 0
+    grid_width = max(columns * (NODE_WIDTH + GAP) - GAP, 0)
+    grid_height = max(rows * (NODE_HEIGHT + GAP) - GAP, 0)
+
+    child_sizes = []
+    for child in children.get(cluster_label, []):
+        width, height = _measure(child, by_cluster, children, sizes)
+        child_sizes.append((width + 2 * PADDING, height + CLUSTER_HEADER + 2 * PADDING))
+
+    # Pack child clusters into rows roughly as wide as the area is tall
+    area = sum(width * height for width, height in child_sizes)
+    row_limit = max([grid_width, int(math.sqrt(area) * 1.5)] + [width for width, _ in child_sizes])
+    rows_layout = _pack_rows(child_sizes, row_limit)
+
+    width = max([grid_width] + [row_width for row_width, _, _ in rows_layout])
+    height = grid_height + sum(row_height + GAP for _, row_height, _ in rows_layout)
+    if grid_height and not rows_layout:
+        height = grid_height
+    elif rows_layout and not grid_height:
+        height -= GAP
+
+    sizes[cluster_label] = (width, height, columns, grid_height, rows_layout)
+    return width, height
+
+
+def _pack_rows(child_sizes: List[Tuple[int, int]], row_limit: int) -> List[Tuple[int, int, List[int]]]:
+    """Pack child sizes into rows no wider than row_limit.
+
+    Returns:
+        List of (row width, row height, child indexes) tuples
+    """
+    rows = []
+    row_width, row_height, members = 0, 0, []
+    for position, (width, height) in enumerate(child_sizes):
+        if members and row_width + GAP + width > row_limit:
+            rows.append((row_width, row_height, members))
+            row_width, row_height, members = 0, 0, []
+        row_width += (GAP if members else 0) + width
+        row_height = max(row_height, height)
+        members.append(position)
+    if members:
+        rows.append((row_width, row_height, members))
+    return rows
+
+
+def _place(f, cluster_label, x: int, y: int, spec: Dict[str, Any], by_cluster: Dict,
+           children: Dict, sizes: Dict, centers: Dict, depth: int):
+    """Write a cluster's nodes and nested clusters at an absolute position."""
+    width, height, columns, grid_height, rows_layout = sizes[cluster_label]
+
+    for position, node in enumerate(by_cluster.get(cluster_label, [])):
+        node_x = x + (position % columns) * (NODE_WIDTH + GAP)
+        node_y = y + (position // columns) * (NODE_HEIGHT + GAP)
+        centers[node['key']] = (node_x + NODE_WIDTH // 2, node_y + NODE_HEIGHT // 2)
+        _write_svg_node(f, node, node_x, node_y)
+
+    cluster_children = children.get(cluster_label, [])
+    row_y = y + grid_height + (GAP if grid_height else 0)
+    for _, row_height, members in rows_layout:
+        child_x = x
+        for position in members:
+            child = cluster_children[position]
+            child_width, child_height = sizes[child][0], sizes[child][1]
+            box_width = child_width + 2 * PADDING
+            box_height = child_height + CLUSTER_HEADER + 2 * PADDING
+
+            cluster_url = spec.get('cluster_urls', {}).get(child)
+            if cluster_url:
+                f.write(f'<a xlink:href={_xml_attr(cluster_url)}>\n')
+            shade = '#F4F6F7' if depth % 2 == 0 else '#E5F5FD'
+            f.write(f'<rect x="{child_x}" y="{row_y}" width="{box_width}" height="{box_height}" '
+                    f'rx="6" fill="{shade}" stroke="#AEB6BE"/>\n')
+            f.write(f'<text x="{child_x + PADDING}" y="{row_y + 20}">{_xml_text(child)}</text>\n')
+            if cluster_url:
+                f.write('</a>\n')
+
+            _place(f, child, child_x + PADDING, row_y + CLUSTER_HEADER + PADDING, spec,
+                   by_cluster, children, sizes, centers, depth + 1)
+            child_x += box_width + GAP
+        row_y += row_height + GAP
+
+
+def _write_svg_node(f, node: Dict[str, Any], x: int, y: int):
+    """Write an SVG node box with its label lines."""
+    if node.get('url'):
+        f.write(f'<a xlink:href={_xml_attr(node["url"])}>\n')
+    f.write(f'<rect x="{x}" y="{y}" width="{NODE_WIDTH}" height="{NODE_HEIGHT}" rx="4" '
+            f'fill="{NODE_COLORS[node["kind"]]}"/>\n')
+    lines = node['label'].split('\n')
+    for line_number, line in enumerate(lines):
+        line_y = y + NODE_HEIGHT // 2 + (line_number - (len(lines) - 1) / 2) * 14 + 4
+        f.write(f'<text x="{x + NODE_WIDTH // 2}" y="{line_y:.0f}" fill="white" '
+                f'text-anchor="middle">{_xml_text(line[:28])}</text>\n')
+    if node.get('url'):
+        f.write('</a>\n')
+
+
+def cluster_tree(spec: Dict[str, Any]) -> Tuple[Dict, Dict]:
+    """Group spec nodes by cluster and resolve nested cluster children.
+
+    Returns:
+        Tuple of ({cluster: nodes}, {parent cluster: child clusters}), where the
+        top level is keyed by None
+    """
+    by_cluster = {None: []}
+    for node in spec['nodes']:
+        by_cluster.setdefault(node.get('cluster'), []).append(node)
+
+    parents = spec.get('cluster_parents', {})
+    children = {}
+    for cluster_label in list(by_cluster):
+        while cluster_label is not None:
+            parent = parents.get(cluster_label)
+            siblings = children.setdefault(parent, [])
+            if cluster_label in siblings:
+                break
+            siblings.append(cluster_label)
+            cluster_label = parent
+    return by_cluster, children
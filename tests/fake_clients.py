@@ -0,0 +1,64 @@
+"""Fake AWS clients shared by the scanner tests.
+
+A backend answers the calls of the clients: ``pages(operation, **kwargs)``
+returns the pages of a paginated operation and ``respond(operation,
+**kwargs)`` the response of a single call, raising to simulate an error.
+Every call is recorded in the factory's ``calls``.
+"""
+
+from collections import namedtuple
+from types import SimpleNamespace
+from botocore.exceptions import ClientError
+
+# One recorded call
+Call = namedtuple('Call', ['service', 'region', 'operation', 'params'])
+
+class FakeClient:
+    """Client answering from a backend, standing in for a boto3 client."""
+    
+    exceptions = SimpleNamespace(ClientError=ClientError)
+    
+    def __init__(self, backend, calls, service, region=None):
+        self.backend = backend
+        self.calls = calls
+        self.service = service
+        self.region = region
+    
+    def get_paginator(self, operation):
+        def paginate(**kwargs):
+            self.calls.append(Call(self.service, self.region, operation, kwargs))
+            return self.backend.pages(operation, **kwargs)
+        
+        return SimpleNamespace(paginate=paginate)
+    
+    def __getattr__(self, operation):
+        def call(**params):
+            self.calls.append(Call(self.service, self.region, operation, params))
+            return self.backend.respond(operation, **params)
+        return call
+
+class FakeClientFactory:
+    """Client factory handing out FakeClients over one backend, or one per region."""
+    
+    def __init__(self, backend=None, regions=None):
+        """Initialize the factory.
+        
+        Args:
+            backend: Backend answering every region
+            regions: Backends by region, instead of a single backend
+        """
+        self.backend = backend
+        self.regions = regions
+        self.calls = []
+    
+    def client(self, service, region=None, session=None):
+        backend = self.regions[region] if self.regions is not None else self.backend
+        return FakeClient(backend, self.calls, service, region)
+    
+    def params(self, operation):
+        """Parameters of the recorded calls to an operation."""
+        return [call.params for call in self.calls if call.operation == operation]
+    
+    def count(self, operation):
+        """Number of recorded calls to an operation."""
+        return len(self.params(operation))
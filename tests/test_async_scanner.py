@@ -0,0 +1,72 @@
+"""Tests for the async AWS resource scanner."""
+
+import unittest
+from unittest.mock import patch
+from botocore.exceptions import ClientError
+from src.aws_infra_doc_gen.scanner import async_scanner
+from src.aws_infra_doc_gen.scanner.async_scanner import AsyncAWSResourceScanner
+
+@unittest.skipIf(async_scanner.get_session is None, "aiobotocore is not installed")
+class TestAsyncAWSResourceScanner(unittest.TestCase):
+    """Test cases for AsyncAWSResourceScanner."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.scanner = AsyncAWSResourceScanner('us-east-1')
+        self.calls = []
+        
+        async def fake_call(scanner, service, operation, **kwargs):
+            self.calls.append((service, operation, kwargs))
+            if operation == 'list_buckets':
+                return {'Buckets': [{'Name': 'a', 'CreationDate': 'd'}, {'Name': 'b', 'CreationDate': 'd'}]}
+            if operation == 'get_bucket_encryption':
+                if kwargs['Bucket'] == 'b':
+                    raise ClientError({'Error': {'Code': 'NotFound'}}, operation)
+                return {'ServerSideEncryptionConfiguration': {'Rules': []}}
+            if operation == 'get_bucket_location':
+                return {'LocationConstraint': 'eu-west-1'}
+            if operation == 'get_role_policy':
+                return {'PolicyDocument': {'Statement': {
+                    'Effect': 'Allow',
+                    'Action': 's3:GetObject' if kwargs['PolicyName'] == 'inline' else 'logs:PutLogEvents',
+                    'Resource': 'arn:aws:s3:::a/*' if kwargs['PolicyName'] == 'inline' else '*',
+                }}}
+            raise AssertionError(f"Unexpected call {operation}")
+        
+        async def fake_paginate(scanner, service, operation, key, **kwargs):
+            self.calls.append((service, operation, kwargs))
+            if operation == 'list_role_policies':
+                return ['inline', 'logs']
+            if operation == 'list_attached_role_policies':
+                return []
+            return [
+                {'FunctionName': f"fn-{i}", 'Runtime': 'python3.11', 'Handler': 'index.handler',
+                 'Role': 'arn:aws:iam::123456789012:role/shared', 'MemorySize': 128,
+                 'Timeout': 3, 'LastModified': 'now'}
+                for i in range(3)
+            ]
+        
+        patch.object(AsyncAWSResourceScanner, '_call', fake_call).start()
+        patch.object(AsyncAWSResourceScanner, '_paginate', fake_paginate).start()
+        self.addCleanup(patch.stopall)
+    
+    def test_scan_s3_fetches_bucket_details(self):
+        """Test S3 records match the sync scanner's shape."""
+        resources = self.scanner.scan_resources(['s3'])
+        
+        self.assertEqual(resources['s3'], [
+            {'name': 'a', 'creation_date': 'd', 'encryption': {'Rules': []}, 'location': 'eu-west-1'},
+            {'name': 'b', 'creation_date': 'd', 'encryption': None, 'location': 'eu-west-1'},
+        ])
+    
+    def test_scan_lambda_resolves_shared_role_once(self):
+        """Test functions sharing a role trigger a single policy lookup, keeping only S3 grants."""
+        resources = self.scanner.scan_resources(['lambda', 'unknown'])
+        
+        self.assertEqual(list(resources), ['lambda'])
+        self.assertEqual([f['policy_resources'] for f in resources['lambda']], [['arn:aws:s3:::a/*']] * 3)
+        operations = [operation for _, operation, _ in self.calls]
+        self.assertEqual(operations.count('list_role_policies'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+"""Tests that CLI startup stays free of heavy imports."""
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+HEAVY_MODULES = ['boto3', 'botocore', 'aiohttp', 'diagrams', 'jinja2', 'markdown', 'git', 'weasyprint']
+
+def loaded_heavy_modules(code):
+    """Run code in a fresh interpreter and list the heavy modules it loaded."""
+    check = f"{code}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', check], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [module for module in result.stdout.strip().split(',') if module]
+
+class TestCliImports(unittest.TestCase):
+    """Test cases for lazy CLI imports."""
+    
+    def test_cli_startup_imports_no_heavy_libraries(self):
+        """Test importing the CLI loads none of the heavy libraries."""
+        self.assertEqual(loaded_heavy_modules("import src.aws_infra_doc_gen.__main__"), [])
+    
+    def test_diagram_specs_do_not_load_diagrams_library(self):
+        """Test the diagram generator loads the Diagrams library only to render."""
+        self.assertEqual(
+            loaded_heavy_modules("import src.aws_infra_doc_gen.visualizer.diagram_generator"), []
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""Tests for the AWS client factory."""
+
+import unittest
+import boto3
+from src.aws_infra_doc_gen.clients.client_factory import ClientFactory, get_client_factory
+from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner
+
+def make_session(access_key='AKIA1', region='us-east-1'):
+    """Create a session with static test credentials."""
+    return boto3.Session(aws_access_key_id=access_key, aws_secret_access_key='secret', region_name=region)
+
+class TestClientFactory(unittest.TestCase):
+    """Test cases for ClientFactory."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.factory = ClientFactory(max_pool_connections=25)
+    
+    def test_clients_pooled_across_sessions_with_same_credentials(self):
+        """Test a second session with the same credentials reuses the client."""
+        first = self.factory.client('s3', 'us-east-1', make_session())
+        second = self.factory.client('s3', 'us-east-1', make_session())
+        
+        self.assertIs(first, second)
+        self.assertEqual(first.meta.config.max_pool_connections, 25)
+    
+    def test_clients_keyed_by_service_region_and_credentials(self):
+        """Test differing service, region or credentials get separate clients."""
+        base = self.factory.client('s3', 'us-east-1', make_session())
+        
+        self.assertIsNot(base, self.factory.client('ec2', 'us-east-1', make_session()))
+        self.assertIsNot(base, self.factory.client('s3', 'eu-west-1', make_session()))
+        self.assertIsNot(base, self.factory.client('s3', 'us-east-1', make_session('AKIA2')))
+        self.assertEqual(self.factory.client('s3', 'eu-west-1', make_session()).meta.region_name, 'eu-west-1')
+    
+    def test_scanners_share_process_wide_factory(self):
+        """Test scanners default to the shared factory."""
+        self.assertIs(AWSResourceScanner('us-east-1').clients, get_client_factory())
+        self.assertIs(AWSResourceScanner('us-east-1', self.factory).clients, self.factory)
+
+if __name__ == '__main__':
+    unittest.main()
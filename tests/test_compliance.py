@@ -76,6 +76,21 @@ class TestComplianceChecker(unittest.TestCase):
         self.assertEqual(results['summary']['compliant'], 1)
         self.assertEqual(results['summary']['non_compliant'], 1)
     
+    def test_scoped_rule_only_checks_resources_in_scope(self):
+        """Test that a rule scope restricts it to resources in that VPC."""
+        self.checker.rules['ec2']['encryption_enabled']['scope'] = {'vpc_id': 'vpc-prod'}
+        resources = {
+            'ec2': [
+                {'id': 'i-prod', 'vpc_id': 'vpc-prod', 'block_device_mappings': {}},
+                {'id': 'i-dev', 'vpc_id': 'vpc-dev', 'block_device_mappings': {}}
+            ]
+        }
+        
+        results = self.checker.check_compliance(resources)
+        
+        self.assertEqual(results['summary']['non_compliant'], 1)
+        self.assertEqual(results['violations'][0]['resource_id'], 'i-prod')
+    
     def test_evaluate_rule_equals(self):
         """Test rule evaluation with equals operator."""
         resource = {'field': 'value'}
@@ -0,0 +1,128 @@
+"""Tests for the scan service and daemon."""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+from src.aws_infra_doc_gen.service.scan_service import ScanService
+from src.aws_infra_doc_gen.service.daemon import DocumentationDaemon
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+class TestScanService(unittest.TestCase):
+    """Test cases for ScanService."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.output_dir = tempfile.mkdtemp()
+        self.config_data = {
+            'aws': {'regions': ['eu-west-1'], 'resources': ['s3']},
+            'output': {'directory': self.output_dir, 'format': ['markdown'], 'diagrams': []},
+            'templates': {'directory': TEMPLATE_DIR},
+        }
+        self.scanner = MagicMock()
+        self.scanner.scan_resources.return_value = {'s3': [{'name': 'logs', 'encryption': None}]}
+        patcher = patch('src.aws_infra_doc_gen.service.scan_service.create_scanner', return_value=self.scanner)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_run_keeps_components_between_runs(self):
+        """Test repeated runs reuse the scanner and record the latest results."""
+        service = ScanService(self.config_data)
+        
+        first = service.run()
+        second = service.run()
+        
+        self.assertEqual(service.region, 'eu-west-1')
+        self.assertEqual(second['status'], 'succeeded')
+        self.assertEqual(second['resource_counts'], {'s3': 1})
+        self.assertEqual(self.scanner.scan_resources.call_count, 2)
+        self.assertEqual(self.scanner.clear_cache.call_count, 2)
+        self.assertNotEqual(first['started'], '')
+        with open(os.path.join(self.output_dir, 'scan_results.json')) as f:
+            self.assertEqual(json.load(f), {'s3': [{'name': 'logs', 'encryption': None}]})
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'documentation.md')))
+    
+    def test_store_shared_with_sqlite_tracker(self):
+        """Test runs are written to the store once, serving as the tracker's snapshots."""
+        self.config_data['store'] = {'enabled': True, 'path': os.path.join(self.output_dir, 'inventory.db')}
+        self.config_data['change_tracking'] = {'enabled': True, 'storage': 'sqlite', 'config': {}}
+        service = ScanService(self.config_data)
+        
+        service.run()
+        service.run()
+        
+        self.assertIs(service.tracker.store, service.store)
+        self.assertEqual([scan['resources'] for scan in service.store.scans()], [1, 1])
+        self.assertEqual(service.store.resources(), {'s3': [{'name': 'logs', 'encryption': None}]})
+    
+    def test_failed_run_recorded(self):
+        """Test a failing scan is reported in the run status."""
+        self.scanner.scan_resources.side_effect = RuntimeError('throttled')
+        service = ScanService(self.config_data)
+        
+        with self.assertRaises(RuntimeError):
+            service.run()
+        
+        self.assertEqual(service.last_run['status'], 'failed')
+        self.assertEqual(service.last_run['error'], 'throttled')
+
+class TestDocumentationDaemon(unittest.TestCase):
+    """Test cases for DocumentationDaemon."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = MagicMock()
+        self.service.last_run = None
+        self.service.resources = None
+        self.service.compliance_results = None
+        
+        def run():
+            self.service.last_run = {'status': 'succeeded', 'resource_counts': {'s3': 1}}
+            self.service.resources = {'s3': [{'name': 'logs'}]}
+            return self.service.last_run
+        self.service.run.side_effect = run
+        
+        self.daemon = DocumentationDaemon(self.service, interval=0, port=0)
+        self.daemon.start()
+        self.addCleanup(self.daemon.stop)
+        self.base_url = 'http://%s:%d' % self.daemon.address
+    
+    def request(self, path, method='GET'):
+        """Make an API request, returning (status, JSON body)."""
+        try:
+            with urlopen(Request(self.base_url + path, method=method)) as response:
+                return response.status, json.load(response)
+        except HTTPError as e:
+            return e.code, json.load(e)
+    
+    def wait_for_runs(self, count):
+        """Wait until the service has run count times."""
+        for _ in range(100):
+            if self.service.run.call_count >= count:
+                return
+            time.sleep(0.02)
+        self.fail(f"Expected {count} runs, got {self.service.run.call_count}")
+    
+    def test_initial_run_and_results(self):
+        """Test the daemon scans on start and serves the results."""
+        self.wait_for_runs(1)
+        
+        self.assertEqual(self.request('/status'), (200, {'status': 'succeeded', 'resource_counts': {'s3': 1}}))
+        self.assertEqual(self.request('/resources'), (200, {'s3': [{'name': 'logs'}]}))
+        self.assertEqual(self.request('/compliance')[0], 404)
+        self.assertEqual(self.request('/unknown')[0], 404)
+    
+    def test_post_scan_triggers_run(self):
+        """Test POST /scan starts another run without waiting for the schedule."""
+        self.wait_for_runs(1)
+        
+        self.assertEqual(self.request('/scan', method='POST'), (202, {'status': 'scheduled'}))
+        self.wait_for_runs(2)
+
+if __name__ == '__main__':
+    unittest.main()
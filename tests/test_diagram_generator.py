@@ -0,0 +1,173 @@
+"""Tests for architecture diagram generator."""
+
+import os
+import tempfile
+import unittest
+from xml.dom import minidom
+from unittest.mock import patch
+from src.aws_infra_doc_gen.scanner.aws_scanner import s3_policy_resources
+from src.aws_infra_doc_gen.visualizer.diagram_generator import ArchitectureDiagramGenerator, _fingerprint
+
+class TestArchitectureDiagramGenerator(unittest.TestCase):
+    """Test cases for ArchitectureDiagramGenerator."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.output_dir = tempfile.mkdtemp()
+        self.generator = ArchitectureDiagramGenerator(self.output_dir, bundle_threshold=2)
+        self.resources = {
+            'ec2': [
+                {'id': 'i-1', 'type': 't3.micro', 'security_groups': [{'GroupId': 'sg-db'}]},
+                {'id': 'i-2', 'type': 't3.micro', 'security_groups': [{'GroupId': 'sg-web'}]}
+            ],
+            'rds': [
+                {'identifier': 'db-1', 'engine': 'mysql', 'vpc_security_groups': ['sg-db']}
+            ],
+            's3': [
+                {'name': 'logs-a'},
+                {'name': 'logs-b'},
+                {'name': 'assets'}
+            ],
+            'lambda': [
+                {
+                    'name': 'fn-1',
+                    'runtime': 'python3.9',
+                    'vpc_config': {'SecurityGroupIds': ['sg-db']},
+                    'policy_resources': ['arn:aws:s3:::logs-*/*']
+                }
+            ]
+        }
+    
+    def test_plan_connections_uses_relationships(self):
+        """Test that edges follow security groups and IAM policies only."""
+        edges = self.generator._plan_connections(self.resources)
+        
+        self.assertEqual(edges, [
+            ('ec2:i-1', 'rds:db-1'),
+            ('lambda:fn-1', 'rds:db-1'),
+            ('lambda:fn-1', 's3:logs-a'),
+            ('lambda:fn-1', 's3:logs-b'),
+        ])
+    
+    def test_wildcard_policy_matches_all_buckets(self):
+        """Test that a '*' resource grants access to every bucket."""
+        self.resources['lambda'][0]['policy_resources'] = ['*']
+        edges = self.generator._plan_connections(self.resources)
+        
+        s3_edges = [edge for edge in edges if edge[1].startswith('s3:')]
+        self.assertEqual(len(s3_edges), 3)
+    
+    def test_logs_only_role_has_no_s3_edges(self):
+        """Test a role granting only CloudWatch Logs on '*' links the function to no bucket."""
+        basic_execution = {'Version': '2012-10-17', 'Statement': [{
+            'Effect': 'Allow',
+            'Action': ['logs:CreateLogGroup', 'logs:CreateLogStream', 'logs:PutLogEvents'],
+            'Resource': '*'
+        }]}
+        self.resources['lambda'][0]['policy_resources'] = s3_policy_resources([basic_execution])
+        edges = self.generator._plan_connections(self.resources)
+        
+        self.assertEqual([edge for edge in edges if edge[1].startswith('s3:')], [])
+    
+    def test_not_resource_excludes_buckets(self):
+        """Test a NotResource grant links every bucket but the excluded ones."""
+        self.resources['lambda'][0]['policy_resources'] = [
+            {'NotResource': ['arn:aws:s3:::logs-*', 'arn:aws:s3:::assets/*']}
+        ]
+        edges = self.generator._plan_connections(self.resources)
+        
+        self.assertEqual([edge for edge in edges if edge[1].startswith('s3:')], [('lambda:fn-1', 's3:assets')])
+    
+    def test_bundle_edges_over_threshold(self):
+        """Test that fan-out above the threshold collapses to one bundle."""
+        edges = [('lambda:fn-1', f's3:b{i}') for i in range(3)] + [('ec2:i-1', 'rds:db-1')]
+        clusters = {
+            'lambda:fn-1': 'Subnet a',
+            'ec2:i-1': 'Subnet a',
+            'rds:db-1': 'Subnet b',
+        }
+        clusters.update({f's3:b{i}': 'S3 Buckets' for i in range(3)})
+        
+        individual, bundles = self.generator._bundle_edges(edges, clusters)
+        
+        self.assertEqual(individual, [('ec2:i-1', 'rds:db-1')])
+        self.assertEqual(list(bundles), [('Subnet a', 'S3 Buckets')])
+        self.assertEqual(len(bundles[('Subnet a', 'S3 Buckets')]), 3)
+    
+    def test_tiered_specs_paginate_and_cross_link(self):
+        """Test tiered mode builds linked overview, VPC and subnet pages."""
+        generator = ArchitectureDiagramGenerator(self.output_dir, page_size=1)
+        resources = {
+            'ec2': [
+                {'id': 'i-1', 'type': 't3.micro', 'vpc_id': 'vpc-1', 'subnet_id': 'subnet-1'},
+                {'id': 'i-2', 'type': 't3.micro', 'vpc_id': 'vpc-1', 'subnet_id': 'subnet-1'}
+            ]
+        }
+        
+        specs = generator._build_tiered_specs(resources, 'svg', 'us-east-1')
+        names = [spec['filename'].rsplit('/', 1)[-1] for spec in specs]
+        
+        self.assertEqual(names, ['overview', 'vpc_vpc-1', 'subnet_vpc-1_subnet-1', 'subnet_vpc-1_subnet-1_p2'])
+        self.assertEqual(specs[0]['nodes'][0]['url'], 'vpc_vpc-1.svg')
+        self.assertIn('2 ec2', specs[0]['nodes'][0]['label'])
+        self.assertEqual(specs[1]['cluster_urls']['Subnet subnet-1'], 'subnet_vpc-1_subnet-1.svg')
+        page_links = {node['label']: node['url'] for node in specs[2]['nodes'] if node['kind'] == 'link'}
+        self.assertEqual(page_links, {
+            'VPC vpc-1': 'vpc_vpc-1.svg',
+            'Next page': 'subnet_vpc-1_subnet-1_p2.svg',
+        })
+    
+    @patch('src.aws_infra_doc_gen.visualizer.diagram_generator._render_spec')
+    def test_render_cache_skips_unchanged_topology(self, mock_render):
+        """Test that only diagrams with a changed fingerprint are re-rendered."""
+        mock_render.side_effect = lambda spec: open(f"{spec['filename']}.png", 'w').close()
+        resources = {'s3': [{'name': 'logs-a'}]}
+        
+        self.generator.generate_diagram(resources, 'architecture')
+        self.generator.generate_diagram({'s3': [{'name': 'logs-a'}]}, 'architecture')
+        self.assertEqual(mock_render.call_count, 1)
+        
+        resources['s3'].append({'name': 'logs-b'})
+        self.generator.generate_diagram(resources, 'architecture')
+        self.assertEqual(mock_render.call_count, 2)
+        
+        os.remove(os.path.join(self.output_dir, 'architecture.png'))
+        self.generator.generate_diagram(resources, 'architecture')
+        self.assertEqual(mock_render.call_count, 3)
+    
+    def test_fingerprint_ignores_order(self):
+        """Test that reordered resources produce the same topology fingerprint."""
+        reordered = dict(self.resources, s3=list(reversed(self.resources['s3'])))
+        
+        spec = self.generator._single_spec(self.resources, 'architecture')
+        reordered_spec = self.generator._single_spec(reordered, 'architecture')
+        
+        self.assertEqual(_fingerprint(spec), _fingerprint(reordered_spec))
+    
+    def test_native_backend_writes_svg_and_dot(self):
+        """Test the native backend renders without the Diagrams library."""
+        generator = ArchitectureDiagramGenerator(self.output_dir, backend='native', use_cache=False)
+        self.resources['ec2'][0].update({'vpc_id': 'vpc-1', 'subnet_id': 'subnet-1'})
+        self.resources['rds'][0].update({'vpc_id': 'vpc-1', 'subnet_ids': ['subnet-2']})
+        
+        svg_path, = generator._render_specs([generator._single_spec(self.resources, 'architecture.svg')])
+        dot_path, = generator._render_specs([generator._single_spec(self.resources, 'architecture.dot')])
+        
+        document = minidom.parse(svg_path)
+        self.assertEqual(len(document.getElementsByTagName('line')), 1)
+        with open(dot_path) as f:
+            dot = f.read()
+        self.assertIn('subgraph "cluster_VPC vpc-1"', dot)
+        self.assertIn('label="i-1\\nt3.micro"', dot)
+    
+    def test_auto_backend_switches_on_size(self):
+        """Test that 'auto' uses the native backend for large SVG diagrams only."""
+        generator = ArchitectureDiagramGenerator(self.output_dir, native_threshold=2)
+        spec = generator._single_spec(self.resources, 'architecture.svg')
+        
+        self.assertEqual(generator._select_backend(spec), 'native')
+        spec['outformat'] = 'png'
+        self.assertEqual(generator._select_backend(spec), 'diagrams')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+"""Tests for distributed scanning."""
+
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from src.aws_infra_doc_gen.distributed.coordinator import (
+    RESULTS, TASKS, Coordinator, ResultMerger, ScanWorker
+)
+from src.aws_infra_doc_gen.distributed.work_queue import LocalQueue, RedisQueue, create_queue
+
+def instance_factory(instance_ids):
+    """Client factory whose EC2 listing returns the given instances in every region."""
+    client = MagicMock()
+    client.get_paginator.return_value.paginate.return_value = [{'Reservations': [{'Instances': [
+        {'InstanceId': instance_id, 'InstanceType': 't3.micro', 'State': {'Name': 'running'},
+         'LaunchTime': datetime(2024, 3, 1, tzinfo=timezone.utc)}
+        for instance_id in instance_ids
+    ]}]}]
+    factory = MagicMock()
+    factory.client.return_value = client
+    return factory
+
+class TestLocalQueue(unittest.TestCase):
+    """Test cases for LocalQueue."""
+    
+    def test_acknowledged_messages_are_gone(self):
+        """Test messages are delivered in order and removed once acknowledged."""
+        queue = LocalQueue()
+        queue.put('q', {'n': 1})
+        queue.put('q', {'n': 2})
+        
+        receipt, message = queue.get('q', timeout=0.1)
+        queue.ack('q', receipt)
+        
+        self.assertEqual(message, {'n': 1})
+        self.assertEqual(queue.get('q', timeout=0.1)[1], {'n': 2})
+        self.assertIsNone(queue.get('other', timeout=0.05))
+    
+    def test_unacknowledged_messages_are_redelivered(self):
+        """Test a message is delivered again after its visibility timeout."""
+        queue = LocalQueue(visibility_timeout=0.05)
+        queue.put('q', {'unit_id': 'u1'})
+        
+        first = queue.get('q', timeout=0.1)
+        self.assertEqual(queue.pending('q'), 1)
+        second = queue.get('q', timeout=1)
+        
+        self.assertEqual(second[1], first[1])
+        self.assertNotEqual(second[0], first[0])
+    
+    def test_create_queue(self):
+        """Test the configured backend is created."""
+        self.assertIsInstance(create_queue(None), LocalQueue)
+        self.assertEqual(create_queue({'type': 'local', 'visibility_timeout': 5}).visibility_timeout, 5)
+        with self.assertRaises(ValueError):
+            create_queue({'type': 'sqs'})
+
+class TestRedisQueue(unittest.TestCase):
+    """Test cases for RedisQueue."""
+    
+    def test_expired_lease_requeues_message(self):
+        """Test a consumer finding an expired lease moves the message back to the queue."""
+        client = MagicMock()
+        client.zrangebyscore.return_value = ['{"unit_id": "u1"}']
+        client.zrem.return_value = 1
+        client.lrem.return_value = 1
+        client.brpoplpush.return_value = None
+        queue = RedisQueue(client=client, prefix='p')
+        
+        self.assertIsNone(queue.get('tasks', timeout=0.5))
+        
+        client.rpush.assert_called_once_with('p:tasks', '{"unit_id": "u1"}')
+        client.brpoplpush.assert_called_once_with('p:tasks', 'p:tasks:processing', 1)
+
+class TestResultMerger(unittest.TestCase):
+    """Test cases for ResultMerger."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.units = [
+            {'unit_id': f"s:-:{region}:ec2", 'account_id': None, 'region': region, 'resource_type': 'ec2'}
+            for region in ['us-east-1', 'eu-west-1']
+        ]
+        self.merger = ResultMerger(self.units)
+    
+    def test_retried_units_merge_once(self):
+        """Test duplicate results of a unit, and of a resource, are merged once."""
+        result = {'unit_id': 's:-:us-east-1:ec2', 'resources': [{'id': 'i-1'}, {'id': 'i-1'}]}
+        
+        self.assertTrue(self.merger.add(dict(result)))
+        self.assertFalse(self.merger.add(dict(result, resources=[{'id': 'i-2'}])))
+        self.assertFalse(self.merger.add({'unit_id': 'other:-:us-east-1:ec2', 'resources': [{'id': 'i-3'}]}))
+        self.assertTrue(self.merger.add({'unit_id': 's:-:eu-west-1:ec2', 'resources': [{'id': 'i-1'}]}))
+        
+        self.assertEqual(self.merger.pending, [])
+        self.assertEqual(self.merger.merged(['ec2'], tag_region=True), {'ec2': [
+            {'id': 'i-1', 'region': 'us-east-1'},
+            {'id': 'i-1', 'region': 'eu-west-1'},
+        ]})
+        self.assertEqual(self.merger.duplicates, 2)
+    
+    def test_buckets_tagged_with_location(self):
+        """Test buckets of the first-region S3 unit are tagged with their own region."""
+        merger = ResultMerger([{'unit_id': 's:-:us-east-1:s3', 'account_id': None, 'region': 'us-east-1',
+                                'resource_type': 's3'}])
+        merger.add({'unit_id': 's:-:us-east-1:s3', 'resources': [
+            {'name': 'logs', 'location': None}, {'name': 'eu', 'location': 'eu-west-1'}
+        ]})
+        buckets = merger.merged(['s3'], tag_region=True)['s3']
+        
+        self.assertEqual([(bucket['name'], bucket['region']) for bucket in buckets],
+                         [('logs', 'us-east-1'), ('eu', 'eu-west-1')])
+    
+    def test_errors_are_listed(self):
+        """Test failed units are reported with their location."""
+        self.merger.add({'unit_id': 's:-:eu-west-1:ec2', 'error': 'AccessDenied'})
+        self.merger.fail('s:-:us-east-1:ec2', 'no result after 3 attempts')
+        
+        self.assertEqual([(error['region'], error['error']) for error in self.merger.error_list()],
+                         [('eu-west-1', 'AccessDenied'), ('us-east-1', 'no result after 3 attempts')])
+
+class TestCoordinator(unittest.TestCase):
+    """Test cases for Coordinator and ScanWorker."""
+    
+    def test_local_workers_scan_every_unit(self):
+        """Test units published to the queue are scanned by the workers and merged."""
+        queue = LocalQueue()
+        workers = [ScanWorker(queue, client_factory=instance_factory(['i-1', 'i-2']), worker_id=f"w{i}")
+                   for i in range(3)]
+        coordinator = Coordinator(queue, ['us-east-1', 'eu-west-1', 'ap-south-1'], poll_interval=0.05,
+                                  local_workers=workers)
+        
+        resources = coordinator.scan_resources(['ec2'])
+        
+        self.assertEqual([(instance['id'], instance['region']) for instance in resources['ec2']], [
+            ('i-1', 'us-east-1'), ('i-2', 'us-east-1'),
+            ('i-1', 'eu-west-1'), ('i-2', 'eu-west-1'),
+            ('i-1', 'ap-south-1'), ('i-2', 'ap-south-1'),
+        ])
+        self.assertEqual(resources['ec2'][0]['launch_time'], '2024-03-01T00:00:00+00:00')
+        self.assertEqual(sum(worker.processed for worker in workers), 3)
+        self.assertEqual(coordinator.errors, [])
+        self.assertEqual(queue.pending(TASKS), 0)
+    
+    def test_late_unit_is_republished_and_merged_once(self):
+        """Test a unit whose worker stalls is published again to another worker and merged once."""
+        queue = LocalQueue()
+        worker = ScanWorker(queue, client_factory=instance_factory(['i-1']), worker_id='w')
+        
+        def stalled_worker():
+            # Takes the first delivery and answers only after the retry
+            receipt, unit = queue.get(TASKS, timeout=1)
+            time.sleep(0.3)
+            queue.put(RESULTS, worker.process(unit))
+            queue.ack(TASKS, receipt)
+        
+        def second_worker():
+            time.sleep(0.2)
+            delivery = queue.get(TASKS, timeout=1)
+            queue.put(RESULTS, worker.process(delivery[1]))
+            queue.ack(TASKS, delivery[0])
+        
+        threads = [threading.Thread(target=stalled_worker), threading.Thread(target=second_worker)]
+        for thread in threads:
+            thread.start()
+        coordinator = Coordinator(queue, ['us-east-1'], unit_timeout=0.1, poll_interval=0.02)
+        resources = coordinator.scan_resources(['ec2'])
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(resources, {'ec2': [resources['ec2'][0]]})
+        self.assertEqual(resources['ec2'][0]['id'], 'i-1')
+        self.assertEqual(coordinator.errors, [])
+    
+    def test_unit_without_workers_fails_after_attempts(self):
+        """Test a unit no worker answers is reported after max_attempts publications."""
+        queue = LocalQueue()
+        coordinator = Coordinator(queue, ['us-east-1'], unit_timeout=0.02, max_attempts=2, poll_interval=0.01)
+        
+        resources = coordinator.scan_resources(['ec2'])
+        
+        self.assertEqual(resources, {'ec2': []})
+        self.assertEqual(coordinator.errors, [{'account_id': None, 'region': 'us-east-1', 'resource_type': 'ec2',
+                                               'error': 'no result after 2 attempts'}])
+        self.assertEqual(queue.pending(TASKS), 2)
+    
+    def test_units_of_other_accounts_carry_their_role(self):
+        """Test accounts become units with the role the worker assumes."""
+        coordinator = Coordinator(LocalQueue(), ['us-east-1', 'eu-west-1'],
+                                  accounts=['arn:aws:iam::111111111111:role/InventoryReader'])
+        
+        units = coordinator.units('scan', ['s3', 'ec2'])
+        
+        self.assertEqual([(unit['unit_id'], unit['role_arn']) for unit in units], [
+            ('scan:111111111111:us-east-1:s3', 'arn:aws:iam::111111111111:role/InventoryReader'),
+            ('scan:111111111111:us-east-1:ec2', 'arn:aws:iam::111111111111:role/InventoryReader'),
+            ('scan:111111111111:eu-west-1:ec2', 'arn:aws:iam::111111111111:role/InventoryReader'),
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+"""Tests for documentation generator."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+from jinja2.utils import htmlsafe_json_dumps
+from src.aws_infra_doc_gen.documentation.doc_generator import (
+    DocumentationGenerator, datetime_converter, resource_json
+)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+class TestDocumentationGenerator(unittest.TestCase):
+    """Test cases for DocumentationGenerator."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.output_dir = tempfile.mkdtemp()
+        self.generator = DocumentationGenerator(self.output_dir, TEMPLATE_DIR)
+        self.resources = {
+            'ec2': [
+                {
+                    'id': 'i-1234567890',
+                    'type': 't3.micro',
+                    'vpc_id': 'vpc-123456',
+                    'subnet_id': 'subnet-123456',
+                    'tags': [{'Key': 'Name', 'Value': 'web'}]
+                }
+            ],
+            's3': [
+                {'name': 'test-bucket', 'encryption': None}
+            ]
+        }
+    
+    def test_generate_markdown_and_html(self):
+        """Test markdown and HTML output."""
+        self.generator.generate_documentation(self.resources, ['markdown', 'html'])
+        
+        with open(os.path.join(self.output_dir, 'documentation.md')) as f:
+            self.assertIn('#### i-1234567890', f.read())
+        with open(os.path.join(self.output_dir, 'documentation.html')) as f:
+            html = f.read()
+        self.assertIn('<!DOCTYPE html>', html)
+        self.assertIn('test-bucket', html)
+    
+    @patch.object(DocumentationGenerator, '_save_pdf')
+    def test_pdf_rendered_from_streamed_html(self, mock_save_pdf):
+        """Test that the PDF is rendered from the HTML file written in the same pass."""
+        self.generator.generate_documentation(self.resources, ['html', 'pdf'])
+        
+        html_path = os.path.join(self.output_dir, 'documentation.html')
+        args = mock_save_pdf.call_args[0]
+        self.assertEqual(args[:2], (html_path, os.path.join(self.output_dir, 'documentation.pdf')))
+        self.assertIsInstance(args[2], ProcessPoolExecutor)
+        with open(html_path) as f:
+            html = f.read()
+        self.assertIn('<!DOCTYPE html>', html)
+        self.assertIn('i-1234567890', html)
+    
+    def test_pdf_job_joined_before_returning(self):
+        """Test that a PDF-only run waits for the PDF job, then removes the temporary HTML."""
+        job = Future()
+        timer = threading.Timer(0.1, job.set_result, [None])
+        with patch.object(DocumentationGenerator, '_save_pdf', return_value=job):
+            timer.start()
+            self.generator.generate_documentation(self.resources, ['pdf'])
+        
+        self.assertTrue(job.done())
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'documentation.html.tmp')))
+    
+    def test_sections_split_at_headings_outside_code(self):
+        """Test that streamed chunks regroup into heading sections."""
+        chunks = ['# Title\nintro\n## A', '\n```\n# not a heading\n```\n', '## B\nend']
+        
+        sections = list(self.generator._sections(iter(chunks)))
+        
+        self.assertEqual(sections, [
+            '# Title\nintro\n',
+            '## A\n```\n# not a heading\n```\n',
+            '## B\nend'
+        ])
+        self.assertEqual(''.join(sections), ''.join(chunks))
+    
+    def test_resource_json_matches_tojson(self):
+        """Test the fast serializer emits what tojson(indent=2) did."""
+        value = {
+            'b': [1, 2.5, True, None, {}, []],
+            'a': {'name': "<O'Brien & co>", 'unicode': 'caf\u00e9', 'nested': [{'z': 1, 'y': 'x'}]},
+            'c': (),
+        }
+        
+        self.assertEqual(resource_json(value), htmlsafe_json_dumps(value, indent=2, sort_keys=True))
+    
+    def test_template_bytecode_cache(self):
+        """Test compiled templates are cached under the output directory."""
+        self.generator.generate_documentation(self.resources, ['markdown'])
+        
+        self.assertTrue(os.listdir(os.path.join(self.output_dir, '.template_cache')))
+    
+    def test_sharded_documentation_pages(self):
+        """Test sharded mode writes an index plus paged per-type documents."""
+        generator = DocumentationGenerator(self.output_dir, TEMPLATE_DIR, page_size=1, max_workers=1)
+        self.resources['ec2'].append({'id': 'i-0987654321', 'type': 't3.micro'})
+        
+        pages = generator.generate_sharded_documentation(self.resources, ['markdown', 'html'])
+        
+        self.assertEqual(pages, ['index', 'ec2_p1', 'ec2_p2', 's3_p1'])
+        with open(os.path.join(self.output_dir, 'docs', 'index.md')) as f:
+            index = f.read()
+        self.assertIn('[Page 2](ec2_p2.md): i-0987654321', index)
+        with open(os.path.join(self.output_dir, 'docs', 'ec2_p2.md')) as f:
+            page = f.read()
+        self.assertIn('#### i-0987654321', page)
+        self.assertNotIn('i-1234567890', page)
+        with open(os.path.join(self.output_dir, 'docs', 'ec2_p1.html')) as f:
+            html = f.read()
+        self.assertIn('href="ec2_p2.html"', html)
+        self.assertIn('id="search-input"', html)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'docs', 'search', 'keys.js')))
+    
+    def test_incremental_regeneration_only_rewrites_changed_pages(self):
+        """Test that unchanged pages keep their files and mtimes."""
+        generator = DocumentationGenerator(self.output_dir, TEMPLATE_DIR, max_workers=1)
+        docs_dir = os.path.join(self.output_dir, 'docs')
+        generator.generate_sharded_documentation(self.resources, ['markdown'])
+        for name in ['index.md', 'ec2_p1.md', 's3_p1.md']:
+            os.utime(os.path.join(docs_dir, name), (0, 0))
+        
+        self.resources['s3'][0]['encryption'] = {'Rules': []}
+        generator.generate_sharded_documentation(self.resources, ['markdown'])
+        
+        self.assertEqual(os.path.getmtime(os.path.join(docs_dir, 'index.md')), 0)
+        self.assertEqual(os.path.getmtime(os.path.join(docs_dir, 'ec2_p1.md')), 0)
+        self.assertNotEqual(os.path.getmtime(os.path.join(docs_dir, 's3_p1.md')), 0)
+    
+    def test_unchanged_documentation_is_not_rewritten(self):
+        """Test that single-document mode skips unchanged inventories."""
+        self.generator.generate_documentation(self.resources, ['markdown'])
+        path = os.path.join(self.output_dir, 'documentation.md')
+        os.utime(path, (0, 0))
+        
+        self.generator.generate_documentation(self.resources, ['markdown'])
+        self.assertEqual(os.path.getmtime(path), 0)
+        
+        self.generator.generate_documentation(self.resources, ['markdown', 'html'])
+        self.assertNotEqual(os.path.getmtime(path), 0)
+    
+    def test_fingerprint_hashes_streamed_encoding(self):
+        """Test the streamed fingerprint equals the hash of the one-shot JSON, so manifests stay valid."""
+        inputs = {'ec2': [dict(self.resources['ec2'][0], launch_time=datetime(2024, 3, 1))] * 5000}
+        
+        fingerprint = self.generator._fingerprint(inputs)
+        
+        payload = json.dumps({'templates': self.generator._template_hash, 'inputs': inputs},
+                             sort_keys=True, default=datetime_converter)
+        self.assertEqual(fingerprint, hashlib.sha256(payload.encode('utf-8')).hexdigest())
+
+if __name__ == '__main__':
+    unittest.main()
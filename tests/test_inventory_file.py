@@ -0,0 +1,126 @@
+"""Tests for the indexed inventory file."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from src.aws_infra_doc_gen.inventory.inventory_file import (
+    InventoryFile, write_inventory, json_to_inventory, inventory_to_json, load_resources, is_inventory_file
+)
+from src.aws_infra_doc_gen.records.resource_records import compact_inventory
+
+class TestInventoryFile(unittest.TestCase):
+    """Test cases for InventoryFile."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.path = os.path.join(self.workdir, 'scan_results.inv')
+        self.resources = {
+            'ec2': [
+                {'id': 'i-1', 'type': 't3.micro', 'tags': [{'Key': 'Name', 'Value': 'web'}]},
+                {'id': 'i-2', 'type': 't3.large', 'tags': []},
+            ],
+            's3': [{'name': 'logs', 'encryption': None}, {'name': 'shared', 'encryption': 'AES256'}],
+            'lambda': [{'name': 'shared', 'runtime': 'python3.12'}],
+            'rds': [],
+        }
+        write_inventory(self.resources, self.path)
+    
+    def test_load_round_trips_all_types(self):
+        """Test loading the whole file gives back the written resources."""
+        with InventoryFile(self.path) as inventory:
+            self.assertEqual(inventory.load(), self.resources)
+            self.assertEqual(inventory.types(), ['ec2', 's3', 'lambda', 'rds'])
+            self.assertEqual(inventory.counts(), {'ec2': 2, 's3': 2, 'lambda': 1, 'rds': 0})
+    
+    def test_load_selected_types(self):
+        """Test only the requested types are decoded, skipping unknown ones."""
+        with InventoryFile(self.path) as inventory, patch('json.loads', wraps=json.loads) as loads:
+            resources = inventory.load(['s3', 'vpc'])
+        
+        self.assertEqual(resources, {'s3': self.resources['s3']})
+        self.assertEqual(loads.call_count, 1)
+    
+    def test_get_by_id_decodes_one_resource(self):
+        """Test looking up a resource by id decodes only that resource."""
+        with InventoryFile(self.path) as inventory, patch('json.loads', wraps=json.loads) as loads:
+            instance = inventory.get('i-2')
+            missing = inventory.get('i-3', default='none')
+        
+        self.assertEqual(instance, self.resources['ec2'][1])
+        self.assertEqual(missing, 'none')
+        self.assertEqual(loads.call_count, 1)
+    
+    def test_ids_shared_across_types(self):
+        """Test ids used by several types are told apart by type."""
+        with InventoryFile(self.path) as inventory:
+            found = inventory.find('shared')
+            function = inventory.get('shared', resource_type='lambda')
+        
+        self.assertEqual(sorted(resource_type for resource_type, _ in found), ['lambda', 's3'])
+        self.assertEqual(function, self.resources['lambda'][0])
+    
+    def test_lazy_type_access(self):
+        """Test a type's resources can be indexed, sliced and iterated."""
+        with InventoryFile(self.path) as inventory:
+            instances = inventory['ec2']
+            
+            self.assertEqual(len(instances), 2)
+            self.assertEqual(instances[-1], self.resources['ec2'][1])
+            self.assertEqual(instances[0:1], self.resources['ec2'][:1])
+            self.assertEqual(list(instances), self.resources['ec2'])
+            self.assertIn('s3', inventory)
+            with self.assertRaises(IndexError):
+                instances[2]
+            with self.assertRaises(KeyError):
+                inventory['vpc']
+    
+    def test_rejects_other_files(self):
+        """Test opening a file that is not an inventory file fails clearly."""
+        json_path = os.path.join(self.workdir, 'scan_results.json')
+        with open(json_path, 'w') as f:
+            json.dump(self.resources, f)
+        
+        with self.assertRaises(ValueError):
+            InventoryFile(json_path)
+        self.assertFalse(is_inventory_file(json_path))
+        self.assertTrue(is_inventory_file(self.path))
+    
+    def test_writes_datetimes_and_records(self):
+        """Test datetimes and compact records are written as in scan_results.json."""
+        launched = datetime(2024, 1, 1, 12, 0)
+        resources = compact_inventory({'s3': [{'name': 'logs', 'creation_date': launched}]})
+        write_inventory(resources, self.path)
+        
+        self.assertEqual(
+            load_resources(self.path),
+            {'s3': [{'name': 'logs', 'creation_date': '2024-01-01T12:00:00'}]}
+        )
+
+class TestInventoryConversion(unittest.TestCase):
+    """Test cases for the JSON converters."""
+    
+    def test_json_round_trip(self):
+        """Test converting JSON to an inventory file and back preserves the resources."""
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        resources = {'ec2': [{'id': 'i-1', 'state': 'running'}], 's3': [{'name': 'logs'}]}
+        json_path = os.path.join(workdir, 'scan_results.json')
+        with open(json_path, 'w') as f:
+            json.dump(resources, f)
+        
+        self.assertEqual(json_to_inventory(json_path, os.path.join(workdir, 'scan_results.inv')), 2)
+        self.assertEqual(inventory_to_json(os.path.join(workdir, 'scan_results.inv'),
+                                           os.path.join(workdir, 'converted.json')), 2)
+        
+        with open(os.path.join(workdir, 'converted.json')) as f:
+            self.assertEqual(json.load(f), resources)
+        self.assertEqual(load_resources(json_path, ['s3']), {'s3': [{'name': 'logs'}]})
+
+if __name__ == '__main__':
+    unittest.main()
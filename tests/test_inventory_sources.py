@@ -0,0 +1,212 @@
+"""Tests for the AWS Config and Resource Explorer inventory sources."""
+
+import copy
+import json
+import os
+import re
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from botocore.exceptions import ClientError
+from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner
+from src.aws_infra_doc_gen.scanner.inventory_sources import (
+    ConfigInventorySource, ResourceExplorerSource, create_inventory_source
+)
+from tests.fake_clients import Call, FakeClientFactory
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'inventory_sources.json')
+
+def selected(result, expression):
+    """Whether a recorded query result matches the query's type and region predicates."""
+    item = json.loads(result)
+    types = re.search(r"resourceType IN \(([^)]*)\)", expression).group(1)
+    region = re.search(r"awsRegion = '([^']*)'", expression)
+    return f"'{item['resourceType']}'" in types and (region is None or item['awsRegion'] == region.group(1))
+
+class Recording:
+    """Backend answering paginators and calls from recorded responses."""
+    
+    def __init__(self, recording):
+        self.recording = recording
+    
+    def pages(self, operation, **kwargs):
+        pages = self.recording['pages'][operation]
+        if 'Expression' in kwargs:
+            pages = [dict(page, Results=[result for result in page['Results']
+                                         if selected(result, kwargs['Expression'])])
+                     for page in pages]
+        return pages
+    
+    def respond(self, operation, **params):
+        for exchange in self.recording['calls'].get(operation, []):
+            if exchange['params'] == params:
+                if 'error' in exchange:
+                    raise ClientError({'Error': exchange['error']}, operation)
+                return copy.deepcopy(exchange['response'])
+        raise ClientError({'Error': {'Code': 'NotRecorded', 'Message': str(params)}}, operation)
+
+class TestConfigInventorySource(unittest.TestCase):
+    """Test cases for ConfigInventorySource."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        with open(FIXTURE) as f:
+            self.factory = FakeClientFactory(Recording(json.load(f)))
+        self.scanner = AWSResourceScanner(
+            'us-east-1',
+            client_factory=self.factory,
+            inventory_source=ConfigInventorySource(aggregator='org')
+        )
+    
+    def test_one_query_for_every_type(self):
+        """Test a single aggregator query in the scanner's region covers the requested types."""
+        self.scanner.scan_resources(['ec2', 'rds', 'elb'])
+        
+        queries = self.factory.params('select_aggregate_resource_config')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0]['ConfigurationAggregatorName'], 'org')
+        self.assertIn("resourceType IN ('AWS::EC2::Instance', 'AWS::RDS::DBInstance', "
+                      "'AWS::ElasticLoadBalancingV2::LoadBalancer')", queries[0]['Expression'])
+        self.assertIn("awsRegion = 'us-east-1'", queries[0]['Expression'])
+    
+    def test_records_match_scanner_shapes(self):
+        """Test configuration items become the records the describe calls produce."""
+        resources = self.scanner.scan_resources(['ec2', 'rds', 'security_group', 'subnet', 'elb'])
+        
+        self.assertEqual(resources['ec2'][0], {
+            'id': 'i-0a1', 'type': 't3.micro', 'state': 'running', 'vpc_id': 'vpc-1', 'subnet_id': 'subnet-1',
+            'private_ip': '10.0.1.10', 'public_ip': None,
+            'tags': [{'Key': 'Name', 'Value': 'web-1'}, {'Key': 'Env', 'Value': 'prod'}],
+            'security_groups': [{'GroupName': 'web', 'GroupId': 'sg-1'}],
+            'launch_time': datetime(2024, 3, 1, 10, 0, tzinfo=timezone.utc),
+            'account_id': '111111111111',
+        })
+        rds = resources['rds'][0]
+        self.assertEqual(rds['endpoint']['Port'], 5432)
+        self.assertEqual(rds['subnet_ids'], ['subnet-1', 'subnet-2'])
+        self.assertEqual(rds['storage'], {'type': 'gp3', 'size': 100, 'encrypted': True})
+        self.assertEqual(resources['security_group'][0]['ingress'][0]['IpRanges'], [{'CidrIp': '0.0.0.0/0'}])
+        self.assertEqual(resources['subnet'][0]['name'], 'app-a')
+        self.assertEqual(resources['elb'][0]['subnet_ids'], ['subnet-1', 'subnet-2'])
+        # Nothing Config records needs a detail call
+        self.assertEqual([call.operation for call in self.factory.calls],
+                         ['get_caller_identity', 'select_aggregate_resource_config'])
+    
+    def test_ec2_record_keys_match_describe_scan(self):
+        """Test a Config EC2 record has the keys of a describe_instances record, plus its account."""
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.return_value = [{'Reservations': [{'Instances': [
+            {'InstanceId': 'i-1', 'InstanceType': 't3.micro', 'State': {'Name': 'running'}}
+        ]}]}]
+        factory = MagicMock()
+        factory.client.return_value = client
+        described = AWSResourceScanner('us-east-1', client_factory=factory).scan_resources(['ec2'])
+        
+        queried = self.scanner.scan_resources(['ec2'])
+        
+        self.assertEqual(list(queried['ec2'][0]), list(described['ec2'][0]) + ['account_id'])
+    
+    def test_aggregated_records_carry_their_account(self):
+        """Test records read through an aggregator are tagged with the account that owns them."""
+        resources = self.scanner.scan_resources(['ec2', 's3'])
+        
+        self.assertEqual([(instance['id'], instance['account_id']) for instance in resources['ec2']],
+                         [('i-0a1', '111111111111'), ('i-0b2', '222222222222')])
+        self.assertEqual([(bucket['name'], bucket['account_id']) for bucket in resources['s3']],
+                         [('logs-bucket', '111111111111'), ('partner-bucket', '222222222222'),
+                          ('archive-bucket', '111111111111')])
+    
+    def test_detail_calls_fill_missing_fields_in_own_account(self):
+        """Test fields Config lacks are read only for the scanner's own account."""
+        resources = self.scanner.scan_resources(['s3', 'lambda'])
+        
+        buckets = {bucket['name']: bucket for bucket in resources['s3']}
+        self.assertEqual(
+            buckets['logs-bucket']['encryption']['Rules'][0]['ApplyServerSideEncryptionByDefault'],
+            {'SSEAlgorithm': 'aws:kms'}
+        )
+        self.assertIsNone(buckets['logs-bucket']['location'])
+        self.assertIsNone(buckets['partner-bucket']['encryption'])
+        self.assertEqual(self.factory.params('get_bucket_encryption'),
+                         [{'Bucket': 'logs-bucket'}, {'Bucket': 'archive-bucket'}])
+        
+        function = resources['lambda'][0]
+        self.assertEqual(function['policy_resources'], ['arn:aws:s3:::logs-bucket/*'])
+        self.assertEqual(function['vpc_config']['VpcId'], 'vpc-1')
+    
+    def test_buckets_read_from_every_region(self):
+        """Test buckets are queried without the region predicate and keep their own location."""
+        resources = self.scanner.scan_resources(['ec2', 's3'])
+        
+        queries = [params['Expression'] for params in self.factory.params('select_aggregate_resource_config')]
+        self.assertEqual(len(queries), 2)
+        self.assertIn("resourceType IN ('AWS::EC2::Instance') AND awsRegion = 'us-east-1'", queries[0])
+        self.assertTrue(queries[1].endswith("WHERE resourceType IN ('AWS::S3::Bucket')"))
+        self.assertEqual([(bucket['name'], bucket['location']) for bucket in resources['s3']],
+                         [('logs-bucket', None), ('partner-bucket', None), ('archive-bucket', 'eu-west-1')])
+    
+    def test_uncovered_types_use_scanners(self):
+        """Test types Config does not cover are left to the regular scanners."""
+        source = ConfigInventorySource(aggregator='org', detail_calls=False)
+        
+        resources, remaining = source.collect(self.scanner, ['ecs', 'ec2', 'apigateway'])
+        
+        self.assertEqual(list(resources), ['ec2'])
+        self.assertEqual(remaining, ['ecs', 'apigateway'])
+        self.assertEqual(self.factory.params('get_caller_identity'), [])
+
+class TestResourceExplorerSource(unittest.TestCase):
+    """Test cases for ResourceExplorerSource."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        with open(FIXTURE) as f:
+            self.recording = json.load(f)
+        self.factory = FakeClientFactory(Recording(self.recording))
+        self.scanner = AWSResourceScanner('us-east-1', client_factory=self.factory)
+    
+    def test_skips_types_without_resources(self):
+        """Test only the types Resource Explorer found are left to scan."""
+        source = ResourceExplorerSource(view_arn='arn:view')
+        
+        resources, remaining = source.collect(self.scanner, ['ec2', 'rds', 'vpc', 'lambda', 'custom'])
+        
+        self.assertEqual(resources, {'rds': [], 'vpc': []})
+        self.assertEqual(remaining, ['ec2', 'lambda', 'custom'])
+        self.assertEqual(self.factory.calls, [Call('resource-explorer-2', 'us-east-1', 'search', {
+            'QueryString': 'region:us-east-1', 'ViewArn': 'arn:view', 'PaginationConfig': {'PageSize': 1000}
+        })])
+    
+    def test_global_types_always_scanned(self):
+        """Test S3 is scanned even when no bucket is indexed in the scanner's region."""
+        for page in self.recording['pages']['search']:
+            page['Resources'] = [resource for resource in page['Resources'] if resource['Service'] != 's3']
+        
+        resources, remaining = ResourceExplorerSource().collect(self.scanner, ['s3', 'rds'])
+        
+        self.assertEqual(resources, {'rds': []})
+        self.assertEqual(remaining, ['s3'])
+    
+    def test_incomplete_results_scan_every_type(self):
+        """Test a truncated listing does not skip any type."""
+        self.recording['pages']['search'][0]['Count']['Complete'] = False
+        
+        resources, remaining = ResourceExplorerSource().collect(self.scanner, ['ec2', 'rds'])
+        
+        self.assertEqual(resources, {})
+        self.assertEqual(remaining, ['ec2', 'rds'])
+
+class TestCreateInventorySource(unittest.TestCase):
+    """Test cases for create_inventory_source."""
+    
+    def test_configured_sources(self):
+        """Test each configured type creates its source."""
+        self.assertIsNone(create_inventory_source(None))
+        self.assertIsNone(create_inventory_source({'type': 'api'}))
+        self.assertEqual(create_inventory_source({'type': 'config', 'aggregator': 'org'}).aggregator, 'org')
+        self.assertIsInstance(create_inventory_source({'type': 'resource_explorer'}), ResourceExplorerSource)
+        with self.assertRaises(ValueError):
+            create_inventory_source({'type': 'cloudquery'})
+
+if __name__ == '__main__':
+    unittest.main()
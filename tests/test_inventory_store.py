@@ -0,0 +1,173 @@
+"""Tests for the SQLite inventory store."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import mock_open, patch
+from src.aws_infra_doc_gen.store.inventory_store import InventoryStore
+from src.aws_infra_doc_gen.compliance.compliance_checker import ComplianceChecker
+from src.aws_infra_doc_gen.tracker.change_tracker import ChangeTracker
+
+def make_resources():
+    """Build a small inventory as the scanner returns it."""
+    return {
+        'ec2': [
+            {'id': 'i-1', 'type': 't3.micro', 'state': 'running', 'vpc_id': 'vpc-a', 'subnet_id': 'subnet-1',
+             'tags': [{'Key': 'Owner', 'Value': 'web'}, {'Key': 'Env', 'Value': 'prod'}]},
+            {'id': 'i-2', 'type': 'm5.large', 'state': 'stopped', 'vpc_id': 'vpc-a', 'subnet_id': 'subnet-2',
+             'tags': [{'Key': 'Env', 'Value': 'dev'}]},
+            {'id': 'i-3', 'type': 't3.micro', 'state': 'running', 'vpc_id': 'vpc-b', 'subnet_id': 'subnet-3',
+             'tags': []},
+        ],
+        'rds': [
+            {'identifier': 'db-1', 'vpc_id': 'vpc-a', 'subnet_ids': ['subnet-1', 'subnet-2'],
+             'storage': {'encrypted': True}},
+            {'identifier': 'db-2', 'vpc_id': 'vpc-b', 'subnet_ids': ['subnet-3'], 'storage': {'encrypted': False}},
+            {'identifier': 'db-3', 'vpc_id': 'vpc-b', 'subnet_ids': []},
+        ],
+        's3': [{'name': 'logs', 'encryption': None, 'region': 'eu-west-1'}],
+    }
+
+class TestInventoryStore(unittest.TestCase):
+    """Test cases for InventoryStore."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.store = InventoryStore(os.path.join(self.workdir, 'inventory.db'))
+        self.addCleanup(self.store.close)
+        self.resources = make_resources()
+        self.scan_id = self.store.write_scan(self.resources, region='us-east-1')
+    
+    def ids(self, **filters):
+        """Ids of the resources matching the filters."""
+        return [
+            resource.get('id') or resource.get('identifier') or resource.get('name')
+            for _, resource in self.store.iter_resources(**filters)
+        ]
+    
+    def test_round_trip(self):
+        """Test a scan reads back unchanged and in order."""
+        self.assertEqual(self.store.resources(), self.resources)
+        self.assertEqual(self.store.types(), ['ec2', 'rds', 's3'])
+        self.assertEqual(self.store.scans()[0]['resources'], 7)
+    
+    def test_location_filters(self):
+        """Test filtering by region, VPC and subnet, including multi-subnet resources."""
+        self.assertEqual(self.ids(vpc_id='vpc-a'), ['i-1', 'i-2', 'db-1'])
+        self.assertEqual(self.ids(subnet_id='subnet-2'), ['i-2', 'db-1'])
+        self.assertEqual(self.ids(region='eu-west-1'), ['logs'])
+        self.assertEqual(self.store.count(region='us-east-1'), 6)
+    
+    def test_tag_filters(self):
+        """Test filtering on tags present, with a value, and absent."""
+        self.assertEqual(self.ids(resource_type='ec2', vpc_id='vpc-a', without_tags=['Owner']), ['i-2'])
+        self.assertEqual(self.ids(tags={'Env': 'prod'}), ['i-1'])
+        self.assertEqual(self.ids(tags={'Env': None}), ['i-1', 'i-2'])
+    
+    def test_field_filters(self):
+        """Test filtering on nested fields, treating missing fields as null."""
+        self.assertEqual(
+            self.ids(resource_type='rds', where={'storage.encrypted': ('not_equals', True)}),
+            ['db-2', 'db-3']
+        )
+        self.assertEqual(self.ids(where={'state': 'running', 'type': 't3.micro'}), ['i-1', 'i-3'])
+        self.assertEqual(self.ids(resource_type='s3', where={'encryption': ('exists', None)}), [])
+        self.assertEqual(self.ids(resource_type='ec2', limit=1), ['i-1'])
+        with self.assertRaises(ValueError):
+            self.store.count(where={'state': ('like', 'run%')})
+    
+    def test_changes_between_scans(self):
+        """Test scans are compared by id and content."""
+        changed = make_resources()
+        changed['ec2'][0]['state'] = 'stopped'
+        del changed['ec2'][2]
+        changed['s3'].append({'name': 'assets'})
+        # Key order alone is not a change
+        changed['rds'][0] = dict(reversed(list(changed['rds'][0].items())))
+        new_scan = self.store.write_scan(changed)
+        
+        changes = {
+            (change['type'], change['resource_id']): change
+            for change in self.store.changes(self.scan_id, new_scan)
+        }
+        
+        self.assertEqual(set(changes), {('modified', 'i-1'), ('removed', 'i-3'), ('added', 'assets')})
+        self.assertEqual(changes[('modified', 'i-1')]['new']['state'], 'stopped')
+        self.assertEqual(changes[('removed', 'i-3')]['details'], self.resources['ec2'][2])
+    
+    def test_keeps_recent_scans(self):
+        """Test older scans are pruned beyond keep_scans."""
+        store = InventoryStore(self.store.path, keep_scans=2)
+        self.addCleanup(store.close)
+        store.write_scan(self.resources)
+        latest = store.write_scan({'s3': [{'name': 'logs'}]})
+        
+        self.assertEqual([scan['id'] for scan in store.scans()], [latest - 1, latest])
+        self.assertEqual(store.count(scan_id=self.scan_id), 0)
+        self.assertEqual(store.resources(), {'s3': [{'name': 'logs'}]})
+
+class TestStoreConsumers(unittest.TestCase):
+    """Test cases for compliance and change tracking on the store."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.path = os.path.join(self.workdir, 'inventory.db')
+    
+    def test_compliance_matches_in_memory_check(self):
+        """Test checking the store gives the results of checking the resources."""
+        rules = """
+        ec2:
+          allowed_type:
+            condition: {field: "type", operator: "contains", value: "t3."}
+          owner_tagged:
+            condition: {field: "tags", operator: "exists"}
+        rds:
+          encrypted:
+            severity: high
+            condition: {field: "storage.encrypted", operator: "equals", value: true}
+          scoped:
+            scope: {vpc_id: vpc-b}
+            condition: {field: "multi_az", operator: "not_equals", value: false}
+        s3:
+          encrypted:
+            condition: {field: "encryption", operator: "exists"}
+        """
+        with patch('builtins.open', mock_open(read_data=rules)):
+            checker = ComplianceChecker('dummy_path')
+        store = InventoryStore(self.path)
+        self.addCleanup(store.close)
+        store.write_scan(make_resources())
+        
+        expected = checker.check_compliance(make_resources())
+        results = checker.check_store(store)
+        
+        del expected['timestamp'], results['timestamp']
+        self.assertEqual(results, expected)
+    
+    def test_tracker_compares_stored_scans(self):
+        """Test the tracker's SQLite storage keeps snapshots as scans and compares them."""
+        tracker = ChangeTracker(storage_type='sqlite', path=self.path)
+        self.addCleanup(tracker.store.close)
+        tracker.store.write_scan({'s3': [{'name': 'logs'}]}, timestamp='2024-01-01T00:00:00')
+        tracker.store.write_scan({'s3': [{'name': 'logs'}, {'name': 'assets'}]}, timestamp='2024-02-01T00:00:00')
+        
+        changes = tracker.get_changes('2024-01-15T00:00:00', '2024-02-15T00:00:00')
+        
+        self.assertEqual(changes, [{
+            'type': 'added', 'resource_type': 's3', 'resource_id': 'assets', 'details': {'name': 'assets'}
+        }])
+        with self.assertRaises(LookupError):
+            tracker.get_changes('2023-01-01T00:00:00')
+    
+    def test_tracker_requires_path(self):
+        """Test SQLite storage needs a database."""
+        with self.assertRaises(ValueError):
+            ChangeTracker(storage_type='sqlite')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+"""Tests for multi-account scanning."""
+
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from botocore.exceptions import ClientError
+from src.aws_infra_doc_gen.accounts import multi_account
+from src.aws_infra_doc_gen.accounts.multi_account import (
+    AccountScheduler, AccountUnavailable, MultiAccountScanner, RoleSessions, parse_accounts
+)
+
+ROLE_A = 'arn:aws:iam::111111111111:role/InventoryReader'
+ROLE_B = 'arn:aws:iam::222222222222:role/InventoryReader'
+
+def sts_credentials(expires_in: timedelta):
+    """AssumeRole response expiring after expires_in."""
+    return {'Credentials': {
+        'AccessKeyId': f"AKIA{time.monotonic_ns()}",
+        'SecretAccessKey': 'secret',
+        'SessionToken': 'token',
+        'Expiration': datetime.now(timezone.utc) + expires_in,
+    }}
+
+class TestAccountScheduler(unittest.TestCase):
+    """Test cases for AccountScheduler."""
+    
+    def test_slow_account_does_not_block_others(self):
+        """Test a slow account holds only its share of workers."""
+        finished = []
+        in_flight = {'slow': 0, 'fast': 0}
+        peak = {'slow': 0, 'fast': 0}
+        lock = threading.Lock()
+        
+        def work(unit):
+            with lock:
+                in_flight[unit[0]] += 1
+                peak[unit[0]] = max(peak[unit[0]], in_flight[unit[0]])
+            time.sleep(0.1 if unit[0] == 'slow' else 0.005)
+            with lock:
+                in_flight[unit[0]] -= 1
+                finished.append(unit)
+            return [unit[2]]
+        
+        units = [('slow', 'us-east-1', f"t{i}") for i in range(4)] + \
+                [('fast', 'us-east-1', f"t{i}") for i in range(8)]
+        results, errors = AccountScheduler(max_workers=3, account_concurrency=2).run(units, work)
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 12)
+        self.assertEqual(peak['slow'], 2)
+        last_fast = max(i for i, unit in enumerate(finished) if unit[0] == 'fast')
+        first_slow = min(i for i, unit in enumerate(finished) if unit[0] == 'slow')
+        self.assertLess(last_fast, first_slow)
+    
+    def test_failures_are_isolated(self):
+        """Test a failing unit is reported while the others complete."""
+        def work(unit):
+            if unit == ('a', 'eu-west-1', 'ec2'):
+                raise RuntimeError('throttled')
+            return []
+        
+        units = [(account, region, 'ec2') for account in 'ab' for region in ['us-east-1', 'eu-west-1']]
+        results, errors = AccountScheduler(max_workers=2).run(units, work)
+        
+        self.assertEqual(len(results), 3)
+        self.assertEqual(errors, [
+            {'account_id': 'a', 'region': 'eu-west-1', 'resource_type': 'ec2', 'error': 'throttled'}
+        ])
+    
+    def test_unavailable_account_is_skipped(self):
+        """Test an account whose role cannot be assumed fails all its units at once."""
+        calls = []
+        
+        def work(unit):
+            calls.append(unit)
+            if unit[0] == 'a':
+                raise AccountUnavailable('Cannot assume role')
+            return []
+        
+        units = [(account, 'us-east-1', resource_type) for account in 'ab' for resource_type in ['ec2', 's3', 'rds']]
+        results, errors = AccountScheduler(max_workers=4, account_concurrency=1).run(units, work)
+        
+        self.assertEqual([unit for unit in calls if unit[0] == 'a'], [('a', 'us-east-1', 'ec2')])
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(len(results), 3)
+    
+    def test_timeout_reports_unfinished_units(self):
+        """Test the run returns at the timeout, reporting what did not finish."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        
+        def work(unit):
+            if unit[0] == 'stuck':
+                release.wait(5)
+            return []
+        
+        started = time.monotonic()
+        results, errors = AccountScheduler(max_workers=2, account_concurrency=1, timeout=0.2).run(
+            [('stuck', 'us-east-1', 'ec2'), ('stuck', 'us-east-1', 's3'), ('ok', 'us-east-1', 'ec2')], work
+        )
+        
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(list(results), [('ok', 'us-east-1', 'ec2')])
+        self.assertEqual([(error['resource_type'], error['error']) for error in errors],
+                         [('ec2', 'timed out'), ('s3', 'timed out')])
+
+class TestRoleSessions(unittest.TestCase):
+    """Test cases for RoleSessions."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.sts = MagicMock()
+        base_session = MagicMock()
+        base_session.client.return_value = self.sts
+        self.sessions = RoleSessions(base_session=base_session)
+    
+    def test_role_assumed_once(self):
+        """Test a role's session is cached."""
+        self.sts.assume_role.return_value = sts_credentials(timedelta(hours=1))
+        
+        session = self.sessions.session(ROLE_A, external_id='secret')
+        
+        self.assertIs(self.sessions.session(ROLE_A), session)
+        self.assertEqual(session.get_credentials().get_frozen_credentials().token, 'token')
+        self.sts.assume_role.assert_called_once_with(
+            RoleArn=ROLE_A, RoleSessionName='aws-infra-doc-gen', DurationSeconds=3600, ExternalId='secret'
+        )
+    
+    def test_expiring_credentials_refresh(self):
+        """Test credentials close to expiry are replaced by a new AssumeRole call."""
+        self.sts.assume_role.side_effect = [
+            sts_credentials(timedelta(minutes=1)),
+            sts_credentials(timedelta(hours=1)),
+        ]
+        credentials = self.sessions.session(ROLE_A).get_credentials()
+        first_key = credentials._access_key
+        
+        refreshed_key = credentials.get_frozen_credentials().access_key
+        
+        self.assertNotEqual(refreshed_key, first_key)
+        self.assertEqual(self.sts.assume_role.call_count, 2)
+    
+    def test_failure_is_remembered(self):
+        """Test a denied role raises AccountUnavailable without calling STS again."""
+        self.sts.assume_role.side_effect = ClientError({'Error': {'Code': 'AccessDenied'}}, 'AssumeRole')
+        
+        for _ in range(2):
+            with self.assertRaises(AccountUnavailable):
+                self.sessions.session(ROLE_B)
+        self.assertEqual(self.sts.assume_role.call_count, 1)
+    
+    def test_failure_expires(self):
+        """Test a role is assumed again once its failure is older than failure_ttl."""
+        self.sessions.failure_ttl = 0.05
+        self.sts.assume_role.side_effect = [
+            ClientError({'Error': {'Code': 'Throttling'}}, 'AssumeRole'),
+            sts_credentials(timedelta(hours=1)),
+        ]
+        with self.assertRaises(AccountUnavailable):
+            self.sessions.session(ROLE_B)
+        
+        time.sleep(0.06)
+        
+        self.assertEqual(self.sessions.session(ROLE_B).get_credentials().get_frozen_credentials().token, 'token')
+
+class TestMultiAccountScanner(unittest.TestCase):
+    """Test cases for MultiAccountScanner."""
+    
+    def test_merges_account_tagged_inventory(self):
+        """Test every account and region is scanned and merged in configuration order."""
+        sessions = MagicMock()
+        sessions.session.side_effect = lambda role_arn, external_id=None: role_arn
+        
+        class FakeScanner:
+            def __init__(self, region, client_factory=None, scanner_options=None, session=None):
+                self.region = region
+                self.session = session
+            
+            def scan_resources(self, resource_types):
+                if self.session == ROLE_B and self.region == 'eu-west-1':
+                    raise ClientError({'Error': {'Code': 'UnauthorizedOperation'}}, 'DescribeInstances')
+                return {'ec2': [{'id': f"i-{self.session[13:16]}-{self.region}"}]}
+        
+        with patch.object(multi_account, 'AWSResourceScanner', FakeScanner):
+            scanner = MultiAccountScanner(
+                [ROLE_A, {'role_arn': ROLE_B, 'name': 'payments'}], ['us-east-1', 'eu-west-1'],
+                sessions=sessions, scheduler=AccountScheduler(max_workers=4)
+            )
+            resources = scanner.scan_resources(['ec2'])
+        
+        self.assertEqual(resources, {'ec2': [
+            {'id': 'i-111-us-east-1', 'account_id': '111111111111', 'region': 'us-east-1'},
+            {'id': 'i-111-eu-west-1', 'account_id': '111111111111', 'region': 'eu-west-1'},
+            {'id': 'i-222-us-east-1', 'account_id': '222222222222', 'region': 'us-east-1'},
+        ]})
+        self.assertEqual([(error['account_id'], error['region']) for error in scanner.errors],
+                         [('222222222222', 'eu-west-1')])
+    
+    def test_buckets_listed_once_per_account(self):
+        """Test S3 is scanned in the first region only, each bucket tagged with its location."""
+        sessions = MagicMock()
+        sessions.session.side_effect = lambda role_arn, external_id=None: role_arn
+        scanned = []
+        
+        class FakeScanner:
+            def __init__(self, region, client_factory=None, scanner_options=None, session=None):
+                self.region = region
+            
+            def scan_resources(self, resource_types):
+                scanned.append((self.region, resource_types[0]))
+                if resource_types == ['s3']:
+                    return {'s3': [{'name': 'logs', 'location': None}, {'name': 'eu', 'location': 'eu-west-1'}]}
+                return {resource_types[0]: [{'id': f"i-{self.region}"}]}
+        
+        with patch.object(multi_account, 'AWSResourceScanner', FakeScanner):
+            scanner = MultiAccountScanner([ROLE_A], ['us-east-1', 'eu-west-1'], sessions=sessions,
+                                          scheduler=AccountScheduler(max_workers=2))
+            resources = scanner.scan_resources(['s3', 'ec2'])
+        
+        self.assertEqual([(bucket['name'], bucket['region']) for bucket in resources['s3']],
+                         [('logs', 'us-east-1'), ('eu', 'eu-west-1')])
+        self.assertEqual(len(resources['ec2']), 2)
+        self.assertEqual(sorted(scanned), [('eu-west-1', 'ec2'), ('us-east-1', 'ec2'), ('us-east-1', 's3')])
+    
+    def test_transient_role_failure_retried_next_scan(self):
+        """Test an account whose role failed to assume is tried again on the next scan."""
+        sts = MagicMock()
+        sts.assume_role.side_effect = [
+            ClientError({'Error': {'Code': 'Throttling'}}, 'AssumeRole'),
+            sts_credentials(timedelta(hours=1)),
+        ]
+        base_session = MagicMock()
+        base_session.client.return_value = sts
+        
+        class FakeScanner:
+            def __init__(self, region, client_factory=None, scanner_options=None, session=None):
+                self.region = region
+            
+            def scan_resources(self, resource_types):
+                return {'ec2': [{'id': f"i-{self.region}"}]}
+        
+        with patch.object(multi_account, 'AWSResourceScanner', FakeScanner):
+            scanner = MultiAccountScanner([ROLE_A], ['us-east-1'], sessions=RoleSessions(base_session=base_session),
+                                          scheduler=AccountScheduler(max_workers=1))
+            first = scanner.scan_resources(['ec2'])
+            first_errors = scanner.errors
+            second = scanner.scan_resources(['ec2'])
+        
+        self.assertEqual(first, {'ec2': []})
+        self.assertEqual(len(first_errors), 1)
+        self.assertEqual(second['ec2'], [{'id': 'i-us-east-1', 'account_id': '111111111111', 'region': 'us-east-1'}])
+        self.assertEqual(scanner.errors, [])
+    
+    def test_parse_accounts(self):
+        """Test accounts are read from role ARNs."""
+        self.assertEqual(parse_accounts([ROLE_A, {'role_arn': ROLE_B, 'name': 'payments'}]), [
+            {'account_id': '111111111111', 'role_arn': ROLE_A, 'name': None, 'external_id': None},
+            {'account_id': '222222222222', 'role_arn': ROLE_B, 'name': 'payments', 'external_id': None},
+        ])
+        with self.assertRaises(ValueError):
+            parse_accounts(['InventoryReader'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+"""Tests for compact resource records."""
+
+import json
+import os
+import pickle
+import unittest
+from unittest.mock import mock_open, patch
+from jinja2 import Environment, FileSystemLoader
+from src.aws_infra_doc_gen.records.resource_records import (
+    TagStore, EC2Instance, RDSInstance, compact_inventory
+)
+from src.aws_infra_doc_gen.compliance.compliance_checker import ComplianceChecker
+from src.aws_infra_doc_gen.documentation.doc_generator import resource_json
+from src.aws_infra_doc_gen.service.serialization import datetime_converter
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+def make_instance(number):
+    """Build an EC2 resource as the scanner returns it."""
+    return {
+        'id': f"i-{number}",
+        'type': 't3.micro',
+        'state': 'running',
+        'vpc_id': 'vpc-1',
+        'subnet_id': 'subnet-1',
+        'private_ip': f"10.0.0.{number}",
+        'public_ip': None,
+        'tags': [{'Key': 'Name', 'Value': f"web-{number}"}, {'Key': 'Env', 'Value': 'prod'}],
+        'security_groups': [{'GroupId': 'sg-1', 'GroupName': 'app'}],
+        'launch_time': '2024-01-01T00:00:00+00:00',
+    }
+
+class TestTagStore(unittest.TestCase):
+    """Test cases for TagStore."""
+    
+    def test_round_trips_tags_and_stores_strings_once(self):
+        """Test tags come back unchanged while repeated strings are stored once."""
+        store = TagStore()
+        first = store.add([{'Key': 'Env', 'Value': 'prod'}, {'Key': 'Name', 'Value': 'a'}])
+        second = store.add([{'Key': 'Env', 'Value': 'prod'}])
+        empty = store.add([])
+        
+        self.assertEqual(store.get(first), [{'Key': 'Env', 'Value': 'prod'}, {'Key': 'Name', 'Value': 'a'}])
+        self.assertEqual(store.get(second), [{'Key': 'Env', 'Value': 'prod'}])
+        self.assertEqual(store.get(empty), [])
+        self.assertEqual(sorted(store.strings), ['Env', 'Name', 'a', 'prod'])
+        self.assertEqual(len(store), 3)
+    
+    def test_rows_with_tag(self):
+        """Test finding rows by tag key and value from the columns."""
+        store = TagStore()
+        store.add([{'Key': 'Env', 'Value': 'prod'}])
+        store.add([])
+        store.add([{'Key': 'Name', 'Value': 'b'}, {'Key': 'Env', 'Value': 'dev'}])
+        
+        self.assertEqual(store.rows_with('Env'), [0, 2])
+        self.assertEqual(store.rows_with('Env', 'dev'), [2])
+        self.assertEqual(store.rows_with('Owner'), [])
+
+class TestResourceRecords(unittest.TestCase):
+    """Test cases for the record classes."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.resources = {
+            'ec2': [make_instance(1), make_instance(2)],
+            'rds': [{
+                'identifier': 'db-1', 'class': 'db.t3.micro', 'engine': 'postgres', 'status': 'available',
+                'endpoint': None, 'multi_az': False, 'vpc_security_groups': ['sg-1'], 'vpc_id': 'vpc-1',
+                'subnet_ids': ['subnet-1'], 'storage': {'type': 'gp2', 'size': 20, 'encrypted': True},
+            }],
+            'custom': [{'id': 'x-1'}],
+        }
+        self.records = compact_inventory(self.resources)
+    
+    def test_records_read_like_the_dicts(self):
+        """Test dict-style access, iteration order and equality with the source dicts."""
+        instance = self.records['ec2'][0]
+        
+        self.assertIsInstance(instance, EC2Instance)
+        self.assertEqual(instance['id'], 'i-1')
+        self.assertEqual(instance.get('tags'), self.resources['ec2'][0]['tags'])
+        self.assertIsNone(instance.get('missing'))
+        self.assertEqual(list(instance), list(self.resources['ec2'][0]))
+        self.assertEqual(instance, self.resources['ec2'][0])
+        self.assertEqual(self.records, self.resources)
+        with self.assertRaises(KeyError):
+            instance['missing']
+    
+    def test_keyword_fields(self):
+        """Test fields named like Python keywords are readable by key."""
+        database = self.records['rds'][0]
+        
+        self.assertIsInstance(database, RDSInstance)
+        self.assertEqual(database['class'], 'db.t3.micro')
+        self.assertIn('class', database)
+    
+    def test_missing_fields_are_absent(self):
+        """Test a resource lacking a field gives a record without that key."""
+        partial = make_instance(3)
+        del partial['public_ip']
+        record = EC2Instance.from_dict(partial, TagStore())
+        
+        self.assertNotIn('public_ip', record)
+        self.assertEqual(dict(record), partial)
+    
+    def test_unknown_fields_and_types_stay_dicts(self):
+        """Test resources the records cannot hold are kept as dicts."""
+        extra = dict(make_instance(4), architecture='arm64')
+        records = compact_inventory({'ec2': [extra]})
+        
+        self.assertIs(records['ec2'][0], extra)
+        self.assertIs(self.records['custom'][0], self.resources['custom'][0])
+    
+    def test_repeated_values_are_shared(self):
+        """Test equal strings and nested values become one object."""
+        first, second = self.records['ec2']
+        
+        self.assertIs(first['vpc_id'], second['vpc_id'])
+        self.assertIs(first['security_groups'], second['security_groups'])
+        self.assertFalse(hasattr(first, '__dict__'))
+    
+    def test_serializes_like_the_dicts(self):
+        """Test JSON output of records matches the dicts'."""
+        self.assertEqual(
+            json.dumps(self.records, default=datetime_converter),
+            json.dumps(self.resources)
+        )
+        self.assertEqual(resource_json(self.records['rds'][0]), resource_json(self.resources['rds'][0]))
+    
+    def test_pickles_without_the_tag_store(self):
+        """Test a pickled record carries its own tags only."""
+        restored = pickle.loads(pickle.dumps(self.records['ec2'][1]))
+        
+        self.assertEqual(restored, self.resources['ec2'][1])
+    
+    def test_compliance_reads_nested_fields(self):
+        """Test compliance rules resolve nested fields of records."""
+        rules = """
+        rds:
+          encryption_enabled:
+            condition:
+              field: "storage.encrypted"
+              operator: "equals"
+              value: true
+        """
+        with patch('builtins.open', mock_open(read_data=rules)):
+            checker = ComplianceChecker('dummy_path')
+        
+        results = checker.check_compliance({'rds': self.records['rds']})
+        
+        self.assertEqual(results['summary']['compliant'], 1)
+    
+    def test_templates_render_records_like_dicts(self):
+        """Test the resource template renders a record and its dict identically."""
+        env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+        env.filters['resource_json'] = resource_json
+        template = env.get_template('resource_details.md.j2')
+        
+        self.assertEqual(
+            template.render(resource=self.records['ec2'][0], resource_type='ec2'),
+            template.render(resource=self.resources['ec2'][0], resource_type='ec2')
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@
 
 import unittest
 from unittest.mock import MagicMock, patch
-from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner
+from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner, s3_policy_resources
 
 class TestAWSResourceScanner(unittest.TestCase):
     """Test cases for AWSResourceScanner."""
@@ -144,5 +144,51 @@ class TestAWSResourceScanner(unittest.TestCase):
         self.assertEqual(resources['lambda'][0]['name'], 'test-function')
         self.assertEqual(resources['lambda'][0]['runtime'], 'python3.9')
 
+class TestS3PolicyResources(unittest.TestCase):
+    """Test cases for s3_policy_resources."""
+    
+    def test_only_statements_granting_s3(self):
+        """Test statements are kept only if their actions can grant an S3 operation."""
+        document = {'Statement': [
+            {'Effect': 'Allow', 'Action': 'logs:*', 'Resource': '*'},
+            {'Effect': 'Allow', 'Action': ['s3:GetObject'], 'Resource': ['arn:aws:s3:::data/*']},
+            {'Effect': 'Allow', 'Action': 'S3:List*', 'Resource': 'arn:aws:s3:::data'},
+            {'Effect': 'Allow', 'Action': '*', 'Resource': 'arn:aws:dynamodb:*:*:table/orders'},
+            {'Effect': 'Deny', 'Action': 's3:*', 'Resource': 'arn:aws:s3:::secret'},
+            {'Effect': 'Allow', 'NotAction': 's3:*', 'Resource': '*'},
+            {'Effect': 'Allow', 'NotAction': 'iam:*', 'Resource': 'arn:aws:s3:::shared'},
+        ]}
+        
+        self.assertEqual(s3_policy_resources([document]),
+                         ['arn:aws:s3:::data', 'arn:aws:s3:::data/*', 'arn:aws:s3:::shared'])
+    
+    def test_not_resource(self):
+        """Test NotResource statements keep their exclusions, unless they exclude every bucket."""
+        document = {'Statement': [
+            {'Effect': 'Allow', 'Action': 's3:GetObject', 'NotResource': 'arn:aws:s3:::secret/*'},
+            {'Effect': 'Allow', 'Action': 's3:*', 'NotResource': ['arn:aws:s3:::*']},
+            {'Effect': 'Allow', 'Action': 's3:*', 'NotResource': 'arn:aws:sqs:*:*:queue'},
+        ]}
+        
+        self.assertEqual(s3_policy_resources([document]), ['*', {'NotResource': ['arn:aws:s3:::secret/*']}])
+    
+    def test_role_policy_listings_paginated(self):
+        """Test every page of a role's inline and attached policies is read."""
+        iam = MagicMock()
+        pages = {
+            'list_role_policies': [{'PolicyNames': ['a']}, {'PolicyNames': ['b']}],
+            'list_attached_role_policies': [{'AttachedPolicies': []}],
+        }
+        iam.get_paginator.side_effect = lambda operation: MagicMock(**{'paginate.return_value': pages[operation]})
+        iam.get_role_policy.side_effect = lambda RoleName, PolicyName: {'PolicyDocument': {'Statement': [
+            {'Effect': 'Allow', 'Action': 's3:GetObject', 'Resource': f"arn:aws:s3:::{PolicyName}/*"}
+        ]}}
+        
+        resources = AWSResourceScanner('us-east-1', client_factory=MagicMock())._get_role_policy_resources(
+            iam, 'arn:aws:iam::123456789012:role/app'
+        )
+        
+        self.assertEqual(resources, ['arn:aws:s3:::a/*', 'arn:aws:s3:::b/*'])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
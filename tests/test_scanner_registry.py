@@ -0,0 +1,232 @@
+"""Tests for the scanner plugin registry and the built-in bulk scanners."""
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from botocore.exceptions import ClientError
+from src.aws_infra_doc_gen.scanner import async_scanner, registry
+from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner
+from src.aws_infra_doc_gen.scanner.async_scanner import AsyncAWSResourceScanner
+from src.aws_infra_doc_gen.scanner.registry import (
+    ScannerPlugin, EngineScanner, Paginate, register_scanner, get_scanner, scanner_types
+)
+from tests.fake_clients import Call, FakeClientFactory
+
+# Response key of the items of each paginated operation
+PAGE_KEYS = {
+    'describe_vpcs': 'Vpcs',
+    'describe_load_balancers': 'LoadBalancers',
+    'list_clusters': 'clusterArns',
+    'list_services': 'serviceArns',
+    'list_tables': 'TableNames',
+    'get_rest_apis': 'items',
+}
+
+def cluster_arn(i):
+    """ARN of the i-th fake ECS cluster."""
+    return f"arn:aws:ecs:us-east-1:123456789012:cluster/c{i}"
+
+class CannedAWS:
+    """Backend answering a scan's calls from canned data."""
+    
+    def __init__(self, balancers=0, clusters=0, services_per_cluster=0, tables=()):
+        self.balancers = [
+            {'LoadBalancerName': f"lb-{i}", 'LoadBalancerArn': f"arn:lb/{i}", 'Type': 'application',
+             'VpcId': 'vpc-a', 'AvailabilityZones': [{'SubnetId': 'subnet-1'}, {'SubnetId': 'subnet-2'}]}
+            for i in range(balancers)
+        ]
+        self.clusters = [cluster_arn(i) for i in range(clusters)]
+        self.services_per_cluster = services_per_cluster
+        self.tables = list(tables)
+    
+    def items(self, operation, **kwargs):
+        """Items of a paginated operation."""
+        if operation == 'describe_vpcs':
+            return [{'VpcId': 'vpc-a', 'CidrBlock': '10.0.0.0/16', 'Tags': [{'Key': 'Name', 'Value': 'main'}]}]
+        if operation == 'describe_load_balancers':
+            return self.balancers
+        if operation == 'list_clusters':
+            return self.clusters
+        if operation == 'list_services':
+            return [f"{kwargs['cluster']}/s{i}" for i in range(self.services_per_cluster)]
+        if operation == 'list_tables':
+            return self.tables
+        if operation in ('get_rest_apis', 'get_apis'):
+            return []
+        raise AssertionError(f"Unexpected paginator {operation}")
+    
+    def pages(self, operation, **kwargs):
+        """Pages of a paginated operation, all items on one page."""
+        return [{PAGE_KEYS.get(operation, 'Items'): self.items(operation, **kwargs)}]
+    
+    def respond(self, operation, **kwargs):
+        """Response of a single call."""
+        if operation == 'describe_tags':
+            return {'TagDescriptions': [
+                {'ResourceArn': arn, 'Tags': [{'Key': 'Env', 'Value': 'prod'}]} for arn in kwargs['ResourceArns']
+            ]}
+        if operation == 'describe_clusters':
+            return {'clusters': [
+                {'clusterName': arn.rsplit('/', 1)[-1], 'clusterArn': arn, 'status': 'ACTIVE'}
+                for arn in kwargs['clusters']
+            ]}
+        if operation == 'describe_services':
+            return {'services': [
+                {'serviceName': arn.rsplit('/', 1)[-1], 'serviceArn': arn} for arn in kwargs['services']
+            ]}
+        if operation == 'describe_table':
+            if kwargs['TableName'] == 'locked':
+                raise ClientError({'Error': {'Code': 'AccessDeniedException'}}, operation)
+            return {'Table': {'TableStatus': 'ACTIVE', 'ItemCount': 3}}
+        raise AssertionError(f"Unexpected call {operation}")
+
+class TestRegistry(unittest.TestCase):
+    """Test cases for registering and looking up scanners."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        # Load the built-in plugins before snapshotting the registry
+        scanner_types()
+        patch.dict(registry.SCANNERS).start()
+        self.addCleanup(patch.stopall)
+    
+    def test_built_in_types(self):
+        """Test the built-in types are registered, with the engine methods kept for the detail-heavy ones."""
+        types = scanner_types()
+        
+        for resource_type in ['ec2', 's3', 'rds', 'lambda', 'vpc', 'subnet', 'security_group',
+                              'apigateway', 'dynamodb', 'ecs', 'elb']:
+            self.assertIn(resource_type, types)
+        self.assertIsInstance(get_scanner('s3'), EngineScanner)
+        self.assertEqual(get_scanner('vpc', {'filters': ['f']}).filters, ['f'])
+        self.assertIsNone(get_scanner('unknown'))
+    
+    def test_register_custom_scanner(self):
+        """Test a decorated plugin is picked up by the sync engine."""
+        @register_scanner('queue')
+        class QueueScanner(ScannerPlugin):
+            def scan(self):
+                urls = yield Paginate('sqs', 'list_queues', 'Items', page_size=1000)
+                return [{'name': url} for url in urls]
+        
+        fake = CannedAWS()
+        fake.items = lambda operation, **kwargs: ['q1', 'q2']
+        factory = FakeClientFactory(fake)
+        scanner = AWSResourceScanner('us-east-1', client_factory=factory)
+        
+        self.assertEqual(scanner.scan_resources(['queue']), {'queue': [{'name': 'q1'}, {'name': 'q2'}]})
+        self.assertEqual(factory.calls, [
+            Call('sqs', 'us-east-1', 'list_queues', {'PaginationConfig': {'PageSize': 1000}})
+        ])
+    
+    def test_concurrent_first_load(self):
+        """Test callers arriving during the first load wait for every plugin to be registered."""
+        entered = threading.Event()
+        
+        def slow_entry_points():
+            entered.set()
+            time.sleep(0.1)
+            register_scanner('installed', EngineScanner)
+        
+        found = []
+        with patch.object(registry, '_loaded', False), \
+                patch.object(registry, '_load_entry_points', slow_entry_points):
+            first = threading.Thread(target=lambda: found.append(get_scanner('installed')))
+            first.start()
+            entered.wait(1)
+            found.append(get_scanner('installed'))
+            first.join()
+        
+        self.assertEqual(len(found), 2)
+        self.assertTrue(all(isinstance(plugin, EngineScanner) for plugin in found))
+
+class TestBulkScanners(unittest.TestCase):
+    """Test cases for the built-in plugins on the sync engine."""
+    
+    def scan(self, fake, resource_types, scanner_options=None):
+        """Scan with a sync scanner over fake, recording the calls in self.factory."""
+        self.factory = FakeClientFactory(fake)
+        scanner = AWSResourceScanner('us-east-1', client_factory=self.factory, scanner_options=scanner_options)
+        return scanner.scan_resources(resource_types)
+    
+    def test_vpc_filters_and_page_size(self):
+        """Test configured filters and the maximum page size reach the describe call."""
+        fake = CannedAWS()
+        filters = [{'Name': 'tag:Environment', 'Values': ['prod']}]
+        
+        resources = self.scan(fake, ['vpc'], {'vpc': {'filters': filters}})
+        
+        self.assertEqual(resources['vpc'][0]['name'], 'main')
+        self.assertEqual(self.factory.calls, [
+            Call('ec2', 'us-east-1', 'describe_vpcs', {'Filters': filters, 'PaginationConfig': {'PageSize': 1000}})
+        ])
+    
+    def test_elb_tags_batched(self):
+        """Test load balancer tags are read 20 balancers per call."""
+        fake = CannedAWS(balancers=45)
+        
+        balancers = self.scan(fake, ['elb'])['elb']
+        
+        self.assertEqual(len(balancers), 45)
+        self.assertEqual(self.factory.count('describe_tags'), 3)
+        self.assertEqual(balancers[0]['tags'], [{'Key': 'Env', 'Value': 'prod'}])
+        self.assertEqual(balancers[0]['subnet_ids'], ['subnet-1', 'subnet-2'])
+    
+    def test_ecs_services_batched(self):
+        """Test clusters are described 100 per call and services 10 per call."""
+        fake = CannedAWS(clusters=150, services_per_cluster=25)
+        
+        clusters = self.scan(fake, ['ecs'])['ecs']
+        
+        self.assertEqual(len(clusters), 150)
+        self.assertEqual(self.factory.count('describe_clusters'), 2)
+        self.assertEqual(self.factory.count('list_services'), 150)
+        self.assertEqual(self.factory.count('describe_services'), 150 * 3)
+        self.assertEqual(len(clusters[0]['services']), 25)
+    
+    def test_optional_call_failure(self):
+        """Test a denied optional detail call leaves the resource without details."""
+        fake = CannedAWS(tables=['orders', 'locked'])
+        
+        tables = self.scan(fake, ['dynamodb'])['dynamodb']
+        
+        self.assertEqual([table['name'] for table in tables], ['orders', 'locked'])
+        self.assertEqual(tables[0]['item_count'], 3)
+        self.assertIsNone(tables[1]['status'])
+
+@unittest.skipIf(async_scanner.get_session is None, "aiobotocore is not installed")
+class TestAsyncPlugins(unittest.TestCase):
+    """Test cases for the built-in plugins on the asyncio engine."""
+    
+    def test_batches_run_concurrently(self):
+        """Test a plugin's batch is issued concurrently and matches the sync results."""
+        fake = CannedAWS(clusters=3, services_per_cluster=12)
+        calls = []
+        in_flight = []
+        peak = []
+        
+        async def fake_call(scanner, service, operation, **kwargs):
+            in_flight.append(operation)
+            peak.append(len(in_flight))
+            await async_scanner.asyncio.sleep(0)
+            in_flight.pop()
+            calls.append(operation)
+            return fake.respond(operation, **kwargs)
+        
+        async def fake_paginate(scanner, service, operation, key, **kwargs):
+            calls.append(operation)
+            return fake.items(operation, **kwargs)
+        
+        patch.object(AsyncAWSResourceScanner, '_call', fake_call).start()
+        patch.object(AsyncAWSResourceScanner, '_paginate', fake_paginate).start()
+        self.addCleanup(patch.stopall)
+        
+        clusters = AsyncAWSResourceScanner('us-east-1').scan_resources(['ecs'])['ecs']
+        
+        self.assertEqual([len(cluster['services']) for cluster in clusters], [12, 12, 12])
+        self.assertEqual(calls.count('describe_services'), 6)
+        self.assertEqual(max(peak), 6)
+
+if __name__ == '__main__':
+    unittest.main()
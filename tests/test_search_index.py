@@ -0,0 +1,58 @@
+"""Tests for the documentation search index."""
+
+import base64
+import gzip
+import json
+import os
+import re
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.aws_infra_doc_gen.documentation import search_index
+from src.aws_infra_doc_gen.documentation.search_index import SearchIndex, tokenize, shard_prefixes
+
+def read_shard(search_dir, name):
+    """Decode a shard script back to its JSON data."""
+    with open(os.path.join(search_dir, f"{name}.js")) as f:
+        encoded = re.search(r'"([A-Za-z0-9+/=]+)"\);', f.read()).group(1)
+    return json.loads(gzip.decompress(base64.b64decode(encoded)))
+
+class TestSearchIndex(unittest.TestCase):
+    """Test cases for SearchIndex."""
+    
+    def test_tokenize_keeps_words_and_word_parts(self):
+        """Test ids, addresses and tag values tokenize for prefix search."""
+        self.assertEqual(tokenize('Web-12'), ('web', 'web-12'))
+        self.assertEqual(tokenize('i-0abc123'), ('i-0abc123',))
+        self.assertEqual(tokenize('10.0.1.5'), ('10.0.1.5',))
+    
+    def test_crowded_prefixes_split_into_longer_keys(self):
+        """Test shards split on longer prefixes once they exceed the token limit."""
+        tokens = sorted(['ab', 'aba', 'abb', 'abc', 'b1'])
+        with patch.object(search_index, 'SHARD_TOKENS', 2):
+            shards = shard_prefixes(tokens)
+        
+        self.assertEqual(shards, [
+            ('ab', ['ab']), ('aba', ['aba']), ('abb', ['abb']), ('abc', ['abc']), ('b', ['b1'])
+        ])
+    
+    def test_write_shards_postings_and_documents(self):
+        """Test the written shards resolve a token to its documents."""
+        index = SearchIndex()
+        index.add('ec2', {'id': 'i-1', 'tags': [{'Key': 'Name', 'Value': 'web'}]}, 'i-1', 'ec2_p1')
+        index.add('s3', {'name': 'logs'}, 'logs', 's3_p1')
+        index.add('ec2', {'id': 'i-2', 'private_ip': '10.0.0.2'}, 'i-2', 'ec2_p1')
+        
+        output_dir = tempfile.mkdtemp()
+        index.write(output_dir)
+        search_dir = os.path.join(output_dir, 'search')
+        
+        keys = read_shard(search_dir, 'keys')
+        postings = read_shard(search_dir, f"t_{keys.index('e')}")
+        docs = read_shard(search_dir, 'd_0')
+        
+        self.assertEqual(postings['ec2'], [0, 2])  # delta-encoded ids 0 and 2
+        self.assertEqual(docs[2], ['i-2', 'ec2', 'ec2_p1.html#i-2'])
+
+if __name__ == '__main__':
+    unittest.main()
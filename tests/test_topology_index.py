@@ -0,0 +1,67 @@
+"""Tests for topology index."""
+
+import unittest
+from src.aws_infra_doc_gen.topology.topology_index import TopologyIndex, NO_VPC, NO_SUBNET
+
+class TestTopologyIndex(unittest.TestCase):
+    """Test cases for TopologyIndex."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.resources = {
+            'ec2': [
+                {'id': 'i-1', 'vpc_id': 'vpc-1', 'subnet_id': 'subnet-1'},
+                {'id': 'i-2', 'vpc_id': None, 'subnet_id': None}
+            ],
+            'rds': [
+                {'identifier': 'db-1', 'vpc_id': 'vpc-1', 'subnet_ids': ['subnet-1', 'subnet-2']}
+            ],
+            'lambda': [
+                {'name': 'fn-1', 'vpc_config': {'VpcId': 'vpc-1', 'SubnetIds': ['subnet-2']}},
+                {'name': 'fn-2', 'vpc_config': {'VpcId': '', 'SubnetIds': []}}
+            ],
+            's3': [
+                {'name': 'logs', 'region': 'eu-west-1'}
+            ]
+        }
+        self.index = TopologyIndex(self.resources, 'us-east-1')
+    
+    def test_tree_groups_by_region_vpc_and_subnet(self):
+        """Test the region -> VPC -> subnet -> type grouping."""
+        self.assertEqual(sorted(self.index.regions()), ['eu-west-1', 'us-east-1'])
+        
+        subnets = self.index.subnets('vpc-1', 'us-east-1')
+        self.assertEqual(sorted(subnets), ['subnet-1', 'subnet-2'])
+        self.assertEqual(sorted(subnets['subnet-2']), ['lambda', 'rds'])
+        
+        unplaced = self.index.subnets(NO_VPC, 'us-east-1')[NO_SUBNET]
+        self.assertEqual([r['id'] for r in unplaced['ec2']], ['i-2'])
+        self.assertEqual([r['name'] for r in unplaced['lambda']], ['fn-2'])
+    
+    def test_resources_query_deduplicates(self):
+        """Test that resources spanning several subnets are returned once."""
+        self.assertEqual(len(self.index.resources('rds', vpc_id='vpc-1')), 1)
+        self.assertEqual(len(self.index.resources(vpc_id='vpc-1')), 3)
+        self.assertEqual(self.index.counts(vpc_id='vpc-1'), {'ec2': 1, 'rds': 1, 'lambda': 1})
+        self.assertEqual(self.index.counts(subnet_id='subnet-2'), {'rds': 1, 'lambda': 1})
+    
+    def test_vpcs_merge_regions(self):
+        """Test resources outside any VPC in two regions are all kept when regions are merged."""
+        self.index.add('lambda', {'name': 'fn-eu', 'vpc_config': None, 'region': 'eu-west-1'})
+        
+        unplaced = self.index.vpcs()[NO_VPC][NO_SUBNET]
+        
+        self.assertEqual([r['name'] for r in unplaced['lambda']], ['fn-2', 'fn-eu'])
+        self.assertEqual([r['name'] for r in unplaced['s3']], ['logs'])
+        self.assertEqual([r['id'] for r in unplaced['ec2']], ['i-2'])
+        self.assertEqual([r['name'] for r in self.index.vpcs('us-east-1')[NO_VPC][NO_SUBNET]['lambda']], ['fn-2'])
+    
+    def test_placement(self):
+        """Test first placement lookup."""
+        self.assertEqual(
+            self.index.placement('rds', self.resources['rds'][0]),
+            ('us-east-1', 'vpc-1', 'subnet-1')
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""Tests for the run tracer."""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import mock_open, patch
+import boto3
+from botocore.stub import Stubber
+from src.aws_infra_doc_gen.tracing.tracer import Tracer, NULL_SPAN, get_tracer, instrument_events
+from src.aws_infra_doc_gen.scanner.aws_scanner import AWSResourceScanner
+from src.aws_infra_doc_gen.clients.client_factory import ClientFactory
+from src.aws_infra_doc_gen.compliance.compliance_checker import ComplianceChecker
+
+class TestTracer(unittest.TestCase):
+    """Test cases for Tracer."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tracer = Tracer(enabled=True)
+    
+    def test_disabled_tracer_records_nothing(self):
+        """Test a disabled tracer hands out the no-op span."""
+        tracer = Tracer()
+        with tracer.span('scan.ec2') as span:
+            span.count('resources', 3)
+        tracer.record('aws.ec2.DescribeInstances', 0.0, 1.0)
+        
+        self.assertIs(tracer.span('scan.ec2'), NULL_SPAN)
+        self.assertEqual(tracer.spans, [])
+    
+    def test_summary_aggregates_spans_by_name(self):
+        """Test calls, times and counters are summed per span name."""
+        for count in (2, 3):
+            with self.tracer.span('scan.s3') as span:
+                span.count('resources', count)
+        with self.tracer.span('scan.ec2'):
+            pass
+        
+        summary = self.tracer.summary()
+        
+        self.assertEqual(summary['scan.s3']['calls'], 2)
+        self.assertEqual(summary['scan.s3']['counts'], {'resources': 5})
+        self.assertEqual(summary['scan.ec2']['calls'], 1)
+        self.assertGreaterEqual(summary['scan.s3']['total'], summary['scan.s3']['max'])
+        self.assertIn('resources=5', self.tracer.format_summary())
+    
+    def test_span_records_error(self):
+        """Test a span closed by an exception notes its type."""
+        with self.assertRaises(ValueError):
+            with self.tracer.span('docs.write'):
+                raise ValueError("boom")
+        
+        self.assertEqual(self.tracer.spans[0].attrs['error'], 'ValueError')
+    
+    def test_max_spans_drops_extra_spans(self):
+        """Test spans beyond max_spans are counted, not kept."""
+        tracer = Tracer(enabled=True, max_spans=2)
+        for _ in range(5):
+            with tracer.span('step'):
+                pass
+        
+        self.assertEqual(len(tracer.spans), 2)
+        self.assertEqual(tracer.dropped, 3)
+    
+    def test_chrome_trace_puts_concurrent_tasks_on_separate_tracks(self):
+        """Test the Chrome trace gives each asyncio task its own track."""
+        async def step(name):
+            with self.tracer.span(name):
+                await asyncio.sleep(0.01)
+        
+        async def run():
+            await asyncio.gather(step('scan.s3'), step('scan.lambda'))
+        
+        asyncio.run(run())
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            self.tracer.export_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        
+        spans = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual(sorted(event['name'] for event in spans), ['scan.lambda', 'scan.s3'])
+        self.assertNotEqual(spans[0]['tid'], spans[1]['tid'])
+        self.assertEqual({event['cat'] for event in spans}, {'scan'})
+        self.assertGreater(spans[0]['dur'], 0)
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for the instrumented components."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tracer = get_tracer()
+        self.tracer.reset()
+        self.tracer.enable()
+    
+    def tearDown(self):
+        """Tear down test fixtures."""
+        self.tracer.disable()
+        self.tracer.reset()
+    
+    def test_api_calls_become_spans(self):
+        """Test every API call through an instrumented client is recorded."""
+        client = boto3.client('ec2', region_name='us-east-1', aws_access_key_id='a', aws_secret_access_key='b')
+        instrument_events(client.meta.events)
+        with Stubber(client) as stubber:
+            stubber.add_response('describe_instances', {'Reservations': []})
+            stubber.add_response('describe_instances', {'Reservations': []})
+            client.describe_instances()
+            client.describe_instances()
+        
+        summary = self.tracer.summary()
+        
+        self.assertEqual(summary['aws.ec2.DescribeInstances']['calls'], 2)
+    
+    def test_scanner_traces_each_resource_type(self):
+        """Test each _scan_* method runs in a span counting its resources."""
+        scanner = AWSResourceScanner('us-east-1', client_factory=ClientFactory())
+        with patch.object(scanner, '_scan_ec2', return_value=[{'id': 'i-1'}, {'id': 'i-2'}]), \
+                patch.object(scanner, '_scan_s3', return_value=[]):
+            scanner.scan_resources(['ec2', 's3'])
+        
+        summary = self.tracer.summary()
+        
+        self.assertEqual(summary['scan.ec2']['counts'], {'resources': 2})
+        self.assertEqual(summary['scan.s3']['counts'], {'resources': 0})
+    
+    def test_compliance_traces_each_rule(self):
+        """Test each compliance rule runs in a span counting its violations."""
+        rules = """
+        s3:
+          encryption_enabled:
+            condition:
+              field: "encryption"
+              operator: "exists"
+          named:
+            condition:
+              field: "name"
+              operator: "exists"
+        """
+        with patch('builtins.open', mock_open(read_data=rules)):
+            checker = ComplianceChecker('dummy_path')
+        checker.check_compliance({'s3': [{'name': 'a', 'encryption': None}, {'name': 'b', 'encryption': {}}]})
+        
+        summary = self.tracer.summary()
+        
+        self.assertEqual(summary['compliance.s3.encryption_enabled']['counts'], {'checked': 2, 'violations': 1})
+        self.assertEqual(summary['compliance.s3.named']['counts'], {'checked': 2, 'violations': 0})
+
+if __name__ == '__main__':
+    unittest.main()
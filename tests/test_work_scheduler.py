@@ -0,0 +1,144 @@
+"""Tests for the priority work scheduler and the scheduled scanner."""
+
+import threading
+import unittest
+from botocore.exceptions import ClientError
+from src.aws_infra_doc_gen.scanner.scheduled_scanner import DEFAULT_ESTIMATE, ScheduledScanner
+from src.aws_infra_doc_gen.scanner.work_scheduler import WorkScheduler
+from tests.fake_clients import FakeClientFactory
+
+class RegionData:
+    """Backend answering one region's calls from canned responses."""
+    
+    def __init__(self, responses):
+        self.responses = responses
+    
+    def pages(self, operation, **kwargs):
+        """Items of a listing, two per page, honoring an availability-zone filter."""
+        zones = [f['Values'][0] for f in kwargs.get('Filters', []) if f['Name'] == 'availability-zone']
+        items = [item for item in self.responses[operation]
+                 if not zones or item['Instances'][0]['Placement']['AvailabilityZone'] in zones]
+        key = {'describe_instances': 'Reservations', 'describe_db_instances': 'DBInstances',
+               'list_functions': 'Functions'}[operation]
+        return [{key: items[start:start + 2]} for start in range(0, max(len(items), 1), 2)]
+    
+    def respond(self, operation, **params):
+        response = self.responses[operation]
+        if isinstance(response, Exception):
+            raise response
+        return response(**params) if callable(response) else response
+
+def reservation(instance_id, zone):
+    return {'Instances': [{'InstanceId': instance_id, 'InstanceType': 't3.micro', 'State': {'Name': 'running'},
+                           'Placement': {'AvailabilityZone': zone}}]}
+
+def region_data(instance_ids, zones=('a', 'b')):
+    return RegionData({
+        'describe_availability_zones': {'AvailabilityZones': [{'ZoneName': zone} for zone in zones]},
+        'describe_instances': [reservation(instance_id, zones[i % len(zones)])
+                               for i, instance_id in enumerate(instance_ids)],
+        'describe_db_instances': [],
+        'list_buckets': {'Buckets': [{'Name': 'logs', 'CreationDate': None}, {'Name': 'eu', 'CreationDate': None}]},
+        'get_bucket_encryption': ClientError({'Error': {'Code': 'NotFound'}}, 'GetBucketEncryption'),
+        'get_bucket_location': lambda Bucket: {'LocationConstraint': 'eu-west-1' if Bucket == 'eu' else None},
+    })
+
+class TestWorkScheduler(unittest.TestCase):
+    """Test cases for WorkScheduler."""
+    
+    def test_highest_priority_runs_first(self):
+        """Test queued units run by priority, then in submission order."""
+        order = []
+        gate = threading.Event()
+        with WorkScheduler(max_workers=1) as scheduler:
+            scheduler.submit(gate.wait)
+            for name, priority in [('low', 1), ('high', 5), ('mid', 3), ('high-2', 5)]:
+                scheduler.submit(order.append, name, priority=priority)
+            gate.set()
+        
+        self.assertEqual(order, ['high', 'high-2', 'mid', 'low'])
+        self.assertEqual(scheduler.executed, 5)
+    
+    def test_units_submit_units(self):
+        """Test units may queue further units before the scheduler shuts down."""
+        results = []
+        with WorkScheduler(max_workers=2) as scheduler:
+            def countdown(n):
+                results.append(n)
+                if n:
+                    scheduler.submit(countdown, n - 1)
+            scheduler.submit(countdown, 3)
+            futures = [scheduler.submit(pow, 2, n) for n in range(3)]
+            wait_all = [future.result() for future in futures]
+        
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+        self.assertEqual(wait_all, [1, 2, 4])
+    
+    def test_exceptions_reach_the_future(self):
+        """Test a failing unit's exception is set on its future."""
+        with WorkScheduler(max_workers=1) as scheduler:
+            future = scheduler.submit(int, 'x')
+        
+        with self.assertRaises(ValueError):
+            future.result()
+
+class TestScheduledScanner(unittest.TestCase):
+    """Test cases for ScheduledScanner."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.factory = FakeClientFactory(regions={
+            'us-east-1': region_data([f"i-{n}" for n in range(7)]),
+            'eu-west-1': region_data(['i-eu']),
+        })
+        self.scanner = ScheduledScanner(['us-east-1', 'eu-west-1'], max_workers=4, client_factory=self.factory)
+    
+    def test_scans_every_region(self):
+        """Test results are merged in region order and tagged with their region."""
+        resources = self.scanner.scan_resources(['ec2'])
+        
+        self.assertEqual(sorted(instance['id'] for instance in resources['ec2']),
+                         ['i-0', 'i-1', 'i-2', 'i-3', 'i-4', 'i-5', 'i-6', 'i-eu'])
+        self.assertEqual(resources['ec2'][-1]['region'], 'eu-west-1')
+        self.assertEqual({instance['region'] for instance in resources['ec2'][:-1]}, {'us-east-1'})
+    
+    def test_instances_listed_per_zone(self):
+        """Test EC2 instances are listed by one page chain per availability zone."""
+        self.scanner.scan_resources(['ec2'])
+        
+        listings = [call.params['Filters'][0]['Values'] for call in self.factory.calls
+                    if call.region == 'us-east-1' and call.operation == 'describe_instances']
+        self.assertEqual(sorted(listings), [['a'], ['b']])
+    
+    def test_global_types_scanned_once(self):
+        """Test S3 is listed in the first region only, each bucket tagged with its location."""
+        resources = self.scanner.scan_resources(['s3'])
+        
+        self.assertEqual([(bucket['name'], bucket['region']) for bucket in resources['s3']],
+                         [('logs', 'us-east-1'), ('eu', 'eu-west-1')])
+        self.assertEqual({call.region for call in self.factory.calls if call.operation == 'list_buckets'},
+                         {'us-east-1'})
+        self.assertIsNone(resources['s3'][0]['encryption'])
+    
+    def test_estimates_recorded(self):
+        """Test each job's duration becomes the next run's estimate."""
+        self.assertEqual(self.scanner.estimates, {})
+        
+        self.scanner.scan_resources(['ec2', 'rds'])
+        
+        self.assertEqual(set(self.scanner.estimates),
+                         {(region, resource_type) for region in ['us-east-1', 'eu-west-1']
+                          for resource_type in ['ec2', 'rds']})
+        self.assertTrue(all(0 <= estimate < DEFAULT_ESTIMATE for estimate in self.scanner.estimates.values()))
+    
+    def test_failure_raises(self):
+        """Test a failing job's error is raised once every job has finished."""
+        self.factory.regions['eu-west-1'].responses['describe_availability_zones'] = None
+        self.factory.regions['eu-west-1'].responses['describe_instances'] = None
+        
+        with self.assertRaises(TypeError):
+            self.scanner.scan_resources(['ec2', 'rds'])
+        self.assertIn(('us-east-1', 'ec2'), self.scanner.estimates)
+
+if __name__ == '__main__':
+    unittest.main()